@@ -0,0 +1,115 @@
+"""
+MABOS Agent Context Cache
+
+Versioned read-through cache for assembled agent contexts. Every agent write
+bumps a per-agent version counter in Redis; encoded contexts are cached under
+(agent_id, version, request options) in an in-process L1 tier and in Redis,
+so a cached entry is never served after the agent has changed.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from pydantic import BaseModel
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+
+class AgentContextCacheMetrics(BaseModel):
+    """Agent context cache metrics"""
+    l1_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+    bypassed: int = 0
+    l1_entries: int = 0
+    hit_rate: float = 0.0
+
+
+def options_digest(**options: Any) -> str:
+    """Digest of the request options (order, limits, cursors) that shape a context"""
+    canonical = json.dumps(options, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def make_etag(version: int, digest: str) -> str:
+    """Strong entity tag for a context at an agent version"""
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, exists: bool = True) -> bool:
+    """Check an If-None-Match header value against the current entity tag
+
+    "*" only matches when a current representation exists.
+    """
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return ("*" in candidates and exists) or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def context_cache_key(agent_id: str, version: int, digest: str) -> str:
+    """Redis key of an encoded context"""
+    return f"agent:context:{agent_id}:{version}:{digest}"
+
+
+def agent_version_key(agent_id: str) -> str:
+    """Redis key of the agent version counter"""
+    return f"agent:version:{agent_id}"
+
+
+class AgentContextCache:
+    """In-process LRU tier of encoded agent contexts keyed by agent version"""
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.metrics = AgentContextCacheMetrics()
+        self._entries: "OrderedDict[Tuple[str, int, str], Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, agent_id: str, version: int, digest: str) -> Optional[bytes]:
+        """Get an encoded context from the L1 tier"""
+        key = (agent_id, version, digest)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, body = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return body
+
+    def set(self, agent_id: str, version: int, digest: str, body: bytes) -> None:
+        """Store an encoded context in the L1 tier, evicting the least recently used entries"""
+        key = (agent_id, version, digest)
+        self._entries[key] = (time.monotonic() + self.ttl, body)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record(self, outcome: str) -> None:
+        """Count a cache lookup outcome (l1_hits, redis_hits, misses, not_modified, bypassed)"""
+        setattr(self.metrics, outcome, getattr(self.metrics, outcome) + 1)
+
+    def get_metrics(self) -> AgentContextCacheMetrics:
+        """Get agent context cache metrics"""
+        served = self.metrics.l1_hits + self.metrics.redis_hits + self.metrics.not_modified
+        total = served + self.metrics.misses
+        self.metrics.hit_rate = served / total if total else 0.0
+        self.metrics.l1_entries = len(self._entries)
+        return self.metrics
+
+    def clear(self) -> None:
+        """Drop every L1 entry"""
+        self._entries.clear()
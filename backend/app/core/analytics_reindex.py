@@ -0,0 +1,230 @@
+"""
+MABOS Analytics Reindex
+
+Backfills and reindexes executions, agents and metrics. Documents are read
+in batches from a source index (point-in-time pages) or from Postgres
+(keyset pages), enriched with the vectorized scores of batch_enrichment and
+written through a dedicated bulk indexer, so a backfill neither shares the
+queue of live writes nor pays per-document Python scoring. Documents are
+enriched in Python even when ingest pipelines are installed.
+
+Every document is written under a stable id (its key column, or the _id of
+its source hit), so a rerun overwrites or, in a data stream, skips the
+documents of an earlier run instead of duplicating them.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.batch_enrichment import BATCH_ENRICHERS
+from app.core.bulk_indexer import BulkIndexer
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# Document id field by IndexType value, filled from the source hit _id when missing
+ID_FIELDS = {
+    "executions": "execution_id",
+    "agents": "agent_id",
+    "metrics": "metric_id",
+}
+
+# Keyset-paged Postgres sources by IndexType value, in the document shape of the index_* methods
+POSTGRES_SOURCES = {
+    "executions": """
+        SELECT e.id::text AS execution_id,
+               e.workflow_id::text AS workflow_id,
+               e.organization_id::text AS organization_id,
+               e.triggered_by::text AS triggered_by,
+               e.trigger_type,
+               e.status,
+               e.priority,
+               e.error_message,
+               to_char(e.started_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS started_at,
+               to_char(e.completed_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS completed_at,
+               (e.duration_ms / 1000.0)::float8 AS duration,
+               COUNT(t.id) AS step_count,
+               COUNT(t.id) FILTER (WHERE t.status = 'completed') AS completed_steps
+        FROM workflow_executions e
+        LEFT JOIN task_executions t ON t.workflow_execution_id = e.id
+        WHERE e.id > CAST(:after AS uuid)
+        GROUP BY e.id
+        ORDER BY e.id
+        LIMIT :limit
+    """,
+    "metrics": """
+        SELECT id::text AS metric_id,
+               organization_id::text AS organization_id,
+               metric_type,
+               metric_name,
+               value::float8 AS value,
+               unit,
+               tags,
+               to_char(timestamp AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"') AS timestamp
+        FROM performance_metrics
+        WHERE id > CAST(:after AS uuid)
+        ORDER BY id
+        LIMIT :limit
+    """,
+}
+
+# Key before every UUID, where keyset paging starts
+FIRST_KEY = "00000000-0000-0000-0000-000000000000"
+
+# Key column the Postgres sources are paged by
+POSTGRES_KEYS = {
+    "executions": "execution_id",
+    "metrics": "metric_id",
+}
+
+
+class ReindexMetrics(BaseModel):
+    """Analytics reindex metrics"""
+    runs: int = 0
+    failed_runs: int = 0
+    documents: int = 0
+    batches: int = 0
+    last_docs_per_second: float = 0.0
+    last_enrich_docs_per_second: float = 0.0
+    last_error: Optional[str] = None
+
+
+class AnalyticsReindexer:
+    """Reindexes analytics documents with vectorized batch enrichment"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = ReindexMetrics()
+
+    async def reindex_index(self, index_type: str, source_index: str) -> Dict[str, Any]:
+        """Re-enrich every document of a source index into the index of an IndexType value
+
+        The source must not be the target data stream, which only accepts new documents.
+        """
+        return await self._reindex(index_type, source_index, self._index_batches(index_type, source_index))
+
+    async def reindex_postgres(self, index_type: str) -> Dict[str, Any]:
+        """Backfill the index of an IndexType value from its Postgres table"""
+        if index_type not in POSTGRES_SOURCES:
+            return {"success": False, "error": f"No Postgres source for {index_type}", "timestamp": datetime.utcnow().isoformat()}
+        return await self._reindex(index_type, "postgres", self._postgres_batches(index_type))
+
+    async def _index_batches(self, index_type: str, source_index: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Source documents of an index in batches, with their ids filled in"""
+        # Imported here: the analytics manager module imports app.core.database
+        from app.models.elasticsearch_manager import IndexType, SearchQuery
+
+        id_field = ID_FIELDS[index_type]
+        batch_size = self.config.analytics_reindex_batch_size
+        query = SearchQuery(query="", size=batch_size)
+
+        batch = []
+        async for hit in self.db.elasticsearch_analytics.scan(IndexType(index_type), query, index_name=source_index):
+            document = hit["_source"]
+            document.setdefault(id_field, hit["_id"])
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _postgres_batches(self, index_type: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Rows of a Postgres source in keyset-paged batches"""
+        key = POSTGRES_KEYS[index_type]
+        batch_size = self.config.analytics_reindex_batch_size
+        after = FIRST_KEY
+        while True:
+            rows = await self.db.postgres.execute_query(
+                POSTGRES_SOURCES[index_type], {"after": after, "limit": batch_size}
+            )
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            after = rows[-1][key]
+
+    async def _reindex(
+        self, index_type: str, source: str, batches: AsyncIterator[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Enrich source batches and write them to the target index through _bulk"""
+        analytics = self.db.elasticsearch_analytics
+        if analytics is None or index_type not in BATCH_ENRICHERS:
+            return {"success": False, "error": f"Cannot reindex {index_type}", "timestamp": datetime.utcnow().isoformat()}
+
+        enrich = BATCH_ENRICHERS[index_type]
+        id_field = ID_FIELDS[index_type]
+        target = analytics.index_name(index_type)
+        indexer = BulkIndexer(
+            client=analytics.client,
+            max_docs=self.config.elasticsearch_bulk_max_docs,
+            max_bytes=self.config.elasticsearch_bulk_max_bytes,
+            flush_interval=self.config.elasticsearch_bulk_flush_interval,
+            max_in_flight=self.config.elasticsearch_bulk_max_in_flight,
+            max_pending=2 * self.config.analytics_reindex_batch_size,
+            enqueue_timeout=self.config.analytics_reindex_enqueue_timeout,
+            max_retries=self.config.elasticsearch_bulk_max_retries,
+            retry_base_delay=self.config.elasticsearch_bulk_retry_base_delay,
+            retry_max_delay=self.config.elasticsearch_bulk_retry_max_delay
+        )
+        if analytics.search_cache is not None:
+            indexer.on_indexed = analytics.search_cache.invalidate
+
+        documents = 0
+        batch_count = 0
+        enrich_seconds = 0.0
+        start_time = time.perf_counter()
+        try:
+            async for batch in batches:
+                enrich_start = time.perf_counter()
+                enriched = enrich(batch)
+                enrich_seconds += time.perf_counter() - enrich_start
+
+                for document in enriched:
+                    document, op_type = analytics._prepare_document(target, document)
+                    await indexer.add(target, document, doc_id=document.get(id_field), op_type=op_type)
+                documents += len(enriched)
+                batch_count += 1
+            await indexer.close()
+
+        except Exception as e:
+            await indexer.close()
+            self.metrics.failed_runs += 1
+            self.metrics.last_error = str(e)
+            logger.error(f"Reindex of {index_type} from {source} failed after {documents} documents: {e}")
+            return {"success": False, "error": str(e), "documents": documents, "timestamp": datetime.utcnow().isoformat()}
+
+        elapsed = time.perf_counter() - start_time
+        bulk_metrics = indexer.get_metrics()
+        self.metrics.runs += 1
+        self.metrics.documents += documents
+        self.metrics.batches += batch_count
+        self.metrics.last_docs_per_second = documents / elapsed if elapsed else 0.0
+        self.metrics.last_enrich_docs_per_second = documents / enrich_seconds if enrich_seconds else 0.0
+        logger.info(f"Reindexed {documents} {index_type} documents from {source} into {target}")
+        return {
+            "success": bulk_metrics.failed == 0,
+            "source": source,
+            "target": target,
+            "documents": documents,
+            "indexed": bulk_metrics.indexed,
+            "duplicates": bulk_metrics.duplicates,
+            "failed": bulk_metrics.failed,
+            "batches": batch_count,
+            "docs_per_second": self.metrics.last_docs_per_second,
+            "enrich_docs_per_second": self.metrics.last_enrich_docs_per_second,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def get_metrics(self) -> ReindexMetrics:
+        """Get analytics reindex metrics"""
+        return self.metrics
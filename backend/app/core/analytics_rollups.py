@@ -0,0 +1,522 @@
+"""
+MABOS Analytics Rollups
+
+Pre-aggregated dashboard analytics. A background pass materializes hourly
+rollups of the executions, logs and metrics indices into Redis once an hour
+has closed (plus analytics_rollup_lateness for late documents), and merges
+24 complete hours into a daily rollup. A rollup holds mergeable partial
+aggregates: counts, sums, maxima and per-hour execution counts.
+
+The dashboard then answers the rolled-up part of a time range from daily
+and hourly rollups and only queries raw documents for the edges: the
+partial hour at the start, the live tail after the watermark and any
+bucket whose rollup is missing. Those tail searches share the _msearch of
+the workflow, user and agent sections. Results are cached per time range
+rounded to analytics_dashboard_cache_bucket seconds, until the bucket
+holding the end of the range has closed; results with a failed search are
+not cached.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+# Rolled-up indices and the time field their documents are bucketed by
+ROLLUP_SOURCES = {"executions": "started_at", "logs": "timestamp", "metrics": "timestamp"}
+
+# Dashboard sections still answered by a live search of their entity index
+ENTITY_SECTIONS = ("workflow_analytics", "user_analytics", "agent_analytics")
+
+PERFORMANCE_METRICS = ["cpu_usage", "memory_usage", "response_time"]
+
+WATERMARK_KEY = "analytics:rollup:watermark"
+
+ROLLUP_AGGS = {
+    "executions": {
+        "success": {"filter": {"term": {"success": True}}},
+        "duration_sum": {"sum": {"field": "duration"}},
+        "duration_count": {"value_count": {"field": "duration"}}
+    },
+    "logs": {
+        "errors": {"filter": {"term": {"is_error": True}}},
+        "services": {
+            "terms": {"field": "service", "size": 100},
+            "aggs": {"errors": {"filter": {"term": {"is_error": True}}}}
+        }
+    },
+    "metrics": {
+        "names": {
+            "terms": {"field": "metric_name", "size": len(PERFORMANCE_METRICS)},
+            "aggs": {
+                "count": {"value_count": {"field": "value"}},
+                "sum": {"sum": {"field": "value"}},
+                "max": {"max": {"field": "value"}}
+            }
+        }
+    }
+}
+
+
+def rollup_key(source: str, granularity: str, start: int) -> str:
+    """Redis key of the hourly or daily rollup of a source starting at start"""
+    return f"analytics:rollup:{source}:{granularity}:{start}"
+
+
+def dashboard_cache_key(start: int, end: int) -> str:
+    """Redis key of the cached dashboard for a bucketed time range"""
+    return f"analytics:dashboard:{start}:{end}"
+
+
+def parse_time(value: Any) -> Optional[float]:
+    """Epoch seconds of an ISO timestamp (naive ones are UTC); None for date math and other formats"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def to_iso(epoch: float) -> str:
+    """Naive UTC ISO timestamp, as stored by the index_* methods"""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def floor_to(epoch: float, step: int) -> int:
+    """Start of the step-aligned bucket holding epoch"""
+    return int(math.floor(epoch / step) * step)
+
+
+def ceil_to(epoch: float, step: int) -> int:
+    """Smallest step-aligned boundary not before epoch"""
+    return int(math.ceil(epoch / step) * step)
+
+
+def coalesce_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort ranges and join the adjacent or overlapping ones"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif start < end:
+            merged.append((start, end))
+    return merged
+
+
+def rollup_search(source: str, ranges: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """Search body computing hourly partial aggregates of a source over time ranges"""
+    field = ROLLUP_SOURCES[source]
+    filters: List[Dict[str, Any]] = [{
+        "bool": {
+            "should": [{"range": {field: {"gte": to_iso(start), "lt": to_iso(end)}}} for start, end in ranges],
+            "minimum_should_match": 1
+        }
+    }]
+    if source == "metrics":
+        filters.append({"terms": {"metric_name": PERFORMANCE_METRICS}})
+
+    return {
+        "size": 0,
+        "query": {"bool": {"filter": filters}},
+        "aggs": {
+            "hours": {
+                "date_histogram": {"field": field, "fixed_interval": "1h"},
+                "aggs": ROLLUP_AGGS[source]
+            }
+        }
+    }
+
+
+def empty_partial(source: str) -> Dict[str, Any]:
+    """Partial aggregate of an hour without documents"""
+    if source == "executions":
+        return {"count": 0, "success": 0, "duration_sum": 0.0, "duration_count": 0, "histogram": {}}
+    if source == "logs":
+        return {"count": 0, "errors": 0, "services": {}}
+    return {"metrics": {}}
+
+
+def bucket_partial(source: str, bucket: Dict[str, Any]) -> Dict[str, Any]:
+    """Partial aggregate of one date_histogram bucket of a rollup search"""
+    if source == "executions":
+        return {
+            "count": bucket["doc_count"],
+            "success": bucket["success"]["doc_count"],
+            "duration_sum": bucket["duration_sum"]["value"] or 0.0,
+            "duration_count": bucket["duration_count"]["value"],
+            "histogram": {str(int(bucket["key"])): bucket["doc_count"]} if bucket["doc_count"] else {}
+        }
+    if source == "logs":
+        return {
+            "count": bucket["doc_count"],
+            "errors": bucket["errors"]["doc_count"],
+            "services": {
+                service["key"]: {"count": service["doc_count"], "errors": service["errors"]["doc_count"]}
+                for service in bucket["services"]["buckets"]
+            }
+        }
+    return {
+        "metrics": {
+            name["key"]: {"count": name["count"]["value"], "sum": name["sum"]["value"] or 0.0, "max": name["max"]["value"]}
+            for name in bucket["names"]["buckets"]
+        }
+    }
+
+
+def hourly_partials(source: str, response: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """Partial aggregates of a rollup search response by hour start"""
+    return {
+        int(bucket["key"]) // 1000: bucket_partial(source, bucket)
+        for bucket in response.get("aggregations", {}).get("hours", {}).get("buckets", [])
+    }
+
+
+def merge_partials(partials: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge partial aggregates: maxima are combined with max, everything else is summed"""
+    merged: Dict[str, Any] = {}
+    for partial in partials:
+        _merge_into(merged, partial)
+    return merged
+
+
+def _merge_into(target: Dict[str, Any], partial: Dict[str, Any]) -> None:
+    """Merge one partial aggregate into another in place"""
+    for key, value in partial.items():
+        if isinstance(value, dict):
+            _merge_into(target.setdefault(key, {}), value)
+        elif key == "max":
+            current = target.get(key)
+            target[key] = value if current is None else current if value is None else max(current, value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+def _percentage(part: int, total: int) -> Optional[float]:
+    """part as a percentage of total, None without documents"""
+    return part / total * 100 if total else None
+
+
+def execution_section(partial: Dict[str, Any]) -> Dict[str, Any]:
+    """execution_analytics aggregations from a merged executions partial"""
+    count = partial.get("count", 0)
+    duration_count = partial.get("duration_count", 0)
+    histogram = {int(key): doc_count for key, doc_count in partial.get("histogram", {}).items()}
+
+    buckets = []
+    if histogram:
+        # Like date_histogram, fill empty hours between the first and last one with documents
+        for key in range(min(histogram), max(histogram) + HOUR * 1000, HOUR * 1000):
+            buckets.append({
+                "key_as_string": datetime.fromtimestamp(key / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "key": key,
+                "doc_count": histogram.get(key, 0)
+            })
+
+    return {
+        "total_executions": {"value": count},
+        "success_rate": {
+            "doc_count": partial.get("success", 0),
+            "percentage": {"value": _percentage(partial.get("success", 0), count)}
+        },
+        "avg_duration": {"value": partial.get("duration_sum", 0.0) / duration_count if duration_count else None},
+        "executions_over_time": {"buckets": buckets}
+    }
+
+
+def system_health_section(logs: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """system_health section from merged logs and metrics partials"""
+    services = sorted(logs.get("services", {}).items(), key=lambda item: (-item[1]["count"], item[0]))[:10]
+    names = sorted(metrics.get("metrics", {}).items(), key=lambda item: (-item[1]["count"], item[0]))
+    return {
+        "logs_analytics": {
+            "error_rate": {
+                "doc_count": logs.get("errors", 0),
+                "percentage": {"value": _percentage(logs.get("errors", 0), logs.get("count", 0))}
+            },
+            "services_health": {
+                "buckets": [
+                    {"key": service, "doc_count": values["count"], "error_count": {"doc_count": values["errors"]}}
+                    for service, values in services
+                ]
+            }
+        },
+        "performance_metrics": {
+            "performance_metrics": {
+                "buckets": [
+                    {
+                        "key": name,
+                        "doc_count": values["count"],
+                        "avg_value": {"value": values["sum"] / values["count"] if values["count"] else None},
+                        "max_value": {"value": values["max"]}
+                    }
+                    for name, values in names
+                ]
+            }
+        }
+    }
+
+
+class AnalyticsRollupMetrics(BaseModel):
+    """Analytics rollup metrics"""
+    passes: int = 0
+    failed_passes: int = 0
+    hours_rolled_up: int = 0
+    days_rolled_up: int = 0
+    watermark: Optional[str] = None
+    dashboard_cache_hits: int = 0
+    dashboard_cache_misses: int = 0
+    dashboard_fallbacks: int = 0
+    dashboard_degraded: int = 0
+    avg_tail_hours: float = 0.0
+    last_error: Optional[str] = None
+
+
+class AnalyticsRollups:
+    """Materializes hourly and daily analytics rollups and answers the dashboard from them"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = AnalyticsRollupMetrics()
+        self._task: Optional[asyncio.Task] = None
+
+    async def materialize(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Roll up every closed hour after the watermark and every day those hours complete"""
+        now = now if now is not None else time.time()
+        analytics = self.db.elasticsearch_analytics
+        watermark = (await self.db.redis.get_cache(WATERMARK_KEY) or {}).get("end")
+
+        start = int(watermark) if watermark else floor_to(now - self.config.analytics_rollup_initial_lookback, HOUR)
+        end = min(
+            floor_to(now - self.config.analytics_rollup_lateness, HOUR),
+            start + self.config.analytics_rollup_max_hours_per_pass * HOUR
+        )
+        if end <= start:
+            return {"success": True, "hours": 0, "days": 0, "watermark": start, "timestamp": datetime.utcnow().isoformat()}
+
+        try:
+            searches = []
+            for source in ROLLUP_SOURCES:
+                searches.extend([{"index": analytics.index_name(source)}, rollup_search(source, [(start, end)])])
+            response = await analytics.msearch(searches)
+
+            hours: Dict[str, Dict[str, Any]] = {}
+            for source, result in zip(ROLLUP_SOURCES, response["responses"]):
+                if "error" in result:
+                    raise RuntimeError(f"Rollup search of {source} failed: {result['error']}")
+                found = hourly_partials(source, result)
+                for hour in range(start, end, HOUR):
+                    hours[rollup_key(source, "hour", hour)] = found.get(hour, empty_partial(source))
+            await self._store(hours, self.config.analytics_rollup_hourly_ttl)
+
+            days = await self._roll_up_days(start, end, hours)
+
+            await self.db.redis.set_cache(WATERMARK_KEY, {"end": end}, ttl=self.config.analytics_rollup_daily_ttl)
+
+            self.metrics.passes += 1
+            self.metrics.hours_rolled_up += (end - start) // HOUR
+            self.metrics.days_rolled_up += days
+            self.metrics.watermark = to_iso(end)
+            logger.info(f"Rolled up analytics from {to_iso(start)} to {to_iso(end)} ({days} days completed)")
+            return {
+                "success": True,
+                "hours": (end - start) // HOUR,
+                "days": days,
+                "watermark": end,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+
+        except Exception as e:
+            self.metrics.failed_passes += 1
+            self.metrics.last_error = str(e)
+            logger.error(f"Analytics rollup from {to_iso(start)} to {to_iso(end)} failed: {e}")
+            return {"success": False, "error": str(e), "timestamp": datetime.utcnow().isoformat()}
+
+    async def _roll_up_days(self, start: int, end: int, hours: Dict[str, Dict[str, Any]]) -> int:
+        """Merge the hourly rollups of every day completed by this pass into daily rollups"""
+        days = [day for day in range(floor_to(start, DAY), floor_to(end, DAY), DAY) if day + DAY <= end]
+        if not days:
+            return 0
+
+        wanted = [
+            rollup_key(source, "hour", hour)
+            for source in ROLLUP_SOURCES for day in days for hour in range(day, day + DAY, HOUR)
+        ]
+        earlier = await self.db.redis.get_cache_many([key for key in wanted if key not in hours])
+        available = {**earlier, **hours}
+
+        daily = {}
+        for day in days:
+            for source in ROLLUP_SOURCES:
+                keys = [rollup_key(source, "hour", hour) for hour in range(day, day + DAY, HOUR)]
+                # A day whose first hours predate the initial lookback stays hourly
+                if all(key in available for key in keys):
+                    daily[rollup_key(source, "day", day)] = merge_partials(available[key] for key in keys)
+        await self._store(daily, self.config.analytics_rollup_daily_ttl)
+        return len({key.rsplit(":", 1)[1] for key in daily})
+
+    async def _store(self, values: Dict[str, Dict[str, Any]], ttl: int) -> None:
+        """Write rollups concurrently"""
+        await asyncio.gather(*[self.db.redis.set_cache(key, value, ttl=ttl) for key, value in values.items()])
+
+    async def get_dashboard_data(self, time_range: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Dashboard data from the rollups plus raw searches of the remaining edges, cached per bucketed range"""
+        analytics = self.db.elasticsearch_analytics
+        now = time.time()
+        time_range = time_range or {"gte": to_iso(now - DAY), "lte": to_iso(now)}
+        gte = parse_time(time_range.get("gte"))
+        lte = parse_time(time_range.get("lte")) if time_range.get("lte") else now
+        if gte is None or lte is None:
+            # Date math and open ranges cannot be mapped onto rollup buckets
+            self.metrics.dashboard_fallbacks += 1
+            return await analytics._load_analytics_dashboard_data(time_range)
+
+        bucket = self.config.analytics_dashboard_cache_bucket
+        start, end = floor_to(gte, bucket), ceil_to(lte, bucket)
+        cache_key = dashboard_cache_key(start, end)
+
+        cached = await self.db.redis.get_cache(cache_key)
+        if cached:
+            self.metrics.dashboard_cache_hits += 1
+            return cached
+        self.metrics.dashboard_cache_misses += 1
+
+        try:
+            data, failed = await self._load_dashboard_data(start, end)
+        except Exception as e:
+            logger.error(f"Rollup dashboard for {to_iso(start)} to {to_iso(end)} failed, searching raw data: {e}")
+            self.metrics.dashboard_fallbacks += 1
+            return await analytics._load_analytics_dashboard_data(time_range)
+
+        if failed:
+            # A partial dashboard is answered but not cached, so the next request searches again
+            self.metrics.dashboard_degraded += 1
+            return data
+
+        # Cache until the bucket holding the end of the range closes; closed ranges only change with entity sections
+        max_ttl = self.config.analytics_dashboard_cache_max_ttl
+        ttl = max_ttl if end <= now else max(1, min(max_ttl, int(end - now)))
+        await self.db.redis.set_cache(cache_key, data, ttl=ttl)
+        return data
+
+    async def _load_dashboard_data(self, start: int, end: int) -> Tuple[Dict[str, Any], Set[str]]:
+        """
+        Merge the rollups covering [start, end) with one _msearch of the entity sections and raw edges.
+        Returns the dashboard data and the names of the searches that failed.
+        """
+        analytics = self.db.elasticsearch_analytics
+        watermark = int((await self.db.redis.get_cache(WATERMARK_KEY) or {}).get("end", 0))
+
+        # Largest hour-aligned span of closed, rolled-up time, split into whole days and remaining hours
+        covered_start, covered_end = ceil_to(start, HOUR), min(floor_to(end, HOUR), watermark)
+        buckets: List[Tuple[str, int, int]] = []
+        bucket_start = covered_start
+        while bucket_start < covered_end:
+            if bucket_start % DAY == 0 and bucket_start + DAY <= covered_end:
+                buckets.append(("day", bucket_start, bucket_start + DAY))
+            else:
+                buckets.append(("hour", bucket_start, bucket_start + HOUR))
+            bucket_start = buckets[-1][2]
+
+        edges = [(start, end)] if not buckets else [(start, covered_start), (covered_end, end)]
+        rollups = await self.db.redis.get_cache_many([
+            rollup_key(source, granularity, bucket_start)
+            for source in ROLLUP_SOURCES for granularity, bucket_start, _ in buckets
+        ])
+
+        partials: Dict[str, List[Dict[str, Any]]] = {}
+        raw_ranges: Dict[str, List[Tuple[int, int]]] = {}
+        for source in ROLLUP_SOURCES:
+            partials[source] = []
+            missing = []
+            for granularity, bucket_start, bucket_end in buckets:
+                rollup = rollups.get(rollup_key(source, granularity, bucket_start))
+                if rollup is None:
+                    missing.append((bucket_start, bucket_end))
+                else:
+                    partials[source].append(rollup)
+            raw_ranges[source] = coalesce_ranges(edges + missing)
+
+        entity_range = {"gte": to_iso(start), "lte": to_iso(end)}
+        searches = [search for search in analytics.dashboard_searches(entity_range) if search[0] in ENTITY_SECTIONS]
+        searches += [
+            (source, analytics.index_name(source), rollup_search(source, ranges))
+            for source, ranges in raw_ranges.items() if ranges
+        ]
+
+        operations = []
+        for _, index_name, body in searches:
+            operations.extend([{"index": index_name}, body])
+        response = await analytics.msearch(operations)
+
+        sections: Dict[str, Dict[str, Any]] = {}
+        failed: Set[str] = set()
+        for (name, index_name, _), result in zip(searches, response["responses"]):
+            if "error" in result:
+                logger.warning(f"Dashboard search {name} on {index_name} failed: {result['error']}")
+                failed.add(name)
+            elif name in ROLLUP_SOURCES:
+                partials[name].extend(hourly_partials(name, result).values())
+            else:
+                sections[name] = result.get("aggregations", {})
+
+        tail_hours = sum(high - low for ranges in raw_ranges.values() for low, high in ranges) / HOUR
+        self.metrics.avg_tail_hours += (tail_hours - self.metrics.avg_tail_hours) / self.metrics.dashboard_cache_misses
+
+        merged = {source: merge_partials(partials[source]) for source in ROLLUP_SOURCES}
+        data = {
+            "workflow_analytics": sections.get("workflow_analytics", {}),
+            "execution_analytics": {} if "executions" in failed else execution_section(merged["executions"]),
+            "user_analytics": sections.get("user_analytics", {}),
+            "agent_analytics": sections.get("agent_analytics", {}),
+            "system_health": (
+                {} if failed & {"logs", "metrics"} else system_health_section(merged["logs"], merged["metrics"])
+            ),
+            "generated_at": datetime.utcnow().isoformat(),
+            "time_range": entity_range
+        }
+        return data, failed
+
+    def start(self) -> None:
+        """Materialize rollups in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="analytics-rollups")
+
+    async def _run(self) -> None:
+        """Rollup loop: catch up in full passes, then one pass per interval"""
+        while True:
+            report = await self.materialize()
+            caught_up = report.get("hours", 0) < self.config.analytics_rollup_max_hours_per_pass
+            if not report["success"] or caught_up:
+                await asyncio.sleep(self.config.analytics_rollup_interval)
+
+    async def stop(self) -> None:
+        """Stop the rollup loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_metrics(self) -> AnalyticsRollupMetrics:
+        """Get analytics rollup metrics"""
+        return self.metrics
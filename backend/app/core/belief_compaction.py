@@ -0,0 +1,349 @@
+"""
+MABOS Belief Compaction
+
+Background job that keeps agent belief sets bounded. Each run pages through
+agents and, per agent batch:
+
+1. decays belief confidence exponentially by per-category half-life,
+   measured from the later of its last decay and its last reinforcement,
+2. merges beliefs sharing category and content into the oldest one, which
+   keeps an observation count,
+3. expires beliefs past their per-category TTL or decayed below the
+   confidence floor.
+
+Every statement touches a bounded batch of beliefs. Removed beliefs can be
+archived to PostgreSQL belief_archive first, one transaction per agent; the
+beliefs of an agent whose archive fails are kept and that agent is skipped
+for the rest of the run, without holding back the other agents of the batch.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# agent_id is the Neo4j agent id, stored as text; re-archiving a belief is a no-op
+ARCHIVE_BELIEF_SQL = """
+    INSERT INTO belief_archive (belief_id, agent_id, reason, category, content, confidence, source, evidence, created_at, archived_at)
+    VALUES (:belief_id, :agent_id, :reason, :category, :content, :confidence, :source, CAST(:evidence AS jsonb), :created_at, :archived_at)
+    ON CONFLICT (belief_id) DO NOTHING
+"""
+
+
+class BeliefCompactionMetrics(BaseModel):
+    """Belief compaction job metrics"""
+    runs: int = 0
+    failed_runs: int = 0
+    failed_batches: int = 0
+    agents_processed: int = 0
+    beliefs_decayed: int = 0
+    beliefs_merged: int = 0
+    beliefs_expired: int = 0
+    beliefs_archived: int = 0
+    archive_failures: int = 0
+    last_run_at: Optional[str] = None
+    last_run_duration_ms: float = 0.0
+    last_run_beliefs_per_second: float = 0.0
+
+
+def _native(value: Any) -> Any:
+    """Convert a Neo4j temporal value to its Python equivalent"""
+    return value.to_native() if hasattr(value, "to_native") else value
+
+
+def archive_row(agent_id: str, belief: Dict[str, Any], reason: str, removed_at: datetime) -> Dict[str, Any]:
+    """Build the belief_archive row of a removed belief"""
+    confidence = belief.get("confidence")
+    last_observed_at = _native(belief.get("last_observed_at"))
+    evidence = {
+        "belief_id": belief.get("id"),
+        "reason": reason,
+        "description": belief.get("description"),
+        "observation_count": belief.get("observation_count", 1),
+        "last_observed_at": last_observed_at.isoformat() if isinstance(last_observed_at, datetime) else None
+    }
+    return {
+        "belief_id": belief.get("id"),
+        "agent_id": agent_id,
+        "reason": reason,
+        "category": belief.get("category") or "uncategorized",
+        "content": str(belief.get("content", "")),
+        "confidence": round(min(max(float(confidence), 0.0), 1.0), 2) if confidence is not None else None,
+        "source": belief.get("source"),
+        "evidence": json.dumps(evidence),
+        "created_at": _native(belief.get("created_at")) or removed_at,
+        "archived_at": removed_at
+    }
+
+
+class BeliefCompactionJob:
+    """Decays, merges and expires agent beliefs in bounded batches"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = BeliefCompactionMetrics()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def decay_enabled(self) -> bool:
+        """Whether any category has a confidence half-life"""
+        return self.config.belief_decay_half_life_days > 0 or any(
+            half_life > 0 for half_life in self.config.belief_decay_half_lives.values()
+        )
+
+    @property
+    def expiry_enabled(self) -> bool:
+        """Whether any TTL or confidence floor is configured"""
+        return (
+            self.config.belief_ttl > 0
+            or any(ttl > 0 for ttl in self.config.belief_ttls.values())
+            or self.config.belief_min_confidence > 0
+        )
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Compact the beliefs of every agent once; concurrent calls wait for the running pass"""
+        async with self._lock:
+            start_time = time.perf_counter()
+            now = datetime.now(timezone.utc)
+            totals = {
+                "agents": 0, "decayed": 0, "merged": 0, "expired": 0, "archived": 0,
+                "archive_failures": 0, "failed_batches": 0
+            }
+            batch_size = self.config.belief_compaction_agent_batch_size
+
+            try:
+                after = None
+                while True:
+                    agent_ids = await self.db.neo4j.get_agent_ids_page(after, batch_size)
+                    if not agent_ids:
+                        break
+
+                    await self._compact_agents(agent_ids, now, totals)
+                    totals["agents"] += len(agent_ids)
+                    after = agent_ids[-1]
+                    if len(agent_ids) < batch_size:
+                        break
+                error = None
+            except Exception as e:
+                logger.error(f"Belief compaction run failed after {totals['agents']} agents: {e}")
+                error = str(e)
+
+            duration = time.perf_counter() - start_time
+            processed = totals["decayed"] + totals["merged"] + totals["expired"]
+            beliefs_per_second = processed / duration if duration > 0 else 0.0
+            self._record(totals, error, now, duration, beliefs_per_second)
+
+            logger.info(
+                f"Belief compaction: {totals['agents']} agents, {totals['decayed']} decayed, "
+                f"{totals['merged']} merged, {totals['expired']} expired, {totals['archived']} archived "
+                f"in {duration:.2f}s ({beliefs_per_second:.0f} beliefs/s)"
+            )
+
+            report = {
+                "success": error is None,
+                **totals,
+                "duration_ms": duration * 1000,
+                "beliefs_per_second": beliefs_per_second,
+                "timestamp": now.isoformat()
+            }
+            if error is not None:
+                report["error"] = error
+            return report
+
+    async def _compact_agents(self, agent_ids: List[str], now: datetime, totals: Dict[str, int]) -> None:
+        """Run every enabled phase over one batch of agents, then invalidate their cached contexts
+
+        Agents whose removed beliefs could not be archived are skipped by the
+        remaining merge and expire steps of the run.
+        """
+        affected: Set[str] = set()
+        unarchived: Set[str] = set()
+
+        def remaining() -> List[str]:
+            return [agent_id for agent_id in agent_ids if agent_id not in unarchived]
+
+        if self.decay_enabled:
+            affected |= await self._drain("decay", lambda: self._decay_batch(agent_ids, now, totals), totals)
+        if self.config.belief_compaction_merge_duplicates:
+            affected |= await self._drain(
+                "merge", lambda: self._merge_batch(remaining(), now, totals, unarchived), totals
+            )
+        if self.expiry_enabled:
+            affected |= await self._drain(
+                "expire", lambda: self._expire_batch(remaining(), now, totals, unarchived), totals
+            )
+
+        await asyncio.gather(*(self.db.bump_agent_version(agent_id) for agent_id in affected))
+
+    async def _drain(
+        self,
+        phase: str,
+        step: Callable[[], Awaitable[Tuple[int, Set[str]]]],
+        totals: Dict[str, int]
+    ) -> Set[str]:
+        """Repeat a bounded phase step until it selects less than a full batch or fails"""
+        affected: Set[str] = set()
+        while True:
+            try:
+                selected, agents = await step()
+            except Exception as e:
+                logger.error(f"Belief compaction {phase} batch failed: {e}")
+                totals["failed_batches"] += 1
+                return affected
+
+            affected |= agents
+            if selected < self.config.belief_compaction_batch_size:
+                return affected
+
+    async def _decay_batch(self, agent_ids: List[str], now: datetime, totals: Dict[str, int]) -> Tuple[int, Set[str]]:
+        """Decay one batch of beliefs not yet decayed in this run"""
+        decayed = await self.db.neo4j.decay_agent_beliefs(
+            agent_ids,
+            self.config.belief_decay_half_lives,
+            self.config.belief_decay_half_life_days,
+            now,
+            self.config.belief_compaction_batch_size
+        )
+        count = sum(decayed.values())
+        totals["decayed"] += count
+        return count, set(decayed)
+
+    async def _merge_batch(
+        self, agent_ids: List[str], now: datetime, totals: Dict[str, int], unarchived: Set[str]
+    ) -> Tuple[int, Set[str]]:
+        """Merge one batch of duplicate belief groups"""
+        if not agent_ids:
+            return 0, set()
+        groups = await self.db.neo4j.find_duplicate_beliefs(agent_ids, self.config.belief_compaction_batch_size)
+        if not groups:
+            return 0, set()
+
+        unarchived |= await self._archive([
+            archive_row(group["agent_id"], duplicate, "merged", now)
+            for group in groups
+            for duplicate in group["duplicates"]
+        ], totals)
+        groups_to_merge = [group for group in groups if group["agent_id"] not in unarchived]
+
+        if groups_to_merge:
+            merged = await self.db.neo4j.merge_duplicate_beliefs([
+                {"keeper_id": group["keeper_id"], "duplicate_ids": [duplicate["id"] for duplicate in group["duplicates"]]}
+                for group in groups_to_merge
+            ])
+            totals["merged"] += merged
+        return len(groups), {group["agent_id"] for group in groups_to_merge}
+
+    async def _expire_batch(
+        self, agent_ids: List[str], now: datetime, totals: Dict[str, int], unarchived: Set[str]
+    ) -> Tuple[int, Set[str]]:
+        """Archive and delete one batch of expired beliefs"""
+        if not agent_ids:
+            return 0, set()
+        rows = await self.db.neo4j.find_expired_beliefs(
+            agent_ids,
+            self.config.belief_ttls,
+            self.config.belief_ttl,
+            self.config.belief_min_confidence,
+            now,
+            self.config.belief_compaction_batch_size
+        )
+        if not rows:
+            return 0, set()
+
+        unarchived |= await self._archive(
+            [archive_row(row["agent_id"], row["belief"], "expired", now) for row in rows], totals
+        )
+        rows_to_delete = [row for row in rows if row["agent_id"] not in unarchived]
+
+        if rows_to_delete:
+            expired = await self.db.neo4j.delete_beliefs([row["belief"]["id"] for row in rows_to_delete])
+            totals["expired"] += expired
+        return len(rows), {row["agent_id"] for row in rows_to_delete}
+
+    async def _archive(self, rows: List[Dict[str, Any]], totals: Dict[str, int]) -> Set[str]:
+        """Archive removed beliefs when enabled, one transaction per agent
+
+        Returns the agents whose rows could not be archived; their beliefs must not be removed.
+        """
+        if not self.config.belief_compaction_archive or not rows:
+            return set()
+
+        rows_by_agent: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            rows_by_agent.setdefault(row["agent_id"], []).append(row)
+
+        results = await asyncio.gather(
+            *(self.db.postgres.execute_many(ARCHIVE_BELIEF_SQL, agent_rows) for agent_rows in rows_by_agent.values()),
+            return_exceptions=True
+        )
+
+        failed: Set[str] = set()
+        for (agent_id, agent_rows), result in zip(rows_by_agent.items(), results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to archive {len(agent_rows)} beliefs of agent {agent_id}: {result}")
+                failed.add(agent_id)
+            else:
+                totals["archived"] += len(agent_rows)
+        totals["archive_failures"] += len(failed)
+        return failed
+
+    def _record(
+        self,
+        totals: Dict[str, int],
+        error: Optional[str],
+        started_at: datetime,
+        duration: float,
+        beliefs_per_second: float
+    ) -> None:
+        """Record one run"""
+        metrics = self.metrics
+        metrics.runs += 1
+        if error is not None:
+            metrics.failed_runs += 1
+        metrics.failed_batches += totals["failed_batches"]
+        metrics.agents_processed += totals["agents"]
+        metrics.beliefs_decayed += totals["decayed"]
+        metrics.beliefs_merged += totals["merged"]
+        metrics.beliefs_expired += totals["expired"]
+        metrics.beliefs_archived += totals["archived"]
+        metrics.archive_failures += totals["archive_failures"]
+        metrics.last_run_at = started_at.isoformat()
+        metrics.last_run_duration_ms = duration * 1000
+        metrics.last_run_beliefs_per_second = beliefs_per_second
+
+    def get_metrics(self) -> BeliefCompactionMetrics:
+        """Get compaction metrics"""
+        return self.metrics
+
+    def start(self) -> None:
+        """Run compaction every belief_compaction_interval seconds in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_periodically(), name="belief-compaction")
+
+    async def _run_periodically(self) -> None:
+        """Background schedule loop"""
+        while True:
+            await asyncio.sleep(self.config.belief_compaction_interval)
+            await self.run_once()
+
+    async def stop(self) -> None:
+        """Stop the background schedule; an interrupted pass rolls back its current batch"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
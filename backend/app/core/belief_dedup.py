@@ -0,0 +1,388 @@
+"""
+MABOS Belief Deduplication
+
+Ingest-time detection of near-duplicate beliefs. Each belief's content is
+reduced to a MinHash signature over byte shingles; signatures are kept
+per agent in an in-memory LSH index (banded buckets, per category), mirrored
+to a Redis hash so the index can be rebuilt after a restart. Every write to
+the hash bumps a per-agent version counter; an index whose version is behind
+is reloaded, so sketches written by other processes are seen. A new belief
+whose estimated Jaccard similarity to an existing belief of the same agent
+and category reaches the threshold is folded into that belief instead of
+creating a new node.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.ids import new_id
+
+if TYPE_CHECKING:
+    from app.core.database import RedisManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_BYTE_BITS = np.uint64(8)
+_HASH_SHIFT = np.uint64(32)
+
+
+def sketch_key(agent_id: str) -> str:
+    """Redis hash holding the belief sketches of an agent"""
+    return f"belief:sketches:{agent_id}"
+
+
+def sketch_version_key(agent_id: str) -> str:
+    """Redis counter bumped on every write to the belief sketches of an agent"""
+    return f"belief:sketches:version:{agent_id}"
+
+
+class BeliefDedupMetrics(BaseModel):
+    """Belief deduplication metrics"""
+    checked: int = 0
+    folded: int = 0
+    dedup_rate: float = 0.0
+    candidates: int = 0
+    stale_folds: int = 0
+    agents_indexed: int = 0
+    sketches: int = 0
+    rebuilds: int = 0
+    refreshes: int = 0
+    avg_check_us: float = 0.0
+
+
+class MinHasher:
+    """MinHash signatures over byte shingles of normalized text"""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 4, seed: int = 1):
+        if not 1 <= shingle_size <= 4:
+            raise ValueError("shingle_size must be between 1 and 4 bytes")
+
+        # A fixed seed keeps signatures comparable across processes and restarts
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Multiply-add-shift hashing: odd 64-bit multipliers, arithmetic modulo 2^64
+        self._a = rng.randint(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Byte shingles of the lowercased, punctuation-free text, each packed into an integer"""
+        normalized = " ".join(_TOKEN_PATTERN.findall(text.lower())).encode("utf-8")
+        data = np.frombuffer(normalized.ljust(self.shingle_size, b"\0"), dtype=np.uint8).astype(np.uint64)
+        count = len(data) - self.shingle_size + 1
+        packed = data[:count].copy()
+        for offset in range(1, self.shingle_size):
+            packed <<= _BYTE_BITS
+            packed |= data[offset:offset + count]
+        return packed
+
+    def signatures(self, texts: List[str], max_cells: int = 1 << 21) -> np.ndarray:
+        """
+        MinHash signatures of many texts, one row per text. Texts are hashed in
+        vectorized chunks of similar shingle count, each padded to a rectangle by
+        repeating a shingle (which leaves the minimum unchanged) and bounded to
+        max_cells hash values.
+        """
+        shingle_sets = [self.shingles(text) for text in texts]
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        order = sorted(range(len(texts)), key=lambda position: len(shingle_sets[position]))
+
+        start = 0
+        while start < len(order):
+            # Sorted by length, so the last text of a chunk sets its width
+            end = start + 1
+            while end < len(order) and (end - start + 1) * len(shingle_sets[order[end]]) * self.num_perm <= max_cells:
+                end += 1
+            positions = order[start:end]
+            width = len(shingle_sets[positions[-1]])
+
+            padded = np.empty((len(positions), width), dtype=np.uint64)
+            for row, position in enumerate(positions):
+                shingles = shingle_sets[position]
+                padded[row, :len(shingles)] = shingles
+                padded[row, len(shingles):] = shingles[0]
+
+            permuted = np.multiply.outer(padded, self._a)
+            permuted += self._b
+            permuted >>= _HASH_SHIFT
+            result[positions] = permuted.min(axis=1)
+            start = end
+
+        return result
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text"""
+        return self.signatures([text])[0]
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class AgentSketchIndex:
+    """Banded LSH index over the belief signatures of one agent, one bucket table per category and band"""
+
+    def __init__(self, bands: int, version: Optional[int] = None):
+        self.bands = bands
+        self.version = version  # sketch version counter the index reflects; None if unknown
+        self.signatures: Dict[str, Tuple[str, np.ndarray]] = {}
+        self._tables: Dict[str, List[Dict[bytes, Set[str]]]] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        """Bucket key of each band of a signature"""
+        data = signature.tobytes()
+        width = len(data) // self.bands
+        return [data[band * width:(band + 1) * width] for band in range(self.bands)]
+
+    def add(self, belief_id: str, category: str, signature: np.ndarray) -> None:
+        """Index a belief signature"""
+        self.signatures[belief_id] = (category, signature)
+        tables = self._tables.get(category)
+        if tables is None:
+            tables = self._tables[category] = [{} for _ in range(self.bands)]
+        for table, key in zip(tables, self._band_keys(signature)):
+            table.setdefault(key, set()).add(belief_id)
+
+    def remove(self, belief_id: str) -> None:
+        """Drop a belief signature"""
+        entry = self.signatures.pop(belief_id, None)
+        if entry is None:
+            return
+        category, signature = entry
+        for table, key in zip(self._tables[category], self._band_keys(signature)):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(belief_id)
+                if not bucket:
+                    del table[key]
+
+    def match(self, category: str, signature: np.ndarray, threshold: float) -> Tuple[Optional[str], int]:
+        """Most similar indexed belief of the category at or above threshold, and the candidates checked"""
+        tables = self._tables.get(category)
+        if tables is None:
+            return None, 0
+
+        candidates: Set[str] = set()
+        for table, key in zip(tables, self._band_keys(signature)):
+            bucket = table.get(key)
+            if bucket:
+                candidates |= bucket
+
+        if not candidates:
+            return None, 0
+
+        ids = list(candidates)
+        matrix = np.stack([self.signatures[belief_id][1] for belief_id in ids])
+        scores = np.count_nonzero(matrix == signature, axis=1) / len(signature)
+        best = int(np.argmax(scores))
+        return (ids[best] if scores[best] >= threshold else None), len(ids)
+
+
+@dataclass
+class DedupPlan:
+    """Fold targets and signatures for a batch of beliefs, by position"""
+    targets: List[Optional[str]]
+    signatures: List[np.ndarray]
+
+
+class BeliefDeduplicator:
+    """Per-agent MinHash/LSH near-duplicate detection with a Redis-backed sketch store"""
+
+    def __init__(
+        self,
+        redis: "RedisManager",
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        max_agents: int = 10000,
+        sketch_ttl: int = 604800
+    ):
+        """
+        Args:
+            redis: Redis manager holding the persisted sketches
+            threshold: Estimated Jaccard similarity at which a belief is folded
+            num_perm: MinHash permutations per signature
+            bands: LSH bands; num_perm must be a multiple of bands
+            max_agents: Agent indexes kept in memory
+            sketch_ttl: Seconds a persisted agent sketch set lives after its last write
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+
+        self.redis = redis
+        self.threshold = threshold
+        self.bands = bands
+        self.max_agents = max_agents
+        self.sketch_ttl = sketch_ttl
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.metrics = BeliefDedupMetrics()
+        self._indexes: "OrderedDict[str, AgentSketchIndex]" = OrderedDict()
+        self._check_seconds = 0.0
+
+    async def _index_for(self, agent_id: str) -> AgentSketchIndex:
+        """In-memory index of an agent, rebuilt from Redis on first use and whenever its version is behind"""
+        # Read before the sketches: a write landing in between is seen as a newer version next time
+        try:
+            version = await self.redis.get_counter(sketch_version_key(agent_id))
+        except Exception as e:
+            logger.warning(f"Failed to read belief sketch version for agent {agent_id}: {e}")
+            version = None
+
+        index = self._indexes.get(agent_id)
+        if index is not None and (version is None or index.version == version):
+            self._indexes.move_to_end(agent_id)
+            return index
+        if index is not None:
+            self.metrics.refreshes += 1
+
+        index = AgentSketchIndex(self.bands, version)
+        try:
+            stored = await self.redis.get_hash(sketch_key(agent_id))
+        except Exception as e:
+            logger.warning(f"Failed to load belief sketches for agent {agent_id}: {e}")
+            stored = {}
+
+        for belief_id, value in stored.items():
+            try:
+                entry = json.loads(value)
+                signature = np.frombuffer(base64.b64decode(entry["s"]), dtype=np.uint32)
+            except (ValueError, KeyError, TypeError):
+                continue
+            if len(signature) == self.hasher.num_perm:
+                index.add(belief_id, entry["c"], signature)
+        if stored:
+            self.metrics.rebuilds += 1
+
+        self._indexes[agent_id] = index
+        self._indexes.move_to_end(agent_id)
+        while len(self._indexes) > self.max_agents:
+            self._indexes.popitem(last=False)
+        return index
+
+    async def plan(self, beliefs: List[Dict[str, Any]]) -> DedupPlan:
+        """
+        Find the existing belief each belief should be folded into.
+        Beliefs without a match are assigned a belief_id and indexed, so later
+        near-duplicates in the same batch fold into them.
+        """
+        agent_ids = list(dict.fromkeys(belief["agent_id"] for belief in beliefs))
+        indexes = dict(zip(agent_ids, await asyncio.gather(*(self._index_for(agent_id) for agent_id in agent_ids))))
+
+        start_time = time.perf_counter()
+        targets: List[Optional[str]] = []
+        signatures: List[np.ndarray] = []
+        candidates = 0
+
+        # Hashing a bulk chunk takes milliseconds; keep it off the event loop
+        batch_signatures = await asyncio.to_thread(
+            self.hasher.signatures, [str(belief.get("content", "")) for belief in beliefs]
+        )
+        for belief, signature in zip(beliefs, batch_signatures):
+            index = indexes[belief["agent_id"]]
+            category = belief.get("category", "")
+            target, checked = index.match(category, signature, self.threshold)
+            candidates += checked
+
+            if target is None:
+                belief["belief_id"] = belief.get("belief_id") or new_id()
+                index.add(belief["belief_id"], category, signature)
+            targets.append(target)
+            signatures.append(signature)
+
+        self._check_seconds += time.perf_counter() - start_time
+        metrics = self.metrics
+        metrics.checked += len(beliefs)
+        metrics.folded += sum(target is not None for target in targets)
+        metrics.candidates += candidates
+        return DedupPlan(targets=targets, signatures=signatures)
+
+    async def _bump_versions(self, agent_ids: List[str]) -> None:
+        """
+        Bump the sketch versions of agents after writing their sketches. An index
+        that was current before the write already holds it and stays current;
+        one that missed another process's write is reloaded on next use.
+        """
+        versions = await asyncio.gather(
+            *(self.redis.increment_counter(sketch_version_key(agent_id)) for agent_id in agent_ids)
+        )
+        for agent_id, version in zip(agent_ids, versions):
+            index = self._indexes.get(agent_id)
+            if index is not None and index.version is not None and index.version + 1 == version:
+                index.version = version
+
+    def forget(self, agent_id: str, belief_id: str) -> None:
+        """Drop the in-memory sketch of a belief"""
+        index = self._indexes.get(agent_id)
+        if index is not None:
+            index.remove(belief_id)
+
+    async def replan_stale(self, belief: Dict[str, Any], stale_id: str, signature: np.ndarray) -> None:
+        """Turn a fold whose target belief no longer exists into a new belief"""
+        agent_id = belief["agent_id"]
+        self.forget(agent_id, stale_id)
+        try:
+            await self.redis.delete_hash_fields(sketch_key(agent_id), [stale_id])
+            await self._bump_versions([agent_id])
+        except Exception as e:
+            logger.warning(f"Failed to delete stale belief sketch {stale_id}: {e}")
+
+        belief["belief_id"] = new_id()
+        index = self._indexes.get(agent_id)
+        if index is not None:
+            index.add(belief["belief_id"], belief.get("category", ""), signature)
+
+        self.metrics.folded -= 1
+        self.metrics.stale_folds += 1
+
+    async def commit(self, beliefs: List[Dict[str, Any]], plan: DedupPlan, created: List[Optional[bool]]) -> None:
+        """
+        Persist the sketches of created beliefs and drop the sketches of beliefs
+        planned as new but not created. Folded beliefs are marked None in created.
+        """
+        persisted: Dict[str, Dict[str, str]] = {}
+        agent_ids: List[str] = []
+        for belief, signature, was_created in zip(beliefs, plan.signatures, created):
+            if was_created is None:
+                continue
+            if not was_created:
+                self.forget(belief["agent_id"], belief["belief_id"])
+                continue
+            if sketch_key(belief["agent_id"]) not in persisted:
+                agent_ids.append(belief["agent_id"])
+            persisted.setdefault(sketch_key(belief["agent_id"]), {})[belief["belief_id"]] = json.dumps({
+                "c": belief.get("category", ""),
+                "s": base64.b64encode(signature.tobytes()).decode("ascii")
+            })
+
+        if persisted:
+            try:
+                await self.redis.set_hashes(persisted, ttl=self.sketch_ttl)
+                await self._bump_versions(agent_ids)
+            except Exception as e:
+                logger.warning(f"Failed to persist belief sketches for {len(persisted)} agents: {e}")
+
+    def get_metrics(self) -> BeliefDedupMetrics:
+        """Get deduplication metrics"""
+        metrics = self.metrics
+        metrics.dedup_rate = metrics.folded / metrics.checked if metrics.checked else 0.0
+        metrics.avg_check_us = self._check_seconds * 1e6 / metrics.checked if metrics.checked else 0.0
+        metrics.agents_indexed = len(self._indexes)
+        metrics.sketches = sum(len(index.signatures) for index in self._indexes.values())
+        return metrics
+
+    def clear(self) -> None:
+        """Drop every in-memory index; they are rebuilt from Redis on demand"""
+        self._indexes.clear()
@@ -0,0 +1,320 @@
+"""
+MABOS Elasticsearch Bulk Indexer
+
+Shared asynchronous bulk indexer. Documents are buffered per index and
+shipped with the _bulk API once a buffer reaches max_docs documents or
+max_bytes encoded bytes, or at the latest every flush_interval seconds.
+At most max_in_flight bulk requests run at once; callers are held back
+when max_pending documents are waiting. Items the cluster rejects with 429
+or a transient 5xx (and whole requests that fail) are retried with
+exponential backoff; a create conflicting with an existing document id
+counts as a duplicate, and every other item error is final.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from pydantic import BaseModel
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# Item statuses worth retrying: queue rejections and transient node errors
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class BulkIndexerOverloaded(RuntimeError):
+    """Raised when a document cannot be queued before the enqueue timeout"""
+
+
+class BulkIndexerMetrics(BaseModel):
+    """Bulk indexer metrics"""
+    enqueued: int = 0
+    rejected: int = 0
+    queue_depth: int = 0
+    in_flight: int = 0
+    requests: int = 0
+    failed_requests: int = 0
+    indexed: int = 0
+    retried: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    avg_batch_size: float = 0.0
+    avg_flush_latency_ms: float = 0.0
+    max_flush_latency_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+@dataclass
+class BulkAction:
+    """A queued document and its bulk action"""
+    index: str
+    document: Dict[str, Any]
+    doc_id: Optional[str]
+    op_type: str
+    size: int
+    pipeline: Optional[str] = None
+    attempts: int = 0
+
+    def operations(self) -> List[Dict[str, Any]]:
+        """Action and source lines of this document"""
+        action = {"_index": self.index}
+        if self.doc_id is not None:
+            action["_id"] = self.doc_id
+        if self.pipeline is not None:
+            action["pipeline"] = self.pipeline
+        return [{self.op_type: action}, self.document]
+
+
+class BulkIndexer:
+    """Buffers documents per index and ships them to Elasticsearch with _bulk"""
+
+    def __init__(
+        self,
+        client: Any = None,
+        max_docs: int = 1000,
+        max_bytes: int = 5 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        max_in_flight: int = 4,
+        max_pending: int = 50000,
+        enqueue_timeout: float = 5.0,
+        max_retries: int = 5,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 30.0
+    ):
+        """
+        Args:
+            client: AsyncElasticsearch client; may be assigned once connected
+            max_docs: Flush an index buffer holding this many documents
+            max_bytes: Flush an index buffer holding this many encoded bytes
+            flush_interval: Seconds after which every buffer is flushed regardless of size
+            max_in_flight: Bulk requests sent concurrently
+            max_pending: Documents waiting to be indexed before callers are held back
+            enqueue_timeout: Seconds a caller may be held back before BulkIndexerOverloaded
+            max_retries: Retries of a rejected document before it is dropped
+            retry_base_delay: Seconds before the first retry, doubled per retry
+            retry_max_delay: Upper bound of the retry delay
+        """
+        self.client = client
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.metrics = BulkIndexerMetrics()
+
+        # Called with the indices every bulk request wrote documents to
+        self.on_indexed: Optional[Callable[[Set[str]], Awaitable[None]]] = None
+
+        self._buffers: Dict[str, List[BulkAction]] = {}
+        self._buffer_bytes: Dict[str, int] = {}
+        self._pending = 0
+        self._space = asyncio.Condition()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._sends: Set[asyncio.Task] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def add(
+        self,
+        index: str,
+        document: Dict[str, Any],
+        doc_id: Optional[str] = None,
+        op_type: str = "index",
+        pipeline: Optional[str] = None
+    ) -> None:
+        """Queue a document, waiting for room when max_pending documents are queued"""
+        if self._closed:
+            raise RuntimeError("Bulk indexer is closed")
+        if self._pending >= self.max_pending:
+            await self._wait_for_space()
+        self._buffer(index, document, doc_id, op_type, pipeline)
+
+    def add_nowait(
+        self,
+        index: str,
+        document: Dict[str, Any],
+        doc_id: Optional[str] = None,
+        op_type: str = "index",
+        pipeline: Optional[str] = None
+    ) -> bool:
+        """Queue a document without waiting; returns False when the indexer is full or closed"""
+        if self._closed or self._pending >= self.max_pending:
+            self.metrics.rejected += 1
+            return False
+        self._buffer(index, document, doc_id, op_type, pipeline)
+        return True
+
+    def _buffer(
+        self, index: str, document: Dict[str, Any], doc_id: Optional[str], op_type: str, pipeline: Optional[str]
+    ) -> None:
+        """Append a document to its index buffer and ship the buffer once it is full"""
+        size = len(json.dumps(document, default=str))
+        self._buffers.setdefault(index, []).append(
+            BulkAction(index=index, document=document, doc_id=doc_id, op_type=op_type, size=size, pipeline=pipeline)
+        )
+        self._buffer_bytes[index] = self._buffer_bytes.get(index, 0) + size
+        self._pending += 1
+        self.metrics.enqueued += 1
+
+        if len(self._buffers[index]) >= self.max_docs or self._buffer_bytes[index] >= self.max_bytes:
+            self._ship(index)
+        self._ensure_worker()
+
+    async def _wait_for_space(self) -> None:
+        """Hold the caller back until fewer than max_pending documents are queued"""
+        try:
+            async with self._space:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: self._pending < self.max_pending),
+                    timeout=self.enqueue_timeout
+                )
+        except asyncio.TimeoutError:
+            self.metrics.rejected += 1
+            raise BulkIndexerOverloaded(
+                f"Bulk indexer is full ({self.max_pending} pending documents)"
+            ) from None
+
+    def _ship(self, index: str) -> None:
+        """Take an index buffer and send it in the background"""
+        batch = self._buffers.pop(index, [])
+        self._buffer_bytes.pop(index, None)
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch), name=f"bulk-indexer-{index}")
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    def _ensure_worker(self) -> None:
+        """Start the interval flusher on first use"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="bulk-indexer-flusher")
+
+    async def _run(self) -> None:
+        """Interval flusher: ship every buffer at least once per flush interval"""
+        while not self._closed:
+            await asyncio.sleep(self.flush_interval)
+            for index in list(self._buffers):
+                self._ship(index)
+
+    async def _send(self, batch: List[BulkAction]) -> None:
+        """Send a batch, retrying rejected documents with backoff until none are left"""
+        while batch:
+            retry = await self._bulk(batch)
+            batch = []
+            for action in retry:
+                action.attempts += 1
+                if action.attempts > self.max_retries:
+                    self.metrics.failed += 1
+                    await self._done(1)
+                else:
+                    batch.append(action)
+
+            if batch:
+                self.metrics.retried += len(batch)
+                delay = self.retry_base_delay * 2 ** (min(action.attempts for action in batch) - 1)
+                await asyncio.sleep(min(delay, self.retry_max_delay))
+
+    async def _bulk(self, batch: List[BulkAction]) -> List[BulkAction]:
+        """Send one _bulk request and return the documents worth retrying"""
+        operations = [line for action in batch for line in action.operations()]
+
+        async with self._slots:
+            self.metrics.in_flight += 1
+            start_time = time.perf_counter()
+            try:
+                response = await self.client.bulk(operations=operations)
+            except Exception as e:
+                self.metrics.failed_requests += 1
+                self.metrics.last_error = str(e)
+                logger.error(f"Bulk request of {len(batch)} documents failed: {e}")
+                return batch
+            finally:
+                self.metrics.in_flight -= 1
+                self._record(len(batch), time.perf_counter() - start_time)
+
+        if not response.get("errors"):
+            self.metrics.indexed += len(batch)
+            await self._done(len(batch))
+            await self._notify(action.index for action in batch)
+            return []
+
+        retry = []
+        written = set()
+        for action, item in zip(batch, response["items"]):
+            result = next(iter(item.values()))
+            status = result.get("status", 500)
+            if status < 300:
+                self.metrics.indexed += 1
+                written.add(action.index)
+                await self._done(1)
+            elif status in RETRYABLE_STATUSES:
+                retry.append(action)
+            elif status == 409 and action.op_type == "create" and action.doc_id is not None:
+                # The document was written before, e.g. by an earlier run of a reindex
+                self.metrics.duplicates += 1
+                await self._done(1)
+            else:
+                self.metrics.failed += 1
+                self.metrics.last_error = str(result.get("error"))
+                logger.error(f"Bulk indexing into {action.index} failed with {status}: {result.get('error')}")
+                await self._done(1)
+        await self._notify(written)
+        return retry
+
+    async def _notify(self, indices: Iterable[str]) -> None:
+        """Report the indices a bulk request wrote to"""
+        indices = set(indices)
+        if self.on_indexed is None or not indices:
+            return
+        try:
+            await self.on_indexed(indices)
+        except Exception as e:
+            logger.error(f"Bulk indexer write callback failed: {e}")
+
+    async def _done(self, count: int) -> None:
+        """Release queue room held by finished documents"""
+        self._pending -= count
+        async with self._space:
+            self._space.notify_all()
+
+    def _record(self, batch_size: int, flush_latency: float) -> None:
+        """Record one bulk request"""
+        metrics = self.metrics
+        metrics.requests += 1
+        metrics.avg_batch_size += (batch_size - metrics.avg_batch_size) / metrics.requests
+
+        flush_ms = flush_latency * 1000
+        metrics.avg_flush_latency_ms += (flush_ms - metrics.avg_flush_latency_ms) / metrics.requests
+        metrics.max_flush_latency_ms = max(metrics.max_flush_latency_ms, flush_ms)
+
+    async def flush(self) -> None:
+        """Ship every buffer and wait until all queued documents are indexed or dropped"""
+        for index in list(self._buffers):
+            self._ship(index)
+        while self._sends:
+            await asyncio.gather(*list(self._sends), return_exceptions=True)
+
+    def get_metrics(self) -> BulkIndexerMetrics:
+        """Get bulk indexer metrics"""
+        self.metrics.queue_depth = self._pending
+        return self.metrics
+
+    async def close(self) -> None:
+        """Stop accepting documents, drain the buffers and stop the flusher"""
+        self._closed = True
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
@@ -0,0 +1,521 @@
+"""
+MABOS Cypher Query Catalog
+
+Every Cypher query issued by the BDI, knowledge graph and onboarding layers,
+defined once and registered with the global query registry.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+from neo4j import READ_ACCESS, WRITE_ACCESS
+
+from app.core.pagination import CURSOR_FIELDS, CONTEXT_ORDERS
+from app.core.query_registry import CypherQuery, query_registry
+
+# ===== SYSTEM =====
+
+HEALTH_CHECK = query_registry.register(CypherQuery(
+    name="system.health_check",
+    access_mode=READ_ACCESS,
+    cypher="RETURN 1 as health"
+))
+
+# ===== BDI AGENT KNOWLEDGE =====
+
+# Node properties that may be requested in a projection
+PROJECTION_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+MAX_PROJECTION_FIELDS = 20
+
+AGENT_CREATE_BELIEF = query_registry.register(CypherQuery(
+    name="agent.create_belief",
+    access_mode=WRITE_ACCESS,
+    parameters=("agent_id", "belief_id", "category", "content", "confidence", "source", "description"),
+    description="Create a belief node and attach it to its agent",
+    cypher="""
+        MATCH (agent:Agent {id: $agent_id})
+        CREATE (belief:Belief {
+            id: $belief_id,
+            category: $category,
+            content: $content,
+            confidence: $confidence,
+            source: $source,
+            created_at: datetime(),
+            last_updated: datetime(),
+            description: $description
+        })
+        CREATE (agent)-[:HAS_BELIEF]->(belief)
+        RETURN belief
+    """
+))
+
+AGENT_CREATE_BELIEFS_BULK = query_registry.register(CypherQuery(
+    name="agent.create_beliefs_bulk",
+    access_mode=WRITE_ACCESS,
+    parameters=("beliefs",),
+    description="Create a chunk of beliefs for many agents in one statement",
+    cypher="""
+        UNWIND $beliefs AS row
+        MATCH (agent:Agent {id: row.agent_id})
+        CREATE (belief:Belief {
+            id: row.belief_id,
+            category: row.category,
+            content: row.content,
+            confidence: row.confidence,
+            source: row.source,
+            created_at: datetime(),
+            last_updated: datetime(),
+            description: row.description
+        })
+        CREATE (agent)-[:HAS_BELIEF]->(belief)
+        RETURN row.agent_id AS agent_id, count(belief) AS created
+    """
+))
+
+AGENT_CREATE_BELIEFS_RETURNING = query_registry.register(CypherQuery(
+    name="agent.create_beliefs_returning",
+    access_mode=WRITE_ACCESS,
+    parameters=("beliefs",),
+    description="Create a group-committed batch of beliefs and return each created belief",
+    cypher="""
+        UNWIND $beliefs AS row
+        MATCH (agent:Agent {id: row.agent_id})
+        CREATE (belief:Belief {
+            id: row.belief_id,
+            category: row.category,
+            content: row.content,
+            confidence: row.confidence,
+            source: row.source,
+            created_at: datetime(),
+            last_updated: datetime(),
+            description: row.description
+        })
+        CREATE (agent)-[:HAS_BELIEF]->(belief)
+        RETURN row.belief_id AS belief_id, belief
+    """
+))
+
+AGENT_MERGE_BELIEFS = query_registry.register(CypherQuery(
+    name="agent.merge_beliefs",
+    access_mode=WRITE_ACCESS,
+    parameters=("beliefs",),
+    description="Create beliefs by id unless they exist, so replayed writes are idempotent",
+    cypher="""
+        UNWIND $beliefs AS row
+        MATCH (agent:Agent {id: row.agent_id})
+        MERGE (belief:Belief {id: row.belief_id})
+        ON CREATE SET belief.category = row.category,
+                      belief.content = row.content,
+                      belief.confidence = row.confidence,
+                      belief.source = row.source,
+                      belief.created_at = datetime(),
+                      belief.last_updated = datetime(),
+                      belief.description = row.description
+        MERGE (agent)-[:HAS_BELIEF]->(belief)
+        RETURN row.belief_id AS belief_id
+    """
+))
+
+AGENT_REINFORCE_BELIEFS = query_registry.register(CypherQuery(
+    name="agent.reinforce_beliefs",
+    access_mode=WRITE_ACCESS,
+    parameters=("folds",),
+    description="Fold re-asserted beliefs into existing near-duplicate beliefs of the same agent",
+    cypher="""
+        UNWIND $folds AS row
+        MATCH (:Agent {id: row.agent_id})-[:HAS_BELIEF]->(belief:Belief {id: row.belief_id})
+        SET belief.confidence = CASE WHEN row.confidence > belief.confidence THEN row.confidence ELSE belief.confidence END,
+            belief.observation_count = coalesce(belief.observation_count, 1) + 1,
+            belief.last_observed_at = datetime(),
+            belief.last_updated = datetime()
+        RETURN row.index AS index, belief
+    """
+))
+
+AGENT_UPDATE_INTENTION_PROGRESS = query_registry.register(CypherQuery(
+    name="agent.update_intention_progress",
+    access_mode=WRITE_ACCESS,
+    parameters=("intention_id", "progress"),
+    description="Set the progress of a single intention and return its owning agents",
+    cypher="""
+        MATCH (intention:Intention {id: $intention_id})
+        SET intention.progress = $progress,
+            intention.last_updated = datetime()
+        WITH intention
+        OPTIONAL MATCH (agent:Agent)-[:HAS_INTENTION]->(intention)
+        RETURN intention.id as id, collect(agent.id) as agent_ids
+    """
+))
+
+AGENT_UPDATE_INTENTIONS_PROGRESS = query_registry.register(CypherQuery(
+    name="agent.update_intentions_progress",
+    access_mode=WRITE_ACCESS,
+    parameters=("updates",),
+    description="Set the progress of many intentions and return their owning agents",
+    cypher="""
+        UNWIND $updates AS row
+        MATCH (intention:Intention {id: row.intention_id})
+        SET intention.progress = row.progress,
+            intention.last_updated = datetime()
+        WITH intention
+        OPTIONAL MATCH (agent:Agent)-[:HAS_INTENTION]->(intention)
+        RETURN intention.id as id, collect(agent.id) as agent_ids
+    """
+))
+
+# Bounded collections of the agent knowledge graph: name -> (pattern, node variable)
+AGENT_KNOWLEDGE_GRAPH_COLLECTIONS = {
+    "beliefs": ("(agent)-[:HAS_BELIEF]->(belief:Belief)", "belief"),
+    "desires": ("(agent)-[:HAS_DESIRE]->(desire:Desire)", "desire"),
+    "intentions": ("(agent)-[:HAS_INTENTION]->(intention:Intention)", "intention"),
+    "plans": ("(agent)-[:HAS_INTENTION]->(:Intention)-[:ACHIEVED_BY]->(plan:Plan)", "plan"),
+}
+
+
+def _projection(variable: str, fields: Optional[Tuple[str, ...]]) -> str:
+    """Return expression for a node, as a map projection when fields are given"""
+    if not fields:
+        return variable
+    return f"{variable} {{{', '.join('.' + field for field in fields)}}}"
+
+
+def _bounded_collection(name: str, pattern: str, variable: str, order: str, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """Build a COLLECT subquery returning one keyset-paged, ordered, limited collection
+
+    Each collection is evaluated independently per agent, so the result size is
+    the sum of the collections rather than their cross product.
+    """
+    comparison, direction = ("<", "DESC") if order == "newest" else (">", "ASC")
+    return f"""COLLECT {{
+                   MATCH {pattern}
+                   WITH DISTINCT {variable}
+                   WITH {variable}, coalesce({variable}.created_at, datetime({{epochSeconds: 0}})) AS sort_key
+                   WHERE ${name}_cursor IS NULL
+                      OR sort_key {comparison} datetime(${name}_cursor.created_at)
+                      OR (sort_key = datetime(${name}_cursor.created_at) AND {variable}.id {comparison} ${name}_cursor.id)
+                   WITH {variable}, sort_key
+                   ORDER BY sort_key {direction}, {variable}.id {direction}
+                   LIMIT ${name}_limit
+                   RETURN {_projection(variable, fields)}
+               }} AS {name}"""
+
+
+def normalize_fields(fields: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """Validate a property projection and return it in canonical (sorted) form
+
+    Property names are interpolated into Cypher, so only plain identifiers are
+    accepted. The cursor fields are always kept so projected collections stay pageable.
+    """
+    if not fields:
+        return None
+
+    names = {field.strip() for field in fields if field and field.strip()}
+    if not names:
+        return None
+
+    invalid = sorted(name for name in names if not PROJECTION_FIELD_PATTERN.match(name))
+    if invalid:
+        raise ValueError(f"Invalid projection fields: {', '.join(invalid)}")
+    if len(names) > MAX_PROJECTION_FIELDS:
+        raise ValueError(f"At most {MAX_PROJECTION_FIELDS} projection fields are allowed")
+
+    return tuple(sorted(names | set(CURSOR_FIELDS)))
+
+
+def bounded_collections_query(
+    name: str,
+    root_match: str,
+    root_variable: str,
+    collections: dict,
+    order: str,
+    description: str,
+    root_parameters: tuple = ("agent_id",),
+    fields: Optional[Tuple[str, ...]] = None
+) -> CypherQuery:
+    """Build and register the query variant for one collection ordering and projection
+
+    Sort direction cannot be parameterised in Cypher, so each ordering is a
+    separately registered query with its own plan cache entry and statistics.
+    Projections are pushed into the RETURN clause, so only the requested
+    properties leave the database.
+    """
+    if order not in CONTEXT_ORDERS:
+        raise ValueError(f"Unsupported collection order: {order}")
+
+    subqueries = ",\n               ".join(
+        _bounded_collection(collection, pattern, variable, order, fields)
+        for collection, (pattern, variable) in collections.items()
+    )
+    parameters = tuple(
+        f"{collection}_{suffix}" for collection in collections for suffix in ("limit", "cursor")
+    )
+    variant = f"{name}.{order}_first"
+    if fields:
+        variant = f"{variant}.fields({','.join(fields)})"
+
+    return query_registry.register(CypherQuery(
+        name=variant,
+        access_mode=READ_ACCESS,
+        parameters=root_parameters + parameters,
+        description=description,
+        cypher=f"""
+        {root_match}
+        RETURN {_projection(root_variable, fields)} AS {root_variable},
+               {subqueries}
+    """
+    ))
+
+
+# How the agents of a knowledge graph query are selected: scope -> (name, match, parameters, description)
+AGENT_KNOWLEDGE_GRAPH_SCOPES = {
+    "agent": (
+        "agent.knowledge_graph",
+        "MATCH (agent:Agent {id: $agent_id})",
+        ("agent_id",),
+        "Agent node with bounded, paged beliefs, desires, intentions and plans"
+    ),
+    # Batch scopes return one row per agent, so many contexts cost one round trip
+    "agents": (
+        "agent.knowledge_graph_batch",
+        "UNWIND $agent_ids AS agent_id\n        MATCH (agent:Agent {id: agent_id})",
+        ("agent_ids",),
+        "Knowledge graphs of a list of agents with bounded collections"
+    ),
+    # Agents of a business are paged in id order, at most $agents_limit after $agents_after
+    "business": (
+        "agent.knowledge_graph_by_business",
+        "MATCH (agent:Agent)-[:BELONGS_TO]->(:Business {id: $business_id})\n"
+        "        WHERE $agents_after IS NULL OR agent.id > $agents_after\n"
+        "        WITH agent ORDER BY agent.id LIMIT $agents_limit",
+        ("business_id", "agents_after", "agents_limit"),
+        "Knowledge graphs of a page of the agents of a business with bounded collections"
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def agent_knowledge_graph_query(scope: str, order: str, fields: Optional[Tuple[str, ...]] = None) -> CypherQuery:
+    """Get the knowledge graph query variant for a scope, ordering and normalized projection"""
+    name, root_match, root_parameters, description = AGENT_KNOWLEDGE_GRAPH_SCOPES[scope]
+    return bounded_collections_query(
+        name,
+        root_match,
+        "agent",
+        AGENT_KNOWLEDGE_GRAPH_COLLECTIONS,
+        order,
+        description,
+        root_parameters=root_parameters,
+        fields=fields
+    )
+
+
+AGENT_KNOWLEDGE_GRAPH = {order: agent_knowledge_graph_query("agent", order) for order in CONTEXT_ORDERS}
+AGENT_KNOWLEDGE_GRAPH_BATCH = {order: agent_knowledge_graph_query("agents", order) for order in CONTEXT_ORDERS}
+AGENT_KNOWLEDGE_GRAPH_BY_BUSINESS = {order: agent_knowledge_graph_query("business", order) for order in CONTEXT_ORDERS}
+
+# ===== BELIEF COMPACTION =====
+
+BELIEF_COMPACTION_AGENT_PAGE = query_registry.register(CypherQuery(
+    name="belief_compaction.agent_page",
+    access_mode=READ_ACCESS,
+    parameters=("after", "limit"),
+    description="Page through agent ids in id order",
+    cypher="""
+        MATCH (agent:Agent)
+        WHERE $after IS NULL OR agent.id > $after
+        RETURN agent.id AS agent_id
+        ORDER BY agent_id
+        LIMIT $limit
+    """
+))
+
+BELIEF_COMPACTION_DECAY = query_registry.register(CypherQuery(
+    name="belief_compaction.decay",
+    access_mode=WRITE_ACCESS,
+    parameters=("agent_ids", "half_lives", "default_half_life", "now", "limit"),
+    description="Apply exponential confidence decay to a bounded batch of beliefs not yet decayed at $now",
+    cypher="""
+        UNWIND $agent_ids AS agent_id
+        MATCH (:Agent {id: agent_id})-[:HAS_BELIEF]->(belief:Belief)
+        WITH agent_id, belief,
+             coalesce($half_lives[belief.category], $default_half_life) AS half_life,
+             CASE
+                 WHEN belief.decayed_at IS NULL OR belief.last_observed_at > belief.decayed_at
+                 THEN coalesce(belief.last_observed_at, belief.created_at)
+                 ELSE belief.decayed_at
+             END AS since
+        WHERE half_life > 0 AND since < $now
+        WITH agent_id, belief, half_life, since
+        LIMIT $limit
+        SET belief.confidence = belief.confidence * 0.5 ^ (duration.inSeconds(since, $now).seconds / 86400.0 / half_life),
+            belief.decayed_at = $now
+        RETURN agent_id, count(belief) AS decayed
+    """
+))
+
+BELIEF_COMPACTION_FIND_EXPIRED = query_registry.register(CypherQuery(
+    name="belief_compaction.find_expired",
+    access_mode=READ_ACCESS,
+    parameters=("agent_ids", "ttls", "default_ttl", "min_confidence", "now", "limit"),
+    description="Find a bounded batch of beliefs past their category TTL or below the confidence floor",
+    cypher="""
+        UNWIND $agent_ids AS agent_id
+        MATCH (:Agent {id: agent_id})-[:HAS_BELIEF]->(belief:Belief)
+        WITH agent_id, belief, coalesce($ttls[belief.category], $default_ttl) AS ttl
+        WHERE (ttl > 0 AND coalesce(belief.last_observed_at, belief.created_at) < $now - duration({seconds: ttl}))
+           OR belief.confidence < $min_confidence
+        RETURN agent_id, belief {.*} AS belief
+        LIMIT $limit
+    """
+))
+
+BELIEF_COMPACTION_FIND_DUPLICATES = query_registry.register(CypherQuery(
+    name="belief_compaction.find_duplicates",
+    access_mode=READ_ACCESS,
+    parameters=("agent_ids", "limit"),
+    description="Find a bounded batch of same-category, same-content belief groups; the oldest belief is kept",
+    cypher="""
+        UNWIND $agent_ids AS agent_id
+        MATCH (:Agent {id: agent_id})-[:HAS_BELIEF]->(belief:Belief)
+        WITH agent_id, belief
+        ORDER BY belief.created_at, belief.id
+        WITH agent_id, belief.category AS category, belief.content AS content, collect(belief) AS beliefs
+        WHERE size(beliefs) > 1
+        RETURN agent_id, beliefs[0].id AS keeper_id, [duplicate IN beliefs[1..] | duplicate {.*}] AS duplicates
+        LIMIT $limit
+    """
+))
+
+BELIEF_COMPACTION_MERGE = query_registry.register(CypherQuery(
+    name="belief_compaction.merge",
+    access_mode=WRITE_ACCESS,
+    parameters=("merges",),
+    description="Fold duplicate beliefs into their kept belief, summing observation counts",
+    cypher="""
+        UNWIND $merges AS merge
+        MATCH (keeper:Belief {id: merge.keeper_id})
+        OPTIONAL MATCH (duplicate:Belief)
+        WHERE duplicate.id IN merge.duplicate_ids
+        WITH keeper, collect(duplicate) AS duplicates
+        WITH keeper, duplicates,
+             reduce(total = coalesce(keeper.observation_count, 1), d IN duplicates | total + coalesce(d.observation_count, 1)) AS observations,
+             reduce(highest = keeper.confidence, d IN duplicates |
+                 CASE WHEN d.confidence > highest THEN d.confidence ELSE highest END) AS confidence,
+             reduce(latest = coalesce(keeper.last_observed_at, keeper.created_at), d IN duplicates |
+                 CASE WHEN latest IS NULL OR coalesce(d.last_observed_at, d.created_at) > latest
+                      THEN coalesce(d.last_observed_at, d.created_at) ELSE latest END) AS last_observed_at
+        SET keeper.observation_count = observations,
+            keeper.confidence = confidence,
+            keeper.last_observed_at = last_observed_at,
+            keeper.last_updated = datetime()
+        FOREACH (duplicate IN duplicates | DETACH DELETE duplicate)
+        RETURN sum(size(duplicates)) AS merged
+    """
+))
+
+BELIEF_COMPACTION_DELETE = query_registry.register(CypherQuery(
+    name="belief_compaction.delete",
+    access_mode=WRITE_ACCESS,
+    parameters=("belief_ids",),
+    description="Delete beliefs by id",
+    cypher="""
+        UNWIND $belief_ids AS belief_id
+        MATCH (belief:Belief {id: belief_id})
+        DETACH DELETE belief
+        RETURN count(*) AS deleted
+    """
+))
+
+# ===== SBVR KNOWLEDGE GRAPH =====
+
+KG_VALIDATE_BUSINESS_RULE = query_registry.register(CypherQuery(
+    name="kg.validate_business_rule",
+    access_mode=READ_ACCESS,
+    parameters=("rule_id",),
+    description="Rule with its proof table and validated proof entries",
+    cypher="""
+        MATCH (r:Rule {id: $rule_id})
+        MATCH (pt:ProofTable)-[:VALIDATES]->(r)
+        MATCH (pe:ProofEntry)-[:BELONGS_TO]->(pt)
+        WHERE pe.validation_status = 'validated'
+        RETURN r, pt, collect(pe) as proof_entries
+    """
+))
+
+# Bounded collections of the SBVR agent knowledge context
+KG_AGENT_KNOWLEDGE_CONTEXT_COLLECTIONS = {
+    "beliefs": ("(a)-[:HAS_BELIEF]->(b:Belief)", "b"),
+    "desires": ("(a)-[:HAS_DESIRE]->(d:Desire)", "d"),
+    "intentions": ("(a)-[:HAS_INTENTION]->(i:Intention)", "i"),
+    "known_concepts": ("(a)-[:KNOWS_CONCEPT]->(c:ConceptType)", "c"),
+    "applicable_rules": ("(a)-[:APPLIES_RULE]->(r:Rule)", "r"),
+}
+
+KG_AGENT_KNOWLEDGE_CONTEXT = {
+    order: bounded_collections_query(
+        "kg.agent_knowledge_context",
+        "MATCH (a:Agent {id: $agent_id})",
+        "a",
+        KG_AGENT_KNOWLEDGE_CONTEXT_COLLECTIONS,
+        order,
+        "Agent BDI state with bounded, paged known concepts and applicable rules"
+    )
+    for order in CONTEXT_ORDERS
+}
+
+KG_RULE_USAGE_ANALYSIS = query_registry.register(CypherQuery(
+    name="kg.rule_usage_analysis",
+    access_mode=READ_ACCESS,
+    description="Rule complexity and usage patterns",
+    cypher="""
+        MATCH (r:Rule)
+        OPTIONAL MATCH (pt:ProofTable)-[:VALIDATES]->(r)
+        OPTIONAL MATCH (pe:ProofEntry)-[:BELONGS_TO]->(pt)
+        RETURN r.id, r.priority, count(pe) as proof_entries_count,
+               avg(pe.confidence) as avg_confidence
+        ORDER BY r.priority DESC, proof_entries_count DESC
+    """
+))
+
+KG_CONCEPT_USAGE_ANALYSIS = query_registry.register(CypherQuery(
+    name="kg.concept_usage_analysis",
+    access_mode=READ_ACCESS,
+    description="Frequently used concept types",
+    cypher="""
+        MATCH (c:ConceptType)
+        OPTIONAL MATCH (f:FactType)-[:RELATES_TO]->(c)
+        OPTIONAL MATCH (c)-[:DEFINES]->(v:VocabularyElement)
+        RETURN c.name, count(f) as fact_relationships, count(v) as vocabulary_definitions
+        ORDER BY fact_relationships DESC, vocabulary_definitions DESC
+    """
+))
+
+KG_REASONING_ENGINE_ANALYSIS = query_registry.register(CypherQuery(
+    name="kg.reasoning_engine_analysis",
+    access_mode=READ_ACCESS,
+    description="Reasoning engine workload",
+    cypher="""
+        MATCH (re:ReasoningEngine)
+        OPTIONAL MATCH (re)-[:PROCESSES]->(r:Rule)
+        RETURN re.name, re.engine_type, count(r) as rules_processed,
+               re.performance_config as config
+    """
+))
+
+# ===== BUSINESS ONBOARDING =====
+
+BUSINESS_CREATE_AGENT = query_registry.register(CypherQuery(
+    name="business.create_agent",
+    access_mode=WRITE_ACCESS,
+    parameters=("business_id", "business_name", "business_type", "agent_id", "role"),
+    description="Merge a business node and an agent belonging to it",
+    cypher="""
+        MERGE (b:Business {id: $business_id})
+        ON CREATE SET b.name = $business_name, b.type = $business_type, b.created_at = datetime()
+        MERGE (a:Agent {id: $agent_id})
+        ON CREATE SET a.role = $role, a.status = 'active', a.created_at = datetime()
+        MERGE (a)-[:BELONGS_TO]->(b)
+        RETURN a.id AS agent_id
+    """
+))
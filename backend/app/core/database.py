@@ -7,21 +7,47 @@ Implements the database architecture plan with BDI agent knowledge graph integra
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import json
+import time
 
 # Database drivers
 import asyncpg
-from neo4j import AsyncGraphDatabase
 import redis.asyncio as redis
 from elasticsearch import AsyncElasticsearch
 
 # Configuration and utilities
+from pydantic import BaseModel, Field, ValidationError
 from pydantic_settings import BaseSettings
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from app.core import cypher_queries
+from app.core.agent_context_cache import (
+    AgentContextCache,
+    agent_version_key,
+    context_cache_key,
+    etag_matches,
+    make_etag,
+    options_digest,
+)
+from app.core.analytics_reindex import AnalyticsReindexer
+from app.core.analytics_rollups import AnalyticsRollups
+from app.core.belief_compaction import BeliefCompactionJob
+from app.core.belief_dedup import BeliefDeduplicator
+from app.core.group_commit import GroupCommitBuffer
+from app.core.ids import new_id
+from app.core.intention_progress import LiveIntentionProgress, intention_ids, merge_live_progress
+from app.core.log_shipping import ElasticsearchLogHandler
+from app.core.neo4j_driver import get_neo4j_driver_factory
+from app.core.pagination import CONTEXT_ORDERS, collection_parameters, page_collections, resolve_limits
+from app.core.query_registry import query_registry
+from app.core.search_cache import SearchResultCache
+from app.core.serialization import dumps, to_builtin
+from app.core.workflow_changes import detect_changes, sync_state_key, workflow_cache_key
+from app.core.workflow_outbox import WORKFLOW_AGENT_ID, WorkflowOutbox, workflow_belief
+
 # Logging setup
 logger = logging.getLogger(__name__)
 
@@ -39,6 +65,58 @@ class DatabaseConfig(BaseSettings):
     neo4j_user: str = "neo4j"
     neo4j_password: str = "neo4j_password"
     neo4j_database: str = "mabos"
+    neo4j_max_connection_pool_size: int = 100
+    neo4j_connection_acquisition_timeout: float = 30.0  # seconds
+    neo4j_max_connection_lifetime: int = 3600  # seconds
+    neo4j_profile_sample_rate: float = 0.01  # fraction of registry queries run with PROFILE (db hit sampling)
+    neo4j_slow_query_threshold_ms: float = 500.0
+    agent_context_default_limit: int = 100  # items per context collection when no limit is given
+    agent_context_max_limit: int = 1000
+    agent_context_cache_ttl: int = 300  # seconds, for both cache tiers
+    agent_context_l1_max_entries: int = 1024
+    agent_context_batch_max_agents: int = 500
+    belief_bulk_chunk_size: int = 1000  # beliefs per UNWIND write transaction
+    belief_bulk_max_items: int = 50000
+    write_buffer_enabled: bool = True  # group-commit single belief and intention progress writes
+    write_buffer_max_batch_size: int = 500
+    write_buffer_max_delay_ms: float = 5.0
+    write_buffer_max_pending: int = 10000
+    write_buffer_enqueue_timeout: float = 5.0  # seconds a writer may be held back when the buffer is full
+    belief_compaction_enabled: bool = False  # run the belief compaction job in the background
+    belief_compaction_interval: int = 3600  # seconds between compaction runs
+    belief_compaction_agent_batch_size: int = 100  # agents compacted together
+    belief_compaction_batch_size: int = 1000  # beliefs or duplicate groups per transaction
+    belief_compaction_merge_duplicates: bool = True
+    belief_compaction_archive: bool = False  # archive removed beliefs to PostgreSQL belief_archive
+    belief_decay_half_life_days: float = 0.0  # 0 disables confidence decay
+    belief_decay_half_lives: Dict[str, float] = {}  # per-category half-life overrides, in days
+    belief_ttl: int = 0  # seconds since last observation; 0 keeps beliefs forever
+    belief_ttls: Dict[str, int] = {}  # per-category TTL overrides, in seconds
+    belief_min_confidence: float = 0.0  # beliefs decayed below this confidence are expired
+    belief_dedup_enabled: bool = False  # fold near-duplicate beliefs into existing ones at ingest
+    belief_dedup_threshold: float = 0.8  # estimated Jaccard similarity of content shingles
+    belief_dedup_num_perm: int = 64  # MinHash permutations per signature
+    belief_dedup_bands: int = 16  # LSH bands; must divide belief_dedup_num_perm
+    belief_dedup_max_agents: int = 10000  # agent sketch indexes kept in memory
+    belief_dedup_sketch_ttl: int = 604800  # seconds a persisted agent sketch set lives after its last write
+    intention_progress_live_enabled: bool = False  # keep reported progress in Redis and flush it to Neo4j periodically
+    intention_progress_flush_interval: float = 1.0  # seconds between flushes of live progress
+    intention_progress_flush_batch_size: int = 1000  # intentions per UNWIND write
+    intention_progress_max_updates_per_second: int = 50  # reports accepted per intention; 0 disables the check
+    intention_progress_key_shards: int = 16  # Redis Cluster hash tags live progress is spread over; change only when no progress is pending
+    intention_progress_live_ttl: int = 86400  # seconds a live value and its holder set outlive the last report
+    intention_progress_batch_max_items: int = 1000  # updates accepted by one batch progress request
+    workflow_outbox_enabled: bool = False  # queue workflow sync in the PostgreSQL outbox and relay it in the background
+    workflow_outbox_targets: List[str] = ["neo4j", "redis", "elasticsearch"]
+    workflow_outbox_batch_size: int = 100  # rows claimed per relay batch
+    workflow_outbox_poll_interval: float = 1.0  # seconds an idle relay waits before polling again
+    workflow_outbox_lease: float = 30.0  # seconds a claimed row is hidden from other relays
+    workflow_outbox_max_attempts: int = 10  # failed deliveries before a row is marked dead
+    workflow_outbox_retry_base_delay: float = 1.0  # seconds, doubled per failed attempt
+    workflow_outbox_retry_max_delay: float = 300.0
+    workflow_outbox_retention: int = 86400  # seconds delivered rows are kept
+    workflow_outbox_purge_interval: float = 300.0  # seconds between purges of delivered rows
+    workflow_sync_state_ttl: int = 2592000  # seconds the content hashes of the last sync are kept
     
     # Redis Configuration
     redis_url: str = "redis://localhost:6380/0"
@@ -47,11 +125,64 @@ class DatabaseConfig(BaseSettings):
     # Elasticsearch Configuration
     elasticsearch_url: str = "http://localhost:9200"
     elasticsearch_index_prefix: str = "mabos"
+    elasticsearch_bulk_enabled: bool = True  # queue analytics documents on the shared bulk indexer
+    elasticsearch_bulk_max_docs: int = 1000  # documents per index buffer before it is shipped
+    elasticsearch_bulk_max_bytes: int = 5242880  # encoded bytes per index buffer before it is shipped
+    elasticsearch_bulk_flush_interval: float = 1.0  # seconds a document may wait in a buffer
+    elasticsearch_bulk_max_in_flight: int = 4  # concurrent _bulk requests
+    elasticsearch_bulk_max_pending: int = 50000  # queued documents before writers are held back
+    elasticsearch_bulk_enqueue_timeout: float = 5.0
+    elasticsearch_bulk_max_retries: int = 5  # retries of a rejected document before it is dropped
+    elasticsearch_bulk_retry_base_delay: float = 0.5  # seconds, doubled per retry
+    elasticsearch_bulk_retry_max_delay: float = 30.0
+    elasticsearch_data_streams_enabled: bool = True  # write logs, metrics and events to data streams with ILM rollover
+    elasticsearch_ingest_pipelines_enabled: bool = True  # enrich documents in ingest pipelines; False enriches in Python
+    elasticsearch_pit_keep_alive: str = "1m"  # how long a point in time survives between cursor pages
+    elasticsearch_scan_page_size: int = 1000  # hits per page when streaming all hits of a search
+    elasticsearch_log_shipping_enabled: bool = False  # ship application logs to the logs index
+    elasticsearch_log_shipping_level: str = "INFO"
+    elasticsearch_log_shipping_queue_size: int = 10000  # records held before the drop policy applies
+    elasticsearch_log_shipping_drop_policy: str = "drop_newest"  # or drop_oldest
+    elasticsearch_log_shipping_batch_size: int = 500  # records handed to the bulk indexer per loop iteration
+    elasticsearch_log_shipping_interval: float = 0.5  # seconds between drains of the log queue
+    analytics_rollups_enabled: bool = False  # answer the analytics dashboard from hourly and daily rollups
+    analytics_rollup_interval: float = 300.0  # seconds between rollup passes
+    analytics_rollup_lateness: int = 300  # seconds after an hour ends before it is rolled up
+    analytics_rollup_initial_lookback: int = 604800  # seconds rolled up when no rollup exists yet
+    analytics_rollup_max_hours_per_pass: int = 168
+    analytics_rollup_hourly_ttl: int = 691200  # seconds hourly rollups are kept
+    analytics_rollup_daily_ttl: int = 34560000  # seconds daily rollups are kept
+    analytics_dashboard_cache_bucket: int = 60  # seconds dashboard time ranges are rounded to
+    analytics_dashboard_cache_max_ttl: int = 300  # seconds a dashboard result may be served from cache
+    analytics_reindex_batch_size: int = 5000  # documents enriched per vectorized batch when reindexing
+    analytics_reindex_enqueue_timeout: float = 60.0  # seconds a reindex batch may wait for bulk indexer room
+    search_cache_enabled: bool = False  # serve repeated analytics searches from the result cache
+    search_cache_ttl: int = 30  # seconds a search result may be served from cache
+    search_cache_l1_max_entries: int = 1024  # search results kept in process
+    search_cache_generation_refresh: float = 1.0  # seconds between re-reads of index write generations
+    search_cache_write_settle: float = 1.0  # seconds after an index write before its results are cached; at least the index refresh_interval
     
     class Config:
         env_file = ".env"
 
 
+class BeliefInput(BaseModel):
+    """A belief submitted for bulk ingestion"""
+    agent_id: str = Field(min_length=1)
+    category: str
+    content: str
+    confidence: float = Field(ge=0.0, le=1.0)
+    source: str = "api"
+    description: str = ""
+
+
+class IntentionProgressInput(BaseModel):
+    """A progress update submitted in a batch"""
+    intention_id: str = Field(min_length=1)
+    progress: float = Field(ge=0.0, le=1.0)
+    reset: bool = False
+
+
 class PostgreSQLManager:
     """PostgreSQL database manager for primary relational data"""
     
@@ -93,7 +224,14 @@ class PostgreSQLManager:
         async with self.engine.begin() as conn:
             from sqlalchemy import text
             result = await conn.execute(text(query), params or {})
-            return [dict(row) for row in result.fetchall()]
+            return [dict(row._mapping) for row in result.fetchall()] if result.returns_rows else []
+    
+    async def execute_many(self, query: str, rows: List[Dict]) -> int:
+        """Execute a raw SQL statement once per parameter set in a single transaction"""
+        async with self.engine.begin() as conn:
+            from sqlalchemy import text
+            result = await conn.execute(text(query), rows)
+            return result.rowcount
     
     async def health_check(self) -> bool:
         """Check PostgreSQL connection health"""
@@ -112,116 +250,303 @@ class Neo4jManager:
     
     def __init__(self, config: DatabaseConfig):
         self.config = config
+        self.driver_factory = get_neo4j_driver_factory(config)
         self.driver = None
+        query_registry.configure(
+            profile_sample_rate=config.neo4j_profile_sample_rate,
+            slow_query_threshold_ms=config.neo4j_slow_query_threshold_ms
+        )
         
     async def initialize(self):
-        """Initialize Neo4j driver"""
+        """Initialize the shared Neo4j driver"""
         try:
-            self.driver = AsyncGraphDatabase.driver(
-                self.config.neo4j_uri,
-                auth=(self.config.neo4j_user, self.config.neo4j_password)
-            )
-            
-            # Verify connectivity
-            await self.driver.verify_connectivity()
+            # The factory creates the driver once and verifies connectivity
+            self.driver = await self.driver_factory.get_driver()
             logger.info("Neo4j manager initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Neo4j: {e}")
             raise
     
+    def session(self, **kwargs):
+        """Open a session on the shared driver"""
+        return self.driver_factory.session(**kwargs)
+    
+    async def run_query(self, name: str, params: Dict = None, raw: bool = False) -> List[Dict]:
+        """
+        Execute a named query from the query registry.
+        With raw=True, record values keep their Neo4j driver types for single-pass JSON encoding.
+        """
+        records = await query_registry.run(self.driver_factory, name, params, raw=True)
+        rows = [dict(record) for record in records]
+        return rows if raw else to_builtin(rows)
+    
+    async def execute_read(self, query: str, params: Dict = None) -> List[Dict]:
+        """Execute a read-only Cypher query in a managed read transaction"""
+        records = await self.driver_factory.execute_read(query, params)
+        # Convert Neo4j DateTime objects to ISO strings for JSON serialization
+        return self._serialize_neo4j_types(records)
+    
+    async def execute_write(self, query: str, params: Dict = None) -> List[Dict]:
+        """Execute a Cypher query that writes in a managed write transaction"""
+        records = await self.driver_factory.execute_write(query, params)
+        return self._serialize_neo4j_types(records)
+    
     async def execute_query(self, query: str, params: Dict = None) -> List[Dict]:
-        """Execute a Cypher query"""
-        async with self.driver.session(database=self.config.neo4j_database) as session:
-            result = await session.run(query, params or {})
-            records = await result.data()
-            # Convert Neo4j DateTime objects to ISO strings for JSON serialization
-            return [self._serialize_neo4j_types(record) for record in records]
+        """Execute a Cypher query of unknown access mode (routed as a write)"""
+        return await self.execute_write(query, params)
     
     def _serialize_neo4j_types(self, obj):
         """Convert Neo4j types to JSON-serializable types"""
-        if hasattr(obj, '__dict__'):
-            # Handle Neo4j DateTime objects
-            from neo4j.time import DateTime
-            if isinstance(obj, DateTime):
-                return obj.isoformat()
-        
-        if isinstance(obj, dict):
-            return {key: self._serialize_neo4j_types(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._serialize_neo4j_types(item) for item in obj]
-        elif hasattr(obj, 'isoformat'):  # Handle datetime-like objects
-            return obj.isoformat()
-        else:
-            return obj
+        return to_builtin(obj)
     
     async def create_agent_belief(self, agent_id: str, belief_data: Dict) -> Dict:
         """Create a new belief for a BDI agent"""
-        query = """
-        MATCH (agent:Agent {id: $agent_id})
-        CREATE (belief:Belief {
-            id: $belief_id,
-            category: $category,
-            content: $content,
-            confidence: $confidence,
-            source: $source,
-            created_at: datetime(),
-            last_updated: datetime(),
-            description: $description
-        })
-        CREATE (agent)-[:HAS_BELIEF]->(belief)
-        RETURN belief
-        """
-        
         params = {
             "agent_id": agent_id,
-            "belief_id": f"belief_{agent_id}_{datetime.now().timestamp()}",
+            "belief_id": new_id(),
             **belief_data
         }
         
-        result = await self.execute_query(query, params)
+        result = await self.run_query(cypher_queries.AGENT_CREATE_BELIEF.name, params)
         return result[0] if result else None
     
-    async def update_agent_intention_progress(self, intention_id: str, progress: float) -> bool:
-        """Update the progress of an agent's intention"""
-        query = """
-        MATCH (intention:Intention {id: $intention_id})
-        SET intention.progress = $progress,
-            intention.last_updated = datetime()
-        RETURN intention.id as id
-        """
-        
-        result = await self.execute_query(query, {"intention_id": intention_id, "progress": progress})
-        return len(result) > 0
-    
-    async def get_agent_knowledge_graph(self, agent_id: str) -> Dict:
-        """Get the complete knowledge graph for a specific agent"""
-        query = """
-        MATCH (agent:Agent {id: $agent_id})
-        OPTIONAL MATCH (agent)-[:HAS_BELIEF]->(belief:Belief)
-        OPTIONAL MATCH (agent)-[:HAS_DESIRE]->(desire:Desire)
-        OPTIONAL MATCH (agent)-[:HAS_INTENTION]->(intention:Intention)
-        OPTIONAL MATCH (intention)-[:ACHIEVED_BY]->(plan:Plan)
-        RETURN agent, 
-               collect(DISTINCT belief) as beliefs,
-               collect(DISTINCT desire) as desires,
-               collect(DISTINCT intention) as intentions,
-               collect(DISTINCT plan) as plans
-        """
-        
-        result = await self.execute_query(query, {"agent_id": agent_id})
-        return result[0] if result else None
+    async def create_agent_beliefs_bulk(self, beliefs: List[Dict]) -> Dict[str, int]:
+        """
+        Create a chunk of beliefs for many agents in one UNWIND write transaction.
+        Returns the number of beliefs created per agent; beliefs of unknown agents are not created.
+        """
+        rows = [
+            {"belief_id": new_id(), **belief}
+            for belief in beliefs
+        ]
+        result = await self.run_query(cypher_queries.AGENT_CREATE_BELIEFS_BULK.name, {"beliefs": rows}, raw=True)
+        return {record["agent_id"]: record["created"] for record in result}
+    
+    async def create_agent_beliefs(self, beliefs: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Create beliefs for many agents in one transaction, returning each created belief in order.
+        Beliefs of unknown agents are not created and come back as None.
+        """
+        rows = [
+            {"belief_id": new_id(), **belief}
+            for belief in beliefs
+        ]
+        result = await self.run_query(cypher_queries.AGENT_CREATE_BELIEFS_RETURNING.name, {"beliefs": rows})
+        created = {record["belief_id"]: {"belief": record["belief"]} for record in result}
+        return [created.get(row["belief_id"]) for row in rows]
+    
+    async def reinforce_beliefs(self, folds: List[Dict]) -> Dict[int, Dict]:
+        """
+        Fold re-asserted beliefs into existing beliefs, raising confidence to the maximum and
+        bumping observation_count and last_observed_at. Each fold carries index, agent_id,
+        belief_id and confidence; returns the updated belief by index for the folds whose target exists.
+        """
+        result = await self.run_query(cypher_queries.AGENT_REINFORCE_BELIEFS.name, {"folds": folds})
+        return {record["index"]: record["belief"] for record in result}
+    
+    async def merge_agent_beliefs(self, beliefs: List[Dict]) -> List[str]:
+        """
+        Create beliefs that do not exist yet, matched by belief_id, and return their ids.
+        Idempotent, so replayed deliveries do not duplicate beliefs.
+        """
+        result = await self.run_query(cypher_queries.AGENT_MERGE_BELIEFS.name, {"beliefs": beliefs})
+        return [record["belief_id"] for record in result]
+    
+    async def update_intentions_progress(self, updates: List[Dict]) -> Dict[str, List[str]]:
+        """
+        Set the progress of many intentions in one transaction.
+        Returns the owning agent ids of every intention that exists.
+        """
+        result = await self.run_query(cypher_queries.AGENT_UPDATE_INTENTIONS_PROGRESS.name, {"updates": updates})
+        return {record["id"]: record["agent_ids"] for record in result}
+    
+    async def update_agent_intention_progress(self, intention_id: str, progress: float) -> Optional[List[str]]:
+        """
+        Update the progress of an agent's intention.
+        Returns the ids of the agents holding the intention, or None if it does not exist.
+        """
+        result = await self.run_query(
+            cypher_queries.AGENT_UPDATE_INTENTION_PROGRESS.name,
+            {"intention_id": intention_id, "progress": progress}
+        )
+        return result[0]["agent_ids"] if result else None
+    
+    async def get_agent_ids_page(self, after: Optional[str], limit: int) -> List[str]:
+        """Get up to limit agent ids greater than after, in id order"""
+        result = await self.run_query(
+            cypher_queries.BELIEF_COMPACTION_AGENT_PAGE.name,
+            {"after": after, "limit": limit}
+        )
+        return [record["agent_id"] for record in result]
+    
+    async def decay_agent_beliefs(
+        self,
+        agent_ids: List[str],
+        half_lives: Dict[str, float],
+        default_half_life: float,
+        now: datetime,
+        limit: int
+    ) -> Dict[str, int]:
+        """Decay the confidence of up to limit beliefs of the given agents; returns decayed beliefs per agent"""
+        result = await self.run_query(
+            cypher_queries.BELIEF_COMPACTION_DECAY.name,
+            {
+                "agent_ids": agent_ids,
+                "half_lives": half_lives,
+                "default_half_life": default_half_life,
+                "now": now,
+                "limit": limit
+            }
+        )
+        return {record["agent_id"]: record["decayed"] for record in result}
+    
+    async def find_expired_beliefs(
+        self,
+        agent_ids: List[str],
+        ttls: Dict[str, int],
+        default_ttl: int,
+        min_confidence: float,
+        now: datetime,
+        limit: int
+    ) -> List[Dict]:
+        """Find up to limit beliefs past their TTL or below the confidence floor, with their owning agent"""
+        return await self.run_query(
+            cypher_queries.BELIEF_COMPACTION_FIND_EXPIRED.name,
+            {
+                "agent_ids": agent_ids,
+                "ttls": ttls,
+                "default_ttl": default_ttl,
+                "min_confidence": min_confidence,
+                "now": now,
+                "limit": limit
+            },
+            raw=True
+        )
+    
+    async def find_duplicate_beliefs(self, agent_ids: List[str], limit: int) -> List[Dict]:
+        """Find up to limit groups of beliefs sharing category and content, each with the belief to keep"""
+        return await self.run_query(
+            cypher_queries.BELIEF_COMPACTION_FIND_DUPLICATES.name,
+            {"agent_ids": agent_ids, "limit": limit},
+            raw=True
+        )
+    
+    async def merge_duplicate_beliefs(self, merges: List[Dict]) -> int:
+        """Merge duplicate beliefs into their kept belief; returns the number of beliefs removed"""
+        result = await self.run_query(cypher_queries.BELIEF_COMPACTION_MERGE.name, {"merges": merges})
+        return result[0]["merged"] if result else 0
+    
+    async def delete_beliefs(self, belief_ids: List[str]) -> int:
+        """Delete beliefs by id; returns the number deleted"""
+        result = await self.run_query(cypher_queries.BELIEF_COMPACTION_DELETE.name, {"belief_ids": belief_ids})
+        return result[0]["deleted"] if result else 0
+    
+    async def get_agent_knowledge_graph(
+        self,
+        agent_id: str,
+        raw: bool = False,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Get the knowledge graph for a specific agent with bounded collections.
+        Beliefs, desires, intentions and plans are each limited, ordered by creation
+        time and paged with the cursors returned under "cursors".
+        With fields, every node is projected to those properties inside the query.
+        With raw=True, nodes are returned as driver objects for single-pass JSON encoding.
+        """
+        if order not in CONTEXT_ORDERS:
+            raise ValueError(f"Unsupported context order: {order}")
+        
+        page_limits = resolve_limits(
+            cypher_queries.AGENT_KNOWLEDGE_GRAPH_COLLECTIONS,
+            limits,
+            self.config.agent_context_default_limit,
+            self.config.agent_context_max_limit
+        )
+        query = cypher_queries.agent_knowledge_graph_query("agent", order, cypher_queries.normalize_fields(fields))
+        params = {"agent_id": agent_id, **collection_parameters(page_limits, cursors)}
+        
+        result = await self.run_query(query.name, params, raw=True)
+        if not result:
+            return None
+        
+        knowledge_graph = page_collections(result[0], page_limits)
+        return knowledge_graph if raw else to_builtin(knowledge_graph)
+    
+    async def get_agent_knowledge_graphs(
+        self,
+        agent_ids: Optional[List[str]] = None,
+        business_id: Optional[str] = None,
+        raw: bool = False,
+        limits: Optional[Dict[str, int]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        after: Optional[str] = None,
+        agents_limit: Optional[int] = None
+    ) -> Dict[str, Dict]:
+        """
+        Get the knowledge graphs of many agents with a single query, keyed by agent id.
+        Agents are selected by id list or by business; unknown ids are omitted.
+        The agents of a business are returned in id order, at most agents_limit
+        (default agent_context_batch_max_agents) with ids after `after`.
+        """
+        if order not in CONTEXT_ORDERS:
+            raise ValueError(f"Unsupported context order: {order}")
+        
+        page_limits = resolve_limits(
+            cypher_queries.AGENT_KNOWLEDGE_GRAPH_COLLECTIONS,
+            limits,
+            self.config.agent_context_default_limit,
+            self.config.agent_context_max_limit
+        )
+        
+        if agent_ids is not None:
+            scope, params = "agents", {"agent_ids": agent_ids}
+        elif business_id is not None:
+            scope, params = "business", {
+                "business_id": business_id,
+                "agents_after": after,
+                "agents_limit": agents_limit or self.config.agent_context_batch_max_agents
+            }
+        else:
+            raise ValueError("Either agent_ids or business_id is required")
+        
+        query = cypher_queries.agent_knowledge_graph_query(scope, order, cypher_queries.normalize_fields(fields))
+        
+        params.update(collection_parameters(page_limits))
+        result = await self.run_query(query.name, params, raw=True)
+        
+        knowledge_graphs = {
+            record["agent"]["id"]: page_collections(record, page_limits)
+            for record in result
+        }
+        return knowledge_graphs if raw else to_builtin(knowledge_graphs)
     
     async def health_check(self) -> bool:
         """Check Neo4j connection health"""
         try:
-            result = await self.execute_query("RETURN 1 as health")
+            result = await self.run_query(cypher_queries.HEALTH_CHECK.name)
             return len(result) > 0
         except Exception as e:
             logger.error(f"Neo4j health check failed: {e}")
             return False
 
 
+# KEYS: version key; ARGV: version, TTL (s)
+ADVANCE_VERSION_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tonumber(ARGV[1]) <= current then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', tonumber(ARGV[2]))
+return 1
+"""
+
+
 class RedisManager:
     """Enhanced Redis cache and session manager with advanced features"""
     
@@ -229,6 +554,7 @@ class RedisManager:
         self.config = config
         self.redis_client = None
         self.cluster_manager = None
+        self._scripts: Dict[str, Any] = {}
         
     async def initialize(self):
         """Initialize Redis connection with enhanced cluster manager"""
@@ -297,6 +623,29 @@ class RedisManager:
             logger.error(f"Failed to get cache key {key}: {e}")
             return None
     
+    async def get_cache_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several cache values in one round trip; missing keys are omitted"""
+        try:
+            if self.cluster_manager and self.cluster_manager.cache_manager:
+                return await self.cluster_manager.cache_manager.get_many(keys)
+            else:
+                # Fallback to basic MGET
+                if not keys:
+                    return {}
+                values = await self.redis_client.mget(keys)
+                found = {}
+                for key, value in zip(keys, values):
+                    if value is None:
+                        continue
+                    try:
+                        found[key] = json.loads(value)
+                    except json.JSONDecodeError:
+                        found[key] = value
+                return found
+        except Exception as e:
+            logger.error(f"Failed to get {len(keys)} cache keys: {e}")
+            return {}
+    
     async def delete_cache(self, key: str) -> bool:
         """Delete a cache key"""
         try:
@@ -310,6 +659,109 @@ class RedisManager:
             logger.error(f"Failed to delete cache key {key}: {e}")
             return False
     
+    async def get_raw(self, key: str, raise_errors: bool = False) -> Optional[bytes]:
+        """Get a raw byte value, bypassing JSON decoding; raise_errors tells a failed read from a missing key"""
+        try:
+            value = await self.redis_client.get(key)
+            # The basic client decodes responses to str
+            return value.encode("utf-8") if isinstance(value, str) else value
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Failed to get raw key {key}: {e}")
+            return None
+    
+    async def set_raw(self, key: str, value: bytes, ttl: int = 3600) -> bool:
+        """Set a raw byte value with TTL"""
+        try:
+            await self.redis_client.setex(key, ttl, value)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set raw key {key}: {e}")
+            return False
+    
+    async def get_hash(self, key: str) -> Dict[str, str]:
+        """Get every field of a hash"""
+        values = await self.redis_client.hgetall(key)
+        return {
+            (field.decode("utf-8") if isinstance(field, bytes) else field):
+            (value.decode("utf-8") if isinstance(value, bytes) else value)
+            for field, value in values.items()
+        }
+    
+    async def set_hashes(self, mappings: Dict[str, Dict[str, str]], ttl: int = 3600) -> None:
+        """Set fields of several hashes and refresh their TTL in one round trip"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, fields in mappings.items():
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, ttl)
+            await pipe.execute()
+    
+    async def write_hash(
+        self,
+        key: str,
+        fields: Dict[str, str],
+        removed: List[str] = (),
+        replace: bool = False,
+        ttl: int = 3600
+    ) -> bool:
+        """Set and delete fields of a hash in one round trip; replace drops every other field first"""
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            if replace:
+                pipe.delete(key)
+            elif removed:
+                pipe.hdel(key, *removed)
+            if fields:
+                pipe.hset(key, mapping=fields)
+            pipe.expire(key, ttl)
+            await pipe.execute()
+        return True
+    
+    async def delete_hash_fields(self, key: str, fields: List[str]) -> int:
+        """Delete fields of a hash"""
+        return await self.redis_client.hdel(key, *fields)
+    
+    async def get_values(self, keys: List[str]) -> List[Optional[str]]:
+        """Get several plain string values with one MGET, None for missing keys"""
+        if not keys:
+            return []
+        values = await self.redis_client.mget(keys)
+        return [value.decode("utf-8") if isinstance(value, bytes) else value for value in values]
+    
+    async def add_set_members(self, mappings: Dict[str, List[str]], ttl: Optional[int] = None) -> None:
+        """Add members to several sets, optionally refreshing their TTL, in one round trip"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, members in mappings.items():
+                pipe.sadd(key, *members)
+                if ttl:
+                    pipe.expire(key, ttl)
+            await pipe.execute()
+    
+    async def pop_set_members(self, key: str, count: int) -> List[str]:
+        """Remove and return up to count members of a set"""
+        members = await self.redis_client.spop(key, count) or []
+        return [member.decode("utf-8") if isinstance(member, bytes) else member for member in members]
+    
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically; scripts are loaded once and then called by SHA"""
+        runner = self._scripts.get(script)
+        if runner is None:
+            runner = self._scripts[script] = self.redis_client.register_script(script)
+        return await runner(keys=keys, args=args)
+    
+    async def advance_version(self, key: str, version: int, ttl: int = 3600) -> bool:
+        """Atomically raise a version counter; False if it already holds version or a later one"""
+        return bool(await self.run_script(ADVANCE_VERSION_SCRIPT, keys=[key], args=[version, ttl]))
+    
+    async def increment_counter(self, key: str) -> int:
+        """Atomically increment a counter and return its new value"""
+        return await self.redis_client.incr(key)
+    
+    async def get_counter(self, key: str) -> int:
+        """Get a counter value (0 if it has never been incremented)"""
+        value = await self.redis_client.get(key)
+        return int(value) if value is not None else 0
+    
     async def set_agent_state(self, agent_id: str, state: Dict) -> bool:
         """Set agent state in cache"""
         key = f"agent:state:{agent_id}"
@@ -320,6 +772,12 @@ class RedisManager:
         key = f"agent:state:{agent_id}"
         return await self.get_cache(key)
     
+    async def get_agent_states(self, agent_ids: List[str]) -> Dict[str, Dict]:
+        """Get the cached state of several agents with one MGET"""
+        keys = {f"agent:state:{agent_id}": agent_id for agent_id in agent_ids}
+        states = await self.get_cache_many(list(keys))
+        return {keys[key]: state for key, state in states.items()}
+    
     async def create_session(self, user_id: str, session_data: Dict[str, Any]) -> Optional[str]:
         """Create a user session using enhanced session manager"""
         try:
@@ -413,6 +871,8 @@ class ElasticsearchManager:
     def __init__(self, config: DatabaseConfig):
         self.config = config
         self.client = None
+        # Analytics search results invalidated by workflow writes, when the cache is enabled
+        self.search_cache: Optional[SearchResultCache] = None
         
     async def initialize(self):
         """Initialize Elasticsearch client"""
@@ -443,12 +903,73 @@ class ElasticsearchManager:
                 id=workflow_id,
                 document=doc
             )
+            await self._invalidate_search(index_name)
             return True
             
         except Exception as e:
             logger.error(f"Failed to index workflow {workflow_id}: {e}")
             return False
     
+    async def bulk_index_workflows(self, workflows: List[Tuple[str, int, Dict]]) -> List[Optional[str]]:
+        """
+        Index (workflow_id, version, document) items with one bulk request.
+        Versions are external, so a replayed or older item leaves a newer document in place.
+        Returns None per indexed or superseded item, otherwise its error.
+        """
+        index_name = f"{self.config.elasticsearch_index_prefix}_workflows"
+        operations = []
+        for workflow_id, version, doc in workflows:
+            operations.append({"index": {"_index": index_name, "_id": workflow_id, "version": version, "version_type": "external"}})
+            operations.append(doc)
+        
+        response = await self.client.bulk(operations=operations)
+        errors = []
+        written = False
+        for item in response["items"]:
+            result = item["index"]
+            status = result.get("status", 500)
+            written = written or status < 300
+            # 409: the document already holds this or a later version
+            errors.append(None if status < 300 or status == 409 else str(result.get("error")))
+        if written:
+            await self._invalidate_search(index_name)
+        return errors
+    
+    async def update_workflow(self, workflow_id: str, fields: Dict, removed: List[str] = ()) -> bool:
+        """Update changed fields of a workflow document, creating it if missing, and drop removed fields"""
+        try:
+            index_name = f"{self.config.elasticsearch_index_prefix}_workflows"
+            doc = {**fields, "indexed_at": datetime.utcnow().isoformat()}
+            
+            if removed:
+                await self.client.update(
+                    index=index_name,
+                    id=workflow_id,
+                    script={
+                        "source": "for (field in params.removed) { ctx._source.remove(field) } ctx._source.putAll(params.doc)",
+                        "params": {"removed": list(removed), "doc": doc}
+                    },
+                    upsert={"workflow_id": workflow_id, **doc}
+                )
+            else:
+                await self.client.update(
+                    index=index_name,
+                    id=workflow_id,
+                    doc=doc,
+                    upsert={"workflow_id": workflow_id, **doc}
+                )
+            await self._invalidate_search(index_name)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Failed to update workflow {workflow_id}: {e}")
+            return False
+    
+    async def _invalidate_search(self, index_name: str) -> None:
+        """Move an index to a new search cache generation after a write"""
+        if self.search_cache is not None:
+            await self.search_cache.invalidate([index_name])
+    
     async def search_workflows(self, query: str, filters: Dict = None) -> List[Dict]:
         """Search workflows"""
         try:
@@ -498,6 +1019,15 @@ class ElasticsearchManager:
             return False
 
 
+# Belief properties a single belief write must provide
+BELIEF_FIELDS = ("category", "content", "confidence", "source", "description")
+
+
+async def _no_states() -> Dict:
+    """Stand-in for a skipped cached state lookup"""
+    return {}
+
+
 class DatabaseManager:
     """
     Unified database manager coordinating PostgreSQL, Neo4j, Redis, and Elasticsearch
@@ -513,6 +1043,46 @@ class DatabaseManager:
         self.redis = RedisManager(self.config)
         self.elasticsearch = ElasticsearchManager(self.config)
         
+        # In-process tier of the versioned agent context cache
+        self.context_cache = AgentContextCache(
+            max_entries=self.config.agent_context_l1_max_entries,
+            ttl=self.config.agent_context_cache_ttl
+        )
+        
+        # Group-commit buffers for single agent writes
+        buffer_settings = {
+            "max_batch_size": self.config.write_buffer_max_batch_size,
+            "max_delay_ms": self.config.write_buffer_max_delay_ms,
+            "max_pending": self.config.write_buffer_max_pending,
+            "enqueue_timeout": self.config.write_buffer_enqueue_timeout
+        }
+        self.belief_buffer = GroupCommitBuffer("beliefs", self._flush_beliefs, **buffer_settings)
+        self.intention_progress_buffer = GroupCommitBuffer(
+            "intention_progress",
+            self._flush_intention_progress,
+            coalesce_key=lambda update: update["intention_id"],
+            **buffer_settings
+        )
+        
+        # Ingest-time near-duplicate belief detection
+        self.belief_dedup = BeliefDeduplicator(
+            self.redis,
+            threshold=self.config.belief_dedup_threshold,
+            num_perm=self.config.belief_dedup_num_perm,
+            bands=self.config.belief_dedup_bands,
+            max_agents=self.config.belief_dedup_max_agents,
+            sketch_ttl=self.config.belief_dedup_sketch_ttl
+        )
+        
+        # Background belief decay, merge and expiry
+        self.belief_compaction = BeliefCompactionJob(self)
+        
+        # Live intention progress kept in Redis and flushed to Neo4j periodically
+        self.intention_progress = LiveIntentionProgress(self)
+        
+        # Outbox relaying workflow synchronization to Neo4j, Redis and Elasticsearch
+        self.workflow_outbox = WorkflowOutbox(self)
+        
         # Initialize enhanced analytics manager
         try:
             from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager
@@ -521,6 +1091,23 @@ class DatabaseManager:
             logger.warning("Enhanced Elasticsearch analytics manager not available")
             self.elasticsearch_analytics = None
         
+        # Hourly and daily analytics rollups answering the dashboard
+        self.analytics_rollups = AnalyticsRollups(self)
+        if self.config.analytics_rollups_enabled and self.elasticsearch_analytics:
+            self.elasticsearch_analytics.rollups = self.analytics_rollups
+        
+        # Backfills and reindexes with vectorized batch enrichment
+        self.analytics_reindexer = AnalyticsReindexer(self)
+        
+        # Search results keyed on the normalized query, invalidated by index writes
+        self.search_cache = SearchResultCache(self)
+        if self.config.search_cache_enabled and self.elasticsearch_analytics:
+            self.elasticsearch_analytics.attach_search_cache(self.search_cache)
+            self.elasticsearch.search_cache = self.search_cache
+        
+        # Logging handler shipping application logs, attached on initialize
+        self.log_shipping: Optional[ElasticsearchLogHandler] = None
+        
         # Initialize SBVR-enabled knowledge graph manager
         try:
             from app.models.neo4j_manager import Neo4jKnowledgeGraphManager
@@ -556,61 +1143,601 @@ class DatabaseManager:
         
         await asyncio.gather(*init_tasks, return_exceptions=True)
         
+        if self.config.belief_compaction_enabled:
+            self.belief_compaction.start()
+        if self.config.intention_progress_live_enabled:
+            self.intention_progress.start()
+        if self.config.workflow_outbox_enabled:
+            self.workflow_outbox.start()
+        if self.config.elasticsearch_log_shipping_enabled:
+            self._start_log_shipping()
+        if self.config.analytics_rollups_enabled and self.elasticsearch_analytics:
+            self.analytics_rollups.start()
+        
         self._initialized = True
         logger.info("MABOS database manager initialized successfully")
     
+    def _start_log_shipping(self) -> None:
+        """Attach the Elasticsearch log handler to the root logger"""
+        if not self.elasticsearch_analytics or not self.elasticsearch_analytics.bulk_indexer:
+            logger.warning("Log shipping needs the Elasticsearch analytics manager with bulk indexing enabled")
+            return
+        
+        self.log_shipping = ElasticsearchLogHandler(
+            self.elasticsearch_analytics,
+            level=self.config.elasticsearch_log_shipping_level,
+            queue_size=self.config.elasticsearch_log_shipping_queue_size,
+            drop_policy=self.config.elasticsearch_log_shipping_drop_policy,
+            batch_size=self.config.elasticsearch_log_shipping_batch_size,
+            ship_interval=self.config.elasticsearch_log_shipping_interval
+        )
+        logging.getLogger().addHandler(self.log_shipping)
+        self.log_shipping.start()
+    
     async def sync_workflow_to_knowledge_graph(self, workflow_data: Dict) -> bool:
+        """Synchronize workflow data across all databases; see sync_workflow"""
+        result = await self.sync_workflow(workflow_data)
+        return result["success"]
+    
+    async def sync_workflow(self, workflow_data: Dict, event_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Synchronize workflow data across all databases
-        1. Store workflow in PostgreSQL
-        2. Update agent beliefs in Neo4j
-        3. Cache workflow state in Redis
-        4. Index workflow in Elasticsearch
+        1. Assert the workflow-created belief in Neo4j (first sync only, idempotent)
+        2. Patch the cached workflow fields in Redis (see get_cached_workflow)
+        3. Partially update the workflow document in Elasticsearch
+        The payload is compared by content hash with the last successful sync: unchanged
+        payloads are skipped and only changed fields are propagated. If the last state
+        cannot be read, the payload replaces the cached workflow without asserting the
+        created belief. With the workflow outbox enabled, changed payloads are committed
+        to the outbox instead.
+        Returns success, status ("unchanged" or "updated") and the changed fields.
         """
+        workflow_id = workflow_data.get("id")
+        state_key = sync_state_key(workflow_id)
+        
         try:
-            workflow_id = workflow_data.get("id")
-            
-            # Update agent beliefs about new workflow
-            belief_data = {
-                "category": "workflow_status",
-                "content": f"workflow_{workflow_id}_created",
-                "confidence": 0.95,
-                "source": "workflow_manager",
-                "description": f"New workflow {workflow_data.get('name')} created"
+            try:
+                # get_cache reports failures as misses, which would look like a first sync
+                recorded = await self.redis.get_raw(state_key, raise_errors=True)
+                previous = json.loads(recorded) if recorded else None
+                state_known = True
+            except Exception as e:
+                # Without the last state the payload is synced in full, but not as a new workflow
+                logger.warning(f"Failed to read sync state of workflow {workflow_id}: {e}")
+                previous = None
+                state_known = False
+            
+            changes = detect_changes(workflow_data, previous if isinstance(previous, dict) else None, known=state_known)
+            result = {
+                "success": True,
+                "workflow_id": workflow_id,
+                "status": "unchanged" if changes.unchanged else "updated",
+                "changed_fields": changes.changed,
+                "removed_fields": changes.removed
             }
+            if changes.unchanged:
+                return result
+            
+            if self.config.workflow_outbox_enabled:
+                result["event_id"] = await self.workflow_outbox.enqueue(
+                    workflow_data, event_id=event_id, created=changes.created
+                )
+                await self.redis.set_raw(state_key, dumps(changes.state()), ttl=self.config.workflow_sync_state_ttl)
+                return result
             
-            # Execute synchronization tasks concurrently
+            changed = {field: workflow_data[field] for field in changes.changed}
             tasks = [
-                self.neo4j.create_agent_belief("agent_workflow_001", belief_data),
-                self.redis.set_cache(f"workflow:cache:{workflow_id}", workflow_data),
-                self.elasticsearch.index_workflow(workflow_id, workflow_data)
+                self.redis.write_hash(
+                    workflow_cache_key(workflow_id),
+                    {field: json.dumps(value, default=str) for field, value in changed.items()},
+                    removed=changes.removed,
+                    replace=changes.replace
+                ),
+                self.elasticsearch.update_workflow(workflow_id, changed, removed=changes.removed)
             ]
             
+            if changes.created:
+                # Keyed by workflow, so a sync after the state expired does not assert it again
+                tasks.append(self._assert_workflow_created(workflow_data))
+            
             results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # Check if all operations succeeded
-            success = all(not isinstance(result, Exception) for result in results)
+            success = all(not isinstance(item, Exception) and item is not False for item in results)
             
             if success:
-                logger.info(f"Successfully synchronized workflow {workflow_id} across all databases")
+                # Record the state only once every store holds it, so failed stores are retried
+                await self.redis.set_raw(state_key, dumps(changes.state()), ttl=self.config.workflow_sync_state_ttl)
+                logger.info(f"Synchronized {len(changes.changed)} changed fields of workflow {workflow_id}")
             else:
                 logger.warning(f"Partial synchronization failure for workflow {workflow_id}")
             
-            return success
+            result["success"] = success
+            return result
             
         except Exception as e:
             logger.error(f"Failed to sync workflow to knowledge graph: {e}")
+            return {"success": False, "workflow_id": workflow_id, "error": str(e)}
+    
+    async def _assert_workflow_created(self, workflow_data: Dict) -> List[str]:
+        """Merge the workflow-created belief and invalidate the workflow agent's cached contexts"""
+        merged = await self.neo4j.merge_agent_beliefs([workflow_belief(workflow_data)])
+        await self.bump_agent_version(WORKFLOW_AGENT_ID)
+        return merged
+    
+    async def get_cached_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the workflow cached by the last sync, or None if it is not cached.
+        workflow:cache:{id} is a Redis hash of JSON-encoded top-level fields, not a cache_manager value.
+        """
+        fields = await self.redis.get_hash(workflow_cache_key(workflow_id))
+        return {field: json.loads(value) for field, value in fields.items()} if fields else None
+    
+    # ===== VERSIONED AGENT WRITES =====
+    
+    async def bump_agent_version(self, agent_id: str) -> Optional[int]:
+        """
+        Bump the agent version after a write, invalidating its cached contexts.
+        Must be called after the write has committed.
+        """
+        try:
+            return await self.redis.increment_counter(agent_version_key(agent_id))
+        except Exception as e:
+            logger.error(f"Failed to bump version for agent {agent_id}: {e}")
+            return None
+    
+    async def get_agent_version(self, agent_id: str) -> Optional[int]:
+        """Get the current agent version, or None if versioning is unavailable"""
+        try:
+            return await self.redis.get_counter(agent_version_key(agent_id))
+        except Exception as e:
+            logger.error(f"Failed to get version for agent {agent_id}: {e}")
+            return None
+    
+    async def create_agent_belief(self, agent_id: str, belief_data: Dict) -> Optional[Dict]:
+        """
+        Create a belief for an agent and bump the agent version.
+        With the write buffer enabled the belief is group-committed with concurrent writes;
+        the call returns once its batch has committed.
+        """
+        if not self.config.write_buffer_enabled:
+            belief = await self.neo4j.create_agent_belief(agent_id, belief_data)
+            if belief:
+                await self.bump_agent_version(agent_id)
+            return belief
+        
+        missing = [field for field in BELIEF_FIELDS if field not in belief_data]
+        if missing:
+            raise ValueError(f"Belief is missing fields: {', '.join(missing)}")
+        
+        return await self.belief_buffer.submit({**belief_data, "agent_id": agent_id})
+    
+    async def _flush_beliefs(self, beliefs: List[Dict]) -> List[Optional[Dict]]:
+        """Group-commit buffered beliefs in one transaction, then bump the affected agent versions"""
+        if self.config.belief_dedup_enabled:
+            created = await self._create_beliefs_deduplicated(beliefs, self.neo4j.create_agent_beliefs)
+        else:
+            created = await self.neo4j.create_agent_beliefs(beliefs)
+        agent_ids = {belief["agent_id"] for belief, result in zip(beliefs, created) if result}
+        await asyncio.gather(*(self.bump_agent_version(agent_id) for agent_id in agent_ids))
+        return created
+    
+    async def _create_beliefs_bulk(self, beliefs: List[Dict]) -> List[Optional[bool]]:
+        """Create beliefs with one UNWIND statement; None marks beliefs of unknown agents"""
+        created = await self.neo4j.create_agent_beliefs_bulk(beliefs)
+        return [True if belief["agent_id"] in created else None for belief in beliefs]
+    
+    async def _create_beliefs_deduplicated(
+        self,
+        beliefs: List[Dict],
+        create: Callable[[List[Dict]], Awaitable[List[Optional[Any]]]]
+    ) -> List[Optional[Any]]:
+        """
+        Create beliefs, folding near-duplicates of an agent's existing beliefs into them.
+        create writes new beliefs and returns one result per belief, None where nothing was created.
+        Folded beliefs come back as {"belief": ..., "deduplicated": True}.
+        """
+        plan = await self.belief_dedup.plan(beliefs)
+        results: List[Optional[Any]] = [None] * len(beliefs)
+        created: List[Optional[bool]] = [False if target is None else None for target in plan.targets]
+        
+        async def write(positions: List[int]) -> None:
+            for position, result in zip(positions, await create([beliefs[position] for position in positions])):
+                results[position] = result
+                created[position] = result is not None
+        
+        try:
+            new_positions = [position for position, target in enumerate(plan.targets) if target is None]
+            if new_positions:
+                await write(new_positions)
+            
+            # Folds run after creation, since a fold may target a belief created in this batch
+            fold_positions = [position for position, target in enumerate(plan.targets) if target is not None]
+            if fold_positions:
+                folded = await self.neo4j.reinforce_beliefs([
+                    {
+                        "index": position,
+                        "agent_id": beliefs[position]["agent_id"],
+                        "belief_id": plan.targets[position],
+                        "confidence": beliefs[position]["confidence"]
+                    }
+                    for position in fold_positions
+                ])
+                
+                # Targets removed since they were sketched (e.g. by compaction) are created instead
+                stale = []
+                for position in fold_positions:
+                    if position in folded:
+                        results[position] = {"belief": folded[position], "deduplicated": True}
+                    else:
+                        stale.append(position)
+                        created[position] = False
+                        await self.belief_dedup.replan_stale(beliefs[position], plan.targets[position], plan.signatures[position])
+                if stale:
+                    await write(stale)
+        finally:
+            await self.belief_dedup.commit(beliefs, plan, created)
+        
+        return results
+    
+    async def ingest_beliefs(self, beliefs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate and create beliefs for many agents.
+        Beliefs are grouped by agent and written in chunks, one UNWIND statement per
+        chunk; invalid beliefs and beliefs of unknown agents are rejected individually.
+        """
+        start_time = time.perf_counter()
+        
+        if len(beliefs) > self.config.belief_bulk_max_items:
+            raise ValueError(f"At most {self.config.belief_bulk_max_items} beliefs can be ingested at once")
+        
+        rejections = []
+        valid: Dict[str, List[Dict]] = {}
+        
+        for index, item in enumerate(beliefs):
+            try:
+                belief = BeliefInput.model_validate(item)
+            except ValidationError as e:
+                errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                rejections.append({"index": index, "agent_id": item.get("agent_id") if isinstance(item, dict) else None, "error": errors})
+                continue
+            valid.setdefault(belief.agent_id, []).append({"index": index, **belief.model_dump()})
+        
+        # Agent-contiguous chunks keep each agent's writes in as few transactions as possible
+        rows = [row for agent_rows in valid.values() for row in agent_rows]
+        chunk_size = self.config.belief_bulk_chunk_size
+        created: Dict[str, int] = {}
+        deduplicated = 0
+        chunks = 0
+        
+        for offset in range(0, len(rows), chunk_size):
+            chunk = rows[offset:offset + chunk_size]
+            chunks += 1
+            payload = [{key: value for key, value in row.items() if key != "index"} for row in chunk]
+            try:
+                if self.config.belief_dedup_enabled:
+                    results = await self._create_beliefs_deduplicated(payload, self._create_beliefs_bulk)
+                else:
+                    results = await self._create_beliefs_bulk(payload)
+            except Exception as e:
+                logger.error(f"Bulk belief chunk of {len(chunk)} failed: {e}")
+                rejections.extend({"index": row["index"], "agent_id": row["agent_id"], "error": str(e)} for row in chunk)
+                continue
+            
+            for row, result in zip(chunk, results):
+                if result is None:
+                    # Beliefs of agents that do not exist were not matched by the write
+                    rejections.append({"index": row["index"], "agent_id": row["agent_id"], "error": "Agent not found"})
+                    continue
+                created[row["agent_id"]] = created.get(row["agent_id"], 0) + 1
+                if isinstance(result, dict) and result.get("deduplicated"):
+                    deduplicated += 1
+        
+        await asyncio.gather(*(self.bump_agent_version(agent_id) for agent_id in created))
+        
+        accepted = sum(created.values())
+        duration = time.perf_counter() - start_time
+        logger.info(
+            f"Ingested {accepted} beliefs for {len(created)} agents in {chunks} chunks "
+            f"({deduplicated} deduplicated, {len(rejections)} rejected)"
+        )
+        
+        return {
+            "accepted": accepted,
+            "deduplicated": deduplicated,
+            "dedup_rate": deduplicated / accepted if accepted else 0.0,
+            "rejected": len(rejections),
+            "rejections": sorted(rejections, key=lambda rejection: rejection["index"]),
+            "agents": len(created),
+            "chunks": chunks,
+            "duration_ms": duration * 1000,
+            "beliefs_per_second": accepted / duration if duration > 0 else 0.0
+        }
+    
+    async def update_agent_intention_progress(self, intention_id: str, progress: float) -> bool:
+        """
+        Update intention progress and bump the version of every agent holding it.
+        With the write buffer enabled, updates are group-committed and pending updates
+        of the same intention are coalesced (last write wins).
+        """
+        if self.config.write_buffer_enabled:
+            return await self.intention_progress_buffer.submit({"intention_id": intention_id, "progress": progress})
+        
+        agent_ids = await self.neo4j.update_agent_intention_progress(intention_id, progress)
+        if agent_ids is None:
             return False
+        
+        await asyncio.gather(*(self.bump_agent_version(agent_id) for agent_id in agent_ids))
+        return True
+    
+    async def report_intention_progress(self, intention_id: str, progress: float, reset: bool = False) -> Dict[str, Any]:
+        """
+        Report intention progress from an executor.
+        With live progress enabled the report only touches Redis: it must not lower the
+        progress (unless reset) and is subject to the per-intention rate limit. Otherwise
+        it is written through update_agent_intention_progress.
+        Returns accepted, progress and the rejection reason.
+        """
+        if self.config.intention_progress_live_enabled:
+            return await self.intention_progress.report(intention_id, progress, reset=reset)
+        
+        if await self.update_agent_intention_progress(intention_id, progress):
+            return {"accepted": True, "reason": None, "progress": progress}
+        return {"accepted": False, "reason": "not_found", "progress": None}
+    
+    async def update_intentions_progress(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate and apply progress updates of many intentions.
+        Every update is validated before anything is written; valid updates are applied
+        with one UNWIND statement and the holders of updated intentions get their version
+        bumped. With live progress enabled, updates are reported to Redis instead and may
+        be rejected by its monotonic and rate checks; unknown intentions are then only
+        discovered by the flusher. Later updates of the same intention win.
+        """
+        start_time = time.perf_counter()
+        
+        if len(updates) > self.config.intention_progress_batch_max_items:
+            raise ValueError(
+                f"At most {self.config.intention_progress_batch_max_items} progress updates can be applied at once"
+            )
+        
+        rejections = []
+        valid: Dict[str, IntentionProgressInput] = {}
+        
+        for index, item in enumerate(updates):
+            try:
+                update = IntentionProgressInput.model_validate(item)
+            except ValidationError as e:
+                errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                rejections.append({"index": index, "intention_id": item.get("intention_id") if isinstance(item, dict) else None, "error": errors})
+                continue
+            valid[update.intention_id] = update
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        if self.config.intention_progress_live_enabled:
+            reports = await asyncio.gather(*(
+                self.intention_progress.report(update.intention_id, update.progress, reset=update.reset)
+                for update in valid.values()
+            ))
+            results = dict(zip(valid, reports))
+        elif valid:
+            owners = await self.neo4j.update_intentions_progress([
+                {"intention_id": update.intention_id, "progress": update.progress} for update in valid.values()
+            ])
+            agent_ids = {agent_id for holders in owners.values() for agent_id in holders}
+            await asyncio.gather(*(self.bump_agent_version(agent_id) for agent_id in agent_ids))
+            results = {
+                intention_id: (
+                    {"accepted": True, "reason": None, "progress": update.progress}
+                    if intention_id in owners else
+                    {"accepted": False, "reason": "not_found", "progress": None}
+                )
+                for intention_id, update in valid.items()
+            }
+        
+        duration = time.perf_counter() - start_time
+        return {
+            "updated": sum(1 for result in results.values() if result["accepted"]),
+            "not_found": [intention_id for intention_id, result in results.items() if result["reason"] == "not_found"],
+            "results": [{"intention_id": intention_id, **result} for intention_id, result in results.items()],
+            "rejected": len(rejections),
+            "rejections": rejections,
+            "duration_ms": duration * 1000
+        }
+    
+    async def _flush_intention_progress(self, updates: List[Dict]) -> List[bool]:
+        """Group-commit buffered progress updates in one transaction, then bump the affected agent versions"""
+        owners = await self.neo4j.update_intentions_progress(updates)
+        agent_ids = {agent_id for holders in owners.values() for agent_id in holders}
+        await asyncio.gather(*(self.bump_agent_version(agent_id) for agent_id in agent_ids))
+        return [update["intention_id"] in owners for update in updates]
     
-    async def get_agent_context(self, agent_id: str) -> Dict:
+    async def set_agent_state(self, agent_id: str, state: Dict) -> bool:
+        """Cache agent state and bump the agent version"""
+        success = await self.redis.set_agent_state(agent_id, state)
+        if success:
+            await self.bump_agent_version(agent_id)
+        return success
+    
+    async def get_agent_context(
+        self,
+        agent_id: str,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        include_cached_state: bool = True
+    ) -> Dict:
         """
         Get comprehensive agent context from multiple databases
         Combines Neo4j knowledge graph with Redis cached state
         """
+        return to_builtin(await self._assemble_agent_context(agent_id, limits, cursors, order, fields, include_cached_state))
+    
+    async def get_agent_context_json(
+        self,
+        agent_id: str,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        include_cached_state: bool = True
+    ) -> bytes:
+        """
+        Get agent context encoded straight to JSON bytes.
+        Knowledge graph records are encoded in one pass without intermediate dicts.
+        """
+        return dumps(await self._assemble_agent_context(agent_id, limits, cursors, order, fields, include_cached_state))
+    
+    async def get_agent_context_cached(
+        self,
+        agent_id: str,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        include_cached_state: bool = True,
+        if_none_match: Optional[str] = None
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Get the encoded agent context through the versioned read-through cache.
+        Returns (body, etag); body is None when if_none_match matches the current version.
+        Only complete contexts carry an ETag, so degraded or missing ones are never revalidated.
+        An unchanged agent costs one Redis GET (the version) when the ETag or L1 tier hits.
+        """
+        version = await self.get_agent_version(agent_id)
+        if version is None:
+            # Without a version counter a cached context cannot be proven fresh
+            self.context_cache.record("bypassed")
+            return await self.get_agent_context_json(agent_id, limits, cursors, order, fields, include_cached_state), None
+        
+        digest = options_digest(
+            limits=limits,
+            cursors=cursors,
+            order=order,
+            fields=cypher_queries.normalize_fields(fields),
+            include_cached_state=include_cached_state
+        )
+        etag = make_etag(version, digest)
+        
+        # A client only holds this tag if it was served a complete context of this version
+        if etag_matches(if_none_match, etag, exists=False):
+            self.context_cache.record("not_modified")
+            return None, etag
+        
+        cache_key = context_cache_key(agent_id, version, digest)
+        body = self.context_cache.get(agent_id, version, digest)
+        if body is not None:
+            self.context_cache.record("l1_hits")
+        else:
+            body = await self.redis.get_raw(cache_key)
+            if body is not None:
+                self.context_cache.record("redis_hits")
+                self.context_cache.set(agent_id, version, digest, body)
+        
+        if body is not None:
+            # Only complete contexts are cached, so "*" matches a cached one
+            if etag_matches(if_none_match, etag):
+                self.context_cache.record("not_modified")
+                return None, etag
+            return body, etag
+        
+        self.context_cache.record("misses")
+        context = await self._assemble_agent_context(agent_id, limits, cursors, order, fields, include_cached_state)
+        body = dumps(context)
+        
+        # Degraded contexts are served once, without an ETag
+        if "error" in context or context.get("knowledge_graph") is None:
+            return body, None
+        
+        self.context_cache.set(agent_id, version, digest, body)
+        await self.redis.set_raw(cache_key, body, ttl=self.config.agent_context_cache_ttl)
+        if etag_matches(if_none_match, etag):
+            self.context_cache.record("not_modified")
+            return None, etag
+        return body, etag
+    
+    async def get_agent_contexts_json(
+        self,
+        agent_ids: Optional[List[str]] = None,
+        business_id: Optional[str] = None,
+        limits: Optional[Dict[str, int]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        include_cached_state: bool = True,
+        after: Optional[str] = None
+    ) -> bytes:
+        """
+        Get the contexts of many agents encoded to JSON bytes, keyed by agent id.
+        Costs one Neo4j query and one Redis MGET regardless of the number of agents.
+        A business is paged agent_context_batch_max_agents agents at a time; the
+        next page starts after next_agent_cursor.
+        """
+        max_agents = self.config.agent_context_batch_max_agents
+        next_agent_cursor = None
+        if agent_ids is not None:
+            agent_ids = list(dict.fromkeys(agent_ids))
+            if len(agent_ids) > max_agents:
+                raise ValueError(f"At most {max_agents} agents can be requested at once")
+            
+            knowledge_graphs, cached_states = await asyncio.gather(
+                self.neo4j.get_agent_knowledge_graphs(
+                    agent_ids=agent_ids, raw=True, limits=limits, order=order, fields=fields
+                ),
+                self.redis.get_agent_states(agent_ids) if include_cached_state else _no_states()
+            )
+        else:
+            # Agent ids are only known once the business query returns; one extra agent tells whether more remain
+            knowledge_graphs = await self.neo4j.get_agent_knowledge_graphs(
+                business_id=business_id, raw=True, limits=limits, order=order, fields=fields,
+                after=after, agents_limit=max_agents + 1
+            )
+            agent_ids = list(knowledge_graphs)
+            if len(agent_ids) > max_agents:
+                knowledge_graphs.pop(agent_ids.pop())
+                next_agent_cursor = agent_ids[-1]
+            cached_states = await self.redis.get_agent_states(agent_ids) if include_cached_state else {}
+        
+        await self._merge_live_progress(knowledge_graphs, fields)
+        
+        retrieved_at = datetime.utcnow().isoformat()
+        contexts = {}
+        for agent_id in agent_ids:
+            if agent_id not in knowledge_graphs:
+                continue
+            context = {"agent_id": agent_id, "knowledge_graph": knowledge_graphs[agent_id]}
+            if include_cached_state:
+                context["cached_state"] = cached_states.get(agent_id)
+            context["retrieved_at"] = retrieved_at
+            contexts[agent_id] = context
+        
+        return dumps({
+            "contexts": contexts,
+            "not_found": [agent_id for agent_id in agent_ids if agent_id not in knowledge_graphs],
+            "business_id": business_id,
+            "next_agent_cursor": next_agent_cursor,
+            "retrieved_at": retrieved_at
+        })
+    
+    async def _assemble_agent_context(
+        self,
+        agent_id: str,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest",
+        fields: Optional[List[str]] = None,
+        include_cached_state: bool = True
+    ) -> Dict:
+        """
+        Assemble agent context with knowledge graph values left as Neo4j driver types.
+        With include_cached_state=False the Redis lookup is skipped and cached_state omitted.
+        """
         try:
             # Get data from multiple sources concurrently
-            knowledge_graph_task = self.neo4j.get_agent_knowledge_graph(agent_id)
-            cached_state_task = self.redis.get_agent_state(agent_id)
+            knowledge_graph_task = self.neo4j.get_agent_knowledge_graph(
+                agent_id, raw=True, limits=limits, cursors=cursors, order=order, fields=fields
+            )
+            cached_state_task = self.redis.get_agent_state(agent_id) if include_cached_state else _no_states()
             
             knowledge_graph, cached_state = await asyncio.gather(
                 knowledge_graph_task,
@@ -618,20 +1745,50 @@ class DatabaseManager:
                 return_exceptions=True
             )
             
+            if isinstance(knowledge_graph, ValueError):
+                # Invalid cursors or ordering are request errors, not a degraded graph;
+                # they propagate to the caller instead of an error body
+                raise knowledge_graph
+            
+            if isinstance(knowledge_graph, Exception):
+                knowledge_graph = None
+            elif knowledge_graph:
+                await self._merge_live_progress({agent_id: knowledge_graph}, fields)
+            
             # Combine results
             context = {
                 "agent_id": agent_id,
-                "knowledge_graph": knowledge_graph if not isinstance(knowledge_graph, Exception) else None,
-                "cached_state": cached_state if not isinstance(cached_state, Exception) else None,
-                "retrieved_at": datetime.utcnow().isoformat()
+                "knowledge_graph": knowledge_graph
             }
+            if include_cached_state:
+                context["cached_state"] = cached_state if not isinstance(cached_state, Exception) else None
+            context["retrieved_at"] = datetime.utcnow().isoformat()
             
             return context
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get agent context for {agent_id}: {e}")
             return {"agent_id": agent_id, "error": str(e)}
     
+    async def _merge_live_progress(self, knowledge_graphs: Dict[str, Dict], fields: Optional[List[str]] = None) -> None:
+        """Overlay live intention progress on raw knowledge graphs, keeping persisted values if Redis fails"""
+        if not self.config.intention_progress_live_enabled or not knowledge_graphs:
+            return
+        
+        try:
+            live = await self.intention_progress.read({
+                agent_id: intention_ids(knowledge_graph) for agent_id, knowledge_graph in knowledge_graphs.items()
+            })
+        except Exception as e:
+            logger.error(f"Failed to read live intention progress: {e}")
+            return
+        
+        normalized = cypher_queries.normalize_fields(fields)
+        for knowledge_graph in knowledge_graphs.values():
+            merge_live_progress(knowledge_graph, live, normalized)
+    
     async def health_check(self) -> Dict[str, bool]:
         """Check health of all database connections"""
         health_tasks = {
@@ -649,11 +1806,69 @@ class DatabaseManager:
         
         return health_status
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """Collect runtime metrics from the database layers"""
+        return {
+            "agent_context_cache": self.context_cache.get_metrics().model_dump(),
+            "write_buffers": {
+                "beliefs": self.belief_buffer.get_metrics().model_dump(),
+                "intention_progress": self.intention_progress_buffer.get_metrics().model_dump()
+            },
+            "belief_compaction": self.belief_compaction.get_metrics().model_dump(),
+            "belief_dedup": self.belief_dedup.get_metrics().model_dump(),
+            "intention_progress": self.intention_progress.get_metrics().model_dump(),
+            "workflow_outbox": self.workflow_outbox.get_metrics().model_dump(),
+            "log_shipping": self.log_shipping.get_metrics().model_dump() if self.log_shipping else None,
+            "analytics_rollups": self.analytics_rollups.get_metrics().model_dump(),
+            "analytics_reindex": self.analytics_reindexer.get_metrics().model_dump(),
+            "search_cache": self.search_cache.get_metrics().model_dump(),
+            "analytics_dashboard": (
+                self.elasticsearch_analytics.dashboard_metrics.model_dump() if self.elasticsearch_analytics else None
+            ),
+            "elasticsearch_bulk": (
+                self.elasticsearch_analytics.bulk_indexer.get_metrics().model_dump()
+                if self.elasticsearch_analytics and self.elasticsearch_analytics.bulk_indexer else None
+            ),
+            "neo4j_pool": self.neo4j.driver_factory.get_metrics().model_dump(),
+            "neo4j_queries": {
+                stats.name: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "avg_time_ms": stats.avg_time_ms,
+                    "max_time_ms": stats.max_time_ms,
+                    "rows": stats.rows,
+                    "profiled_count": stats.profiled_count,
+                    "sampled_db_hits": stats.sampled_db_hits,
+                    "avg_db_hits": stats.avg_db_hits,
+                    "latency_histogram": stats.latency_histogram
+                }
+                for stats in query_registry.slowest(limit=None)
+            }
+        }
+    
     async def close(self):
         """Close all database connections"""
         try:
-            if self.neo4j.driver:
-                await self.neo4j.driver.close()
+            await self.belief_compaction.stop()
+            await self.workflow_outbox.stop()
+            await self.analytics_rollups.stop()
+            
+            # Persist live intention progress and commit buffered writes before the driver goes away
+            if self.config.intention_progress_live_enabled:
+                await self.intention_progress.stop()
+            await self.belief_buffer.close()
+            await self.intention_progress_buffer.close()
+            
+            # Hands queued log records to the bulk indexer, which drains before its client goes away
+            if self.log_shipping:
+                logging.getLogger().removeHandler(self.log_shipping)
+                await self.log_shipping.stop()
+                self.log_shipping = None
+            if self.elasticsearch_analytics:
+                await self.elasticsearch_analytics.close()
+            
+            # Closes the shared driver used by both Neo4j managers
+            await self.neo4j.driver_factory.close()
             if self.redis.redis_client:
                 await self.redis.redis_client.close()
             if self.elasticsearch.client:
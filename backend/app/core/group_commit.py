@@ -0,0 +1,231 @@
+"""
+MABOS Group Commit Buffer
+
+In-process write buffer that turns many small writes into few batched
+transactions. Writes are queued, optionally coalesced by key (last write wins),
+and flushed by a single worker every N milliseconds or M items, whichever
+comes first. Each caller's await resolves once the batch holding its write
+has committed.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generic, Hashable, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class GroupCommitOverloaded(RuntimeError):
+    """Raised when a write cannot be queued before the enqueue timeout"""
+
+
+class GroupCommitMetrics(BaseModel):
+    """Group commit buffer metrics"""
+    enqueued: int = 0
+    coalesced: int = 0
+    rejected: int = 0
+    pending: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    flushed_items: int = 0
+    avg_batch_size: float = 0.0
+    avg_flush_latency_ms: float = 0.0
+    max_flush_latency_ms: float = 0.0
+    avg_queue_wait_ms: float = 0.0
+    max_queue_wait_ms: float = 0.0
+
+
+@dataclass
+class _PendingWrite:
+    """A queued write and every caller waiting on it"""
+    item: Any
+    enqueued_at: float
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+class GroupCommitBuffer(Generic[T]):
+    """Batches writes into group commits with coalescing and backpressure"""
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[T]], Awaitable[List[Any]]],
+        max_batch_size: int = 500,
+        max_delay_ms: float = 5.0,
+        max_pending: int = 10000,
+        enqueue_timeout: float = 5.0,
+        coalesce_key: Optional[Callable[[T], Hashable]] = None
+    ):
+        """
+        Args:
+            name: Buffer name used in logs and metrics
+            flush: Commits a batch and returns one result per item, in order
+            max_batch_size: Flush as soon as this many writes are pending
+            max_delay_ms: Flush at the latest this long after the first pending write
+            max_pending: Writes that may wait for a flush before callers are held back
+            enqueue_timeout: Seconds a caller may be held back before GroupCommitOverloaded
+            coalesce_key: Key under which a newer write replaces a pending one
+        """
+        self.name = name
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.coalesce_key = coalesce_key
+        self.metrics = GroupCommitMetrics()
+
+        self._pending: "OrderedDict[Hashable, _PendingWrite]" = OrderedDict()
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._space = asyncio.Condition()
+        self._worker: Optional[asyncio.Task] = None
+        self._closed = False
+        self._sequence = 0
+
+    async def submit(self, item: T) -> Any:
+        """Queue a write and wait until the batch containing it has committed"""
+        if self._closed:
+            raise RuntimeError(f"Group commit buffer {self.name} is closed")
+
+        key = self._key_for(item)
+        if key not in self._pending and len(self._pending) >= self.max_pending:
+            await self._wait_for_space()
+
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Last write wins; every caller is answered by the surviving write
+            pending.item = item
+            pending.futures.append(future)
+            self.metrics.coalesced += 1
+        else:
+            self._pending[key] = _PendingWrite(item=item, enqueued_at=time.perf_counter(), futures=[future])
+
+        self.metrics.enqueued += 1
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        self._ensure_worker()
+        return await future
+
+    def _key_for(self, item: T) -> Hashable:
+        """Coalescing key of a write; uncoalesced writes get a unique key"""
+        if self.coalesce_key is not None:
+            return self.coalesce_key(item)
+        self._sequence += 1
+        return ("write", self._sequence)
+
+    async def _wait_for_space(self) -> None:
+        """Hold the caller back until the buffer has room"""
+        try:
+            async with self._space:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: len(self._pending) < self.max_pending),
+                    timeout=self.enqueue_timeout
+                )
+        except asyncio.TimeoutError:
+            self.metrics.rejected += 1
+            raise GroupCommitOverloaded(
+                f"Group commit buffer {self.name} is full ({self.max_pending} pending writes)"
+            ) from None
+
+    def _ensure_worker(self) -> None:
+        """Start the flush worker on first use"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name=f"group-commit-{self.name}")
+
+    async def _run(self) -> None:
+        """Flush worker: one batch at a time, so batches commit in submission order"""
+        while True:
+            await self._has_pending.wait()
+            if not self._batch_full.is_set() and not self._closed:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            await self._commit(await self._take_batch())
+
+            if self._closed and not self._pending:
+                return
+
+    async def _take_batch(self) -> List[_PendingWrite]:
+        """Remove up to max_batch_size pending writes and wake held-back callers"""
+        batch = []
+        while self._pending and len(batch) < self.max_batch_size:
+            batch.append(self._pending.popitem(last=False)[1])
+
+        if not self._pending:
+            self._has_pending.clear()
+        if len(self._pending) < self.max_batch_size:
+            self._batch_full.clear()
+
+        async with self._space:
+            self._space.notify_all()
+        return batch
+
+    async def _commit(self, batch: List[_PendingWrite]) -> None:
+        """Commit one batch and resolve its callers"""
+        if not batch:
+            return
+
+        start_time = time.perf_counter()
+        queue_wait = start_time - min(write.enqueued_at for write in batch)
+
+        try:
+            results = await self.flush([write.item for write in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Flush of {self.name} returned {len(results)} results for {len(batch)} writes")
+        except Exception as e:
+            self.metrics.failed_flushes += 1
+            logger.error(f"Group commit flush of {len(batch)} {self.name} writes failed: {e}")
+            for write in batch:
+                for future in write.futures:
+                    if not future.done():
+                        future.set_exception(e)
+        else:
+            for write, result in zip(batch, results):
+                for future in write.futures:
+                    if not future.done():
+                        future.set_result(result)
+
+        self._record(len(batch), time.perf_counter() - start_time, queue_wait)
+
+    def _record(self, batch_size: int, flush_latency: float, queue_wait: float) -> None:
+        """Record one flush"""
+        metrics = self.metrics
+        metrics.flushes += 1
+        metrics.flushed_items += batch_size
+        metrics.avg_batch_size = metrics.flushed_items / metrics.flushes
+
+        flush_ms = flush_latency * 1000
+        wait_ms = queue_wait * 1000
+        metrics.avg_flush_latency_ms += (flush_ms - metrics.avg_flush_latency_ms) / metrics.flushes
+        metrics.max_flush_latency_ms = max(metrics.max_flush_latency_ms, flush_ms)
+        metrics.avg_queue_wait_ms += (wait_ms - metrics.avg_queue_wait_ms) / metrics.flushes
+        metrics.max_queue_wait_ms = max(metrics.max_queue_wait_ms, wait_ms)
+
+    def get_metrics(self) -> GroupCommitMetrics:
+        """Get buffer metrics"""
+        self.metrics.pending = len(self._pending)
+        return self.metrics
+
+    async def close(self) -> None:
+        """Stop accepting writes, flush every pending write and stop the worker"""
+        self._closed = True
+        if self._worker is not None and not self._worker.done():
+            # Wake the worker so it drains without waiting for the flush delay
+            self._has_pending.set()
+            self._batch_full.set()
+            await self._worker
+        self._worker = None
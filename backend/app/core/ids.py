@@ -0,0 +1,100 @@
+"""
+MABOS Identifiers
+
+Compact, time-ordered identifiers (ULID layout) for beliefs, desires,
+intentions and SBVR elements. An id is 26 Crockford base32 characters
+encoding a 48-bit millisecond timestamp and 80 random bits, so ids sort
+lexicographically by creation time and keep unique-index inserts on the
+right-hand edge of the index.
+
+Ids are strictly monotonic within a process: ids generated in the same
+millisecond increment the random part instead of drawing a new one. Across
+worker processes, uniqueness comes from the 80 random bits, which are
+redrawn in a forked child.
+"""
+
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+# Crockford base32 alphabet (no I, L, O, U)
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: index for index, char in enumerate(_ALPHABET)}
+
+ID_LENGTH = 26
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+class IdGenerator:
+    """Thread-safe generator of monotonic, time-ordered ids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new_id(self) -> str:
+        """Generate the next id"""
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+            elif self._last_random < _RANDOM_MAX:
+                # Same millisecond, or the clock stepped back: stay ordered after the last id
+                self._last_random += 1
+            else:
+                # Random part exhausted within one millisecond: borrow the next one
+                self._last_ms += 1
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+
+            value = (self._last_ms << _RANDOM_BITS) | self._last_random
+
+        return _encode(value)
+
+    def reset(self) -> None:
+        """Forget the last id, so a forked worker does not replay its parent's sequence"""
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+
+def _encode(value: int) -> str:
+    """Encode a 128-bit integer as 26 Crockford base32 characters"""
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def id_timestamp(identifier: str) -> datetime:
+    """Creation time encoded in an id"""
+    if len(identifier) != ID_LENGTH:
+        raise ValueError(f"Not a {ID_LENGTH}-character id: {identifier}")
+
+    value = 0
+    for char in identifier[:10].upper():
+        try:
+            value = (value << 5) | _DECODE[char]
+        except KeyError:
+            raise ValueError(f"Invalid id character {char!r} in {identifier}") from None
+
+    # The first 10 characters carry 50 bits; the top 2 are padding above the 48-bit timestamp
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+# Process-wide generator
+_generator = IdGenerator()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_generator.reset)
+
+
+def new_id() -> str:
+    """Generate a new time-ordered id"""
+    return _generator.new_id()
@@ -0,0 +1,109 @@
+"""
+MABOS Ingest Pipelines
+
+Elasticsearch ingest pipelines computing the analytics enrichment fields
+server-side. Each Painless script mirrors the Python enrichment of
+ElasticsearchAnalyticsManager (_enrich_workflow, _enrich_execution,
+_enrich_user, _enrich_agent, _enrich_log_entry and _enrich_metrics) and
+must be changed together with it; test_ingest_pipelines checks both give
+the same fields through the _simulate API.
+"""
+
+from typing import Any, Dict
+
+from app.core.workflow_changes import content_hash
+
+# Painless helper reading a numeric field, with the default the Python .get() uses
+NUMBER_HELPER = """
+double num(def value, double fallback) {
+  return value == null ? fallback : ((Number) value).doubleValue();
+}
+"""
+
+ENRICHMENT_SCRIPTS: Dict[str, str] = {
+    "workflows": """
+List steps = [];
+if (ctx.definition instanceof Map && ctx.definition.steps instanceof List) {
+  steps = ctx.definition.steps;
+}
+int conditions = 0;
+int integrations = 0;
+for (def step : steps) {
+  if (step instanceof Map && 'condition'.equals(step.type)) { conditions++; }
+  if (step instanceof Map && 'integration'.equals(step.type)) { integrations++; }
+}
+double complexity = 1.0 + steps.size() * 0.1 + conditions * 0.3 + integrations * 0.2;
+if (complexity > 10.0) { complexity = 10.0; }
+ctx.complexity_score = complexity;
+ctx.estimated_duration = steps.size() * 5 + complexity * 10;
+String name = ctx.name == null ? '' : ctx.name.toString();
+String description = ctx.description == null ? '' : ctx.description.toString();
+ctx.search_text = name + ' ' + description;
+""",
+    "executions": NUMBER_HELPER + """
+double stepCount = num(ctx.step_count, 1);
+double efficiency = 0.0;
+if (stepCount != 0) {
+  double completionRate = num(ctx.completed_steps, 0) / stepCount;
+  double timeEfficiency = 1 - (num(ctx.duration, 0) / (stepCount * 10));
+  if (timeEfficiency < 0) { timeEfficiency = 0; }
+  efficiency = (completionRate * 0.7 + timeEfficiency * 0.3) * 100;
+}
+ctx.efficiency_score = efficiency;
+ctx.success = 'completed'.equals(ctx.status);
+String startedAt = ctx.started_at == null ? ctx.indexed_at : ctx.started_at.toString();
+ctx.execution_date = startedAt.substring(0, startedAt.length() < 10 ? startedAt.length() : 10);
+""",
+    "users": NUMBER_HELPER + """
+double successRate = ctx.activity_summary instanceof Map ? num(ctx.activity_summary.success_rate, 0) : 0;
+double score = (num(ctx.workflow_count, 0) * 2 + num(ctx.execution_count, 0) * 0.1) * successRate;
+if (score > 100.0) { score = 100.0; }
+ctx.activity_score = score;
+ctx.expertise_level = score >= 80 ? 'expert' : score >= 50 ? 'advanced' : score >= 20 ? 'intermediate' : 'beginner';
+""",
+    "agents": NUMBER_HELPER + """
+Map metrics = ctx.performance_metrics instanceof Map ? ctx.performance_metrics : [:];
+double timeScore = 1 - (num(metrics.avg_response_time, Double.POSITIVE_INFINITY) / 10);
+if (timeScore < 0) { timeScore = 0; }
+double intelligence = (num(metrics.success_rate, 0) * 0.8 + timeScore * 0.2) * 100;
+ctx.intelligence_score = intelligence > 100.0 ? 100.0 : intelligence;
+double tasks = num(metrics.tasks_completed, 1);
+if (tasks < 1) { tasks = 1; }
+double errorRate = 1 - (num(metrics.error_count, 0) / tasks);
+double reliability = (num(metrics.uptime_percentage, 0) * 0.6 + errorRate * 0.4) * 100;
+ctx.reliability_score = reliability > 100.0 ? 100.0 : reliability;
+""",
+    "logs": """
+Map severities = ['debug': 1, 'info': 2, 'warning': 3, 'warn': 3, 'error': 4, 'critical': 5, 'fatal': 5];
+String level = ctx.level == null ? null : ctx.level.toString().toLowerCase();
+ctx.severity_score = level == null ? 2 : severities.getOrDefault(level, 2);
+ctx.is_error = level == 'error' || level == 'critical' || level == 'fatal';
+""",
+    "metrics": NUMBER_HELPER + """
+double value = num(ctx.value, 0);
+double score = 0.0;
+if ('cpu_usage'.equals(ctx.metric_type) || 'memory_usage'.equals(ctx.metric_type)) {
+  score = value > 90 ? 0.9 : value > 70 ? 0.5 : 0.1;
+}
+ctx.anomaly_score = score;
+""",
+}
+
+
+def enrichment_pipeline_name(index_prefix: str, index_type: str) -> str:
+    """Name of the enrichment pipeline of an IndexType value such as executions"""
+    return f"{index_prefix}_{index_type}_enrichment"
+
+
+def enrichment_pipeline(index_type: str) -> Dict[str, Any]:
+    """Ingest pipeline body stamping indexed_at and running the enrichment script of an index type"""
+    source = ENRICHMENT_SCRIPTS[index_type]
+    return {
+        "description": f"MABOS {index_type} analytics enrichment",
+        # Identifies the script revision an installed pipeline runs
+        "version": int(content_hash(source)[:7], 16),
+        "processors": [
+            {"set": {"field": "indexed_at", "value": "{{_ingest.timestamp}}"}},
+            {"script": {"lang": "painless", "source": source}}
+        ]
+    }
@@ -0,0 +1,346 @@
+"""
+MABOS Live Intention Progress
+
+Executors report intention progress many times per second, yet only the
+latest value matters. Reports are checked and stored in Redis as the live
+value of the intention; a background flusher persists the latest value of
+every intention reported since its previous pass with one UNWIND write, so
+Neo4j sees at most one write per intention per flush interval.
+
+Each report runs as one Lua script, so concurrent reports are checked
+against each other atomically. Intentions are spread over
+intention_progress_key_shards Redis Cluster hash tags; the keys of an
+intention share the tag of its shard with the shard's dirty set, so the
+script stays on one slot. The checks are:
+
+- progress may not decrease unless the report is a reset,
+- an intention accepts at most intention_progress_max_updates_per_second reports.
+
+Agent contexts merge the live values over the persisted ones on read.
+Reading a context also records which agents hold each intention, so later
+reports bump those agent versions and invalidate their cached contexts.
+"""
+
+import asyncio
+import logging
+import time
+import zlib
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "intention_progress"
+
+# KEYS: live value, rate window, owners, dirty set
+# ARGV: intention id, progress, now (ms), max reports per second, live TTL (s), reset flag
+RECORD_PROGRESS_SCRIPT = """
+local max_rate = tonumber(ARGV[4])
+if max_rate > 0 then
+    local count = redis.call('INCR', KEYS[2])
+    if count == 1 then
+        redis.call('PEXPIRE', KEYS[2], 1000)
+    end
+    if count > max_rate then
+        return {'rate_limited', redis.call('GET', KEYS[1]) or ''}
+    end
+end
+local current = redis.call('GET', KEYS[1])
+if current and ARGV[6] == '0' then
+    local current_progress = tonumber(string.match(current, '^[^|]+'))
+    if tonumber(ARGV[2]) < current_progress then
+        return {'regressed', current}
+    end
+end
+redis.call('SET', KEYS[1], ARGV[2] .. '|' .. ARGV[3], 'EX', tonumber(ARGV[5]))
+redis.call('SADD', KEYS[4], ARGV[1])
+local result = {'accepted', ''}
+for _, agent_id in ipairs(redis.call('SMEMBERS', KEYS[3])) do
+    table.insert(result, agent_id)
+end
+return result
+"""
+
+
+def shard_of(intention_id: str, shards: int) -> int:
+    """Shard of an intention; stable across processes"""
+    return zlib.crc32(intention_id.encode("utf-8")) % shards
+
+
+def _tag(shard: int) -> str:
+    """Hash tag shared by the keys of one shard"""
+    return f"{{{KEY_PREFIX}:{shard}}}"
+
+
+def dirty_key(shard: int) -> str:
+    """Redis key of the set of intentions of a shard reported since the last flush"""
+    return f"{_tag(shard)}:dirty"
+
+
+def live_key(intention_id: str, shard: int) -> str:
+    """Redis key of the live progress of an intention"""
+    return f"{_tag(shard)}:live:{intention_id}"
+
+
+def rate_key(intention_id: str, shard: int) -> str:
+    """Redis key counting the reports of an intention in the current second"""
+    return f"{_tag(shard)}:rate:{intention_id}"
+
+
+def owners_key(intention_id: str, shard: int) -> str:
+    """Redis key of the set of agents known to hold an intention"""
+    return f"{_tag(shard)}:owners:{intention_id}"
+
+
+def _text(value: Any) -> str:
+    """Decode a Redis reply item returned as bytes by clients without decode_responses"""
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def parse_live_value(value: Optional[str]) -> Optional[Tuple[float, int]]:
+    """Parse a live value stored as "progress|updated_at_ms" """
+    if not value:
+        return None
+    progress, _, updated_at = value.partition("|")
+    return float(progress), int(updated_at or 0)
+
+
+def merge_live_progress(
+    knowledge_graph: Optional[Dict[str, Any]],
+    live: Dict[str, float],
+    fields: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Overlay live progress on the intentions of a knowledge graph
+
+    Intentions may be driver nodes; updated ones are replaced with property maps,
+    which encode to the same JSON. Projections without progress are left alone.
+    """
+    if not live or not knowledge_graph or (fields and "progress" not in fields):
+        return knowledge_graph
+    intentions = []
+    for intention in knowledge_graph.get("intentions") or []:
+        progress = live.get(intention.get("id"))
+        if progress is not None:
+            intention = {**dict(intention.items()), "progress": progress}
+        intentions.append(intention)
+    knowledge_graph["intentions"] = intentions
+    return knowledge_graph
+
+
+def intention_ids(knowledge_graph: Optional[Dict[str, Any]]) -> List[str]:
+    """Ids of the intentions in a knowledge graph"""
+    if not knowledge_graph:
+        return []
+    return [intention.get("id") for intention in knowledge_graph.get("intentions") or [] if intention.get("id")]
+
+
+class IntentionProgressMetrics(BaseModel):
+    """Live intention progress metrics"""
+    reports: int = 0
+    accepted: int = 0
+    regressed: int = 0
+    rate_limited: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    intentions_flushed: int = 0
+    intentions_missing: int = 0
+    last_flush_at: Optional[str] = None
+    last_flush_duration_ms: float = 0.0
+
+
+class LiveIntentionProgress:
+    """Keeps the latest intention progress in Redis and flushes it to Neo4j periodically"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = IntentionProgressMetrics()
+        self.shards = max(1, self.config.intention_progress_key_shards)
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def report(self, intention_id: str, progress: float, reset: bool = False) -> Dict[str, Any]:
+        """
+        Record a progress report as the live value of the intention.
+        Returns accepted, the resulting live progress and, when rejected, the reason
+        ("regressed" or "rate_limited").
+        """
+        shard = shard_of(intention_id, self.shards)
+        result = await self.db.redis.run_script(
+            RECORD_PROGRESS_SCRIPT,
+            keys=[
+                live_key(intention_id, shard),
+                rate_key(intention_id, shard),
+                owners_key(intention_id, shard),
+                dirty_key(shard)
+            ],
+            args=[
+                intention_id,
+                repr(float(progress)),
+                int(time.time() * 1000),
+                self.config.intention_progress_max_updates_per_second,
+                self.config.intention_progress_live_ttl,
+                "1" if reset else "0"
+            ]
+        )
+        status, current, *agent_ids = [_text(item) for item in result]
+        self.metrics.reports += 1
+
+        if status != "accepted":
+            setattr(self.metrics, status, getattr(self.metrics, status) + 1)
+            live = parse_live_value(current)
+            return {"accepted": False, "reason": status, "progress": live[0] if live else None}
+
+        self.metrics.accepted += 1
+        # Cached contexts of known holders now show stale progress
+        await asyncio.gather(*(self.db.bump_agent_version(agent_id) for agent_id in agent_ids))
+        return {"accepted": True, "reason": None, "progress": progress}
+
+    async def read(self, holders: Dict[str, Iterable[str]]) -> Dict[str, float]:
+        """
+        Get the live progress of the intentions held by each agent, keyed by intention id.
+        Records the agents as holders so later reports invalidate their contexts.
+        """
+        owners: Dict[str, List[str]] = {}
+        for agent_id, held in holders.items():
+            for intention_id in held:
+                owners.setdefault(intention_id, []).append(agent_id)
+        if not owners:
+            return {}
+
+        ids_by_shard: Dict[int, List[str]] = {}
+        for intention_id in owners:
+            ids_by_shard.setdefault(shard_of(intention_id, self.shards), []).append(intention_id)
+
+        # One MGET per shard: a multi-key read must stay within one cluster slot
+        values_by_shard, _ = await asyncio.gather(
+            asyncio.gather(*(
+                self.db.redis.get_values([live_key(intention_id, shard) for intention_id in ids])
+                for shard, ids in ids_by_shard.items()
+            )),
+            self.db.redis.add_set_members(
+                {
+                    owners_key(intention_id, shard_of(intention_id, self.shards)): agent_ids
+                    for intention_id, agent_ids in owners.items()
+                },
+                ttl=self.config.intention_progress_live_ttl
+            )
+        )
+        live = {}
+        for ids, values in zip(ids_by_shard.values(), values_by_shard):
+            for intention_id, value in zip(ids, values):
+                parsed = parse_live_value(value)
+                if parsed is not None:
+                    live[intention_id] = parsed[0]
+        return live
+
+    async def flush(self) -> Dict[str, Any]:
+        """
+        Persist the latest live value of every reported intention to Neo4j.
+        Each pass pops a batch of dirty intentions from every shard and writes
+        them batch_size at a time; a failed pass is queued again.
+        """
+        async with self._lock:
+            start = time.perf_counter()
+            batch_size = self.config.intention_progress_flush_batch_size
+            flushed = missing = 0
+            try:
+                shards = list(range(self.shards))
+                while shards:
+                    popped = await asyncio.gather(*(
+                        self.db.redis.pop_set_members(dirty_key(shard), batch_size) for shard in shards
+                    ))
+                    ids_by_shard = {shard: ids for shard, ids in zip(shards, popped) if ids}
+                    if not ids_by_shard:
+                        break
+
+                    try:
+                        values_by_shard = await asyncio.gather(*(
+                            self.db.redis.get_values([live_key(intention_id, shard) for intention_id in ids])
+                            for shard, ids in ids_by_shard.items()
+                        ))
+                        updates = []
+                        for ids, values in zip(ids_by_shard.values(), values_by_shard):
+                            for intention_id, value in zip(ids, values):
+                                parsed = parse_live_value(value)
+                                if parsed is not None:
+                                    updates.append({"intention_id": intention_id, "progress": parsed[0]})
+                        owners = {}
+                        for offset in range(0, len(updates), batch_size):
+                            owners.update(
+                                await self.db.neo4j.update_intentions_progress(updates[offset:offset + batch_size])
+                            )
+                    except Exception:
+                        # Keep the pass for the next flush; newer reports are read then
+                        await self.db.redis.add_set_members(
+                            {dirty_key(shard): ids for shard, ids in ids_by_shard.items()}
+                        )
+                        raise
+
+                    flushed += len(owners)
+                    missing += len(updates) - len(owners)
+                    agent_ids = {agent_id for holders in owners.values() for agent_id in holders}
+                    if agent_ids:
+                        await self.db.redis.add_set_members(
+                            {
+                                owners_key(intention_id, shard_of(intention_id, self.shards)): holders
+                                for intention_id, holders in owners.items() if holders
+                            },
+                            ttl=self.config.intention_progress_live_ttl
+                        )
+                        await asyncio.gather(*(self.db.bump_agent_version(agent_id) for agent_id in agent_ids))
+
+                    shards = [shard for shard, ids in ids_by_shard.items() if len(ids) == batch_size]
+
+                success = True
+            except Exception as e:
+                logger.error(f"Intention progress flush failed: {e}")
+                self.metrics.failed_flushes += 1
+                success = False
+
+            duration = time.perf_counter() - start
+            self.metrics.flushes += 1
+            self.metrics.intentions_flushed += flushed
+            self.metrics.intentions_missing += missing
+            self.metrics.last_flush_at = datetime.utcnow().isoformat()
+            self.metrics.last_flush_duration_ms = duration * 1000
+
+            return {
+                "success": success,
+                "intentions_flushed": flushed,
+                "intentions_missing": missing,
+                "duration_ms": duration * 1000,
+                "timestamp": self.metrics.last_flush_at
+            }
+
+    def start(self) -> None:
+        """Flush every intention_progress_flush_interval seconds in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_periodically(), name="intention-progress-flush")
+
+    async def _flush_periodically(self) -> None:
+        """Background flush loop"""
+        while True:
+            await asyncio.sleep(self.config.intention_progress_flush_interval)
+            await self.flush()
+
+    async def stop(self) -> None:
+        """Stop the background flusher and persist pending live values"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    def get_metrics(self) -> IntentionProgressMetrics:
+        """Get live intention progress metrics"""
+        return self.metrics
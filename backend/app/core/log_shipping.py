@@ -0,0 +1,203 @@
+"""
+MABOS Log Shipping
+
+Logging handler that ships application logs to the Elasticsearch logs
+index. emit() only turns the record into a dict and appends it to a
+bounded deque: it takes no lock and never waits on Elasticsearch, from
+any thread. A background task drains the deque every ship_interval and
+queues the entries on the shared bulk indexer, which enriches them with
+their severity. When the deque is full, the drop policy decides whether
+the incoming (drop_newest) or the oldest queued record (drop_oldest) is
+lost; entries the bulk indexer has no room for are dropped as well.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ("drop_newest", "drop_oldest")
+
+# Records from the shipping path itself are never shipped, so a failing
+# cluster cannot feed its own errors back into the queue
+EXCLUDED_LOGGERS = ("elasticsearch", "elastic_transport", "app.core.bulk_indexer", __name__)
+
+_formatter = logging.Formatter()
+
+
+class LogShippingMetrics(BaseModel):
+    """Log shipping metrics"""
+    queued: int = 0
+    shipped: int = 0
+    dropped_queue_full: int = 0
+    dropped_indexer_full: int = 0
+    queue_depth: int = 0
+    avg_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    last_lag_ms: float = 0.0
+
+
+class _NoLock:
+    """Handler lock that never blocks; Handler.handle still enters it around emit()"""
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoLock":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+    def _at_fork_reinit(self) -> None:
+        pass
+
+
+class ElasticsearchLogHandler(logging.Handler):
+    """Non-blocking logging handler shipping records through the bulk indexer"""
+
+    def __init__(
+        self,
+        analytics: "ElasticsearchAnalyticsManager",
+        level: int = logging.INFO,
+        queue_size: int = 10000,
+        drop_policy: str = "drop_newest",
+        batch_size: int = 500,
+        ship_interval: float = 0.5,
+        service: str = "mabos-backend"
+    ):
+        """
+        Args:
+            analytics: Analytics manager whose bulk indexer receives the entries
+            level: Lowest level shipped
+            queue_size: Records held before the drop policy applies
+            drop_policy: drop_newest discards incoming records, drop_oldest evicts queued ones
+            batch_size: Records handed to the bulk indexer between yields to the event loop
+            ship_interval: Seconds between drains of the queue
+            service: Service name stored with every entry
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy}; expected one of {DROP_POLICIES}")
+        super().__init__(level)
+        self.analytics = analytics
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.batch_size = batch_size
+        self.ship_interval = ship_interval
+        self.service = service
+        self.metrics = LogShippingMetrics()
+
+        # deque appends and pops are atomic, so emit() needs no lock
+        self._queue: Deque[Tuple[float, Dict[str, Any]]] = deque(maxlen=queue_size if drop_policy == "drop_oldest" else None)
+        self._task: Optional[asyncio.Task] = None
+
+    def createLock(self) -> None:
+        """Use a lock that never blocks; emit() only appends to a deque"""
+        self.lock = _NoLock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Skip records logged by the shipping path"""
+        if record.name.startswith(EXCLUDED_LOGGERS):
+            return False
+        return super().filter(record)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue a record, applying the drop policy when the queue is full"""
+        try:
+            if len(self._queue) >= self.queue_size:
+                self.metrics.dropped_queue_full += 1
+                if self.drop_policy == "drop_newest":
+                    return
+            self._queue.append((record.created, self._to_entry(record)))
+            self.metrics.queued += 1
+        except Exception:
+            self.handleError(record)
+
+    def _to_entry(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """Log entry document of a record"""
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "service": self.service,
+            "component": record.module,
+            "context": {
+                "function": record.funcName,
+                "line": record.lineno,
+                "process": record.process,
+                "thread": record.threadName
+            }
+        }
+        if record.exc_info:
+            entry["stack_trace"] = _formatter.formatException(record.exc_info)
+        return entry
+
+    def ship(self, limit: Optional[int] = None) -> int:
+        """Move up to limit queued records (all by default) onto the bulk indexer"""
+        shipped = 0
+        now = time.time()
+        while self._queue and (limit is None or shipped < limit):
+            try:
+                created, entry = self._queue.popleft()
+            except IndexError:
+                break
+
+            shipped += 1
+            if not self.analytics.queue_log_entry(entry):
+                self.metrics.dropped_indexer_full += 1
+                continue
+
+            lag_ms = max(now - created, 0.0) * 1000
+            metrics = self.metrics
+            metrics.shipped += 1
+            metrics.avg_lag_ms += (lag_ms - metrics.avg_lag_ms) / metrics.shipped
+            metrics.max_lag_ms = max(metrics.max_lag_ms, lag_ms)
+            metrics.last_lag_ms = lag_ms
+        return shipped
+
+    def start(self) -> None:
+        """Ship queued records in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="log-shipping")
+
+    async def _run(self) -> None:
+        """Shipping loop: drain the queue in batches, yielding to the event loop between them"""
+        while True:
+            await asyncio.sleep(self.ship_interval)
+            while self._queue:
+                try:
+                    self.ship(self.batch_size)
+                except Exception as e:
+                    logger.error(f"Log shipping failed: {e}")
+                    break
+                await asyncio.sleep(0)
+
+    def get_metrics(self) -> LogShippingMetrics:
+        """Get log shipping metrics"""
+        self.metrics.queue_depth = len(self._queue)
+        return self.metrics
+
+    async def stop(self) -> None:
+        """Stop the shipping loop and hand the remaining records to the bulk indexer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.ship()
@@ -0,0 +1,195 @@
+"""
+MABOS Neo4j Driver Factory
+
+Process-wide Neo4j driver shared by every graph manager, with a tuned connection
+pool, managed read/write transactions and transaction load metrics.
+"""
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from neo4j import READ_ACCESS, WRITE_ACCESS, AsyncDriver, AsyncGraphDatabase, AsyncManagedTransaction, AsyncSession, ResultSummary
+from neo4j.exceptions import ClientError
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseConfig
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Message raised by the driver when the pool has no free connection in time
+POOL_ACQUISITION_TIMEOUT_MESSAGE = "failed to obtain a connection from the pool"
+
+
+class Neo4jPoolMetrics(BaseModel):
+    """Neo4j connection pool metrics
+
+    in_flight_transactions counts managed transactions running through the
+    factory, not connections held by the driver pool; transaction_load is that
+    count relative to max_pool_size.
+    """
+    max_pool_size: int = 0
+    in_flight_transactions: int = 0
+    peak_in_flight_transactions: int = 0
+    read_transactions: int = 0
+    write_transactions: int = 0
+    failed_transactions: int = 0
+    acquisition_timeouts: int = 0
+    avg_transaction_time: float = 0.0
+    transaction_load: float = 0.0
+
+
+def query_work(query: str, parameters: Dict[str, Any] = None) -> Callable[[AsyncManagedTransaction], Awaitable[List[Dict[str, Any]]]]:
+    """Build a managed transaction function that runs one query and returns its records"""
+    async def _work(tx: AsyncManagedTransaction) -> List[Dict[str, Any]]:
+        # The result must be fully consumed inside the transaction function,
+        # since the driver may retry the whole function on transient errors.
+        result = await tx.run(query, parameters or {})
+        return await result.data()
+
+    return _work
+
+
+def summarized_query_work(query: str, parameters: Dict[str, Any] = None, raw: bool = False) -> Callable[[AsyncManagedTransaction], Awaitable[Tuple[List[Any], ResultSummary]]]:
+    """Build a managed transaction function that returns the records and the result summary
+
+    With raw=True the driver records are returned untouched (nodes, temporal
+    values etc. intact) so they can be encoded to JSON in a single pass.
+    """
+    async def _work(tx: AsyncManagedTransaction) -> Tuple[List[Any], ResultSummary]:
+        result = await tx.run(query, parameters or {})
+        if raw:
+            records = [record async for record in result]
+        else:
+            records = await result.data()
+        summary = await result.consume()
+        return records, summary
+
+    return _work
+
+
+class Neo4jDriverFactory:
+    """Owns the single shared Neo4j driver and routes managed transactions through it"""
+
+    def __init__(self, config: "DatabaseConfig"):
+        self.config = config
+        self._driver: Optional[AsyncDriver] = None
+        self._lock = asyncio.Lock()
+        self.metrics = Neo4jPoolMetrics(max_pool_size=config.neo4j_max_connection_pool_size)
+
+    @property
+    def driver(self) -> Optional[AsyncDriver]:
+        """The shared driver, or None if it has not been created yet"""
+        return self._driver
+
+    async def get_driver(self) -> AsyncDriver:
+        """Create the shared driver on first use and return it"""
+        if self._driver is None:
+            async with self._lock:
+                if self._driver is None:
+                    driver = AsyncGraphDatabase.driver(
+                        self.config.neo4j_uri,
+                        auth=(self.config.neo4j_user, self.config.neo4j_password),
+                        max_connection_pool_size=self.config.neo4j_max_connection_pool_size,
+                        connection_acquisition_timeout=self.config.neo4j_connection_acquisition_timeout,
+                        max_connection_lifetime=self.config.neo4j_max_connection_lifetime
+                    )
+                    await driver.verify_connectivity()
+                    self._driver = driver
+                    logger.info(
+                        f"Neo4j driver created (pool size {self.config.neo4j_max_connection_pool_size}, "
+                        f"acquisition timeout {self.config.neo4j_connection_acquisition_timeout}s)"
+                    )
+        return self._driver
+
+    def session(self, **kwargs: Any) -> AsyncSession:
+        """Open a session on the shared driver against the configured database"""
+        if self._driver is None:
+            raise RuntimeError("Neo4j driver not initialized")
+        kwargs.setdefault("database", self.config.neo4j_database)
+        return self._driver.session(**kwargs)
+
+    async def execute_read(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run a read query in a managed transaction (routable to read replicas)"""
+        return await self.run_transaction(READ_ACCESS, query_work(query, parameters))
+
+    async def execute_write(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run a write query in a managed transaction"""
+        return await self.run_transaction(WRITE_ACCESS, query_work(query, parameters))
+
+    async def run_transaction(self, access_mode: str, work: Callable[[AsyncManagedTransaction], Awaitable[T]]) -> T:
+        """Run a unit of work in a retried, managed transaction with the given access mode"""
+        driver = await self.get_driver()
+
+        self._on_acquire(access_mode)
+        start_time = time.perf_counter()
+
+        try:
+            async with driver.session(database=self.config.neo4j_database, default_access_mode=access_mode) as session:
+                if access_mode == READ_ACCESS:
+                    return await session.execute_read(work)
+                return await session.execute_write(work)
+        except ClientError as e:
+            if POOL_ACQUISITION_TIMEOUT_MESSAGE in str(e):
+                self.metrics.acquisition_timeouts += 1
+                logger.warning(f"Neo4j connection pool exhausted: {e}")
+            self.metrics.failed_transactions += 1
+            raise
+        except Exception:
+            self.metrics.failed_transactions += 1
+            raise
+        finally:
+            self._on_release(time.perf_counter() - start_time)
+
+    def _on_acquire(self, access_mode: str) -> None:
+        """Track a transaction starting"""
+        self.metrics.in_flight_transactions += 1
+        self.metrics.peak_in_flight_transactions = max(
+            self.metrics.peak_in_flight_transactions, self.metrics.in_flight_transactions
+        )
+
+        if access_mode == READ_ACCESS:
+            self.metrics.read_transactions += 1
+        else:
+            self.metrics.write_transactions += 1
+
+    def _on_release(self, transaction_time: float) -> None:
+        """Track a transaction finishing"""
+        self.metrics.in_flight_transactions -= 1
+
+        total_transactions = self.metrics.read_transactions + self.metrics.write_transactions
+        self.metrics.avg_transaction_time = (
+            (self.metrics.avg_transaction_time * (total_transactions - 1) + transaction_time) / total_transactions
+        )
+
+    def get_metrics(self) -> Neo4jPoolMetrics:
+        """Get connection pool metrics"""
+        if self.metrics.max_pool_size > 0:
+            self.metrics.transaction_load = self.metrics.in_flight_transactions / self.metrics.max_pool_size
+        return self.metrics
+
+    async def close(self) -> None:
+        """Close the shared driver; safe to call from every manager that uses it"""
+        driver, self._driver = self._driver, None
+        if driver:
+            await driver.close()
+            logger.info("Neo4j driver closed")
+
+
+# One factory per Neo4j endpoint, shared across all managers in the process
+_driver_factories: Dict[Tuple[str, str, str], Neo4jDriverFactory] = {}
+
+
+def get_neo4j_driver_factory(config: "DatabaseConfig") -> Neo4jDriverFactory:
+    """Get the shared driver factory for the Neo4j endpoint described by config"""
+    key = (config.neo4j_uri, config.neo4j_user, config.neo4j_database)
+
+    if key not in _driver_factories:
+        _driver_factories[key] = Neo4jDriverFactory(config)
+
+    return _driver_factories[key]
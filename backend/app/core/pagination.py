@@ -0,0 +1,88 @@
+"""
+MABOS Collection Pagination
+
+Keyset pagination for the bounded collections returned by agent context
+queries. Each collection is ordered by (created_at, id) and paged with an
+opaque cursor holding the sort key of the last item returned.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from neo4j.time import DateTime
+
+# Supported collection orderings: newest first (default) or oldest first
+CONTEXT_ORDERS = ("newest", "oldest")
+
+# Properties a collection item must carry to build its cursor
+CURSOR_FIELDS = ("created_at", "id")
+
+# Sort key used for nodes without a created_at property, matching the Cypher fallback
+EPOCH_SORT_KEY = "1970-01-01T00:00:00Z"
+
+
+def encode_cursor(item: Any) -> str:
+    """Build an opaque cursor from the (created_at, id) sort key of a collection item"""
+    created_at = item.get("created_at")
+    if isinstance(created_at, DateTime):
+        # iso_format keeps nanosecond precision, so the keyset comparison is exact
+        created_at = created_at.iso_format()
+    elif created_at is None:
+        created_at = EPOCH_SORT_KEY
+    else:
+        created_at = str(created_at)
+
+    payload = json.dumps({"created_at": created_at, "id": item.get("id")}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor into Cypher query parameters"""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {"created_at": str(payload["created_at"]), "id": payload["id"]}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def resolve_limits(collections: Iterable[str], limits: Optional[Mapping[str, int]], default: int, maximum: int) -> Dict[str, int]:
+    """Resolve the page size of each collection, clamped to [1, maximum]"""
+    limits = limits or {}
+    return {
+        name: max(1, min(limits.get(name) or default, maximum))
+        for name in collections
+    }
+
+
+def collection_parameters(limits: Mapping[str, int], cursors: Optional[Mapping[str, Optional[str]]] = None) -> Dict[str, Any]:
+    """Build the limit and cursor query parameters for each bounded collection
+
+    One extra item is fetched per collection to tell whether another page exists.
+    """
+    cursors = cursors or {}
+    params: Dict[str, Any] = {}
+    for name, limit in limits.items():
+        params[f"{name}_limit"] = limit + 1
+        params[f"{name}_cursor"] = decode_cursor(cursors.get(name))
+    return params
+
+
+def page_collections(record: Dict[str, Any], limits: Mapping[str, int]) -> Dict[str, Any]:
+    """Trim each collection to its page size and attach the cursor for the next page"""
+    next_cursors: Dict[str, Optional[str]] = {}
+    for name, limit in limits.items():
+        items = record.get(name) or []
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursors[name] = encode_cursor(items[-1])
+        else:
+            next_cursors[name] = None
+        record[name] = items
+
+    record["cursors"] = next_cursors
+    return record
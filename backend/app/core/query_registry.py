@@ -0,0 +1,182 @@
+"""
+MABOS Cypher Query Registry
+
+Named, parameterised Cypher queries that are defined once and executed through
+the shared Neo4j driver, with per-query latency histograms, row counts, and db hits
+and slow query plans from PROFILE-sampled executions.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from neo4j import READ_ACCESS
+from pydantic import BaseModel
+
+from app.core.neo4j_driver import Neo4jDriverFactory, summarized_query_work
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@dataclass(frozen=True)
+class CypherQuery:
+    """A named Cypher query with its access mode and expected parameters"""
+    name: str
+    cypher: str
+    access_mode: str = READ_ACCESS
+    parameters: Tuple[str, ...] = ()
+    description: str = ""
+    profile_cypher: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Prepared once so PROFILE sampling never rebuilds query text
+        object.__setattr__(self, "profile_cypher", f"PROFILE {self.cypher}")
+
+
+class QueryPlanSample(BaseModel):
+    """A captured PROFILE plan for a slow query execution"""
+    duration_ms: float
+    rows: int
+    db_hits: int
+    plan: Dict[str, Any]
+    captured_at: float
+
+
+class QueryStats(BaseModel):
+    """Per-query execution statistics
+
+    db hits are only known for PROFILE-sampled executions: sampled_db_hits
+    sums them over profiled_count runs and avg_db_hits is the mean per run,
+    None until a run has been sampled.
+    """
+    name: str
+    access_mode: str
+    count: int = 0
+    errors: int = 0
+    total_time_ms: float = 0.0
+    avg_time_ms: float = 0.0
+    max_time_ms: float = 0.0
+    rows: int = 0
+    profiled_count: int = 0
+    sampled_db_hits: int = 0
+    avg_db_hits: Optional[float] = None
+    latency_histogram: Dict[str, int] = {}
+    slow_plans: List[QueryPlanSample] = []
+
+
+class QueryRegistry:
+    """Registry of named Cypher queries with execution instrumentation"""
+
+    def __init__(self, profile_sample_rate: float = 0.0, slow_query_threshold_ms: float = 500.0, max_plans_per_query: int = 5):
+        self.profile_sample_rate = profile_sample_rate
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.max_plans_per_query = max_plans_per_query
+        self._queries: Dict[str, CypherQuery] = {}
+        self._stats: Dict[str, QueryStats] = {}
+
+    def configure(self, profile_sample_rate: float, slow_query_threshold_ms: float) -> None:
+        """Update PROFILE sampling settings"""
+        self.profile_sample_rate = profile_sample_rate
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+
+    def register(self, query: CypherQuery) -> CypherQuery:
+        """Register a query under its name; re-registering identical text is a no-op"""
+        existing = self._queries.get(query.name)
+        if existing and existing.cypher != query.cypher:
+            raise ValueError(f"Cypher query '{query.name}' is already registered with different text")
+
+        self._queries[query.name] = query
+        self._stats.setdefault(query.name, QueryStats(name=query.name, access_mode=query.access_mode))
+        return query
+
+    def get(self, name: str) -> CypherQuery:
+        """Get a registered query by name"""
+        try:
+            return self._queries[name]
+        except KeyError:
+            raise KeyError(f"Unknown Cypher query: {name}") from None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    async def run(self, factory: Neo4jDriverFactory, name: str, parameters: Dict[str, Any] = None, raw: bool = False) -> List[Any]:
+        """Execute a registered query in a managed transaction and record its statistics
+
+        With raw=True the driver records are returned as-is for single-pass encoding.
+        """
+        query = self.get(name)
+        missing = [param for param in query.parameters if param not in (parameters or {})]
+        if missing:
+            raise ValueError(f"Cypher query '{name}' is missing parameters: {', '.join(missing)}")
+
+        profile = self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+        cypher = query.profile_cypher if profile else query.cypher
+
+        start_time = time.perf_counter()
+        try:
+            records, summary = await factory.run_transaction(
+                query.access_mode, summarized_query_work(cypher, parameters, raw=raw)
+            )
+        except Exception:
+            self._stats[name].errors += 1
+            raise
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        self._record(query, duration_ms, len(records), summary.profile if profile else None)
+        return records
+
+    def _record(self, query: CypherQuery, duration_ms: float, rows: int, profile: Optional[Dict[str, Any]]) -> None:
+        """Record one execution of a query"""
+        stats = self._stats[query.name]
+        stats.count += 1
+        stats.total_time_ms += duration_ms
+        stats.avg_time_ms = stats.total_time_ms / stats.count
+        stats.max_time_ms = max(stats.max_time_ms, duration_ms)
+        stats.rows += rows
+
+        bucket = next((f"le_{bound:g}ms" for bound in LATENCY_BUCKETS_MS if duration_ms <= bound), "gt_5000ms")
+        stats.latency_histogram[bucket] = stats.latency_histogram.get(bucket, 0) + 1
+
+        if profile is None:
+            return
+
+        db_hits = self._total_db_hits(profile)
+        stats.profiled_count += 1
+        stats.sampled_db_hits += db_hits
+        stats.avg_db_hits = stats.sampled_db_hits / stats.profiled_count
+
+        if duration_ms >= self.slow_query_threshold_ms:
+            stats.slow_plans.append(QueryPlanSample(
+                duration_ms=duration_ms,
+                rows=rows,
+                db_hits=db_hits,
+                plan=profile,
+                captured_at=time.time()
+            ))
+            # Keep only the slowest plans per query
+            stats.slow_plans.sort(key=lambda sample: sample.duration_ms, reverse=True)
+            del stats.slow_plans[self.max_plans_per_query:]
+            logger.info(f"Captured PROFILE plan for slow query {query.name} ({duration_ms:.1f}ms, {db_hits} db hits)")
+
+    def _total_db_hits(self, plan: Dict[str, Any]) -> int:
+        """Sum db hits over a PROFILE plan tree"""
+        return plan.get("dbHits", 0) + sum(self._total_db_hits(child) for child in plan.get("children", []))
+
+    def get_stats(self, name: str) -> QueryStats:
+        """Get execution statistics for a query"""
+        return self._stats[self.get(name).name]
+
+    def slowest(self, limit: Optional[int] = 10) -> List[QueryStats]:
+        """Get the executed queries with the highest maximum latency, including captured plans"""
+        executed = [stats for stats in self._stats.values() if stats.count > 0]
+        return sorted(executed, key=lambda stats: stats.max_time_ms, reverse=True)[:limit]
+
+
+# Global query registry instance
+query_registry = QueryRegistry()
@@ -0,0 +1,156 @@
+"""
+MABOS Search Result Cache
+
+Two-tier cache of analytics search results. Keys hash the canonical JSON of
+the SearchQuery (query, filters, sort, paging, highlight, aggregations),
+the search scope and any extra search parameters, and embed a per-index
+generation counter. Writing to an index bumps its generation in Redis, so
+every cached result of that index is skipped from then on and expires with
+its short TTL. Generations are re-read from Redis at most once per
+search_cache_generation_refresh seconds, which keeps L1 hits free of any
+network round trip.
+
+A write only becomes searchable after the next index refresh, so results
+are not cached for search_cache_write_settle seconds after an index moves
+to a new generation, whether this process wrote to it or saw another
+process do so; a result read before the refresh would otherwise be served
+under the new generation for the whole TTL.
+"""
+
+import dataclasses
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.workflow_changes import content_hash
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+
+def search_generation_key(index: str) -> str:
+    """Redis key of the write generation counter of an index"""
+    return f"search:generation:{index}"
+
+
+def search_digest(query: Any, scope: str, **extra: Any) -> str:
+    """Canonical hash of a search query dataclass, its scope and extra search parameters"""
+    return content_hash({"query": dataclasses.asdict(query), "scope": scope, "extra": extra})
+
+
+class SearchCacheMetrics(BaseModel):
+    """Search result cache metrics"""
+    l1_hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    invalidations: int = 0
+    unsettled_skips: int = 0
+    hit_rate: float = 0.0
+    l1_entries: int = 0
+    avg_l1_hit_us: float = 0.0
+
+
+class SearchResultCache:
+    """In-process LRU and Redis tiers of search results, invalidated per index by write generation"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = SearchCacheMetrics()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generations: Dict[str, Tuple[int, float]] = {}
+        self._settling: Dict[str, float] = {}
+
+    async def get(self, index: str, digest: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Look a result up in both tiers; returns the cache key to store a fresh result under,
+        or None while the index settles after a write.
+        """
+        start_time = time.perf_counter()
+        key = f"search:result:{index}:{await self._generation(index)}:{digest}"
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] >= time.monotonic():
+                self._entries.move_to_end(key)
+                self.metrics.l1_hits += 1
+                hit_us = (time.perf_counter() - start_time) * 1_000_000
+                self.metrics.avg_l1_hit_us += (hit_us - self.metrics.avg_l1_hit_us) / self.metrics.l1_hits
+                return key, entry[1]
+            del self._entries[key]
+
+        value = await self.db.redis.get_cache(key)
+        if isinstance(value, dict):
+            self.metrics.redis_hits += 1
+            self._remember(key, value)
+            return key, value
+
+        self.metrics.misses += 1
+        if time.monotonic() < self._settling.get(index, 0.0):
+            self.metrics.unsettled_skips += 1
+            return None, None
+        return key, None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in both tiers"""
+        self._remember(key, value)
+        await self.db.redis.set_cache(key, value, ttl=self.config.search_cache_ttl)
+        self.metrics.stores += 1
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result in the L1 tier, evicting the least recently used entries"""
+        self._entries[key] = (time.monotonic() + self.config.search_cache_ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.search_cache_l1_max_entries:
+            self._entries.popitem(last=False)
+
+    async def _generation(self, index: str) -> int:
+        """Write generation of an index, re-read from Redis once per refresh interval"""
+        known = self._generations.get(index)
+        if known is not None and time.monotonic() - known[1] < self.config.search_cache_generation_refresh:
+            return known[0]
+
+        try:
+            generation = await self.db.redis.get_counter(search_generation_key(index))
+        except Exception as e:
+            logger.error(f"Failed to read search generation of {index}: {e}")
+            generation = 0
+        if known is not None and generation > known[0]:
+            # Another process wrote to the index; its write may not be searchable yet
+            self._settle(index)
+        # A generation raised locally while Redis was unreachable is never lowered again
+        generation = max(generation, known[0] if known else 0)
+        self._generations[index] = (generation, time.monotonic())
+        return generation
+
+    def _settle(self, index: str) -> None:
+        """Stop caching results of an index until its latest write is searchable"""
+        self._settling[index] = time.monotonic() + self.config.search_cache_write_settle
+
+    async def invalidate(self, indices: Iterable[str]) -> None:
+        """Move indices to a new generation so their cached results are no longer served"""
+        for index in indices:
+            known = self._generations.get(index, (0, 0.0))[0]
+            try:
+                generation = await self.db.redis.increment_counter(search_generation_key(index))
+            except Exception as e:
+                logger.error(f"Failed to bump search generation of {index}: {e}")
+                generation = known + 1
+            self._generations[index] = (max(generation, known + 1), time.monotonic())
+            self._settle(index)
+            self.metrics.invalidations += 1
+
+    def get_metrics(self) -> SearchCacheMetrics:
+        """Get search result cache metrics"""
+        metrics = self.metrics
+        hits = metrics.l1_hits + metrics.redis_hits
+        metrics.hit_rate = hits / (hits + metrics.misses) if hits + metrics.misses else 0.0
+        metrics.l1_entries = len(self._entries)
+        return metrics
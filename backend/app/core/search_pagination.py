@@ -0,0 +1,55 @@
+"""
+MABOS Search Pagination
+
+Deep pagination of analytics searches with a point in time (PIT) and
+search_after. A page is sorted by the search's own sort plus the _shard_doc
+tiebreaker, and the next page resumes after the sort values of the last hit
+against the same PIT, so each page costs the same however deep it is and
+index.max_result_window never applies. The PIT id, the resume point and the
+total of the first page travel in an opaque cursor.
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+# Tiebreaker giving every hit of a point in time a unique sort position
+TIEBREAKER = {"_shard_doc": "asc"}
+
+
+def encode_search_cursor(pit_id: str, search_after: List[Any], total: int) -> str:
+    """Build an opaque cursor resuming a point-in-time search after a hit"""
+    payload = json.dumps({"pit": pit_id, "after": search_after, "total": total}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_search_cursor"""
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {"pit": str(payload["pit"]), "after": list(payload["after"]), "total": int(payload["total"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+
+
+def with_tiebreaker(sort: Optional[List[Any]]) -> List[Any]:
+    """Search sort completed with the _shard_doc tiebreaker"""
+    sort = list(sort or [])
+    if not any(isinstance(clause, dict) and "_shard_doc" in clause or clause == "_shard_doc" for clause in sort):
+        sort.append(TIEBREAKER)
+    return sort
+
+
+def pit_page(es_query: Dict[str, Any], pit_id: str, keep_alive: str, search_after: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """Search body reading one page of a point in time, after the given sort values"""
+    body = {**es_query, "sort": with_tiebreaker(es_query.get("sort")), "pit": {"id": pit_id, "keep_alive": keep_alive}}
+    if search_after is not None:
+        body["search_after"] = search_after
+        # Totals and aggregations are the same on every page; only the first one computes them
+        body.pop("aggs", None)
+        body["track_total_hits"] = False
+    return body
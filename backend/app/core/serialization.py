@@ -0,0 +1,128 @@
+"""
+MABOS Serialization
+
+Single-pass JSON encoding of Neo4j results. Driver values (nodes, relationships,
+paths, temporal and spatial types) are converted through a type dispatch table
+while the encoder walks the structure, so records go straight to JSON bytes
+without an intermediate Python conversion pass.
+"""
+
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List
+
+from neo4j import Record
+from neo4j.graph import Node, Path, Relationship
+from neo4j.spatial import Point
+from neo4j.time import Date, DateTime, Duration, Time
+from starlette.responses import Response
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+    logger.warning("orjson not available, falling back to the standard json encoder")
+
+
+def _encode_entity(entity: Any) -> Dict[str, Any]:
+    """Encode a node or relationship as its property map, matching Result.data()"""
+    return dict(entity.items())
+
+
+def _encode_path(path: Path) -> List[Any]:
+    """Encode a path as alternating node and relationship property maps"""
+    encoded: List[Any] = [_encode_entity(path.start_node)]
+    for relationship in path.relationships:
+        encoded.append(_encode_entity(relationship))
+        encoded.append(_encode_entity(relationship.end_node))
+    return encoded
+
+
+# Type dispatch table for values the JSON encoder cannot handle natively.
+# Temporal values are converted to native datetimes (microsecond precision),
+# which the encoder formats in C far faster than Neo4j's iso_format().
+_ENCODERS: Dict[type, Callable[[Any], Any]] = {
+    Node: _encode_entity,
+    Relationship: _encode_entity,
+    Path: _encode_path,
+    DateTime: lambda value: value.to_native(),
+    Date: lambda value: value.to_native(),
+    Time: lambda value: value.to_native(),
+    Duration: lambda value: value.iso_format(),
+    Point: list,
+    Record: dict,
+    datetime: lambda value: value.isoformat(),
+    date: lambda value: value.isoformat(),
+    time: lambda value: value.isoformat(),
+    Decimal: float,
+    set: list,
+    frozenset: list,
+    tuple: list,
+}
+
+
+def _encoder_for(value_type: type) -> Callable[[Any], Any]:
+    """Resolve the encoder for a type, caching subclass lookups in the table"""
+    encoder = _ENCODERS.get(value_type)
+    if encoder is None:
+        for base in value_type.__mro__[1:]:
+            if base in _ENCODERS:
+                encoder = _ENCODERS[value_type] = _ENCODERS[base]
+                break
+        else:
+            raise TypeError(f"Type is not JSON serializable: {value_type.__name__}")
+    return encoder
+
+
+def _default(value: Any) -> Any:
+    """Encoder hook invoked only for values without a native JSON representation"""
+    return _encoder_for(type(value))(value)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value containing Neo4j driver types to JSON bytes in one pass"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def records_to_json(records: Iterable[Record]) -> bytes:
+    """Encode driver records to a JSON array of objects"""
+    return dumps([dict(record) for record in records])
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes produced by dumps"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert a value containing Neo4j driver types to plain JSON-compatible Python objects"""
+    if orjson is not None:
+        # A C-level encode/decode round trip is cheaper than a Python tree walk
+        return orjson.loads(dumps(value))
+
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return to_builtin(_default(value))
+
+
+class RawJSONResponse(Response):
+    """Response carrying pre-encoded JSON bytes, bypassing FastAPI re-validation and re-encoding"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,89 @@
+"""
+MABOS Workflow Change Detection
+
+Canonical content hashing for workflow sync. The hash of the whole payload
+and of each top-level field are kept per workflow after a successful sync;
+the next sync compares against them, skips unchanged payloads and
+propagates only the fields that changed. Without a recorded state the
+payload replaces the cached workflow in full.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+def sync_state_key(workflow_id: Any) -> str:
+    """Redis key of the hashes recorded by the last successful sync of a workflow"""
+    return f"workflow:sync:{workflow_id}"
+
+
+def workflow_cache_key(workflow_id: Any) -> str:
+    """Redis key of the cached workflow, a hash of JSON-encoded top-level fields"""
+    return f"workflow:cache:{workflow_id}"
+
+
+def canonical_json(value: Any) -> str:
+    """Encode a value as JSON independent of key order and whitespace"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of the canonical JSON encoding of a value"""
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+
+class WorkflowChanges(BaseModel):
+    """Difference between a workflow payload and its last synced state"""
+    content_hash: str
+    field_hashes: Dict[str, str]
+    changed: List[str]
+    removed: List[str]
+    created: bool
+    replace: bool = False
+
+    @property
+    def unchanged(self) -> bool:
+        """Whether the payload matches the last synced one"""
+        return not self.replace and not self.changed and not self.removed
+
+    def state(self) -> Dict[str, Any]:
+        """State to record once the changes have been propagated"""
+        return {"content_hash": self.content_hash, "fields": self.field_hashes}
+
+
+def detect_changes(
+    workflow_data: Dict[str, Any], previous: Optional[Dict[str, Any]], known: bool = True
+) -> WorkflowChanges:
+    """Compare a workflow payload with the state recorded by its last successful sync
+
+    Without a previous state every field is changed and the payload replaces the
+    cached workflow. known=False means the state could not be read, so the
+    workflow is not treated as created.
+    """
+    field_hashes = {field: content_hash(value) for field, value in workflow_data.items()}
+    digest = content_hash(field_hashes)
+
+    if not previous:
+        return WorkflowChanges(
+            content_hash=digest,
+            field_hashes=field_hashes,
+            changed=sorted(field_hashes),
+            removed=[],
+            created=known,
+            replace=True
+        )
+
+    if previous.get("content_hash") == digest:
+        return WorkflowChanges(content_hash=digest, field_hashes=field_hashes, changed=[], removed=[], created=False)
+
+    previous_fields = previous.get("fields") or {}
+    return WorkflowChanges(
+        content_hash=digest,
+        field_hashes=field_hashes,
+        changed=sorted(field for field, value in field_hashes.items() if previous_fields.get(field) != value),
+        removed=sorted(field for field in previous_fields if field not in field_hashes),
+        created=False
+    )
@@ -0,0 +1,320 @@
+"""
+MABOS Workflow Outbox
+
+Transactional outbox for cross-store workflow synchronization. A sync
+request commits one outbox row per target store in a single PostgreSQL
+transaction and returns; a relay per target then delivers pending rows in
+batches:
+
+- neo4j: merges the workflow-created belief, keyed by the workflow id; only
+  a sync that creates the workflow queues a neo4j row,
+- redis: caches the workflow, skipping events older than the cached one,
+- elasticsearch: indexes the workflow with the row id as external version.
+
+Every delivery is idempotent, so a row redelivered after a crash or a
+lost acknowledgement has no further effect. Rows are claimed with
+FOR UPDATE SKIP LOCKED and a lease, so relays in several processes share
+the work; a failed row is retried with exponential backoff and marked dead
+after workflow_outbox_max_attempts.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.core.ids import new_id
+from app.core.workflow_changes import workflow_cache_key
+
+if TYPE_CHECKING:
+    from app.core.database import DatabaseManager
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+OUTBOX_TARGETS = ("neo4j", "redis", "elasticsearch")
+
+# Agent that holds the workflow status beliefs
+WORKFLOW_AGENT_ID = "agent_workflow_001"
+
+ENQUEUE_SQL = """
+    INSERT INTO workflow_outbox (event_id, workflow_id, target, payload)
+    VALUES (:event_id, :workflow_id, :target, CAST(:payload AS jsonb))
+    ON CONFLICT (event_id, target) DO NOTHING
+"""
+
+CLAIM_SQL = """
+    UPDATE workflow_outbox
+    SET attempts = attempts + 1,
+        available_at = CURRENT_TIMESTAMP + make_interval(secs => :lease)
+    WHERE id IN (
+        SELECT id FROM workflow_outbox
+        WHERE target = :target AND status = 'pending' AND available_at <= CURRENT_TIMESTAMP
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, event_id, workflow_id, payload, attempts, created_at
+"""
+
+DELIVERED_SQL = """
+    UPDATE workflow_outbox
+    SET status = 'delivered', delivered_at = CURRENT_TIMESTAMP, last_error = NULL
+    WHERE id = :id
+"""
+
+RETRY_SQL = """
+    UPDATE workflow_outbox
+    SET status = CASE WHEN attempts >= :max_attempts THEN 'dead' ELSE 'pending' END,
+        available_at = CURRENT_TIMESTAMP + make_interval(secs => :delay),
+        last_error = :error
+    WHERE id = :id
+"""
+
+PURGE_SQL = """
+    DELETE FROM workflow_outbox
+    WHERE status = 'delivered' AND delivered_at < CURRENT_TIMESTAMP - make_interval(secs => :retention)
+"""
+
+BACKLOG_SQL = """
+    SELECT target,
+           count(*) AS pending,
+           EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - min(created_at)) * 1000 AS oldest_ms
+    FROM workflow_outbox
+    WHERE status = 'pending'
+    GROUP BY target
+"""
+
+
+def outbox_rows(
+    workflow_data: Dict[str, Any], event_id: str, targets=OUTBOX_TARGETS, created: bool = True
+) -> List[Dict[str, Any]]:
+    """Build the ENQUEUE_SQL rows of one sync event
+
+    The neo4j row only asserts the workflow-created belief, so it is left out
+    unless the event creates the workflow. Callers writing the workflow
+    themselves run ENQUEUE_SQL with these rows in the same transaction.
+    """
+    payload = json.dumps(workflow_data, default=str)
+    return [
+        {"event_id": event_id, "workflow_id": str(workflow_data.get("id")), "target": target, "payload": payload}
+        for target in targets
+        if created or target != "neo4j"
+    ]
+
+
+def workflow_belief(workflow: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the workflow-created belief, keyed by the workflow so asserting it again is a no-op"""
+    return {
+        "belief_id": f"workflow_{workflow.get('id')}_created",
+        "agent_id": WORKFLOW_AGENT_ID,
+        "category": "workflow_status",
+        "content": f"workflow_{workflow.get('id')}_created",
+        "confidence": 0.95,
+        "source": "workflow_manager",
+        "description": f"New workflow {workflow.get('name')} created"
+    }
+
+
+class OutboxTargetMetrics(BaseModel):
+    """Relay metrics of one outbox target"""
+    batches: int = 0
+    delivered: int = 0
+    failed_attempts: int = 0
+    dead: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    avg_lag_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+class WorkflowOutboxMetrics(BaseModel):
+    """Workflow outbox metrics"""
+    enqueued: int = 0
+    purged: int = 0
+    targets: Dict[str, OutboxTargetMetrics] = {}
+
+
+class WorkflowOutbox:
+    """Queues workflow synchronization in PostgreSQL and relays it to the other stores"""
+
+    def __init__(self, db: "DatabaseManager"):
+        self.db = db
+        self.config = db.config
+        self.metrics = WorkflowOutboxMetrics(
+            targets={target: OutboxTargetMetrics() for target in self.config.workflow_outbox_targets}
+        )
+        self._handlers: Dict[str, Callable[[List[Dict]], Awaitable[Dict[int, Optional[str]]]]] = {
+            "neo4j": self._deliver_neo4j,
+            "redis": self._deliver_redis,
+            "elasticsearch": self._deliver_elasticsearch
+        }
+        self._wakeup: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._last_purge = 0.0
+
+    async def enqueue(
+        self, workflow_data: Dict[str, Any], event_id: Optional[str] = None, created: bool = True
+    ) -> str:
+        """
+        Commit the outbox rows of a workflow sync in one transaction and return the event id.
+        Only a created workflow is delivered to neo4j. A repeated event_id (idempotency key) is ignored.
+        """
+        event_id = event_id or new_id()
+        rows = outbox_rows(workflow_data, event_id, self.config.workflow_outbox_targets, created=created)
+        if rows:
+            await self.db.postgres.execute_many(ENQUEUE_SQL, rows)
+        self.metrics.enqueued += 1
+        for wakeup in self._wakeup.values():
+            wakeup.set()
+        return event_id
+
+    async def relay_once(self, target: str) -> int:
+        """Claim and deliver one batch of pending rows for a target; returns the rows claimed"""
+        rows = await self.db.postgres.execute_query(CLAIM_SQL, {
+            "target": target,
+            "limit": self.config.workflow_outbox_batch_size,
+            "lease": float(self.config.workflow_outbox_lease)
+        })
+        if not rows:
+            return 0
+
+        for row in rows:
+            if isinstance(row["payload"], str):
+                row["payload"] = json.loads(row["payload"])
+
+        metrics = self.metrics.targets[target]
+        metrics.batches += 1
+        try:
+            errors = await self._handlers[target](rows)
+        except Exception as e:
+            logger.error(f"Outbox delivery of {len(rows)} rows to {target} failed: {e}")
+            errors = {row["id"]: str(e) for row in rows}
+
+        delivered = [row for row in rows if errors.get(row["id"]) is None]
+        failed = [row for row in rows if errors.get(row["id"]) is not None]
+
+        if delivered:
+            await self.db.postgres.execute_many(DELIVERED_SQL, [{"id": row["id"]} for row in delivered])
+            now = datetime.now(timezone.utc)
+            for row in delivered:
+                lag_ms = (now - row["created_at"]).total_seconds() * 1000
+                metrics.delivered += 1
+                metrics.avg_lag_ms += (lag_ms - metrics.avg_lag_ms) / metrics.delivered
+                metrics.max_lag_ms = max(metrics.max_lag_ms, lag_ms)
+                metrics.last_lag_ms = lag_ms
+
+        if failed:
+            await self.db.postgres.execute_many(RETRY_SQL, [
+                {
+                    "id": row["id"],
+                    "error": errors[row["id"]][:1000],
+                    "delay": self._backoff(row["attempts"]),
+                    "max_attempts": self.config.workflow_outbox_max_attempts
+                }
+                for row in failed
+            ])
+            metrics.failed_attempts += len(failed)
+            metrics.dead += sum(1 for row in failed if row["attempts"] >= self.config.workflow_outbox_max_attempts)
+            metrics.last_error = errors[failed[-1]["id"]]
+
+        return len(rows)
+
+    def _backoff(self, attempts: int) -> float:
+        """Seconds before a row that failed attempts times is retried"""
+        delay = self.config.workflow_outbox_retry_base_delay * 2 ** max(attempts - 1, 0)
+        return float(min(delay, self.config.workflow_outbox_retry_max_delay))
+
+    async def _deliver_neo4j(self, rows: List[Dict]) -> Dict[int, Optional[str]]:
+        """Merge the workflow status beliefs of a batch in one statement"""
+        await self.db.neo4j.merge_agent_beliefs([workflow_belief(row["payload"]) for row in rows])
+        await self.db.bump_agent_version(WORKFLOW_AGENT_ID)
+        return {}
+
+    async def _deliver_redis(self, rows: List[Dict]) -> Dict[int, Optional[str]]:
+        """Cache the latest workflow of a batch unless a newer event was cached already"""
+        latest = {row["workflow_id"]: row for row in rows}
+        for workflow_id, row in latest.items():
+            key = workflow_cache_key(workflow_id)
+            if await self.db.redis.advance_version(f"{key}:version", row["id"], ttl=3600):
+                fields = {field: json.dumps(value, default=str) for field, value in row["payload"].items()}
+                await self.db.redis.write_hash(key, fields, replace=True)
+        return {}
+
+    async def _deliver_elasticsearch(self, rows: List[Dict]) -> Dict[int, Optional[str]]:
+        """Index the workflows of a batch with one bulk request"""
+        indexed_at = datetime.utcnow().isoformat()
+        errors = await self.db.elasticsearch.bulk_index_workflows([
+            (row["workflow_id"], row["id"], {"workflow_id": row["workflow_id"], "indexed_at": indexed_at, **row["payload"]})
+            for row in rows
+        ])
+        return {row["id"]: error for row, error in zip(rows, errors)}
+
+    async def purge(self) -> int:
+        """Delete rows delivered longer than workflow_outbox_retention seconds ago"""
+        purged = await self.db.postgres.execute_many(
+            PURGE_SQL, [{"retention": float(self.config.workflow_outbox_retention)}]
+        )
+        self.metrics.purged += purged or 0
+        return purged
+
+    async def get_backlog(self) -> Dict[str, Dict[str, float]]:
+        """Pending rows and age of the oldest pending row per target"""
+        rows = await self.db.postgres.execute_query(BACKLOG_SQL)
+        return {row["target"]: {"pending": row["pending"], "oldest_ms": float(row["oldest_ms"])} for row in rows}
+
+    def start(self) -> None:
+        """Run one relay per target in the background"""
+        for target in self.config.workflow_outbox_targets:
+            task = self._tasks.get(target)
+            if task is None or task.done():
+                self._wakeup[target] = asyncio.Event()
+                self._tasks[target] = asyncio.create_task(self._relay(target), name=f"workflow-outbox-{target}")
+
+    async def _relay(self, target: str) -> None:
+        """Relay loop: drain full batches, otherwise wait for an enqueue or the poll interval"""
+        wakeup = self._wakeup[target]
+        while True:
+            try:
+                claimed = await self.relay_once(target)
+            except Exception as e:
+                logger.error(f"Outbox relay for {target} failed: {e}")
+                claimed = 0
+
+            if claimed >= self.config.workflow_outbox_batch_size:
+                continue
+
+            # One relay purges delivered rows, at most once per purge interval
+            purge_due = time.monotonic() - self._last_purge >= self.config.workflow_outbox_purge_interval
+            if target == self.config.workflow_outbox_targets[0] and purge_due:
+                self._last_purge = time.monotonic()
+                try:
+                    await self.purge()
+                except Exception as e:
+                    logger.error(f"Outbox purge failed: {e}")
+
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.config.workflow_outbox_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop the relays; undelivered rows stay pending for the next start"""
+        for task in self._tasks.values():
+            task.cancel()
+        for task in self._tasks.values():
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+        self._wakeup.clear()
+
+    def get_metrics(self) -> WorkflowOutboxMetrics:
+        """Get workflow outbox metrics"""
+        return self.metrics
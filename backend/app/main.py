@@ -8,14 +8,17 @@ Implements BDI (Belief-Desire-Intention) architecture for intelligent workflow a
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import logging
 
 from app import __version__
+from app.core import cypher_queries
 from app.core.database import get_database_manager
+from app.core.query_registry import query_registry
+from app.core.serialization import RawJSONResponse
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -141,24 +144,162 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
 
 # ===== BDI AGENT KNOWLEDGE GRAPH ENDPOINTS =====
 
-@app.get("/api/agents/{agent_id}/context", response_model=Dict[str, Any])
-async def get_agent_context(agent_id: str) -> Dict[str, Any]:
+class AgentContextBatchRequest(BaseModel):
+    agent_ids: Optional[List[str]] = None
+    business_id: Optional[str] = None
+    order: str = Field("newest", pattern="^(newest|oldest)$")
+    limit: Optional[int] = Field(None, ge=1)
+    fields: Optional[List[str]] = None  # node properties to return, projected in Cypher
+    include_cached_state: bool = True
+    after: Optional[str] = None  # next_agent_cursor of the previous page of a business
+
+
+@app.post("/api/agents/context:batch", response_model=Dict[str, Any], response_class=RawJSONResponse)
+async def get_agent_contexts_batch(request: AgentContextBatchRequest) -> Any:
+    """
+    Get the context of many BDI agents in one call, keyed by agent id.
+    
+    All knowledge graphs are fetched with a single Neo4j query and all cached
+    states with a single Redis MGET, so the cost does not grow in round trips
+    with the number of agents.
+    
+    At most agent_context_batch_max_agents agents are returned per call: a
+    longer id list is answered with 400 Bad Request, and the agents of a
+    business are paged in id order with next_agent_cursor passed as `after`.
+    
+    Args:
+        request: Agent ids or a business id whose agents to fetch, plus ordering,
+            per-collection limit, field projection and whether to include cached state
+        
+    Returns:
+        RawJSONResponse: Contexts keyed by agent id, the ids that were not found
+            and the cursor of the next page of a business
+    """
+    if request.agent_ids is None and request.business_id is None:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": "Either agent_ids or business_id is required",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+    
+    try:
+        db_manager = await get_database_manager()
+        limits = dict.fromkeys(cypher_queries.AGENT_KNOWLEDGE_GRAPH_COLLECTIONS, request.limit)
+        contexts_json = await db_manager.get_agent_contexts_json(
+            agent_ids=request.agent_ids,
+            business_id=request.business_id,
+            limits=limits,
+            order=request.order,
+            fields=request.fields,
+            include_cached_state=request.include_cached_state,
+            after=request.after
+        )
+        
+        logger.info(f"Retrieved batch agent context ({len(request.agent_ids or [])} ids, business {request.business_id})")
+        return RawJSONResponse(contexts_json)
+        
+    except ValueError as e:
+        # Too many agents, unknown fields or orders are client errors
+        return JSONResponse(
+            status_code=400,
+            content={
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to get batch agent context: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
+@app.get("/api/agents/{agent_id}/context", response_model=Dict[str, Any], response_class=RawJSONResponse)
+async def get_agent_context(
+    agent_id: str,
+    order: str = Query("newest", pattern="^(newest|oldest)$"),
+    limit: Optional[int] = Query(None, ge=1),
+    beliefs_limit: Optional[int] = Query(None, ge=1),
+    desires_limit: Optional[int] = Query(None, ge=1),
+    intentions_limit: Optional[int] = Query(None, ge=1),
+    plans_limit: Optional[int] = Query(None, ge=1),
+    beliefs_cursor: Optional[str] = None,
+    desires_cursor: Optional[str] = None,
+    intentions_cursor: Optional[str] = None,
+    plans_cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    include_cached_state: bool = True,
+    if_none_match: Optional[str] = Header(None)
+) -> Any:
     """
     Get comprehensive context for a BDI agent including knowledge graph and cached state.
     
+    Beliefs, desires, intentions and plans are bounded collections ordered by
+    creation time. Each is limited independently and paged with the cursor
+    returned in knowledge_graph.cursors; a malformed cursor is answered with
+    400 Bad Request.
+    
+    The context is encoded straight from the Neo4j records to JSON bytes and
+    returned as a raw response, skipping response-model validation. Encoded
+    contexts are cached per agent version; the response carries an ETag and a
+    request with a matching If-None-Match header gets 304 Not Modified.
+    
     Args:
         agent_id: Unique identifier for the BDI agent
+        order: "newest" (default) or "oldest" first
+        limit: Page size applied to every collection without its own limit
+        beliefs_limit, desires_limit, intentions_limit, plans_limit: Per-collection page sizes
+        beliefs_cursor, desires_cursor, intentions_cursor, plans_cursor: Cursors from a previous page
         
     Returns:
-        Dict[str, Any]: Agent context including beliefs, desires, intentions, and cached state
+        RawJSONResponse: Agent context including beliefs, desires, intentions, and cached state
     """
+    limits = {
+        "beliefs": beliefs_limit or limit,
+        "desires": desires_limit or limit,
+        "intentions": intentions_limit or limit,
+        "plans": plans_limit or limit
+    }
+    cursors = {
+        "beliefs": beliefs_cursor,
+        "desires": desires_cursor,
+        "intentions": intentions_cursor,
+        "plans": plans_cursor
+    }
+    
     try:
         db_manager = await get_database_manager()
-        context = await db_manager.get_agent_context(agent_id)
+        context_json, etag = await db_manager.get_agent_context_cached(
+            agent_id,
+            limits=limits,
+            cursors=cursors,
+            order=order,
+            fields=fields.split(",") if fields else None,
+            include_cached_state=include_cached_state,
+            if_none_match=if_none_match
+        )
+        headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+        
+        if context_json is None:
+            return Response(status_code=304, headers=headers)
         
         logger.info(f"Retrieved context for agent {agent_id}")
-        return context
+        return RawJSONResponse(context_json, headers=headers)
         
+    except ValueError as e:
+        # Malformed cursors are client errors
+        return JSONResponse(
+            status_code=400,
+            content={
+                "agent_id": agent_id,
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
     except Exception as e:
         logger.error(f"Failed to get agent context for {agent_id}: {e}")
         return {
@@ -168,8 +309,8 @@ async def get_agent_context(agent_id: str) -> Dict[str, Any]:
         }
 
 
-@app.post("/api/agents/{agent_id}/beliefs", response_model=Dict[str, Any])
-async def create_agent_belief(agent_id: str, belief_data: Dict[str, Any]) -> Dict[str, Any]:
+@app.post("/api/agents/{agent_id}/beliefs", response_model=Dict[str, Any], response_class=RawJSONResponse)
+async def create_agent_belief(agent_id: str, belief_data: Dict[str, Any]) -> Any:
     """
     Create a new belief for a BDI agent in the knowledge graph.
     
@@ -182,16 +323,16 @@ async def create_agent_belief(agent_id: str, belief_data: Dict[str, Any]) -> Dic
     """
     try:
         db_manager = await get_database_manager()
-        belief = await db_manager.neo4j.create_agent_belief(agent_id, belief_data)
+        belief = await db_manager.create_agent_belief(agent_id, belief_data)
         
         if belief:
             logger.info(f"Created belief for agent {agent_id}")
-            return {
+            return RawJSONResponse({
                 "success": True,
                 "agent_id": agent_id,
                 "belief": belief,
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            })
         else:
             return {
                 "success": False,
@@ -210,20 +351,69 @@ async def create_agent_belief(agent_id: str, belief_data: Dict[str, Any]) -> Dic
         }
 
 
+class BulkBeliefRequest(BaseModel):
+    beliefs: List[Dict[str, Any]]  # each with agent_id, category, content, confidence, source, description
+
+
+@app.post("/api/agents/beliefs:bulk", response_model=Dict[str, Any])
+async def create_agent_beliefs_bulk(request: BulkBeliefRequest) -> Dict[str, Any]:
+    """
+    Create beliefs for many BDI agents in one request.
+    
+    Beliefs are validated individually, grouped by agent and written in chunks
+    with one UNWIND statement per chunk. Invalid beliefs and beliefs for unknown
+    agents are rejected without failing the rest of the batch. With belief
+    deduplication enabled, near-duplicates of an agent's existing beliefs are
+    folded into them and counted as deduplicated.
+    
+    Args:
+        request: Beliefs to create, each carrying its agent_id
+        
+    Returns:
+        Dict[str, Any]: Accepted, deduplicated and rejected counts with the reason for each rejection
+    """
+    try:
+        db_manager = await get_database_manager()
+        report = await db_manager.ingest_beliefs(request.beliefs)
+        
+        return {
+            "success": report["rejected"] == 0,
+            **report,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Bulk belief ingestion failed: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
+class IntentionProgressRequest(BaseModel):
+    progress: float
+    reset: bool = False  # allow progress to decrease
+
+
 @app.put("/api/agents/intentions/{intention_id}/progress", response_model=Dict[str, Any])
-async def update_intention_progress(intention_id: str, progress_data: Dict[str, float]) -> Dict[str, Any]:
+async def update_intention_progress(intention_id: str, progress_data: IntentionProgressRequest) -> Dict[str, Any]:
     """
     Update the progress of an agent's intention.
     
+    With live progress enabled, reports are kept in Redis and flushed to Neo4j
+    periodically; progress may then only decrease with 'reset' set.
+    
     Args:
         intention_id: Unique identifier for the intention
         progress_data: Progress information with 'progress' field (0.0 to 1.0)
+            and optional 'reset' flag
         
     Returns:
         Dict[str, Any]: Update result
     """
     try:
-        progress = progress_data.get("progress", 0.0)
+        progress = progress_data.progress
         
         # Validate progress value
         if not 0.0 <= progress <= 1.0:
@@ -235,9 +425,11 @@ async def update_intention_progress(intention_id: str, progress_data: Dict[str,
             }
         
         db_manager = await get_database_manager()
-        success = await db_manager.neo4j.update_agent_intention_progress(intention_id, progress)
+        result = await db_manager.report_intention_progress(
+            intention_id, progress, reset=progress_data.reset
+        )
         
-        if success:
+        if result["accepted"]:
             logger.info(f"Updated intention {intention_id} progress to {progress}")
             return {
                 "success": True,
@@ -246,10 +438,17 @@ async def update_intention_progress(intention_id: str, progress_data: Dict[str,
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
+            errors = {
+                "not_found": "Intention not found",
+                "regressed": "Progress cannot decrease without reset",
+                "rate_limited": "Too many progress updates for this intention"
+            }
             return {
                 "success": False,
                 "intention_id": intention_id,
-                "error": "Intention not found",
+                "error": errors[result["reason"]],
+                "reason": result["reason"],
+                "progress": result["progress"],
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -263,36 +462,86 @@ async def update_intention_progress(intention_id: str, progress_data: Dict[str,
         }
 
 
+@app.put("/api/agents/intentions/progress:batch", response_model=Dict[str, Any])
+async def update_intentions_progress_batch(updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Update the progress of many intentions in one request.
+    
+    All updates are validated first, then applied with a single UNWIND
+    statement. Invalid updates are rejected individually and unknown
+    intentions are listed under not_found without failing the rest.
+    
+    Args:
+        updates: Progress updates, each with 'intention_id' and 'progress' (0.0 to 1.0)
+    
+    Returns:
+        Dict[str, Any]: Per-intention results with rejected and not found updates
+    """
+    try:
+        db_manager = await get_database_manager()
+        report = await db_manager.update_intentions_progress(updates)
+        
+        return {
+            "success": report["rejected"] == 0 and report["updated"] == len(report["results"]),
+            **report,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    except Exception as e:
+        logger.error(f"Batch intention progress update failed: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
 @app.post("/api/workflows/sync", response_model=Dict[str, Any])
-async def sync_workflow_to_knowledge_graph(workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+async def sync_workflow_to_knowledge_graph(
+    workflow_data: Dict[str, Any],
+    idempotency_key: Optional[str] = Header(None, max_length=100)
+) -> Dict[str, Any]:
     """
     Synchronize workflow data across all databases including the knowledge graph.
     
+    Payloads identical to the last synchronized one are skipped with status
+    'unchanged'; otherwise only the changed fields are propagated and the
+    status is 'updated'. With the workflow outbox enabled, changes are
+    committed to the PostgreSQL outbox and the response returns without
+    waiting for Neo4j, Redis or Elasticsearch; background relays deliver
+    them. A repeated Idempotency-Key is queued only once.
+    
     Args:
         workflow_data: Workflow information to synchronize
+        idempotency_key: Optional client key identifying the sync event
         
     Returns:
         Dict[str, Any]: Synchronization result
     """
     try:
         db_manager = await get_database_manager()
-        success = await db_manager.sync_workflow_to_knowledge_graph(workflow_data)
+        result = await db_manager.sync_workflow(workflow_data, event_id=idempotency_key)
         
         workflow_id = workflow_data.get("id", "unknown")
         
-        if success:
-            logger.info(f"Successfully synchronized workflow {workflow_id}")
+        if result["success"]:
+            messages = {
+                "unchanged": "Workflow unchanged since the last synchronization",
+                "updated": "Workflow queued for synchronization" if "event_id" in result
+                else "Workflow synchronized across all databases"
+            }
+            logger.info(f"Workflow {workflow_id} sync: {result['status']}")
             return {
-                "success": True,
+                **result,
                 "workflow_id": workflow_id,
-                "message": "Workflow synchronized across all databases",
+                "message": messages[result["status"]],
                 "timestamp": datetime.utcnow().isoformat()
             }
         else:
             return {
-                "success": False,
+                **result,
                 "workflow_id": workflow_id,
-                "error": "Partial synchronization failure",
+                "error": result.get("error", "Partial synchronization failure"),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -305,6 +554,104 @@ async def sync_workflow_to_knowledge_graph(workflow_data: Dict[str, Any]) -> Dic
         }
 
 
+# ===== METRICS ENDPOINTS =====
+
+@app.get("/api/metrics", response_model=Dict[str, Any])
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Get runtime metrics for the database layers, including Neo4j transaction load.
+    
+    Returns:
+        Dict[str, Any]: Metrics grouped by subsystem
+    """
+    try:
+        db_manager = await get_database_manager()
+        
+        return {
+            **db_manager.get_metrics(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to collect metrics: {e}")
+        return {
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
+@app.get("/api/metrics/queries/slowest", response_model=Dict[str, Any])
+async def get_slowest_queries(limit: int = 10) -> Dict[str, Any]:
+    """
+    List the slowest registered Cypher queries with their captured PROFILE plans.
+    
+    Args:
+        limit: Maximum number of queries to return
+        
+    Returns:
+        Dict[str, Any]: Query statistics ordered by maximum latency
+    """
+    queries = query_registry.slowest(limit=limit)
+    
+    return {
+        "queries": [stats.model_dump() for stats in queries],
+        "profile_sample_rate": query_registry.profile_sample_rate,
+        "slow_query_threshold_ms": query_registry.slow_query_threshold_ms,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+# ===== MAINTENANCE ENDPOINTS =====
+
+@app.post("/api/maintenance/beliefs:compact", response_model=Dict[str, Any])
+async def compact_beliefs() -> Dict[str, Any]:
+    """
+    Run one belief compaction pass now: decay, duplicate merging and expiry.
+
+    Returns:
+        Dict[str, Any]: Beliefs decayed, merged, expired and archived, with throughput
+    """
+    try:
+        db_manager = await get_database_manager()
+
+        return await db_manager.belief_compaction.run_once()
+
+    except Exception as e:
+        logger.error(f"Belief compaction failed: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
+@app.get("/api/maintenance/workflow-outbox", response_model=Dict[str, Any])
+async def get_workflow_outbox_status() -> Dict[str, Any]:
+    """
+    Get the workflow outbox backlog and relay lag per target store.
+    
+    Returns:
+        Dict[str, Any]: Pending rows and oldest pending age per target, with relay metrics
+    """
+    try:
+        db_manager = await get_database_manager()
+        
+        return {
+            "success": True,
+            "backlog": await db_manager.workflow_outbox.get_backlog(),
+            "relays": db_manager.workflow_outbox.get_metrics().model_dump(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    except Exception as e:
+        logger.error(f"Failed to get workflow outbox status: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+
 # ===== BUSINESS ONBOARDING ENDPOINTS =====
 
 class BusinessOnboardRequest(BaseModel):
@@ -367,7 +714,7 @@ async def onboard_business(request: BusinessOnboardRequest) -> Dict[str, Any]:
         # 2. Neo4j: Load SBVR ontology
         try:
             from app.models.neo4j_manager import SBVROntologyManager
-            neo4j_session = db_manager.neo4j.driver.session() if db_manager.neo4j.driver else None
+            neo4j_session = db_manager.neo4j.session() if db_manager.neo4j.driver else None
 
             if neo4j_session:
                 sbvr_mgr = SBVROntologyManager(neo4j_session)
@@ -398,16 +745,8 @@ async def onboard_business(request: BusinessOnboardRequest) -> Dict[str, Any]:
                 # Create Agent nodes linked to business
                 for role in request.agent_roles:
                     agent_id = f"{request.business_id}/{role}"
-                    create_agent_query = """
-                        MERGE (b:Business {id: $business_id})
-                        ON CREATE SET b.name = $business_name, b.type = $business_type, b.created_at = datetime()
-                        MERGE (a:Agent {id: $agent_id})
-                        ON CREATE SET a.role = $role, a.status = 'active', a.created_at = datetime()
-                        MERGE (a)-[:BELONGS_TO]->(b)
-                        RETURN a.id AS agent_id
-                    """
-                    result = await db_manager.neo4j.execute_cypher_query(
-                        create_agent_query,
+                    await db_manager.neo4j.run_query(
+                        cypher_queries.BUSINESS_CREATE_AGENT.name,
                         {
                             "business_id": request.business_id,
                             "business_name": request.business_name,
@@ -416,6 +755,7 @@ async def onboard_business(request: BusinessOnboardRequest) -> Dict[str, Any]:
                             "role": role,
                         }
                     )
+                    await db_manager.bump_agent_version(agent_id)
                     agent_ids.append(agent_id)
 
                 await neo4j_session.close()
@@ -0,0 +1,26 @@
+-- MABOS PostgreSQL Migration 002
+-- Workflow synchronization outbox
+
+-- =====================================================
+-- WORKFLOW OUTBOX
+-- =====================================================
+
+-- One row per sync event and target store, relayed in the background
+CREATE TABLE IF NOT EXISTS workflow_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    event_id VARCHAR(100) NOT NULL, -- idempotency key shared by the rows of one sync
+    workflow_id VARCHAR(100) NOT NULL,
+    target VARCHAR(20) NOT NULL, -- neo4j, redis, elasticsearch
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, delivered, dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    delivered_at TIMESTAMP WITH TIME ZONE,
+    UNIQUE (event_id, target)
+);
+
+-- Relays claim pending rows of their target in id order
+CREATE INDEX IF NOT EXISTS idx_workflow_outbox_pending ON workflow_outbox(target, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_workflow_outbox_delivered_at ON workflow_outbox(delivered_at) WHERE status = 'delivered';
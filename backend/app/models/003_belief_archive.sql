@@ -0,0 +1,25 @@
+-- MABOS PostgreSQL Migration 003
+-- Archive of beliefs removed by belief compaction
+
+-- =====================================================
+-- BELIEF ARCHIVE
+-- =====================================================
+
+-- Beliefs merged or expired out of the Neo4j knowledge graph. agent_id is the
+-- Neo4j agent id (e.g. agent_workflow_001 or {business_id}/{role}), not an
+-- agents(id) UUID, so it is kept as text without a foreign key.
+CREATE TABLE IF NOT EXISTS belief_archive (
+    id BIGSERIAL PRIMARY KEY,
+    belief_id VARCHAR(100) UNIQUE, -- Neo4j belief id; re-archiving a belief is a no-op
+    agent_id VARCHAR(255) NOT NULL,
+    reason VARCHAR(20) NOT NULL, -- merged, expired
+    category VARCHAR(100) NOT NULL,
+    content TEXT NOT NULL,
+    confidence DECIMAL(3,2),
+    source VARCHAR(200),
+    evidence JSONB,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_belief_archive_agent_id ON belief_archive(agent_id, archived_at);
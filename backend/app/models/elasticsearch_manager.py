@@ -9,7 +9,8 @@ import asyncio
 import logging
 import json
 import hashlib
-from typing import Dict, List, Any, Optional, Union
+import time
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
@@ -18,11 +19,19 @@ from elasticsearch import AsyncElasticsearch
 from elasticsearch.exceptions import NotFoundError, RequestError
 from pydantic import BaseModel
 
+from app.core.analytics_rollups import AnalyticsRollups
+from app.core.bulk_indexer import BulkIndexer
 from app.core.database import DatabaseConfig
+from app.core.ingest_pipelines import ENRICHMENT_SCRIPTS, enrichment_pipeline, enrichment_pipeline_name
+from app.core.search_cache import SearchResultCache, search_digest
+from app.core.search_pagination import decode_search_cursor, encode_search_cursor, pit_page
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Priority of the data stream templates, above the built-in logs-*-* and metrics-*-* templates
+DATA_STREAM_TEMPLATE_PRIORITY = 200
+
 class IndexType(Enum):
     """Elasticsearch index types for different data categories"""
     WORKFLOWS = "workflows"
@@ -50,6 +59,7 @@ class IndexConfig:
     settings: Dict[str, Any]
     aliases: List[str] = None
     lifecycle_policy: str = None
+    data_stream: bool = False  # append-only time series written to a data stream
 
 @dataclass
 class SearchQuery:
@@ -61,6 +71,8 @@ class SearchQuery:
     from_: int = 0
     highlight: Dict[str, Any] = None
     aggregations: Dict[str, Any] = None
+    paginate: bool = False  # page with a point in time and search_after instead of from_
+    cursor: Optional[str] = None  # cursor of the next page from a previous SearchResult
 
 class SearchResult(BaseModel):
     """Search result model"""
@@ -69,6 +81,15 @@ class SearchResult(BaseModel):
     aggregations: Dict[str, Any] = None
     took: int
     timed_out: bool
+    cursor: Optional[str] = None  # set on cursor-paged results while more pages follow
+
+class DashboardMetrics(BaseModel):
+    """Analytics dashboard load metrics"""
+    loads: int = 0
+    coalesced: int = 0
+    requests: int = 0
+    avg_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
 
 class ElasticsearchAnalyticsManager:
     """Advanced Elasticsearch analytics and search manager"""
@@ -79,8 +100,37 @@ class ElasticsearchAnalyticsManager:
         self.client: Optional[AsyncElasticsearch] = None
         self.index_prefix = config.elasticsearch_index_prefix
         
+        # Shared bulk indexer the index_* methods queue documents on
+        self.bulk_indexer: Optional[BulkIndexer] = None
+        if config.elasticsearch_bulk_enabled:
+            self.bulk_indexer = BulkIndexer(
+                max_docs=config.elasticsearch_bulk_max_docs,
+                max_bytes=config.elasticsearch_bulk_max_bytes,
+                flush_interval=config.elasticsearch_bulk_flush_interval,
+                max_in_flight=config.elasticsearch_bulk_max_in_flight,
+                max_pending=config.elasticsearch_bulk_max_pending,
+                enqueue_timeout=config.elasticsearch_bulk_enqueue_timeout,
+                max_retries=config.elasticsearch_bulk_max_retries,
+                retry_base_delay=config.elasticsearch_bulk_retry_base_delay,
+                retry_max_delay=config.elasticsearch_bulk_retry_max_delay
+            )
+        
+        # Rollups answering the dashboard, attached by DatabaseManager when enabled
+        self.rollups: Optional["AnalyticsRollups"] = None
+        
+        # Search result cache, attached by DatabaseManager when enabled
+        self.search_cache: Optional[SearchResultCache] = None
+        
+        # In-flight dashboard loads by time range
+        self._dashboard_loads: Dict[str, asyncio.Future] = {}
+        self.dashboard_metrics = DashboardMetrics()
+        
         # Index configurations
         self.index_configs = self._get_index_configurations()
+        self.data_streams = {config.name for config in self.index_configs.values() if config.data_stream}
+        
+        # Enrichment pipelines by index type, filled once they are installed
+        self.ingest_pipelines: Dict[IndexType, str] = {}
     
     async def initialize(self) -> None:
         """Initialize Elasticsearch connection and indices"""
@@ -93,15 +143,22 @@ class ElasticsearchAnalyticsManager:
                 retry_on_timeout=True
             )
             
+            if self.bulk_indexer is not None:
+                self.bulk_indexer.client = self.client
+            
             # Test connection
             await self.client.ping()
             
+            # Set up index lifecycle policies the data stream templates refer to
+            await self._setup_lifecycle_policies()
+            
+            # Install the enrichment pipelines documents are indexed through
+            if self.config.elasticsearch_ingest_pipelines_enabled:
+                await self._setup_ingest_pipelines()
+            
             # Initialize indices
             await self._initialize_indices()
             
-            # Set up index lifecycle policies
-            await self._setup_lifecycle_policies()
-            
             logger.info("Elasticsearch analytics manager initialized successfully")
             
         except Exception as e:
@@ -282,10 +339,11 @@ class ElasticsearchAnalyticsManager:
                 },
                 settings={
                     "number_of_shards": 5,
-                    "number_of_replicas": 1,
-                    "index.lifecycle.name": "logs_policy"
+                    "number_of_replicas": 1
                 },
-                aliases=["logs", "system_logs"]
+                aliases=["logs", "system_logs"],
+                lifecycle_policy="logs_policy",
+                data_stream=self.config.elasticsearch_data_streams_enabled
             ),
             
             IndexType.METRICS: IndexConfig(
@@ -307,19 +365,51 @@ class ElasticsearchAnalyticsManager:
                 },
                 settings={
                     "number_of_shards": 3,
-                    "number_of_replicas": 1,
-                    "index.lifecycle.name": "metrics_policy"
+                    "number_of_replicas": 1
+                },
+                aliases=["metrics", "performance_metrics"],
+                lifecycle_policy="metrics_policy",
+                data_stream=self.config.elasticsearch_data_streams_enabled
+            ),
+            
+            IndexType.EVENTS: IndexConfig(
+                name=f"{self.index_prefix}_events",
+                mappings={
+                    "properties": {
+                        "timestamp": {"type": "date"},
+                        "event_type": {"type": "keyword"},
+                        "source": {"type": "keyword"},
+                        "severity": {"type": "keyword"},
+                        "user_id": {"type": "keyword"},
+                        "workflow_id": {"type": "keyword"},
+                        "execution_id": {"type": "keyword"},
+                        "agent_id": {"type": "keyword"},
+                        "message": {"type": "text"},
+                        "payload": {"type": "object", "enabled": False},
+                        "tags": {"type": "keyword"}
+                    }
+                },
+                settings={
+                    "number_of_shards": 2,
+                    "number_of_replicas": 1
                 },
-                aliases=["metrics", "performance_metrics"]
+                aliases=["events", "system_events"],
+                lifecycle_policy="events_policy",
+                data_stream=self.config.elasticsearch_data_streams_enabled
             )
         }
     
     async def _initialize_indices(self) -> None:
         """Initialize all required indices"""
+        if any(config.data_stream for config in self.index_configs.values()):
+            await self._put_time_series_component_template()
+        
         for index_type, config in self.index_configs.items():
             try:
+                if config.data_stream:
+                    await self._initialize_data_stream(config)
                 # Check if index exists
-                if not await self.client.indices.exists(index=config.name):
+                elif not await self.client.indices.exists(index=config.name):
                     # Create index with mappings and settings
                     await self.client.indices.create(
                         index=config.name,
@@ -342,6 +432,51 @@ class ElasticsearchAnalyticsManager:
                 logger.error(f"Failed to initialize index {config.name}: {e}")
                 raise
     
+    @property
+    def _time_series_component_template(self) -> str:
+        """Name of the component template shared by every data stream"""
+        return f"{self.index_prefix}_time_series"
+    
+    async def _put_time_series_component_template(self) -> None:
+        """Create the component template mapping the @timestamp field data streams require"""
+        await self.client.cluster.put_component_template(
+            name=self._time_series_component_template,
+            template={
+                "mappings": {
+                    "properties": {
+                        "@timestamp": {"type": "date"}
+                    }
+                }
+            }
+        )
+    
+    async def _initialize_data_stream(self, config: IndexConfig) -> None:
+        """Create the composable index template of a data stream and the data stream itself
+        
+        Backing indices roll over and expire under the lifecycle policy of the index
+        configuration. An existing regular index of the same name keeps receiving
+        documents until it is migrated.
+        """
+        settings = dict(config.settings)
+        if config.lifecycle_policy:
+            settings["index.lifecycle.name"] = config.lifecycle_policy
+        
+        await self.client.indices.put_index_template(
+            name=f"{config.name}_template",
+            index_patterns=[config.name],
+            data_stream={},
+            composed_of=[self._time_series_component_template],
+            priority=DATA_STREAM_TEMPLATE_PRIORITY,
+            template={
+                "mappings": config.mappings,
+                "settings": settings
+            }
+        )
+        
+        if not await self.client.indices.exists(index=config.name):
+            await self.client.indices.create_data_stream(name=config.name)
+            logger.info(f"Created data stream: {config.name}")
+    
     async def _setup_lifecycle_policies(self) -> None:
         """Set up index lifecycle management policies"""
         policies = {
@@ -373,7 +508,10 @@ class ElasticsearchAnalyticsManager:
                             }
                         },
                         "delete": {
-                            "min_age": "90d"
+                            "min_age": "90d",
+                            "actions": {
+                                "delete": {}
+                            }
                         }
                     }
                 }
@@ -392,6 +530,7 @@ class ElasticsearchAnalyticsManager:
                         "warm": {
                             "min_age": "1d",
                             "actions": {
+                                "readonly": {},
                                 "allocate": {
                                     "number_of_replicas": 0
                                 }
@@ -406,7 +545,10 @@ class ElasticsearchAnalyticsManager:
                             }
                         },
                         "delete": {
-                            "min_age": "30d"
+                            "min_age": "30d",
+                            "actions": {
+                                "delete": {}
+                            }
                         }
                     }
                 }
@@ -425,13 +567,46 @@ class ElasticsearchAnalyticsManager:
                         "warm": {
                             "min_age": "3d",
                             "actions": {
+                                "readonly": {},
                                 "allocate": {
                                     "number_of_replicas": 0
                                 }
                             }
                         },
                         "delete": {
-                            "min_age": "14d"
+                            "min_age": "14d",
+                            "actions": {
+                                "delete": {}
+                            }
+                        }
+                    }
+                }
+            },
+            "events_policy": {
+                "policy": {
+                    "phases": {
+                        "hot": {
+                            "actions": {
+                                "rollover": {
+                                    "max_size": "5GB",
+                                    "max_age": "1d"
+                                }
+                            }
+                        },
+                        "warm": {
+                            "min_age": "1d",
+                            "actions": {
+                                "readonly": {},
+                                "allocate": {
+                                    "number_of_replicas": 0
+                                }
+                            }
+                        },
+                        "delete": {
+                            "min_age": "30d",
+                            "actions": {
+                                "delete": {}
+                            }
                         }
                     }
                 }
@@ -441,32 +616,54 @@ class ElasticsearchAnalyticsManager:
         for policy_name, policy_config in policies.items():
             try:
                 await self.client.ilm.put_lifecycle(
-                    policy=policy_name,
-                    **policy_config
+                    name=policy_name,
+                    policy=policy_config["policy"]
                 )
                 logger.info(f"Created lifecycle policy: {policy_name}")
             except Exception as e:
                 logger.warning(f"Failed to create lifecycle policy {policy_name}: {e}")
     
+    async def _setup_ingest_pipelines(self) -> None:
+        """Install the enrichment ingest pipelines; without them documents are enriched in Python"""
+        pipelines = {}
+        for index_type_value in ENRICHMENT_SCRIPTS:
+            index_type = IndexType(index_type_value)
+            pipeline_name = enrichment_pipeline_name(self.index_prefix, index_type_value)
+            try:
+                await self.client.ingest.put_pipeline(id=pipeline_name, **enrichment_pipeline(index_type_value))
+                pipelines[index_type] = pipeline_name
+            except Exception as e:
+                logger.warning(f"Failed to create ingest pipeline {pipeline_name}, enriching in Python: {e}")
+                return
+        
+        self.ingest_pipelines = pipelines
+        logger.info(f"Created ingest pipelines: {', '.join(pipelines.values())}")
+    
+    def _enrich(self, index_type: IndexType, document: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Raw document and its enrichment pipeline, or the document enriched in Python without one"""
+        pipeline = self.ingest_pipelines.get(index_type)
+        if pipeline is not None:
+            return document, pipeline
+        
+        enrichers = {
+            IndexType.WORKFLOWS: self._enrich_workflow,
+            IndexType.EXECUTIONS: self._enrich_execution,
+            IndexType.USERS: self._enrich_user,
+            IndexType.AGENTS: self._enrich_agent,
+            IndexType.LOGS: self._enrich_log_entry,
+            IndexType.METRICS: self._enrich_metrics
+        }
+        return enrichers[index_type](document), None
+    
     async def index_workflow(self, workflow_data: Dict[str, Any]) -> bool:
         """Index a workflow for search and analytics"""
         try:
             index_name = self.index_configs[IndexType.WORKFLOWS].name
             
             # Enrich workflow data with analytics
-            enriched_data = {
-                **workflow_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "search_text": f"{workflow_data.get('name', '')} {workflow_data.get('description', '')}",
-                "complexity_score": self._calculate_workflow_complexity(workflow_data),
-                "estimated_duration": self._estimate_workflow_duration(workflow_data)
-            }
+            document, pipeline = self._enrich(IndexType.WORKFLOWS, workflow_data)
             
-            await self.client.index(
-                index=index_name,
-                id=workflow_data.get("workflow_id"),
-                document=enriched_data
-            )
+            await self._index_document(index_name, document, doc_id=workflow_data.get("workflow_id"), pipeline=pipeline)
             
             logger.debug(f"Indexed workflow: {workflow_data.get('workflow_id')}")
             return True
@@ -481,19 +678,9 @@ class ElasticsearchAnalyticsManager:
             index_name = self.index_configs[IndexType.EXECUTIONS].name
             
             # Enrich execution data
-            enriched_data = {
-                **execution_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "execution_date": execution_data.get("started_at", datetime.utcnow().isoformat())[:10],
-                "success": execution_data.get("status") == "completed",
-                "efficiency_score": self._calculate_execution_efficiency(execution_data)
-            }
+            document, pipeline = self._enrich(IndexType.EXECUTIONS, execution_data)
             
-            await self.client.index(
-                index=index_name,
-                id=execution_data.get("execution_id"),
-                document=enriched_data
-            )
+            await self._index_document(index_name, document, doc_id=execution_data.get("execution_id"), pipeline=pipeline)
             
             logger.debug(f"Indexed execution: {execution_data.get('execution_id')}")
             return True
@@ -508,18 +695,9 @@ class ElasticsearchAnalyticsManager:
             index_name = self.index_configs[IndexType.USERS].name
             
             # Enrich user data with activity metrics
-            enriched_data = {
-                **user_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "activity_score": self._calculate_user_activity_score(user_data),
-                "expertise_level": self._determine_user_expertise(user_data)
-            }
+            document, pipeline = self._enrich(IndexType.USERS, user_data)
             
-            await self.client.index(
-                index=index_name,
-                id=user_data.get("user_id"),
-                document=enriched_data
-            )
+            await self._index_document(index_name, document, doc_id=user_data.get("user_id"), pipeline=pipeline)
             
             logger.debug(f"Indexed user activity: {user_data.get('user_id')}")
             return True
@@ -534,18 +712,9 @@ class ElasticsearchAnalyticsManager:
             index_name = self.index_configs[IndexType.AGENTS].name
             
             # Enrich agent data
-            enriched_data = {
-                **agent_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "intelligence_score": self._calculate_agent_intelligence(agent_data),
-                "reliability_score": self._calculate_agent_reliability(agent_data)
-            }
+            document, pipeline = self._enrich(IndexType.AGENTS, agent_data)
             
-            await self.client.index(
-                index=index_name,
-                id=agent_data.get("agent_id"),
-                document=enriched_data
-            )
+            await self._index_document(index_name, document, doc_id=agent_data.get("agent_id"), pipeline=pipeline)
             
             logger.debug(f"Indexed agent data: {agent_data.get('agent_id')}")
             return True
@@ -559,18 +728,8 @@ class ElasticsearchAnalyticsManager:
         try:
             index_name = self.index_configs[IndexType.LOGS].name
             
-            # Enrich log data
-            enriched_data = {
-                **log_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "severity_score": self._calculate_log_severity(log_data),
-                "is_error": log_data.get("level", "").lower() in ["error", "critical", "fatal"]
-            }
-            
-            await self.client.index(
-                index=index_name,
-                document=enriched_data
-            )
+            document, pipeline = self._enrich(IndexType.LOGS, log_data)
+            await self._index_document(index_name, document, pipeline=pipeline)
             
             return True
             
@@ -578,29 +737,257 @@ class ElasticsearchAnalyticsManager:
             logger.error(f"Failed to index log entry: {e}")
             return False
     
+    def queue_log_entry(self, log_data: Dict[str, Any]) -> bool:
+        """Queue a log entry on the bulk indexer without waiting; returns False when it is full"""
+        config = self.index_configs[IndexType.LOGS]
+        document, pipeline = self._enrich(IndexType.LOGS, log_data)
+        document, op_type = self._prepare_document(config.name, document)
+        return self.bulk_indexer.add_nowait(config.name, document, op_type=op_type, pipeline=pipeline)
+    
+    def _enrich_workflow(self, workflow_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time, search text, complexity and estimated duration to a workflow"""
+        return {
+            **workflow_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "search_text": f"{workflow_data.get('name') or ''} {workflow_data.get('description') or ''}",
+            "complexity_score": self._calculate_workflow_complexity(workflow_data),
+            "estimated_duration": self._estimate_workflow_duration(workflow_data)
+        }
+    
+    def _enrich_execution(self, execution_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time, execution date, success flag and efficiency to an execution"""
+        return {
+            **execution_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "execution_date": execution_data.get("started_at", datetime.utcnow().isoformat())[:10],
+            "success": execution_data.get("status") == "completed",
+            "efficiency_score": self._calculate_execution_efficiency(execution_data)
+        }
+    
+    def _enrich_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time, activity score and expertise level to a user"""
+        return {
+            **user_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "activity_score": self._calculate_user_activity_score(user_data),
+            "expertise_level": self._determine_user_expertise(user_data)
+        }
+    
+    def _enrich_agent(self, agent_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time, intelligence and reliability scores to an agent"""
+        return {
+            **agent_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "intelligence_score": self._calculate_agent_intelligence(agent_data),
+            "reliability_score": self._calculate_agent_reliability(agent_data)
+        }
+    
+    def _enrich_log_entry(self, log_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time, severity and error flag to a log entry"""
+        return {
+            **log_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "severity_score": self._calculate_log_severity(log_data),
+            "is_error": log_data.get("level", "").lower() in ["error", "critical", "fatal"]
+        }
+    
     async def index_metrics(self, metrics_data: Dict[str, Any]) -> bool:
         """Index performance metrics"""
         try:
             index_name = self.index_configs[IndexType.METRICS].name
             
             # Enrich metrics data
+            document, pipeline = self._enrich(IndexType.METRICS, metrics_data)
+            
+            await self._index_document(index_name, document, pipeline=pipeline)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to index metrics: {e}")
+            return False
+    
+    def _enrich_metrics(self, metrics_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Add indexing time and anomaly score to a metric"""
+        return {
+            **metrics_data,
+            "indexed_at": datetime.utcnow().isoformat(),
+            "anomaly_score": self._calculate_anomaly_score(metrics_data)
+        }
+    
+    async def index_event(self, event_data: Dict[str, Any]) -> bool:
+        """Index a system or domain event"""
+        try:
+            index_name = self.index_configs[IndexType.EVENTS].name
+            
             enriched_data = {
-                **metrics_data,
-                "indexed_at": datetime.utcnow().isoformat(),
-                "anomaly_score": self._calculate_anomaly_score(metrics_data)
+                **event_data,
+                "timestamp": event_data.get("timestamp") or datetime.utcnow().isoformat(),
+                "indexed_at": datetime.utcnow().isoformat()
             }
             
-            await self.client.index(
-                index=index_name,
-                document=enriched_data
-            )
+            await self._index_document(index_name, enriched_data)
             
             return True
             
         except Exception as e:
-            logger.error(f"Failed to index metrics: {e}")
+            logger.error(f"Failed to index event: {e}")
             return False
     
+    async def _index_document(
+        self, index_name: str, document: Dict[str, Any], doc_id: Optional[str] = None, pipeline: Optional[str] = None
+    ) -> None:
+        """Queue a document on the bulk indexer, or index it directly when bulk indexing is disabled"""
+        document, op_type = self._prepare_document(index_name, document)
+        if self.bulk_indexer is not None:
+            await self.bulk_indexer.add(index_name, document, doc_id=doc_id, op_type=op_type, pipeline=pipeline)
+        else:
+            await self.client.index(index=index_name, id=doc_id, document=document, op_type=op_type, pipeline=pipeline)
+            if self.search_cache is not None:
+                await self.search_cache.invalidate([index_name])
+    
+    def _prepare_document(self, index_name: str, document: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Document and bulk operation for an index; data streams only accept create with @timestamp"""
+        if index_name not in self.data_streams:
+            return document, "index"
+        timestamp = document.get("timestamp") or datetime.utcnow().isoformat()
+        return {**document, "@timestamp": timestamp}, "create"
+    
+    def attach_search_cache(self, search_cache: SearchResultCache) -> None:
+        """Serve searches from a result cache that every write through this manager invalidates"""
+        self.search_cache = search_cache
+        if self.bulk_indexer is not None:
+            self.bulk_indexer.on_indexed = search_cache.invalidate
+    
+    async def _search(self, index_name: str, es_query: Dict[str, Any], query: SearchQuery, digest: str) -> SearchResult:
+        """Run a search, answering repeated ones from the result cache when it is attached"""
+        if query.paginate or query.cursor:
+            return await self._cursor_search(index_name, es_query, query)
+        
+        cache_key = None
+        if self.search_cache is not None:
+            cache_key, cached = await self.search_cache.get(index_name, digest)
+            if cached is not None:
+                return SearchResult.model_construct(**cached)
+        
+        response = await self.client.search(
+            index=index_name,
+            body=es_query,
+            size=query.size,
+            from_=query.from_,
+            **self._search_params([index_name])
+        )
+        
+        result = SearchResult(
+            total=response["hits"]["total"]["value"],
+            hits=response["hits"]["hits"],
+            aggregations=response.get("aggregations", {}),
+            took=response["took"],
+            timed_out=response["timed_out"]
+        )
+        if cache_key is not None and not result.timed_out:
+            await self.search_cache.set(cache_key, result.model_dump())
+        return result
+    
+    async def _cursor_search(self, index_name: str, es_query: Dict[str, Any], query: SearchQuery) -> SearchResult:
+        """Read one page of a point-in-time search, opening the point in time on the first page"""
+        keep_alive = self.config.elasticsearch_pit_keep_alive
+        cursor = decode_search_cursor(query.cursor)
+        if cursor is None:
+            pit_id = await self._open_point_in_time(index_name)
+            body = pit_page(es_query, pit_id, keep_alive)
+        else:
+            pit_id = cursor["pit"]
+            body = pit_page(es_query, pit_id, keep_alive, cursor["after"])
+        
+        response = await self.client.search(body=body, size=query.size, **self._search_params([index_name]))
+        pit_id = response.get("pit_id", pit_id)
+        hits = response["hits"]["hits"]
+        total = response["hits"]["total"]["value"] if cursor is None else cursor["total"]
+        
+        next_cursor = None
+        if len(hits) < query.size:
+            await self._close_point_in_time(pit_id)
+        else:
+            next_cursor = encode_search_cursor(pit_id, hits[-1]["sort"], total)
+        
+        return SearchResult(
+            total=total,
+            hits=hits,
+            aggregations=response.get("aggregations", {}),
+            took=response["took"],
+            timed_out=response["timed_out"],
+            cursor=next_cursor
+        )
+    
+    async def scan(
+        self,
+        index_type: IndexType,
+        query: SearchQuery,
+        scope: SearchScope = SearchScope.GLOBAL,
+        index_name: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream every hit matching a query, one point-in-time page at a time
+        
+        Pages hold elasticsearch_scan_page_size hits, or query.size when it is larger.
+        index_name reads another index than the one of index_type, such as a reindex source.
+        """
+        index_name = index_name or self.index_configs[index_type].name
+        es_query = self._build_search_query(query, index_type, scope)
+        es_query.pop("aggs", None)
+        es_query["track_total_hits"] = False
+        page_size = max(query.size, self.config.elasticsearch_scan_page_size)
+        keep_alive = self.config.elasticsearch_pit_keep_alive
+        
+        pit_id = await self._open_point_in_time(index_name)
+        search_after = None
+        try:
+            while True:
+                response = await self.client.search(
+                    body=pit_page(es_query, pit_id, keep_alive, search_after),
+                    size=page_size,
+                    **self._search_params([index_name])
+                )
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                for hit in hits:
+                    yield hit
+                if len(hits) < page_size:
+                    return
+                search_after = hits[-1]["sort"]
+        finally:
+            await self._close_point_in_time(pit_id)
+    
+    def _search_params(self, index_names: List[str]) -> Dict[str, Any]:
+        """Search parameters skipping the shards a search cannot match
+        
+        Searches reading a data stream always run the can_match pre-filter phase,
+        so backing indices whose timestamps fall outside a time range filter are
+        skipped before the query phase.
+        """
+        if self.data_streams.intersection(index_names):
+            return {"pre_filter_shard_size": 1}
+        return {}
+    
+    async def msearch(self, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run an _msearch of alternating header and body lines"""
+        index_names = [header["index"] for header in operations[::2]]
+        return await self.client.msearch(searches=operations, **self._search_params(index_names))
+    
+    async def _open_point_in_time(self, index_name: str) -> str:
+        """Open a point in time over an index"""
+        response = await self.client.open_point_in_time(
+            index=index_name, keep_alive=self.config.elasticsearch_pit_keep_alive
+        )
+        return response["id"]
+    
+    async def _close_point_in_time(self, pit_id: str) -> None:
+        """Release a point in time; one left open expires after its keep-alive"""
+        try:
+            await self.client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.warning(f"Failed to close point in time: {e}")
+    
     async def search_workflows(self, query: SearchQuery, scope: SearchScope = SearchScope.GLOBAL) -> SearchResult:
         """Search workflows with advanced filtering and faceting"""
         try:
@@ -609,20 +996,7 @@ class ElasticsearchAnalyticsManager:
             # Build Elasticsearch query
             es_query = self._build_search_query(query, IndexType.WORKFLOWS, scope)
             
-            response = await self.client.search(
-                index=index_name,
-                body=es_query,
-                size=query.size,
-                from_=query.from_
-            )
-            
-            return SearchResult(
-                total=response["hits"]["total"]["value"],
-                hits=response["hits"]["hits"],
-                aggregations=response.get("aggregations", {}),
-                took=response["took"],
-                timed_out=response["timed_out"]
-            )
+            return await self._search(index_name, es_query, query, search_digest(query, scope.value))
             
         except Exception as e:
             logger.error(f"Failed to search workflows: {e}")
@@ -653,20 +1027,7 @@ class ElasticsearchAnalyticsManager:
                 }
             }
             
-            response = await self.client.search(
-                index=index_name,
-                body=es_query,
-                size=query.size,
-                from_=query.from_
-            )
-            
-            return SearchResult(
-                total=response["hits"]["total"]["value"],
-                hits=response["hits"]["hits"],
-                aggregations=response.get("aggregations", {}),
-                took=response["took"],
-                timed_out=response["timed_out"]
-            )
+            return await self._search(index_name, es_query, query, search_digest(query, scope.value))
             
         except Exception as e:
             logger.error(f"Failed to search executions: {e}")
@@ -717,27 +1078,33 @@ class ElasticsearchAnalyticsManager:
                 }
             }
             
-            response = await self.client.search(
-                index=index_name,
-                body=es_query,
-                size=query.size,
-                from_=query.from_
-            )
-            
-            return SearchResult(
-                total=response["hits"]["total"]["value"],
-                hits=response["hits"]["hits"],
-                aggregations=response.get("aggregations", {}),
-                took=response["took"],
-                timed_out=response["timed_out"]
-            )
+            return await self._search(index_name, es_query, query, search_digest(query, SearchScope.SYSTEM.value, time_range=time_range))
             
         except Exception as e:
             logger.error(f"Failed to search logs: {e}")
             return SearchResult(total=0, hits=[], took=0, timed_out=False)
     
     async def get_analytics_dashboard_data(self, time_range: Dict[str, str] = None) -> Dict[str, Any]:
-        """Get comprehensive analytics data for dashboard"""
+        """Get comprehensive analytics data for dashboard
+        
+        Concurrent calls for the same time range share one in-flight load.
+        """
+        key = json.dumps(time_range, sort_keys=True, default=str)
+        load = self._dashboard_loads.get(key)
+        if load is None:
+            loader = self.rollups.get_dashboard_data if self.rollups is not None else self._load_analytics_dashboard_data
+            load = asyncio.ensure_future(loader(time_range))
+            self._dashboard_loads[key] = load
+            load.add_done_callback(lambda _: self._dashboard_loads.pop(key, None))
+            self.dashboard_metrics.loads += 1
+        else:
+            self.dashboard_metrics.coalesced += 1
+        
+        # A cancelled caller must not cancel the load other callers wait on
+        return dict(await asyncio.shield(load))
+    
+    async def _load_analytics_dashboard_data(self, time_range: Optional[Dict[str, str]]) -> Dict[str, Any]:
+        """Run every dashboard search in one _msearch request and split the responses into sections"""
         try:
             # Default to last 24 hours if no time range provided
             if not time_range:
@@ -746,23 +1113,37 @@ class ElasticsearchAnalyticsManager:
                     "lte": datetime.utcnow().isoformat()
                 }
             
-            # Parallel queries for different analytics
-            tasks = [
-                self._get_workflow_analytics(time_range),
-                self._get_execution_analytics(time_range),
-                self._get_user_analytics(time_range),
-                self._get_agent_analytics(time_range),
-                self._get_system_health_analytics(time_range)
-            ]
+            searches = self.dashboard_searches(time_range)
+            operations = []
+            for _, index_name, body in searches:
+                operations.extend([{"index": index_name}, body])
+            
+            start_time = time.perf_counter()
+            response = await self.msearch(operations)
+            self._record_dashboard_latency(time.perf_counter() - start_time)
+            
+            # A failed search only empties its own section, as a failed search did before
+            aggregations: Dict[str, Optional[Dict[str, Any]]] = {}
+            for (section, index_name, _), result in zip(searches, response["responses"]):
+                if "error" in result:
+                    logger.warning(f"Dashboard search {section} on {index_name} failed: {result['error']}")
+                    aggregations[section] = None
+                else:
+                    aggregations[section] = result.get("aggregations", {})
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            system_health = {}
+            if aggregations["logs_analytics"] is not None and aggregations["performance_metrics"] is not None:
+                system_health = {
+                    "logs_analytics": aggregations["logs_analytics"],
+                    "performance_metrics": aggregations["performance_metrics"]
+                }
             
             return {
-                "workflow_analytics": results[0] if not isinstance(results[0], Exception) else {},
-                "execution_analytics": results[1] if not isinstance(results[1], Exception) else {},
-                "user_analytics": results[2] if not isinstance(results[2], Exception) else {},
-                "agent_analytics": results[3] if not isinstance(results[3], Exception) else {},
-                "system_health": results[4] if not isinstance(results[4], Exception) else {},
+                "workflow_analytics": aggregations["workflow_analytics"] or {},
+                "execution_analytics": aggregations["execution_analytics"] or {},
+                "user_analytics": aggregations["user_analytics"] or {},
+                "agent_analytics": aggregations["agent_analytics"] or {},
+                "system_health": system_health,
                 "generated_at": datetime.utcnow().isoformat(),
                 "time_range": time_range
             }
@@ -771,6 +1152,30 @@ class ElasticsearchAnalyticsManager:
             logger.error(f"Failed to get analytics dashboard data: {e}")
             return {}
     
+    def dashboard_searches(self, time_range: Dict[str, str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Every dashboard search as (section, index, body), in _msearch order"""
+        logs_search, metrics_search = self._system_health_searches(time_range)
+        return [
+            ("workflow_analytics", *self._workflow_analytics_search(time_range)),
+            ("execution_analytics", *self._execution_analytics_search(time_range)),
+            ("user_analytics", *self._user_analytics_search(time_range)),
+            ("agent_analytics", *self._agent_analytics_search(time_range)),
+            ("logs_analytics", *logs_search),
+            ("performance_metrics", *metrics_search)
+        ]
+    
+    def index_name(self, index_type: str) -> str:
+        """Name of the index holding documents of an IndexType value such as executions"""
+        return self.index_configs[IndexType(index_type)].name
+    
+    def _record_dashboard_latency(self, latency: float) -> None:
+        """Record the duration of one dashboard _msearch"""
+        metrics = self.dashboard_metrics
+        metrics.requests += 1
+        latency_ms = latency * 1000
+        metrics.avg_latency_ms += (latency_ms - metrics.avg_latency_ms) / metrics.requests
+        metrics.max_latency_ms = max(metrics.max_latency_ms, latency_ms)
+    
     def _build_search_query(self, query: SearchQuery, index_type: IndexType, scope: SearchScope) -> Dict[str, Any]:
         """Build Elasticsearch query from search parameters"""
         es_query = {
@@ -971,8 +1376,8 @@ class ElasticsearchAnalyticsManager:
         
         return 0.0
     
-    async def _get_workflow_analytics(self, time_range: Dict[str, str]) -> Dict[str, Any]:
-        """Get workflow analytics data"""
+    def _workflow_analytics_search(self, time_range: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+        """Index and body of the workflow analytics search"""
         index_name = self.index_configs[IndexType.WORKFLOWS].name
         
         query = {
@@ -998,11 +1403,10 @@ class ElasticsearchAnalyticsManager:
             }
         }
         
-        response = await self.client.search(index=index_name, body=query)
-        return response.get("aggregations", {})
+        return index_name, query
     
-    async def _get_execution_analytics(self, time_range: Dict[str, str]) -> Dict[str, Any]:
-        """Get execution analytics data"""
+    def _execution_analytics_search(self, time_range: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+        """Index and body of the execution analytics search"""
         index_name = self.index_configs[IndexType.EXECUTIONS].name
         
         query = {
@@ -1042,11 +1446,10 @@ class ElasticsearchAnalyticsManager:
             }
         }
         
-        response = await self.client.search(index=index_name, body=query)
-        return response.get("aggregations", {})
+        return index_name, query
     
-    async def _get_user_analytics(self, time_range: Dict[str, str]) -> Dict[str, Any]:
-        """Get user analytics data"""
+    def _user_analytics_search(self, time_range: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+        """Index and body of the user analytics search"""
         index_name = self.index_configs[IndexType.USERS].name
         
         query = {
@@ -1072,11 +1475,10 @@ class ElasticsearchAnalyticsManager:
             }
         }
         
-        response = await self.client.search(index=index_name, body=query)
-        return response.get("aggregations", {})
+        return index_name, query
     
-    async def _get_agent_analytics(self, time_range: Dict[str, str]) -> Dict[str, Any]:
-        """Get agent analytics data"""
+    def _agent_analytics_search(self, time_range: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+        """Index and body of the agent analytics search"""
         index_name = self.index_configs[IndexType.AGENTS].name
         
         query = {
@@ -1105,11 +1507,10 @@ class ElasticsearchAnalyticsManager:
             }
         }
         
-        response = await self.client.search(index=index_name, body=query)
-        return response.get("aggregations", {})
+        return index_name, query
     
-    async def _get_system_health_analytics(self, time_range: Dict[str, str]) -> Dict[str, Any]:
-        """Get system health analytics"""
+    def _system_health_searches(self, time_range: Dict[str, str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Index and body of the log and metric searches behind the system health section"""
         logs_index = self.index_configs[IndexType.LOGS].name
         metrics_index = self.index_configs[IndexType.METRICS].name
         
@@ -1169,14 +1570,7 @@ class ElasticsearchAnalyticsManager:
             }
         }
         
-        # Execute both queries
-        logs_response = await self.client.search(index=logs_index, body=logs_query)
-        metrics_response = await self.client.search(index=metrics_index, body=metrics_query)
-        
-        return {
-            "logs_analytics": logs_response.get("aggregations", {}),
-            "performance_metrics": metrics_response.get("aggregations", {})
-        }
+        return [(logs_index, logs_query), (metrics_index, metrics_query)]
     
     async def health_check(self) -> Dict[str, Any]:
         """Check Elasticsearch cluster health"""
@@ -1216,7 +1610,9 @@ class ElasticsearchAnalyticsManager:
             }
     
     async def close(self) -> None:
-        """Close Elasticsearch connection"""
+        """Drain the bulk indexer and close the Elasticsearch connection"""
+        if self.bulk_indexer is not None:
+            await self.bulk_indexer.close()
         if self.client:
             await self.client.close()
             logger.info("Elasticsearch analytics manager closed")
@@ -176,6 +176,40 @@ class DatabaseMigration:
         else:
             logger.info("Initial schema already applied, skipping")
     
+    async def run_workflow_outbox_schema(self, engine: AsyncEngine) -> None:
+        """Create the workflow synchronization outbox table"""
+        schema_file = self.migrations_dir / "002_workflow_outbox.sql"
+        
+        applied_migrations = await self.get_applied_migrations(engine)
+        
+        if "002_workflow_outbox" not in applied_migrations:
+            logger.info("Applying workflow outbox schema...")
+            await self.apply_migration(
+                engine,
+                "002_workflow_outbox",
+                "Workflow synchronization outbox",
+                schema_file.read_text()
+            )
+        else:
+            logger.info("Workflow outbox schema already applied, skipping")
+    
+    async def run_belief_archive_schema(self, engine: AsyncEngine) -> None:
+        """Create the archive table for beliefs removed by compaction"""
+        schema_file = self.migrations_dir / "003_belief_archive.sql"
+        
+        applied_migrations = await self.get_applied_migrations(engine)
+        
+        if "003_belief_archive" not in applied_migrations:
+            logger.info("Applying belief archive schema...")
+            await self.apply_migration(
+                engine,
+                "003_belief_archive",
+                "Archive of compacted beliefs",
+                schema_file.read_text()
+            )
+        else:
+            logger.info("Belief archive schema already applied, skipping")
+    
     async def create_sample_data(self, engine: AsyncEngine) -> None:
         """Create sample data for development and testing"""
         sample_data_sql = """
@@ -280,6 +314,8 @@ class DatabaseManager:
             
             # Apply initial schema
             await self.migration.run_initial_schema(engine)
+            await self.migration.run_workflow_outbox_schema(engine)
+            await self.migration.run_belief_archive_schema(engine)
             
             # Create sample data for development
             await self.migration.create_sample_data(engine)
@@ -329,7 +365,8 @@ class DatabaseManager:
             'organization_members', 'workflows', 'workflow_versions', 
             'workflow_executions', 'task_executions', 'agents', 'agent_beliefs',
             'agent_desires', 'agent_intentions', 'agent_messages', 'integrations',
-            'integration_sync_logs', 'audit_logs', 'system_events', 'performance_metrics'
+            'integration_sync_logs', 'audit_logs', 'system_events', 'performance_metrics',
+            'workflow_outbox', 'belief_archive'
         ]
         
         async with engine.begin() as conn:
@@ -10,13 +10,18 @@ import logging
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import json
-import uuid
 from pathlib import Path
 
-from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
+from neo4j import AsyncDriver, AsyncSession
 from neo4j.exceptions import ServiceUnavailable, AuthError
 
+from app.core import cypher_queries
 from app.core.database import DatabaseConfig
+from app.core.ids import new_id
+from app.core.neo4j_driver import get_neo4j_driver_factory, query_work
+from app.core.pagination import CONTEXT_ORDERS, collection_parameters, page_collections, resolve_limits
+from app.core.query_registry import query_registry
+from app.core.serialization import to_builtin
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -89,13 +94,13 @@ class SBVROntologyManager:
         ]
         
         for query in sbvr_schema_queries:
-            await self.session.run(query)
+            await self.session.execute_write(query_work(query))
         
         logger.info("SBVR ontology schema initialized successfully")
     
     async def create_vocabulary_element(self, element_data: Dict[str, Any]) -> str:
         """Create a vocabulary element in the knowledge graph"""
-        element_id = element_data.get('id', str(uuid.uuid4()))
+        element_id = element_data.get('id') or new_id()
         
         query = """
         CREATE (v:VocabularyElement {
@@ -110,20 +115,19 @@ class SBVROntologyManager:
         RETURN v.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': element_id,
             'name': element_data.get('name', ''),
             'definition': element_data.get('definition', ''),
             'type': element_data.get('type', 'general'),
             'domain': element_data.get('domain', 'business')
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_concept_type(self, concept_data: Dict[str, Any]) -> str:
         """Create a concept type with SBVR semantics"""
-        concept_id = concept_data.get('id', str(uuid.uuid4()))
+        concept_id = concept_data.get('id') or new_id()
         
         query = """
         CREATE (c:ConceptType:VocabularyElement {
@@ -139,21 +143,20 @@ class SBVROntologyManager:
         RETURN c.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': concept_id,
             'name': concept_data.get('name', ''),
             'definition': concept_data.get('definition', ''),
             'properties': json.dumps(concept_data.get('properties', {})),
             'constraints': json.dumps(concept_data.get('constraints', [])),
             'business_context': concept_data.get('business_context', '')
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_fact_type(self, fact_data: Dict[str, Any]) -> str:
         """Create a fact type representing relationships between concepts"""
-        fact_id = fact_data.get('id', str(uuid.uuid4()))
+        fact_id = fact_data.get('id') or new_id()
         
         query = """
         CREATE (f:FactType:VocabularyElement {
@@ -170,7 +173,7 @@ class SBVROntologyManager:
         RETURN f.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': fact_id,
             'name': fact_data.get('name', ''),
             'definition': fact_data.get('definition', ''),
@@ -178,14 +181,13 @@ class SBVROntologyManager:
             'roles': json.dumps(fact_data.get('roles', [])),
             'constraints': json.dumps(fact_data.get('constraints', [])),
             'business_significance': fact_data.get('business_significance', '')
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_business_rule(self, rule_data: Dict[str, Any]) -> str:
         """Create a business rule with SBVR semantics and validation logic"""
-        rule_id = rule_data.get('id', str(uuid.uuid4()))
+        rule_id = rule_data.get('id') or new_id()
         
         query = """
         CREATE (r:Rule:VocabularyElement {
@@ -206,7 +208,7 @@ class SBVROntologyManager:
         RETURN r.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': rule_id,
             'name': rule_data.get('name', ''),
             'definition': rule_data.get('definition', ''),
@@ -218,14 +220,13 @@ class SBVROntologyManager:
             'proof_requirements': json.dumps(rule_data.get('proof_requirements', [])),
             'business_impact': rule_data.get('business_impact', 'medium'),
             'is_active': rule_data.get('is_active', True)
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_proof_table(self, proof_data: Dict[str, Any]) -> str:
         """Create a proof table for rule validation and optimization"""
-        proof_id = proof_data.get('id', str(uuid.uuid4()))
+        proof_id = proof_data.get('id') or new_id()
         
         query = """
         CREATE (pt:ProofTable {
@@ -244,7 +245,7 @@ class SBVROntologyManager:
         RETURN pt.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': proof_id,
             'name': proof_data.get('name', ''),
             'description': proof_data.get('description', ''),
@@ -254,14 +255,13 @@ class SBVROntologyManager:
             'truth_conditions': json.dumps(proof_data.get('truth_conditions', [])),
             'optimization_hints': json.dumps(proof_data.get('optimization_hints', {})),
             'performance_metrics': json.dumps(proof_data.get('performance_metrics', {}))
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_proof_entry(self, entry_data: Dict[str, Any]) -> str:
         """Create a proof table entry with specific input/output combinations"""
-        entry_id = entry_data.get('id', str(uuid.uuid4()))
+        entry_id = entry_data.get('id') or new_id()
         
         query = """
         CREATE (pe:ProofEntry {
@@ -279,7 +279,7 @@ class SBVROntologyManager:
         RETURN pe.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': entry_id,
             'proof_table_id': entry_data.get('proof_table_id', ''),
             'input_values': json.dumps(entry_data.get('input_values', {})),
@@ -288,14 +288,13 @@ class SBVROntologyManager:
             'confidence': entry_data.get('confidence', 1.0),
             'evidence': json.dumps(entry_data.get('evidence', [])),
             'validation_status': entry_data.get('validation_status', 'validated')
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def create_reasoning_engine(self, engine_data: Dict[str, Any]) -> str:
         """Create a reasoning engine for automated rule processing"""
-        engine_id = engine_data.get('id', str(uuid.uuid4()))
+        engine_id = engine_data.get('id') or new_id()
         
         query = """
         CREATE (re:ReasoningEngine {
@@ -313,7 +312,7 @@ class SBVROntologyManager:
         RETURN re.id as id
         """
         
-        result = await self.session.run(query, {
+        records = await self.session.execute_write(query_work(query, {
             'id': engine_id,
             'name': engine_data.get('name', ''),
             'description': engine_data.get('description', ''),
@@ -322,10 +321,9 @@ class SBVROntologyManager:
             'optimization_strategies': json.dumps(engine_data.get('optimization_strategies', [])),
             'performance_config': json.dumps(engine_data.get('performance_config', {})),
             'is_active': engine_data.get('is_active', True)
-        })
+        }))
         
-        record = await result.single()
-        return record['id']
+        return records[0]['id']
     
     async def establish_sbvr_relationships(self) -> None:
         """Establish SBVR semantic relationships between entities"""
@@ -375,7 +373,7 @@ class SBVROntologyManager:
         ]
         
         for query in relationship_queries:
-            await self.session.run(query)
+            await self.session.execute_write(query_work(query))
         
         logger.info("SBVR semantic relationships established")
 
@@ -385,24 +383,18 @@ class Neo4jKnowledgeGraphManager:
     def __init__(self, config: DatabaseConfig):
         """Initialize Neo4j knowledge graph manager"""
         self.config = config
+        self.driver_factory = get_neo4j_driver_factory(config)
         self.driver: Optional[AsyncDriver] = None
         self.sbvr_manager: Optional[SBVROntologyManager] = None
     
     async def initialize(self) -> None:
         """Initialize Neo4j connection and knowledge graph schema"""
         try:
-            # Create Neo4j driver
-            self.driver = AsyncGraphDatabase.driver(
-                self.config.neo4j_uri,
-                auth=(self.config.neo4j_user, self.config.neo4j_password),
-                database=self.config.neo4j_database
-            )
-            
-            # Verify connection
-            await self.driver.verify_connectivity()
+            # Share the process-wide driver (connectivity is verified on creation)
+            self.driver = await self.driver_factory.get_driver()
             
             # Initialize knowledge graph schema
-            async with self.driver.session() as session:
+            async with self.driver_factory.session() as session:
                 self.sbvr_manager = SBVROntologyManager(session)
                 await self.initialize_knowledge_graph_schema(session)
                 await self.sbvr_manager.initialize_sbvr_schema()
@@ -500,7 +492,7 @@ class Neo4jKnowledgeGraphManager:
         ]
         
         for query in schema_queries:
-            await session.run(query)
+            await session.execute_write(query_work(query))
         
         logger.info("Knowledge graph schema initialized")
     
@@ -684,38 +676,41 @@ class Neo4jKnowledgeGraphManager:
         
         logger.info("Initial SBVR ontology data loaded successfully")
     
-    async def execute_cypher_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Execute a Cypher query and return results"""
+    async def run_query(self, name: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Execute a named query from the query registry"""
         if not self.driver:
             raise RuntimeError("Neo4j driver not initialized")
         
-        async with self.driver.session() as session:
-            result = await session.run(query, parameters or {})
-            records = await result.data()
-            return [self._serialize_neo4j_types(record) for record in records]
+        records = await query_registry.run(self.driver_factory, name, parameters, raw=True)
+        return self._serialize_neo4j_types([dict(record) for record in records])
+    
+    async def execute_read(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Execute a read-only Cypher query in a managed read transaction"""
+        if not self.driver:
+            raise RuntimeError("Neo4j driver not initialized")
+        
+        records = await self.driver_factory.execute_read(query, parameters)
+        return self._serialize_neo4j_types(records)
+    
+    async def execute_write(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Execute a Cypher query that writes in a managed write transaction"""
+        if not self.driver:
+            raise RuntimeError("Neo4j driver not initialized")
+        
+        records = await self.driver_factory.execute_write(query, parameters)
+        return self._serialize_neo4j_types(records)
+    
+    async def execute_cypher_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Execute a Cypher query of unknown access mode (routed as a write)"""
+        return await self.execute_write(query, parameters)
     
     def _serialize_neo4j_types(self, obj):
         """Convert Neo4j types to JSON-serializable types"""
-        if hasattr(obj, 'isoformat'):  # DateTime objects
-            return obj.isoformat()
-        elif isinstance(obj, dict):
-            return {k: self._serialize_neo4j_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._serialize_neo4j_types(item) for item in obj]
-        else:
-            return obj
+        return to_builtin(obj)
     
     async def validate_business_rule(self, rule_id: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate business rule using SBVR proof tables"""
-        query = """
-        MATCH (r:Rule {id: $rule_id})
-        MATCH (pt:ProofTable)-[:VALIDATES]->(r)
-        MATCH (pe:ProofEntry)-[:BELONGS_TO]->(pt)
-        WHERE pe.validation_status = 'validated'
-        RETURN r, pt, collect(pe) as proof_entries
-        """
-        
-        result = await self.execute_cypher_query(query, {'rule_id': rule_id})
+        result = await self.run_query(cypher_queries.KG_VALIDATE_BUSINESS_RULE.name, {'rule_id': rule_id})
         
         if not result:
             return {'valid': False, 'reason': 'Rule not found or no proof table available'}
@@ -755,65 +750,48 @@ class Neo4jKnowledgeGraphManager:
                 return False
         return True
     
-    async def get_agent_knowledge_context(self, agent_id: str) -> Dict[str, Any]:
-        """Get comprehensive knowledge context for a BDI agent"""
-        query = """
-        MATCH (a:Agent {id: $agent_id})
-        OPTIONAL MATCH (a)-[:HAS_BELIEF]->(b:Belief)
-        OPTIONAL MATCH (a)-[:HAS_DESIRE]->(d:Desire)
-        OPTIONAL MATCH (a)-[:HAS_INTENTION]->(i:Intention)
-        OPTIONAL MATCH (a)-[:KNOWS_CONCEPT]->(c:ConceptType)
-        OPTIONAL MATCH (a)-[:APPLIES_RULE]->(r:Rule)
-        RETURN a,
-               collect(DISTINCT b) as beliefs,
-               collect(DISTINCT d) as desires,
-               collect(DISTINCT i) as intentions,
-               collect(DISTINCT c) as known_concepts,
-               collect(DISTINCT r) as applicable_rules
-        """
+    async def get_agent_knowledge_context(
+        self,
+        agent_id: str,
+        limits: Optional[Dict[str, int]] = None,
+        cursors: Optional[Dict[str, str]] = None,
+        order: str = "newest"
+    ) -> Dict[str, Any]:
+        """Get knowledge context for a BDI agent with bounded, cursor-paged collections"""
+        if not self.driver:
+            raise RuntimeError("Neo4j driver not initialized")
+        if order not in CONTEXT_ORDERS:
+            raise ValueError(f"Unsupported context order: {order}")
+        
+        page_limits = resolve_limits(
+            cypher_queries.KG_AGENT_KNOWLEDGE_CONTEXT_COLLECTIONS,
+            limits,
+            self.config.agent_context_default_limit,
+            self.config.agent_context_max_limit
+        )
+        query = cypher_queries.KG_AGENT_KNOWLEDGE_CONTEXT[order]
+        params = {'agent_id': agent_id, **collection_parameters(page_limits, cursors)}
         
-        result = await self.execute_cypher_query(query, {'agent_id': agent_id})
+        # Cursors are built from the raw records to keep full timestamp precision
+        records = await query_registry.run(self.driver_factory, query.name, params, raw=True)
         
-        if not result:
+        if not records:
             return {'agent_id': agent_id, 'context': 'not_found'}
         
-        return result[0]
+        return self._serialize_neo4j_types(page_collections(dict(records[0]), page_limits))
     
     async def optimize_reasoning_performance(self) -> Dict[str, Any]:
         """Optimize reasoning engine performance using graph analytics"""
-        optimization_queries = [
-            # Analyze rule complexity and usage patterns
-            """
-            MATCH (r:Rule)
-            OPTIONAL MATCH (pt:ProofTable)-[:VALIDATES]->(r)
-            OPTIONAL MATCH (pe:ProofEntry)-[:BELONGS_TO]->(pt)
-            RETURN r.id, r.priority, count(pe) as proof_entries_count,
-                   avg(pe.confidence) as avg_confidence
-            ORDER BY r.priority DESC, proof_entries_count DESC
-            """,
-            
-            # Identify frequently used concept types
-            """
-            MATCH (c:ConceptType)
-            OPTIONAL MATCH (f:FactType)-[:RELATES_TO]->(c)
-            OPTIONAL MATCH (c)-[:DEFINES]->(v:VocabularyElement)
-            RETURN c.name, count(f) as fact_relationships, count(v) as vocabulary_definitions
-            ORDER BY fact_relationships DESC, vocabulary_definitions DESC
-            """,
-            
-            # Analyze reasoning engine performance
-            """
-            MATCH (re:ReasoningEngine)
-            OPTIONAL MATCH (re)-[:PROCESSES]->(r:Rule)
-            RETURN re.name, re.engine_type, count(r) as rules_processed,
-                   re.performance_config as config
-            """
+        analysis_queries = [
+            cypher_queries.KG_RULE_USAGE_ANALYSIS,
+            cypher_queries.KG_CONCEPT_USAGE_ANALYSIS,
+            cypher_queries.KG_REASONING_ENGINE_ANALYSIS
         ]
         
         optimization_results = {}
         
-        for i, query in enumerate(optimization_queries):
-            result = await self.execute_cypher_query(query)
+        for i, query in enumerate(analysis_queries):
+            result = await self.run_query(query.name)
             optimization_results[f'analysis_{i+1}'] = result
         
         # Generate optimization recommendations
@@ -833,7 +811,9 @@ class Neo4jKnowledgeGraphManager:
     async def close(self) -> None:
         """Close Neo4j connection"""
         if self.driver:
-            await self.driver.close()
+            # The driver is shared, so closing goes through its factory
+            await self.driver_factory.close()
+            self.driver = None
             logger.info("Neo4j knowledge graph manager closed")
 
 # Utility functions for direct usage
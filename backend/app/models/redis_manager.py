@@ -242,6 +242,42 @@ class RedisCacheManager:
             self.metrics.misses += 1
             return default
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one MGET round trip; missing keys are omitted"""
+        if not keys:
+            return {}
+        
+        start_time = time.time()
+        cache_keys = [f"{self.cache_prefix}:{key}" for key in keys]
+        
+        try:
+            values = await self.redis.mget(cache_keys)
+        except Exception as e:
+            logger.error(f"Cache mget error for {len(keys)} keys: {e}")
+            self.metrics.misses += len(keys)
+            return {}
+        
+        response_time = time.time() - start_time
+        found = {}
+        
+        for key, value in zip(keys, values):
+            if value is None:
+                self.metrics.misses += 1
+                continue
+            
+            self.metrics.hits += 1
+            self._update_avg_response_time(response_time)
+            
+            if self.config.compression:
+                value = self._decompress(value)
+            
+            try:
+                found[key] = json.loads(value) if isinstance(value, (str, bytes)) else value
+            except json.JSONDecodeError:
+                found[key] = pickle.loads(value) if isinstance(value, bytes) else value
+        
+        return found
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL"""
         cache_key = f"{self.cache_prefix}:{key}"
@@ -0,0 +1,316 @@
+"""
+Shared fakes for the unit tests
+
+In-memory stand-ins for the Redis, Neo4j, PostgreSQL and Elasticsearch
+managers and the Elasticsearch client, plus factories wiring them into a
+DatabaseManager or an ElasticsearchAnalyticsManager. Tests import them with
+``from app.tests.unit.fakes import ...`` and subclass them for behaviour
+specific to one test module.
+"""
+
+import asyncio
+import json
+
+from app.core.database import DatabaseConfig, DatabaseManager
+from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager
+
+
+class FakeRedis:
+    """In-memory stand-in for the RedisManager operations the managers use."""
+
+    def __init__(self):
+        self.cache = {}
+        self.ttls = {}
+        self.values = {}
+        self.hashes = {}
+        self.hash_writes = []
+        self.sets = {}
+        self.counters = {}
+        self.versions = {}
+        self.bumped = []
+        self.gets = 0
+        self.mgets = 0
+
+    async def get_cache(self, key):
+        return self.cache.get(key)
+
+    async def set_cache(self, key, value, ttl=3600):
+        self.cache[key] = value
+        self.ttls[key] = ttl
+        return True
+
+    async def get_cache_many(self, keys):
+        self.mgets += 1
+        return {key: self.cache[key] for key in keys if key in self.cache}
+
+    async def delete_cache(self, key):
+        return self.cache.pop(key, None) is not None
+
+    async def get_raw(self, key, raise_errors=False):
+        self.gets += 1
+        return self.values.get(key)
+
+    async def set_raw(self, key, value, ttl=3600):
+        self.values[key] = value
+        return True
+
+    async def get_values(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    async def get_hash(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def set_hashes(self, mappings, ttl=3600):
+        for key, fields in mappings.items():
+            self.hashes.setdefault(key, {}).update(fields)
+
+    async def write_hash(self, key, fields, removed=(), replace=False, ttl=3600):
+        self.hash_writes.append({"key": key, "fields": sorted(fields), "removed": list(removed), "replace": replace})
+        stored = {} if replace else self.hashes.get(key, {})
+        for field in removed:
+            stored.pop(field, None)
+        stored.update(fields)
+        self.hashes[key] = stored
+        return True
+
+    async def delete_hash_fields(self, key, fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+        return len(fields)
+
+    def decoded_hash(self, key):
+        """A hash written with JSON-encoded field values, decoded"""
+        return {field: json.loads(value) for field, value in self.hashes.get(key, {}).items()}
+
+    async def add_set_members(self, mappings, ttl=None):
+        for key, members in mappings.items():
+            self.sets.setdefault(key, set()).update(members)
+
+    async def pop_set_members(self, key, count):
+        members = sorted(self.sets.get(key, ()))[:count]
+        self.sets[key] = set(self.sets.get(key, ())) - set(members)
+        return members
+
+    async def advance_version(self, key, version, ttl=3600):
+        if version <= self.versions.get(key, 0):
+            return False
+        self.versions[key] = version
+        return True
+
+    async def increment_counter(self, key):
+        self.bumped.append(key)
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def get_counter(self, key):
+        self.gets += 1
+        return self.counters.get(key, 0)
+
+    async def get_agent_state(self, agent_id):
+        return {"status": "active"}
+
+    async def get_agent_states(self, agent_ids):
+        self.mgets += 1
+        return {agent_id: {"status": "active"} for agent_id in agent_ids}
+
+
+class FakeNeo4j:
+    """In-memory knowledge graph; agents outside known_ids (when given) do not exist."""
+
+    def __init__(self, known_ids=None):
+        self.known_ids = known_ids
+        self.beliefs = {}
+        self.chunks = []
+        self.folds = []
+        self.queries = 0
+        self.fail = False
+
+    def knows(self, agent_id):
+        return self.known_ids is None or agent_id in self.known_ids
+
+    def knowledge_graph(self, agent_id):
+        return {"agent": {"id": agent_id}, "beliefs": [], "cursors": {}}
+
+    async def get_agent_knowledge_graph(self, agent_id, raw=False, limits=None, cursors=None, order="newest", fields=None):
+        self.queries += 1
+        return self.knowledge_graph(agent_id) if self.knows(agent_id) else None
+
+    async def get_agent_knowledge_graphs(
+        self, agent_ids=None, business_id=None, raw=False, limits=None, order="newest", fields=None,
+        after=None, agents_limit=None
+    ):
+        self.queries += 1
+        if agent_ids is None:
+            # The agents of a business are paged in id order
+            agent_ids = [agent_id for agent_id in sorted(self.known_ids) if after is None or agent_id > after][:agents_limit]
+        return {agent_id: self.knowledge_graph(agent_id) for agent_id in agent_ids if self.knows(agent_id)}
+
+    def _store(self, belief):
+        stored = self.beliefs[belief.get("belief_id") or f"belief-{len(self.beliefs) + 1}"] = {**belief, "observation_count": 1}
+        return stored
+
+    async def create_agent_belief(self, agent_id, belief_data):
+        if not self.knows(agent_id):
+            return None
+        return {"belief": self._store({**belief_data, "agent_id": agent_id})}
+
+    async def create_agent_beliefs(self, beliefs):
+        self.chunks.append(beliefs)
+        return [{"belief": self._store(belief)} if self.knows(belief["agent_id"]) else None for belief in beliefs]
+
+    async def create_agent_beliefs_bulk(self, beliefs):
+        self.chunks.append(beliefs)
+        created = {}
+        for belief in beliefs:
+            if self.knows(belief["agent_id"]):
+                self._store(belief)
+                created[belief["agent_id"]] = created.get(belief["agent_id"], 0) + 1
+        return created
+
+    async def merge_agent_beliefs(self, beliefs):
+        if self.fail:
+            raise ConnectionError("neo4j unavailable")
+        for belief in beliefs:
+            self.beliefs.setdefault(belief["belief_id"], belief)
+        return [belief["belief_id"] for belief in beliefs]
+
+    async def reinforce_beliefs(self, folds):
+        self.folds.extend(folds)
+        folded = {}
+        for fold in folds:
+            belief = self.beliefs.get(fold["belief_id"])
+            if belief is not None:
+                belief["observation_count"] += 1
+                belief["confidence"] = max(belief["confidence"], fold["confidence"])
+                folded[fold["index"]] = belief
+        return folded
+
+
+class FakePostgres:
+    """Records executed statements and their rows, optionally failing."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.rows = []
+        self.queries = []
+
+    async def execute_many(self, query, rows):
+        if self.fail:
+            raise RuntimeError("postgres unavailable")
+        self.rows.extend(rows)
+        return len(rows)
+
+    async def execute_query(self, query, params=None):
+        self.queries.append(params)
+        return []
+
+
+class FakeElasticsearch:
+    """Stand-in for ElasticsearchManager keeping versioned workflow documents, optionally failing."""
+
+    def __init__(self):
+        self.documents = {}
+        self.updates = []
+        self.fail = False
+
+    async def update_workflow(self, workflow_id, fields, removed=()):
+        if self.fail:
+            return False
+        self.updates.append({"fields": sorted(fields), "removed": list(removed)})
+        return True
+
+    async def bulk_index_workflows(self, workflows):
+        for workflow_id, version, doc in workflows:
+            if version > self.documents.get(workflow_id, (0, None))[0]:
+                self.documents[workflow_id] = (version, doc)
+        return [None] * len(workflows)
+
+
+class FakeClient:
+    """Stand-in for AsyncElasticsearch answering _bulk and point-in-time searches over hits.
+
+    Bulk item statuses can be scripted per request; hits must carry their sort values.
+    """
+
+    def __init__(self, hits=(), statuses=None, delay=0.0):
+        self.hits = list(hits)
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.bodies = []
+        self.opened = []
+        self.closed = []
+
+    async def bulk(self, operations):
+        actions = operations[::2]
+        self.requests.append(list(zip(actions, operations[1::2])))
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        statuses = self.statuses.pop(0) if self.statuses else [201] * len(actions)
+        items = [{"index": {"status": status, "error": None if status < 300 else {"type": "rejected"}}} for status in statuses]
+        return {"errors": any(status >= 300 for status in statuses), "items": items}
+
+    def written(self):
+        return [(action, source) for request in self.requests for action, source in request]
+
+    def documents(self):
+        return [source for _, source in self.written()]
+
+    async def open_point_in_time(self, index, keep_alive):
+        self.opened.append(index)
+        return {"id": f"pit-{len(self.opened)}"}
+
+    async def close_point_in_time(self, id):
+        self.closed.append(id)
+        return {"succeeded": True}
+
+    async def search(self, body, size, **params):
+        assert "from_" not in body
+        self.bodies.append(body)
+        start = 0
+        if "search_after" in body:
+            start = next(position + 1 for position, hit in enumerate(self.hits) if hit["sort"] == body["search_after"])
+        return {
+            "pit_id": body["pit"]["id"],
+            "hits": {"total": {"value": len(self.hits)}, "hits": self.hits[start:start + size]},
+            "aggregations": {name: {} for name in body.get("aggs", {})},
+            "took": 1,
+            "timed_out": False
+        }
+
+
+def make_manager(neo4j=None, redis=None, postgres=None, elasticsearch=None, client=None, **settings):
+    """DatabaseManager over fakes; client replaces the analytics Elasticsearch client"""
+    manager = DatabaseManager(DatabaseConfig(**settings))
+    manager.neo4j = neo4j or FakeNeo4j()
+    manager.redis = redis or FakeRedis()
+    manager.belief_dedup.redis = manager.redis
+    if postgres is not None:
+        manager.postgres = postgres
+    if elasticsearch is not None:
+        manager.elasticsearch = elasticsearch
+    if client is not None:
+        attach_client(manager.elasticsearch_analytics, client)
+    return manager
+
+
+def make_analytics(client=None, **settings):
+    """ElasticsearchAnalyticsManager whose searches and bulk requests go to client"""
+    analytics = ElasticsearchAnalyticsManager(DatabaseConfig(**settings))
+    if client is not None:
+        attach_client(analytics, client)
+    return analytics
+
+
+def attach_client(analytics, client):
+    analytics.client = client
+    if analytics.bulk_indexer is not None:
+        analytics.bulk_indexer.client = client
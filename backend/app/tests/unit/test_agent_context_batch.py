@@ -0,0 +1,94 @@
+"""
+Unit tests for the multi-agent batch context
+
+Checks that a batch costs one knowledge graph query and one state lookup
+regardless of the number of agents, that businesses are paged and that
+oversized batches are answered with 400.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.serialization import loads
+
+from app.tests.unit.fakes import FakeNeo4j, make_manager
+
+
+class TestAgentContextBatch:
+    """Test batch agent context assembly"""
+
+    async def test_batch_uses_one_query_and_one_mget(self):
+        """Test many agents are fetched in constant round trips"""
+        agent_ids = [f"agent-{i}" for i in range(50)]
+        manager = make_manager(neo4j=FakeNeo4j(set(agent_ids[:-1])))
+
+        result = loads(await manager.get_agent_contexts_json(agent_ids=agent_ids))
+
+        assert len(result["contexts"]) == 49
+        assert result["not_found"] == ["agent-49"]
+        assert result["contexts"]["agent-0"]["cached_state"] == {"status": "active"}
+        assert manager.neo4j.queries == 1
+        assert manager.redis.mgets == 1
+
+    async def test_business_batch_returns_its_agents(self):
+        """Test agents can be selected by business"""
+        manager = make_manager(neo4j=FakeNeo4j({"biz/ceo", "biz/cfo"}))
+
+        result = loads(await manager.get_agent_contexts_json(business_id="biz"))
+
+        assert set(result["contexts"]) == {"biz/ceo", "biz/cfo"}
+        assert result["not_found"] == []
+        assert result["next_agent_cursor"] is None
+
+    async def test_business_batch_is_paged(self):
+        """Test a business with more agents than the batch cap is returned page by page"""
+        agent_ids = {f"biz/agent-{i}" for i in range(5)}
+        manager = make_manager(neo4j=FakeNeo4j(agent_ids), agent_context_batch_max_agents=2)
+
+        pages = []
+        after = None
+        while True:
+            result = loads(await manager.get_agent_contexts_json(business_id="biz", after=after))
+            pages.append(list(result["contexts"]))
+            after = result["next_agent_cursor"]
+            if after is None:
+                break
+
+        assert pages == [["biz/agent-0", "biz/agent-1"], ["biz/agent-2", "biz/agent-3"], ["biz/agent-4"]]
+
+    async def test_cached_state_lookup_can_be_skipped(self):
+        """Test include_cached_state=False avoids the MGET and omits cached_state"""
+        manager = make_manager(neo4j=FakeNeo4j({"agent-1"}))
+
+        result = loads(await manager.get_agent_contexts_json(agent_ids=["agent-1"], include_cached_state=False))
+
+        assert "cached_state" not in result["contexts"]["agent-1"]
+        assert manager.redis.mgets == 0
+
+
+class TestAgentContextBatchErrors:
+    """Test invalid batches are answered as client errors"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        manager = make_manager(neo4j=FakeNeo4j(), agent_context_batch_max_agents=2)
+
+        async def get_manager():
+            return manager
+
+        monkeypatch.setattr(main, "get_database_manager", get_manager)
+        return TestClient(main.app)
+
+    def test_too_many_agents_is_rejected_with_400(self, client):
+        """Test a batch over agent_context_batch_max_agents answers 400 instead of a degraded 200"""
+        response = client.post("/api/agents/context:batch", json={"agent_ids": ["a", "b", "c"]})
+
+        assert response.status_code == 400
+        assert "At most 2 agents" in response.json()["error"]
+
+    def test_missing_selection_is_rejected_with_400(self, client):
+        """Test a batch without agent ids or a business answers 400"""
+        response = client.post("/api/agents/context:batch", json={})
+
+        assert response.status_code == 400
@@ -0,0 +1,109 @@
+"""
+Unit tests for the versioned agent context cache
+
+Covers L1/Redis tier lookups, ETag revalidation and invalidation through
+the per-agent version counter.
+"""
+
+from app.core.agent_context_cache import AgentContextCache, etag_matches, make_etag
+
+from app.tests.unit.fakes import FakeNeo4j, make_manager
+
+
+class FailingNeo4j(FakeNeo4j):
+    """Fails knowledge graph reads while fail is set."""
+
+    async def get_agent_knowledge_graph(self, agent_id, **kwargs):
+        self.queries += 1
+        if self.fail:
+            raise ConnectionError("neo4j unavailable")
+        return self.knowledge_graph(agent_id)
+
+
+class TestAgentContextCache:
+    """Test the versioned read-through cache"""
+
+    def test_l1_evicts_least_recently_used(self):
+        """Test the L1 tier stays within its size bound"""
+        cache = AgentContextCache(max_entries=2)
+        cache.set("a", 1, "d", b"a")
+        cache.set("b", 1, "d", b"b")
+        cache.get("a", 1, "d")
+        cache.set("c", 1, "d", b"c")
+
+        assert cache.get("a", 1, "d") == b"a"
+        assert cache.get("b", 1, "d") is None
+
+    def test_etag_matching(self):
+        """Test weak, list and wildcard If-None-Match values"""
+        etag = make_etag(3, "abc")
+
+        assert etag_matches(f'"v2-abc", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches("*", etag, exists=False)
+        assert not etag_matches('"v2-abc"', etag)
+        assert not etag_matches(None, etag)
+
+    async def test_unchanged_agent_is_served_from_l1_with_one_redis_get(self):
+        """Test a repeated poll costs only the version read"""
+        manager = make_manager()
+        body, etag = await manager.get_agent_context_cached("agent-1")
+
+        manager.redis.gets = 0
+        cached_body, cached_etag = await manager.get_agent_context_cached("agent-1")
+
+        assert cached_body == body
+        assert cached_etag == etag
+        assert manager.neo4j.queries == 1
+        assert manager.redis.gets == 1
+
+    async def test_if_none_match_returns_not_modified(self):
+        """Test a matching ETag yields no body"""
+        manager = make_manager()
+        _, etag = await manager.get_agent_context_cached("agent-1")
+
+        body, same_etag = await manager.get_agent_context_cached("agent-1", if_none_match=etag)
+
+        assert body is None
+        assert same_etag == etag
+
+    async def test_agent_write_invalidates_cached_context(self):
+        """Test bumping the agent version forces a fresh assembly"""
+        manager = make_manager()
+        _, etag = await manager.get_agent_context_cached("agent-1")
+
+        await manager.bump_agent_version("agent-1")
+        body, new_etag = await manager.get_agent_context_cached("agent-1", if_none_match=etag)
+
+        assert body is not None
+        assert new_etag != etag
+        assert manager.neo4j.queries == 2
+
+    async def test_degraded_context_gets_no_etag(self):
+        """Test a context assembled without its graph is neither tagged nor revalidated"""
+        manager = make_manager(neo4j=FailingNeo4j())
+        manager.neo4j.fail = True
+
+        body, etag = await manager.get_agent_context_cached("agent-1")
+        assert body is not None and etag is None
+
+        manager.neo4j.fail = False
+        body, etag = await manager.get_agent_context_cached("agent-1")
+
+        assert body is not None and etag is not None
+        assert manager.neo4j.queries == 2
+        assert manager.context_cache.get_metrics().not_modified == 0
+
+    async def test_wildcard_needs_an_existing_context(self):
+        """Test If-None-Match: * does not answer 304 for an unknown agent"""
+        manager = make_manager(neo4j=FakeNeo4j(known_ids={"agent-1"}))
+
+        first = await manager.get_agent_context_cached("missing", if_none_match="*")
+        second = await manager.get_agent_context_cached("missing", if_none_match="*")
+
+        assert first[0] is not None and first[1] is None
+        assert second[0] is not None
+        assert manager.neo4j.queries == 2
+
+        await manager.get_agent_context_cached("agent-1")
+        assert (await manager.get_agent_context_cached("agent-1", if_none_match="*"))[0] is None
@@ -0,0 +1,97 @@
+"""
+Unit tests for the analytics dashboard
+
+Covers loading every section with one _msearch request, keeping the result
+shape when a search fails and coalescing concurrent loads of the same time
+range.
+"""
+
+import asyncio
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+TIME_RANGE = {"gte": "2026-01-01T00:00:00", "lte": "2026-01-02T00:00:00"}
+
+
+class DashboardClient(FakeClient):
+    """Answers _msearch with one aggregation per search, optionally failing some indices."""
+
+    def __init__(self, failing=(), delay=0.0):
+        super().__init__(delay=delay)
+        self.failing = set(failing)
+
+    async def msearch(self, searches, **params):
+        self.requests.append(searches)
+        await asyncio.sleep(self.delay)
+        responses = []
+        for header in searches[::2]:
+            if header["index"] in self.failing:
+                responses.append({"error": {"type": "index_not_found_exception"}, "status": 404})
+            else:
+                responses.append({"aggregations": {"index": {"value": header["index"]}}, "status": 200})
+        return {"took": 3, "responses": responses}
+
+    async def search(self, **kwargs):
+        raise AssertionError("the dashboard must not issue single searches")
+
+
+class TestAnalyticsDashboard:
+    """Test the single-request, coalesced analytics dashboard"""
+
+    async def test_sections_are_loaded_with_one_msearch(self):
+        """Test every section comes from one _msearch request in the usual shape"""
+        client = DashboardClient()
+        manager = make_analytics(client)
+
+        data = await manager.get_analytics_dashboard_data(TIME_RANGE)
+
+        assert len(client.requests) == 1
+        assert len(client.requests[0]) == 12
+        assert data["workflow_analytics"] == {"index": {"value": "mabos_workflows"}}
+        assert data["agent_analytics"] == {"index": {"value": "mabos_agents"}}
+        assert data["system_health"] == {
+            "logs_analytics": {"index": {"value": "mabos_logs"}},
+            "performance_metrics": {"index": {"value": "mabos_metrics"}}
+        }
+        assert data["time_range"] == TIME_RANGE
+
+    async def test_failed_search_empties_only_its_section(self):
+        """Test a failing search leaves the other sections intact"""
+        manager = make_analytics(DashboardClient(failing={"mabos_users", "mabos_metrics"}))
+
+        data = await manager.get_analytics_dashboard_data(TIME_RANGE)
+
+        assert data["user_analytics"] == {}
+        assert data["system_health"] == {}
+        assert data["execution_analytics"] == {"index": {"value": "mabos_executions"}}
+
+    async def test_concurrent_loads_of_a_time_range_are_coalesced(self):
+        """Test identical concurrent requests share one _msearch and others do not"""
+        client = DashboardClient(delay=0.01)
+        manager = make_analytics(client)
+        other_range = {"gte": "2026-01-02T00:00:00", "lte": "2026-01-03T00:00:00"}
+
+        results = await asyncio.gather(
+            *[manager.get_analytics_dashboard_data(dict(TIME_RANGE)) for _ in range(5)],
+            manager.get_analytics_dashboard_data(other_range)
+        )
+
+        assert len(client.requests) == 2
+        assert all(result == results[0] for result in results[:5])
+        assert manager.dashboard_metrics.coalesced == 4
+
+        # A finished load is not reused
+        await manager.get_analytics_dashboard_data(TIME_RANGE)
+        assert len(client.requests) == 3
+
+    async def test_cancelled_caller_does_not_cancel_the_shared_load(self):
+        """Test the remaining callers still get the result when one caller is cancelled"""
+        client = DashboardClient(delay=0.02)
+        manager = make_analytics(client)
+
+        first = asyncio.ensure_future(manager.get_analytics_dashboard_data(TIME_RANGE))
+        second = asyncio.ensure_future(manager.get_analytics_dashboard_data(TIME_RANGE))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert (await second)["workflow_analytics"] == {"index": {"value": "mabos_workflows"}}
@@ -0,0 +1,223 @@
+"""
+Unit tests for analytics rollups
+
+Covers materializing hourly and daily rollups, answering the dashboard from
+rollups plus raw edge searches with the same totals as raw data, filling
+missing rollups from raw data, and caching per bucketed time range.
+"""
+
+from collections import defaultdict
+
+from app.core.analytics_rollups import (
+    DAY,
+    HOUR,
+    ROLLUP_SOURCES,
+    WATERMARK_KEY,
+    parse_time,
+    rollup_key,
+    to_iso,
+)
+
+from app.tests.unit.fakes import FakeClient, make_manager
+
+# 2026-03-10T12:00:00Z
+NOW = 1773144000
+
+
+class RollupClient(FakeClient):
+    """Evaluates rollup searches over in-memory documents and answers entity searches with a marker."""
+
+    def __init__(self, documents):
+        super().__init__()
+        self.documents = documents
+        self.ranges = []
+
+    async def msearch(self, searches, **params):
+        self.requests.append(searches)
+        return {"responses": [self.evaluate(header["index"], body) for header, body in zip(searches[::2], searches[1::2])]}
+
+    def evaluate(self, index, body):
+        source = index.split("_", 1)[1]
+        if "hours" not in body.get("aggs", {}):
+            return {"aggregations": {"index": index}}
+
+        field = ROLLUP_SOURCES[source]
+        ranges = [
+            (parse_time(clause["range"][field]["gte"]), parse_time(clause["range"][field]["lt"]))
+            for clause in body["query"]["bool"]["filter"][0]["bool"]["should"]
+        ]
+        self.ranges.append((source, ranges))
+
+        hours = defaultdict(list)
+        for document in self.documents[source]:
+            if any(low <= parse_time(document[field]) < high for low, high in ranges):
+                hours[int(parse_time(document[field]) // HOUR * HOUR)].append(document)
+        return {"aggregations": {"hours": {"buckets": [self.bucket(source, hour, hours[hour]) for hour in sorted(hours)]}}}
+
+    def bucket(self, source, hour, documents):
+        bucket = {"key": hour * 1000, "doc_count": len(documents)}
+        if source == "executions":
+            durations = [document["duration"] for document in documents]
+            bucket["success"] = {"doc_count": sum(document["success"] for document in documents)}
+            bucket["duration_sum"] = {"value": sum(durations)}
+            bucket["duration_count"] = {"value": len(durations)}
+        elif source == "logs":
+            bucket["errors"] = {"doc_count": sum(document["is_error"] for document in documents)}
+            services = defaultdict(list)
+            for document in documents:
+                services[document["service"]].append(document)
+            bucket["services"] = {"buckets": [
+                {"key": service, "doc_count": len(entries), "errors": {"doc_count": sum(entry["is_error"] for entry in entries)}}
+                for service, entries in services.items()
+            ]}
+        else:
+            names = defaultdict(list)
+            for document in documents:
+                names[document["metric_name"]].append(document["value"])
+            bucket["names"] = {"buckets": [
+                {"key": name, "doc_count": len(values), "count": {"value": len(values)}, "sum": {"value": sum(values)}, "max": {"value": max(values)}}
+                for name, values in names.items()
+            ]}
+        return bucket
+
+
+def make_documents():
+    """Three days of executions every 20 minutes, logs every 30 minutes and metrics every hour"""
+    documents = {"executions": [], "logs": [], "metrics": []}
+    for number, at in enumerate(range(NOW - 3 * DAY, NOW + HOUR, 20 * 60)):
+        documents["executions"].append({"started_at": to_iso(at), "success": number % 3 != 0, "duration": number % 7})
+    for number, at in enumerate(range(NOW - 3 * DAY, NOW + HOUR, 30 * 60)):
+        documents["logs"].append({"timestamp": to_iso(at), "service": ["api", "worker"][number % 2], "is_error": number % 5 == 0})
+    for number, at in enumerate(range(NOW - 3 * DAY, NOW + HOUR, HOUR)):
+        documents["metrics"].append({"timestamp": to_iso(at), "metric_name": "cpu_usage", "value": float(number % 100)})
+    return documents
+
+
+def make_rollup_manager(documents):
+    return make_manager(client=RollupClient(documents), analytics_rollups_enabled=True)
+
+
+def within(documents, field, start, end):
+    return [document for document in documents if start <= parse_time(document[field]) < end]
+
+
+class TestAnalyticsRollups:
+    """Test rollup materialization and rollup-backed dashboard answers"""
+
+    async def test_closed_hours_and_days_are_rolled_up(self):
+        """Test a pass rolls up every closed hour, completes daily rollups and moves the watermark"""
+        manager = make_rollup_manager(make_documents())
+        rollups = manager.analytics_rollups
+
+        report = await rollups.materialize(now=NOW)
+
+        # 12:00 minus the lateness leaves 11:00 as the last closed hour boundary
+        assert report["success"] is True
+        assert report["watermark"] == NOW - HOUR
+        assert report["hours"] == 7 * 24 - 1
+        day = NOW - 12 * HOUR - DAY
+        hourly = manager.redis.cache[rollup_key("executions", "hour", day + HOUR)]
+        assert hourly["count"] == 3
+        assert manager.redis.cache[rollup_key("executions", "day", day)]["count"] == 72
+        assert manager.redis.cache[WATERMARK_KEY] == {"end": NOW - HOUR}
+
+        # Nothing closed since, so the next pass queries nothing
+        again = await rollups.materialize(now=NOW + 60)
+        assert again["hours"] == 0
+        assert len(manager.elasticsearch_analytics.client.requests) == 1
+
+    async def test_dashboard_matches_raw_data_and_searches_only_edges(self):
+        """Test rollups plus edge searches give the raw totals with one _msearch"""
+        documents = make_documents()
+        manager = make_rollup_manager(documents)
+        await manager.analytics_rollups.materialize(now=NOW)
+        client = manager.elasticsearch_analytics.client
+        client.ranges.clear()
+
+        start, end = NOW - 2 * DAY - 90 * 60, NOW
+        data = await manager.elasticsearch_analytics.get_analytics_dashboard_data({"gte": to_iso(start), "lte": to_iso(end)})
+
+        assert len(client.requests) == 2
+        assert dict(client.ranges)["executions"] == [(start, start + 30 * 60), (NOW - HOUR, NOW)]
+
+        executions = within(documents["executions"], "started_at", start, end)
+        section = data["execution_analytics"]
+        assert section["total_executions"]["value"] == len(executions)
+        assert section["success_rate"]["doc_count"] == sum(document["success"] for document in executions)
+        assert section["avg_duration"]["value"] == sum(document["duration"] for document in executions) / len(executions)
+        assert sum(bucket["doc_count"] for bucket in section["executions_over_time"]["buckets"]) == len(executions)
+
+        logs = within(documents["logs"], "timestamp", start, end)
+        health = data["system_health"]
+        assert health["logs_analytics"]["error_rate"]["doc_count"] == sum(document["is_error"] for document in logs)
+        metrics = within(documents["metrics"], "timestamp", start, end)
+        cpu = health["performance_metrics"]["performance_metrics"]["buckets"][0]
+        assert cpu["doc_count"] == len(metrics)
+        assert cpu["max_value"]["value"] == max(document["value"] for document in metrics)
+
+        assert data["workflow_analytics"] == {"index": "mabos_workflows"}
+
+    async def test_missing_rollups_are_searched_raw(self):
+        """Test a bucket without a rollup is covered by the raw search instead"""
+        documents = make_documents()
+        manager = make_rollup_manager(documents)
+        await manager.analytics_rollups.materialize(now=NOW)
+        missing_hour = NOW - 5 * HOUR
+        del manager.redis.cache[rollup_key("executions", "hour", missing_hour)]
+        client = manager.elasticsearch_analytics.client
+        client.ranges.clear()
+
+        start, end = NOW - 10 * HOUR, NOW
+        data = await manager.elasticsearch_analytics.get_analytics_dashboard_data({"gte": to_iso(start), "lte": to_iso(end)})
+
+        assert dict(client.ranges)["executions"] == [(missing_hour, missing_hour + HOUR), (NOW - HOUR, NOW)]
+        assert data["execution_analytics"]["total_executions"]["value"] == len(within(documents["executions"], "started_at", start, end))
+
+    async def test_results_are_cached_per_bucketed_range(self):
+        """Test ranges rounding to the same bucket share one cached result"""
+        manager = make_rollup_manager(make_documents())
+        await manager.analytics_rollups.materialize(now=NOW)
+        analytics = manager.elasticsearch_analytics
+
+        first = await analytics.get_analytics_dashboard_data({"gte": to_iso(NOW - 6 * HOUR + 10), "lte": to_iso(NOW - 20)})
+        second = await analytics.get_analytics_dashboard_data({"gte": to_iso(NOW - 6 * HOUR + 30), "lte": to_iso(NOW - 5)})
+
+        assert first == second
+        assert len(analytics.client.requests) == 2
+        assert manager.analytics_rollups.get_metrics().dashboard_cache_hits == 1
+        cache_key = f"analytics:dashboard:{NOW - 6 * HOUR}:{NOW}"
+        assert manager.redis.ttls[cache_key] == manager.config.analytics_dashboard_cache_max_ttl
+
+    async def test_results_with_failed_sections_are_not_cached(self):
+        """Test a dashboard with a failed search is answered but searched again next time"""
+        manager = make_rollup_manager(make_documents())
+        await manager.analytics_rollups.materialize(now=NOW)
+        analytics = manager.elasticsearch_analytics
+        evaluate = analytics.client.evaluate
+        analytics.client.evaluate = lambda index, body: (
+            {"error": {"type": "search_phase_execution_exception"}} if index.endswith("_users") else evaluate(index, body)
+        )
+        time_range = {"gte": to_iso(NOW - 6 * HOUR), "lte": to_iso(NOW)}
+
+        degraded = await analytics.get_analytics_dashboard_data(time_range)
+        analytics.client.evaluate = evaluate
+        recovered = await analytics.get_analytics_dashboard_data(time_range)
+
+        assert degraded["user_analytics"] == {}
+        assert recovered["user_analytics"] == {"index": "mabos_users"}
+        assert recovered["execution_analytics"] == degraded["execution_analytics"]
+        assert len(analytics.client.requests) == 3
+        metrics = manager.analytics_rollups.get_metrics()
+        assert metrics.dashboard_degraded == 1 and metrics.dashboard_cache_hits == 0
+        assert f"analytics:dashboard:{NOW - 6 * HOUR}:{NOW}" in manager.redis.cache
+
+    async def test_date_math_ranges_fall_back_to_raw_searches(self):
+        """Test ranges that cannot be mapped onto buckets use the raw dashboard searches"""
+        manager = make_rollup_manager(make_documents())
+        client = manager.elasticsearch_analytics.client
+
+        data = await manager.elasticsearch_analytics.get_analytics_dashboard_data({"gte": "now-1h", "lte": "now"})
+
+        assert data["execution_analytics"] == {"index": "mabos_executions"}
+        assert len(client.requests[0]) == 12
+        assert manager.analytics_rollups.get_metrics().dashboard_fallbacks == 1
@@ -0,0 +1,200 @@
+"""
+Unit tests for vectorized batch enrichment and analytics reindexing
+
+Covers batch scores equal to the per-document helpers, including missing
+fields and edge values, and reindexing from a source index and from
+Postgres through _bulk, idempotently.
+"""
+
+import random
+
+import pytest
+
+from app.core.batch_enrichment import enrich_agents, enrich_executions, enrich_metrics
+from app.core.database import DatabaseConfig
+from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager
+
+from app.tests.unit.fakes import FakeClient, FakePostgres, make_manager
+
+INDEXED_AT = "2026-03-10T12:00:00"
+
+
+def random_executions(rng, count):
+    documents = []
+    for number in range(count):
+        document = {"execution_id": f"e{number}", "status": rng.choice(["completed", "failed", "running"])}
+        if rng.random() < 0.9:
+            document["duration"] = rng.uniform(0, 200)
+        if rng.random() < 0.9:
+            document["step_count"] = rng.choice([0, 1, 3, 8, 20])
+        if rng.random() < 0.9:
+            document["completed_steps"] = rng.randint(0, 20)
+        if rng.random() < 0.9:
+            document["started_at"] = f"2026-03-{rng.randint(1, 28):02d}T10:00:00Z"
+        documents.append(document)
+    return documents
+
+
+def random_agents(rng, count):
+    documents = []
+    for number in range(count):
+        metrics = {}
+        for field, high in (("success_rate", 1), ("avg_response_time", 30), ("uptime_percentage", 1), ("error_count", 20), ("tasks_completed", 50)):
+            if rng.random() < 0.85:
+                metrics[field] = rng.uniform(0, high) if field in ("success_rate", "avg_response_time", "uptime_percentage") else rng.randint(0, high)
+        document = {"agent_id": f"a{number}"}
+        if rng.random() < 0.9:
+            document["performance_metrics"] = metrics
+        documents.append(document)
+    return documents
+
+
+def random_metrics(rng, count):
+    return [
+        {"metric_type": rng.choice(["cpu_usage", "memory_usage", "latency"]), "value": rng.choice([70, 90, rng.uniform(0, 100)])}
+        for _ in range(count)
+    ]
+
+
+class KeysetPostgres(FakePostgres):
+    """Answers keyset-paged queries over in-memory rows."""
+
+    def __init__(self, rows, key):
+        super().__init__()
+        self.source = sorted(rows, key=lambda row: row[key])
+        self.key = key
+
+    async def execute_query(self, query, params=None):
+        self.queries.append(params)
+        rows = [row for row in self.source if row[self.key] > params["after"]]
+        return rows[:params["limit"]]
+
+
+class StoringClient(FakeClient):
+    """Keeps written documents by index and id; a create of an existing id conflicts like in a data stream."""
+
+    def __init__(self, hits=()):
+        super().__init__(hits)
+        self.stored = {}
+
+    async def bulk(self, operations):
+        self.requests.append(list(zip(operations[::2], operations[1::2])))
+        items = []
+        for action, source in zip(operations[::2], operations[1::2]):
+            (op_type, meta), = action.items()
+            key = (meta["_index"], meta.get("_id") or f"auto-{len(self.stored)}")
+            status = 409 if op_type == "create" and key in self.stored else 201
+            self.stored.setdefault(key, source)
+            items.append({op_type: {"status": status}})
+        return {"errors": any(item[next(iter(item))]["status"] >= 300 for item in items), "items": items}
+
+
+def make_reindex_manager(client, postgres=None):
+    return make_manager(
+        client=client, postgres=postgres, analytics_reindex_batch_size=10, elasticsearch_scan_page_size=7
+    )
+
+
+class TestBatchEnrichment:
+    """Test vectorized enrichment against the per-document helpers"""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_batch_scores_match_per_document_helpers(self, seed):
+        """Test every batch score equals the score of the per-document helper"""
+        rng = random.Random(seed)
+        manager = ElasticsearchAnalyticsManager(DatabaseConfig())
+
+        executions = random_executions(rng, 300)
+        for document, enriched in zip(executions, enrich_executions(executions, INDEXED_AT)):
+            assert enriched["efficiency_score"] == pytest.approx(manager._calculate_execution_efficiency(document))
+            assert enriched["success"] == (document["status"] == "completed")
+            assert enriched["execution_date"] == document.get("started_at", INDEXED_AT)[:10]
+
+        agents = random_agents(rng, 300)
+        for document, enriched in zip(agents, enrich_agents(agents, INDEXED_AT)):
+            assert enriched["intelligence_score"] == pytest.approx(manager._calculate_agent_intelligence(document))
+            assert enriched["reliability_score"] == pytest.approx(manager._calculate_agent_reliability(document))
+
+        metrics = random_metrics(rng, 300)
+        for document, enriched in zip(metrics, enrich_metrics(metrics, INDEXED_AT)):
+            assert enriched["anomaly_score"] == manager._calculate_anomaly_score(document)
+
+    def test_enriched_documents_match_per_document_enrichment(self):
+        """Test a batch carries the same fields and plain Python values as _enrich_execution"""
+        manager = ElasticsearchAnalyticsManager(DatabaseConfig())
+        document = {"execution_id": "e1", "status": "completed", "started_at": "2026-03-10T12:00:00Z", "duration": 5, "step_count": 2, "completed_steps": 2}
+
+        enriched, = enrich_executions([document], INDEXED_AT)
+        expected = {**manager._enrich_execution(document), "indexed_at": INDEXED_AT}
+
+        assert enriched == expected
+        assert type(enriched["efficiency_score"]) is float
+
+
+class TestAnalyticsReindex:
+    """Test reindexing through the vectorized batches"""
+
+    async def test_reindex_from_source_index(self):
+        """Test every source document is re-enriched into the target index with its id"""
+        hits = [{"_id": f"e{number}", "_source": {"status": "completed", "step_count": 4, "completed_steps": number % 5}, "sort": [number]} for number in range(23)]
+        client = FakeClient(hits)
+        manager = make_reindex_manager(client)
+
+        report = await manager.analytics_reindexer.reindex_index("executions", "mabos_executions_v1")
+
+        assert report["success"] is True
+        assert report["documents"] == report["indexed"] == 23
+        assert report["batches"] == 3
+        assert client.opened == ["mabos_executions_v1"]
+        written = client.written()
+        assert sorted(action["index"]["_id"] for action, _ in written) == sorted(hit["_id"] for hit in hits)
+        assert all(action["index"]["_index"] == "mabos_executions" for action, _ in written)
+        assert {source["execution_id"]: source["efficiency_score"] for _, source in written}["e3"] == pytest.approx(82.5)
+
+    async def test_backfill_from_postgres(self):
+        """Test metric rows are keyset-paged, scored and appended to the metrics data stream"""
+        rows = [
+            {"metric_id": f"00000000-0000-0000-0000-{number:012d}", "metric_type": "cpu_usage", "value": float(number), "timestamp": "2026-03-10T12:00:00Z"}
+            for number in range(95, 69, -1)
+        ]
+        client = FakeClient()
+        manager = make_reindex_manager(client, KeysetPostgres(rows, "metric_id"))
+
+        report = await manager.analytics_reindexer.reindex_postgres("metrics")
+
+        assert report["documents"] == 26
+        assert [params["after"][-2:] for params in manager.postgres.queries] == ["00", "79", "89"]
+        written = client.written()
+        assert all(list(action) == ["create"] for action, _ in written)
+        scores = {source["value"]: source["anomaly_score"] for _, source in written}
+        assert scores[95.0] == 0.9 and scores[80.0] == 0.5 and scores[70.0] == 0.1
+        assert written[0][1]["@timestamp"] == "2026-03-10T12:00:00Z"
+
+    async def test_rerun_does_not_duplicate_metrics(self):
+        """Test metrics reindexed twice, from Postgres or from an index, keep one document each"""
+        rows = [
+            {"metric_id": f"00000000-0000-0000-0000-{number:012d}", "metric_type": "latency", "value": 1.0, "timestamp": "2026-03-10T12:00:00Z"}
+            for number in range(1, 13)
+        ]
+        hits = [{"_id": f"m{number}", "_source": {"metric_type": "latency", "value": 1.0}, "sort": [number]} for number in range(12)]
+        client = StoringClient(hits)
+        manager = make_reindex_manager(client, KeysetPostgres(rows, "metric_id"))
+        reindexer = manager.analytics_reindexer
+
+        first = await reindexer.reindex_postgres("metrics")
+        second = await reindexer.reindex_postgres("metrics")
+        from_index = [await reindexer.reindex_index("metrics", "mabos_metrics_v1") for _ in range(2)]
+
+        assert first["success"] and second["success"] and all(report["success"] for report in from_index)
+        assert (first["duplicates"], second["duplicates"]) == (0, 12)
+        assert from_index[1]["duplicates"] == 12
+        assert sorted(doc_id for _, doc_id in client.stored) == sorted([row["metric_id"] for row in rows] + [hit["_id"] for hit in hits])
+        assert client.stored[("mabos_metrics", "m3")]["metric_id"] == "m3"
+
+    async def test_unknown_postgres_source(self):
+        """Test index types without a Postgres table are refused"""
+        manager = make_reindex_manager(FakeClient())
+
+        report = await manager.analytics_reindexer.reindex_postgres("agents")
+
+        assert report["success"] is False
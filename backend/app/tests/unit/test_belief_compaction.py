@@ -0,0 +1,237 @@
+"""
+Unit tests for belief compaction
+
+Covers bounded batching, duplicate merging, expiry, archiving of removed
+beliefs and agent version invalidation.
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+from neo4j.time import DateTime
+
+from app.core.belief_compaction import archive_row
+
+from app.tests.unit.fakes import FakeNeo4j, FakePostgres, make_manager
+
+
+class CompactionNeo4j(FakeNeo4j):
+    """In-memory belief store, keyed by agent, implementing the compaction operations."""
+
+    def __init__(self, beliefs):
+        super().__init__()
+        self.beliefs = beliefs
+        self.calls = []
+
+    async def get_agent_ids_page(self, after, limit):
+        return [agent_id for agent_id in sorted(self.beliefs) if after is None or agent_id > after][:limit]
+
+    async def decay_agent_beliefs(self, agent_ids, half_lives, default_half_life, now, limit):
+        self.calls.append("decay")
+        decayed = {}
+        for agent_id in agent_ids:
+            for belief in self.beliefs[agent_id]:
+                if belief.get("decayed_at") != now and sum(decayed.values()) < limit:
+                    belief["confidence"] /= 2
+                    belief["decayed_at"] = now
+                    decayed[agent_id] = decayed.get(agent_id, 0) + 1
+        return decayed
+
+    async def find_duplicate_beliefs(self, agent_ids, limit):
+        self.calls.append("find_duplicates")
+        groups = []
+        for agent_id in agent_ids:
+            seen = {}
+            for belief in self.beliefs[agent_id]:
+                seen.setdefault((belief["category"], belief["content"]), []).append(belief)
+            for beliefs in seen.values():
+                if len(beliefs) > 1:
+                    groups.append({"agent_id": agent_id, "keeper_id": beliefs[0]["id"], "duplicates": beliefs[1:]})
+        return groups[:limit]
+
+    async def merge_duplicate_beliefs(self, merges):
+        self.calls.append("merge")
+        merged = 0
+        for merge in merges:
+            for beliefs in self.beliefs.values():
+                keeper = next((belief for belief in beliefs if belief["id"] == merge["keeper_id"]), None)
+                if keeper is None:
+                    continue
+                duplicates = [belief for belief in beliefs if belief["id"] in merge["duplicate_ids"]]
+                keeper["observation_count"] = keeper.get("observation_count", 1) + len(duplicates)
+                beliefs[:] = [belief for belief in beliefs if belief not in duplicates]
+                merged += len(duplicates)
+        return merged
+
+    async def find_expired_beliefs(self, agent_ids, ttls, default_ttl, min_confidence, now, limit):
+        self.calls.append("find_expired")
+        return [
+            {"agent_id": agent_id, "belief": belief}
+            for agent_id in agent_ids
+            for belief in self.beliefs[agent_id]
+            if belief["confidence"] < min_confidence
+        ][:limit]
+
+    async def delete_beliefs(self, belief_ids):
+        self.calls.append("delete")
+        deleted = 0
+        for agent_id, beliefs in self.beliefs.items():
+            kept = [belief for belief in beliefs if belief["id"] not in belief_ids]
+            deleted += len(beliefs) - len(kept)
+            self.beliefs[agent_id] = kept
+        return deleted
+
+
+class ArchivePostgres(FakePostgres):
+    """Rejects rows PostgreSQL would: non-UUID agent ids cast to uuid, and agents listed in failing."""
+
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+        self.statements = []
+
+    async def execute_many(self, query, rows):
+        self.statements.append([row["agent_id"] for row in rows])
+        for row in rows:
+            if row["agent_id"] in self.failing:
+                raise RuntimeError(f"archive of {row['agent_id']} failed")
+            if "AS uuid" in query:
+                uuid.UUID(row["agent_id"])
+        return await super().execute_many(query, rows)
+
+
+def belief(belief_id, content, confidence=0.9):
+    return {"id": belief_id, "category": "perception", "content": content, "confidence": confidence, "source": "test"}
+
+
+def make_compaction_manager(beliefs, archive_fails=False, **settings):
+    return make_manager(neo4j=CompactionNeo4j(beliefs), postgres=FakePostgres(fail=archive_fails), **settings)
+
+
+class TestBeliefCompaction:
+    """Test the belief compaction job"""
+
+    async def test_duplicates_merged_in_bounded_batches(self):
+        """Test every duplicate group is merged, at most batch_size groups per transaction"""
+        beliefs = {"agent-1": [belief(f"b{i}", f"content-{i % 5}") for i in range(20)]}
+        manager = make_compaction_manager(beliefs, belief_compaction_batch_size=2)
+
+        report = await manager.belief_compaction.run_once()
+
+        assert report["success"]
+        assert report["merged"] == 15
+        assert len(beliefs["agent-1"]) == 5
+        assert all(item["observation_count"] == 4 for item in beliefs["agent-1"])
+        assert manager.neo4j.calls.count("merge") == 3
+        assert manager.redis.bumped == ["agent:version:agent-1"]
+
+    async def test_decayed_beliefs_below_floor_expire(self):
+        """Test decay runs before expiry, so beliefs decayed below the floor are removed"""
+        beliefs = {
+            "agent-1": [belief("strong", "a", confidence=0.9), belief("weak", "b", confidence=0.3)],
+            "agent-2": [belief("other", "c", confidence=0.9)]
+        }
+        manager = make_compaction_manager(
+            beliefs,
+            belief_decay_half_life_days=30.0,
+            belief_min_confidence=0.2,
+            belief_compaction_agent_batch_size=1
+        )
+
+        report = await manager.belief_compaction.run_once()
+
+        assert report["agents"] == 2
+        assert report["decayed"] == 3
+        assert report["expired"] == 1
+        assert [item["id"] for item in beliefs["agent-1"]] == ["strong"]
+        assert sorted(manager.redis.bumped) == ["agent:version:agent-1", "agent:version:agent-2"]
+
+    async def test_removed_beliefs_archived(self):
+        """Test merged and expired beliefs are archived before removal"""
+        beliefs = {"agent-1": [belief("b1", "a"), belief("b2", "a"), belief("b3", "b", confidence=0.1)]}
+        manager = make_compaction_manager(beliefs, belief_min_confidence=0.2, belief_compaction_archive=True)
+
+        report = await manager.belief_compaction.run_once()
+
+        archived = manager.postgres.rows
+        assert report["archived"] == 2
+        assert [json.loads(row["evidence"])["reason"] for row in archived] == ["merged", "expired"]
+        assert [row["belief_id"] for row in archived] == ["b2", "b3"]
+        assert [row["reason"] for row in archived] == ["merged", "expired"]
+
+    async def test_archive_accepts_neo4j_agent_ids(self):
+        """Test beliefs of agents with non-UUID Neo4j ids are archived and removed"""
+        beliefs = {
+            "agent_workflow_001": [belief("b1", "a"), belief("b2", "a")],
+            "biz-1/ceo": [belief("b3", "b", confidence=0.1)]
+        }
+        postgres = ArchivePostgres()
+        manager = make_manager(neo4j=CompactionNeo4j(beliefs), postgres=postgres,
+                               belief_min_confidence=0.2, belief_compaction_archive=True)
+
+        report = await manager.belief_compaction.run_once()
+
+        assert report["archived"] == 2
+        assert report["failed_batches"] == 0
+        assert sorted(row["agent_id"] for row in postgres.rows) == ["agent_workflow_001", "biz-1/ceo"]
+        assert [item["id"] for item in beliefs["agent_workflow_001"]] == ["b1"]
+        assert beliefs["biz-1/ceo"] == []
+
+    async def test_archive_failure_is_isolated_per_agent(self):
+        """Test an agent whose archive fails keeps its beliefs without blocking the rest of the batch"""
+        beliefs = {
+            "agent-1": [belief("b1", "a"), belief("b2", "a"), belief("b3", "b", confidence=0.1)],
+            "agent-2": [belief("b4", "a"), belief("b5", "a"), belief("b6", "b", confidence=0.1)]
+        }
+        postgres = ArchivePostgres(failing={"agent-1"})
+        manager = make_manager(neo4j=CompactionNeo4j(beliefs), postgres=postgres,
+                               belief_min_confidence=0.2, belief_compaction_archive=True)
+
+        report = await manager.belief_compaction.run_once()
+
+        assert report["merged"] == 1
+        assert report["expired"] == 1
+        assert report["archive_failures"] == 1
+        assert len(beliefs["agent-1"]) == 3
+        assert [item["id"] for item in beliefs["agent-2"]] == ["b4"]
+        assert all(len(set(agent_ids)) == 1 for agent_ids in postgres.statements)
+        assert "agent-1" not in [agent_id for agent_ids in postgres.statements[1:] for agent_id in agent_ids]
+        assert manager.redis.bumped == ["agent:version:agent-2"]
+
+    async def test_archive_failure_keeps_beliefs(self):
+        """Test beliefs are not removed when they cannot be archived"""
+        beliefs = {"agent-1": [belief("b1", "a"), belief("b2", "a")]}
+        manager = make_compaction_manager(beliefs, belief_compaction_archive=True, archive_fails=True)
+
+        report = await manager.belief_compaction.run_once()
+
+        assert report["merged"] == 0
+        assert report["archive_failures"] == 1
+        assert len(beliefs["agent-1"]) == 2
+        assert "merge" not in manager.neo4j.calls
+        assert manager.belief_compaction.get_metrics().archive_failures == 1
+
+    async def test_metrics_record_throughput(self):
+        """Test run totals and throughput are reported in the job metrics"""
+        beliefs = {"agent-1": [belief("b1", "a"), belief("b2", "a")]}
+        manager = make_compaction_manager(beliefs)
+
+        await manager.belief_compaction.run_once()
+        metrics = manager.belief_compaction.get_metrics()
+
+        assert metrics.runs == 1
+        assert metrics.beliefs_merged == 1
+        assert metrics.last_run_beliefs_per_second > 0
+
+    def test_archive_row_converts_neo4j_types(self):
+        """Test archive rows carry native datetimes and clamped confidence"""
+        created = DateTime(2025, 1, 1, 12, 0, 0, 0, tzinfo=timezone.utc)
+        removed = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+        row = archive_row("agent-1", {**belief("b1", "a", confidence=1.004), "created_at": created}, "expired", removed)
+
+        assert row["created_at"] == datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+        assert row["archived_at"] == removed
+        assert (row["belief_id"], row["reason"]) == ("b1", "expired")
+        assert row["confidence"] == 1.0
@@ -0,0 +1,117 @@
+"""
+Unit tests for near-duplicate belief detection
+
+Covers MinHash similarity, folding on the bulk and buffered belief paths,
+rebuilding and refreshing sketches from Redis and recovery from stale fold targets.
+"""
+
+from app.core.belief_dedup import MinHasher, similarity
+
+from app.tests.unit.fakes import FakeNeo4j, FakeRedis, make_manager
+
+
+def belief(content, agent_id="agent-1", category="market", confidence=0.6):
+    return {"agent_id": agent_id, "category": category, "content": content, "confidence": confidence}
+
+
+class TestBeliefDedup:
+    """Test ingest-time near-duplicate folding"""
+
+    def test_minhash_similarity_tracks_text_overlap(self):
+        """Test near-identical texts score high and unrelated texts score low"""
+        hasher = MinHasher()
+        base = hasher.signature("Customer demand for premium coffee is rising in Q3")
+
+        assert similarity(base, hasher.signature("customer demand for premium coffee is rising in Q3!")) == 1.0
+        assert similarity(base, hasher.signature("Customer demand for premium coffee rising in Q3")) > 0.8
+        assert similarity(base, hasher.signature("Supplier lead times doubled for packaging")) < 0.3
+
+    async def test_bulk_ingestion_folds_near_duplicates(self):
+        """Test re-asserted beliefs fold into the first one and the dedup rate is reported"""
+        manager = make_manager(belief_dedup_enabled=True)
+
+        report = await manager.ingest_beliefs([
+            belief("Customer demand for premium coffee is rising in Q3"),
+            belief("Customer demand for premium coffee is rising in Q3.", confidence=0.9),
+            belief("customer demand for premium coffee rising in Q3"),
+            belief("Supplier lead times doubled for packaging"),
+        ])
+
+        assert report["accepted"] == 4
+        assert report["deduplicated"] == 2
+        assert report["dedup_rate"] == 0.5
+        assert len(manager.neo4j.beliefs) == 2
+
+        kept = next(item for item in manager.neo4j.beliefs.values() if item["content"].startswith("Customer"))
+        assert kept["observation_count"] == 3
+        assert kept["confidence"] == 0.9
+        assert manager.belief_dedup.get_metrics().dedup_rate == 0.5
+
+    async def test_categories_and_agents_are_not_folded_together(self):
+        """Test only beliefs of the same agent and category are compared"""
+        manager = make_manager(belief_dedup_enabled=True)
+
+        report = await manager.ingest_beliefs([
+            belief("Inventory is low"),
+            belief("Inventory is low", category="operations"),
+            belief("Inventory is low", agent_id="agent-2"),
+        ])
+
+        assert report["deduplicated"] == 0
+        assert len(manager.neo4j.beliefs) == 3
+
+    async def test_sketches_rebuilt_from_redis(self):
+        """Test a fresh process folds into beliefs sketched by an earlier one"""
+        redis = FakeRedis()
+        neo4j = FakeNeo4j()
+        await make_manager(redis=redis, neo4j=neo4j, belief_dedup_enabled=True).ingest_beliefs([belief("Inventory of green beans is low")])
+
+        restarted = make_manager(redis=redis, neo4j=neo4j, belief_dedup_enabled=True)
+        report = await restarted.ingest_beliefs([belief("Inventory of green beans is low!")])
+
+        assert report["deduplicated"] == 1
+        assert len(neo4j.beliefs) == 1
+        assert restarted.belief_dedup.get_metrics().rebuilds == 1
+
+    async def test_indexes_see_sketches_written_by_other_processes(self):
+        """Test a loaded index is refreshed once another process has written sketches of the agent"""
+        redis = FakeRedis()
+        neo4j = FakeNeo4j()
+        first = make_manager(redis=redis, neo4j=neo4j, belief_dedup_enabled=True)
+        second = make_manager(redis=redis, neo4j=neo4j, belief_dedup_enabled=True)
+        await first.ingest_beliefs([belief("Supplier lead times doubled for packaging")])
+        await second.ingest_beliefs([belief("Inventory of green beans is low")])
+
+        report = await first.ingest_beliefs([belief("Inventory of green beans is low!")])
+        repeated = await second.ingest_beliefs([belief("Supplier lead times doubled for packaging.")])
+
+        assert report["deduplicated"] == 1 and repeated["deduplicated"] == 1
+        assert len(neo4j.beliefs) == 2
+        assert first.belief_dedup.get_metrics().refreshes == 1
+
+    async def test_stale_fold_target_creates_new_belief(self):
+        """Test a fold into a belief removed since it was sketched creates the belief instead"""
+        manager = make_manager(belief_dedup_enabled=True)
+        await manager.ingest_beliefs([belief("Inventory of green beans is low")])
+        manager.neo4j.beliefs.clear()
+
+        report = await manager.ingest_beliefs([belief("Inventory of green beans is low")])
+
+        assert report["accepted"] == 1
+        assert report["deduplicated"] == 0
+        assert len(manager.neo4j.beliefs) == 1
+        assert manager.belief_dedup.get_metrics().stale_folds == 1
+        assert list(manager.redis.hashes["belief:sketches:agent-1"]) == list(manager.neo4j.beliefs)
+
+    async def test_buffered_single_writes_are_deduplicated(self):
+        """Test the group-committed single belief path folds near-duplicates"""
+        manager = make_manager(belief_dedup_enabled=True)
+        data = {"category": "market", "content": "Competitor opened a new store", "confidence": 0.7, "source": "test", "description": ""}
+
+        first = await manager.create_agent_belief("agent-1", dict(data))
+        second = await manager.create_agent_belief("agent-1", dict(data))
+        await manager.belief_buffer.close()
+
+        assert "deduplicated" not in first
+        assert second["deduplicated"] is True
+        assert second["belief"]["observation_count"] == 2
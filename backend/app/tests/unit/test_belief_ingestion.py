@@ -0,0 +1,63 @@
+"""
+Unit tests for bulk belief ingestion
+
+Covers per-item validation, agent-grouped chunking, rejection of beliefs
+for unknown agents and group commit of single belief writes.
+"""
+
+import asyncio
+
+
+from app.tests.unit.fakes import FakeNeo4j, make_manager
+
+
+def belief(agent_id, confidence=0.9):
+    return {"agent_id": agent_id, "category": "perception", "content": "seen", "confidence": confidence}
+
+
+def belief_data():
+    return {"category": "perception", "content": "seen", "confidence": 0.9, "source": "test", "description": ""}
+
+
+class TestBeliefIngestion:
+    """Test bulk belief ingestion"""
+
+    async def test_beliefs_are_grouped_by_agent_and_chunked(self):
+        """Test rows are agent-contiguous and split into chunks"""
+        manager = make_manager(neo4j=FakeNeo4j({"a", "b"}), belief_bulk_chunk_size=3)
+        beliefs = [belief("a"), belief("b"), belief("a"), belief("b"), belief("a")]
+
+        report = await manager.ingest_beliefs(beliefs)
+
+        assert report["accepted"] == 5
+        assert report["chunks"] == 2
+        written = [row["agent_id"] for chunk in manager.neo4j.chunks for row in chunk]
+        assert written == ["a", "a", "a", "b", "b"]
+        assert sorted(manager.redis.bumped) == ["agent:version:a", "agent:version:b"]
+
+    async def test_invalid_and_unknown_agent_beliefs_are_rejected(self):
+        """Test each bad belief is reported by index without failing the batch"""
+        manager = make_manager(neo4j=FakeNeo4j({"a"}))
+        beliefs = [belief("a"), belief("a", confidence=1.5), belief("ghost"), {"agent_id": "a"}]
+
+        report = await manager.ingest_beliefs(beliefs)
+
+        assert report["accepted"] == 1
+        assert report["rejected"] == 3
+        assert [rejection["index"] for rejection in report["rejections"]] == [1, 2, 3]
+        assert report["rejections"][1]["error"] == "Agent not found"
+
+    async def test_single_belief_writes_are_group_committed(self):
+        """Test concurrent single writes share one transaction and version bump per agent"""
+        manager = make_manager(neo4j=FakeNeo4j({"a", "b"}))
+
+        results = await asyncio.gather(
+            manager.create_agent_belief("a", belief_data()),
+            manager.create_agent_belief("a", belief_data()),
+            manager.create_agent_belief("b", belief_data()),
+            manager.create_agent_belief("ghost", belief_data())
+        )
+
+        assert len(manager.neo4j.chunks) == 1
+        assert [result is not None for result in results] == [True, True, True, False]
+        assert sorted(manager.redis.bumped) == ["agent:version:a", "agent:version:b"]
@@ -0,0 +1,139 @@
+"""
+Unit tests for the Elasticsearch bulk indexer
+
+Covers flushing on size, bytes and interval, bounding in-flight requests,
+retrying only rejected items, backpressure on enqueue and the analytics
+manager queueing its documents on the indexer.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.bulk_indexer import BulkIndexer, BulkIndexerOverloaded
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+
+def make_indexer(client, **settings):
+    settings.setdefault("flush_interval", 60.0)
+    settings.setdefault("retry_base_delay", 0.0)
+    return BulkIndexer(client, **settings)
+
+
+class TestBulkIndexer:
+    """Test buffered _bulk indexing with backpressure and retries"""
+
+    async def test_full_buffer_is_shipped_in_one_request(self):
+        """Test a buffer reaching max_docs is sent as one _bulk request per index"""
+        client = FakeClient()
+        indexer = make_indexer(client, max_docs=3)
+
+        for number in range(3):
+            await indexer.add("mabos_logs", {"n": number})
+        await indexer.add("mabos_metrics", {"n": 9}, doc_id="m-1")
+        await asyncio.sleep(0)
+
+        assert len(client.requests) == 1
+        assert [action["index"]["_index"] for action, _ in client.requests[0]] == ["mabos_logs"] * 3
+
+        await indexer.flush()
+
+        assert client.requests[1] == [({"index": {"_index": "mabos_metrics", "_id": "m-1"}}, {"n": 9})]
+        metrics = indexer.get_metrics()
+        assert metrics.indexed == 4 and metrics.queue_depth == 0 and metrics.requests == 2
+        await indexer.close()
+
+    async def test_buffers_flush_on_bytes_and_interval(self):
+        """Test a buffer is shipped once it holds max_bytes or has waited the flush interval"""
+        client = FakeClient()
+        indexer = make_indexer(client, max_docs=1000, max_bytes=50)
+
+        await indexer.add("mabos_logs", {"message": "x" * 60})
+        await asyncio.sleep(0)
+        assert len(client.requests) == 1
+
+        timed = make_indexer(client, max_docs=1000, flush_interval=0.01)
+        await timed.add("mabos_logs", {"message": "short"})
+        await asyncio.sleep(0.05)
+
+        assert len(client.requests) == 2
+        await indexer.close()
+        await timed.close()
+
+    async def test_only_rejected_items_are_retried(self):
+        """Test items rejected with 429 are resent alone and other errors are final"""
+        client = FakeClient(statuses=[[201, 429, 400], [201]])
+        indexer = make_indexer(client, max_docs=3)
+
+        for number in range(3):
+            await indexer.add("mabos_logs", {"n": number})
+        await indexer.flush()
+
+        assert [source for _, source in client.requests[1]] == [{"n": 1}]
+        metrics = indexer.get_metrics()
+        assert metrics.indexed == 2 and metrics.retried == 1 and metrics.failed == 1
+        assert metrics.queue_depth == 0
+        await indexer.close()
+
+    async def test_items_are_dropped_after_max_retries(self):
+        """Test a document rejected on every attempt is given up after max_retries"""
+        client = FakeClient(statuses=[[503]] * 3)
+        indexer = make_indexer(client, max_docs=1, max_retries=2)
+
+        await indexer.add("mabos_logs", {"n": 1})
+        await indexer.flush()
+
+        assert len(client.requests) == 3
+        assert indexer.get_metrics().failed == 1
+
+    async def test_in_flight_requests_are_bounded(self):
+        """Test no more than max_in_flight bulk requests run at once"""
+        client = FakeClient(delay=0.01)
+        indexer = make_indexer(client, max_docs=1, max_in_flight=2)
+
+        for number in range(6):
+            await indexer.add(f"index-{number}", {"n": number})
+        await indexer.flush()
+
+        assert client.max_in_flight == 2
+        assert len(client.documents()) == 6
+
+    async def test_full_indexer_holds_writers_back(self):
+        """Test writers wait for room and time out when the indexer stays full"""
+        client = FakeClient(delay=0.05)
+        indexer = make_indexer(client, max_docs=1, max_pending=1, enqueue_timeout=0.01)
+
+        await indexer.add("mabos_logs", {"n": 1})
+        assert indexer.add_nowait("mabos_logs", {"n": 2}) is False
+        with pytest.raises(BulkIndexerOverloaded):
+            await indexer.add("mabos_logs", {"n": 3})
+
+        indexer.enqueue_timeout = 1.0
+        await indexer.add("mabos_logs", {"n": 4})
+        await indexer.close()
+
+        assert client.documents() == [{"n": 1}, {"n": 4}]
+        assert indexer.get_metrics().rejected == 2
+
+    async def test_analytics_manager_queues_documents(self):
+        """Test index_* methods go through the bulk indexer and close drains it"""
+        client = FakeClient()
+        manager = make_analytics(client, elasticsearch_bulk_flush_interval=60.0)
+
+        assert await manager.index_log_entry({"level": "error", "message": "boom"})
+        assert await manager.index_workflow({"workflow_id": "wf-1", "name": "Onboarding"})
+        assert client.requests == []
+
+        await manager.bulk_indexer.close()
+
+        indexed = {
+            meta["_index"]: (op_type, meta.get("_id"), source)
+            for request in client.requests for action, source in request for op_type, meta in action.items()
+        }
+        assert indexed["mabos_logs"][2]["is_error"] is True
+        assert indexed["mabos_workflows"][:2] == ("index", "wf-1")
+
+        # Logs go to a data stream, which only accepts create operations carrying @timestamp
+        assert indexed["mabos_logs"][0] == "create"
+        assert "@timestamp" in indexed["mabos_logs"][2]
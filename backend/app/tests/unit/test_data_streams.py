@@ -0,0 +1,127 @@
+"""
+Unit tests for analytics data streams
+
+Covers the composable templates and lifecycle policies set up for logs,
+metrics and events, writing time series documents as data stream creates
+and letting time-bounded searches skip backing indices.
+"""
+
+from app.models.elasticsearch_manager import SearchQuery
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+
+class FakeNamespace:
+    """Records every call made through an API namespace."""
+
+    def __init__(self, calls, prefix, existing=()):
+        self.calls = calls
+        self.prefix = prefix
+        self.existing = set(existing)
+
+    def __getattr__(self, name):
+        async def call(**kwargs):
+            self.calls.append((f"{self.prefix}.{name}", kwargs))
+            if name == "exists":
+                return kwargs["index"] in self.existing
+            return {"acknowledged": True}
+        return call
+
+
+class ManagementClient(FakeClient):
+    """Records index management calls and searches."""
+
+    def __init__(self, existing=()):
+        super().__init__()
+        self.calls = []
+        self.indices = FakeNamespace(self.calls, "indices", existing)
+        self.cluster = FakeNamespace(self.calls, "cluster")
+        self.ilm = FakeNamespace(self.calls, "ilm")
+
+    async def index(self, **kwargs):
+        self.calls.append(("index", kwargs))
+        return {"result": "created"}
+
+    async def search(self, **kwargs):
+        self.calls.append(("search", kwargs))
+        return {"hits": {"total": {"value": 0}, "hits": []}, "took": 1, "timed_out": False}
+
+    async def msearch(self, **kwargs):
+        self.calls.append(("msearch", kwargs))
+        return {"responses": [{"aggregations": {}} for _ in kwargs["searches"][::2]]}
+
+    def named(self, name):
+        return [kwargs for call, kwargs in self.calls if call == name]
+
+
+class TestDataStreams:
+    """Test data streams for logs, metrics and events"""
+
+    async def test_templates_and_data_streams_are_created(self):
+        """Test each time series gets a composable template with its policy and a data stream"""
+        client = ManagementClient()
+        manager = make_analytics(client, elasticsearch_bulk_enabled=False)
+
+        await manager._setup_lifecycle_policies()
+        await manager._initialize_indices()
+
+        policies = {kwargs["name"]: kwargs["policy"] for kwargs in client.named("ilm.put_lifecycle")}
+        assert policies["logs_policy"]["phases"]["hot"]["actions"]["rollover"]["max_age"] == "1d"
+        assert policies["events_policy"]["phases"]["delete"]["actions"] == {"delete": {}}
+        assert client.named("cluster.put_component_template")[0]["template"]["mappings"]["properties"]["@timestamp"] == {"type": "date"}
+
+        templates = {kwargs["name"]: kwargs for kwargs in client.named("indices.put_index_template")}
+        assert set(templates) == {"mabos_logs_template", "mabos_metrics_template", "mabos_events_template"}
+        logs = templates["mabos_logs_template"]
+        assert logs["index_patterns"] == ["mabos_logs"]
+        assert logs["data_stream"] == {}
+        assert logs["composed_of"] == ["mabos_time_series"]
+        assert logs["template"]["settings"]["index.lifecycle.name"] == "logs_policy"
+
+        assert [kwargs["name"] for kwargs in client.named("indices.create_data_stream")] == ["mabos_logs", "mabos_metrics", "mabos_events"]
+        assert "mabos_logs" not in [kwargs["index"] for kwargs in client.named("indices.create")]
+
+    async def test_existing_data_streams_are_kept(self):
+        """Test an existing data stream is not created again"""
+        client = ManagementClient(existing={"mabos_logs", "mabos_metrics", "mabos_events"})
+
+        await make_analytics(client, elasticsearch_bulk_enabled=False)._initialize_indices()
+
+        assert client.named("indices.create_data_stream") == []
+
+    async def test_disabled_data_streams_keep_regular_indices(self):
+        """Test turning data streams off creates the former fixed indices"""
+        client = ManagementClient()
+
+        await make_analytics(client, elasticsearch_bulk_enabled=False, elasticsearch_data_streams_enabled=False)._initialize_indices()
+
+        assert client.named("indices.put_index_template") == []
+        assert "mabos_logs" in [kwargs["index"] for kwargs in client.named("indices.create")]
+
+    async def test_time_series_documents_are_created_with_a_timestamp(self):
+        """Test events are written as creates carrying @timestamp and workflows as plain index operations"""
+        client = ManagementClient()
+        manager = make_analytics(client, elasticsearch_bulk_enabled=False)
+
+        assert await manager.index_event({"event_type": "workflow.started", "timestamp": "2026-03-10T12:00:00Z"})
+        assert await manager.index_workflow({"workflow_id": "wf-1", "name": "Onboarding"})
+
+        event, workflow = client.named("index")
+        assert event["op_type"] == "create"
+        assert event["document"]["@timestamp"] == "2026-03-10T12:00:00Z"
+        assert workflow["op_type"] == "index"
+        assert "@timestamp" not in workflow["document"]
+
+    async def test_time_bounded_searches_pre_filter_shards(self):
+        """Test searches reading a data stream let can_match skip backing indices outside the range"""
+        client = ManagementClient()
+        manager = make_analytics(client, elasticsearch_bulk_enabled=False)
+
+        await manager.search_logs(SearchQuery(query="timeout"), {"gte": "now-1h"})
+        await manager.search_workflows(SearchQuery(query="etl"))
+        await manager.get_analytics_dashboard_data({"gte": "now-1h", "lte": "now"})
+
+        logs_search, workflows_search = client.named("search")
+        assert logs_search["pre_filter_shard_size"] == 1
+        assert "pre_filter_shard_size" not in workflows_search
+        assert client.named("msearch")[0]["pre_filter_shard_size"] == 1
@@ -0,0 +1,106 @@
+"""
+Unit tests for the group commit buffer
+
+Covers batching by size and delay, last-write-wins coalescing, failure
+propagation, backpressure and draining on close.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.group_commit import GroupCommitBuffer, GroupCommitOverloaded
+
+
+class RecordingFlush:
+    """Records each committed batch and echoes its items back."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.batches = []
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, items):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.batches.append(list(items))
+        return list(items)
+
+
+class TestGroupCommitBuffer:
+    """Test group commit batching"""
+
+    async def test_concurrent_writes_share_one_commit(self):
+        """Test writes submitted together are committed as one batch"""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer("test", flush, max_batch_size=100, max_delay_ms=5)
+
+        results = await asyncio.gather(*(buffer.submit(i) for i in range(10)))
+
+        assert results == list(range(10))
+        assert flush.batches == [list(range(10))]
+        assert buffer.get_metrics().flushes == 1
+
+    async def test_full_batch_flushes_without_waiting_for_delay(self):
+        """Test reaching max_batch_size triggers a flush and splits larger loads"""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer("test", flush, max_batch_size=4, max_delay_ms=10_000)
+
+        await asyncio.wait_for(asyncio.gather(*(buffer.submit(i) for i in range(8))), timeout=1)
+
+        assert flush.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+    async def test_pending_writes_to_the_same_key_are_coalesced(self):
+        """Test the last pending write wins and every caller gets its result"""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer("test", flush, coalesce_key=lambda item: item["id"])
+
+        results = await asyncio.gather(
+            buffer.submit({"id": "a", "progress": 0.1}),
+            buffer.submit({"id": "b", "progress": 0.5}),
+            buffer.submit({"id": "a", "progress": 0.3})
+        )
+
+        assert flush.batches == [[{"id": "a", "progress": 0.3}, {"id": "b", "progress": 0.5}]]
+        assert results[0] == results[2] == {"id": "a", "progress": 0.3}
+        assert buffer.get_metrics().coalesced == 1
+
+    async def test_failed_commit_raises_in_every_caller(self):
+        """Test a flush error is delivered to each waiting writer"""
+        buffer = GroupCommitBuffer("test", RecordingFlush(error=RuntimeError("deadlock")))
+
+        results = await asyncio.gather(buffer.submit(1), buffer.submit(2), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert buffer.get_metrics().failed_flushes == 1
+
+    async def test_full_buffer_holds_back_then_rejects_writers(self):
+        """Test backpressure when writes arrive faster than they commit"""
+        buffer = GroupCommitBuffer(
+            "test", RecordingFlush(delay=0.2), max_batch_size=1, max_pending=1, enqueue_timeout=0.05
+        )
+
+        first = asyncio.create_task(buffer.submit(1))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(buffer.submit(2))
+        await asyncio.sleep(0)
+
+        with pytest.raises(GroupCommitOverloaded):
+            await buffer.submit(3)
+        assert await first == 1
+        assert await second == 2
+        assert buffer.get_metrics().rejected == 1
+
+    async def test_close_commits_pending_writes(self):
+        """Test closing drains the buffer without waiting for the flush delay"""
+        flush = RecordingFlush()
+        buffer = GroupCommitBuffer("test", flush, max_delay_ms=10_000)
+
+        pending = asyncio.create_task(buffer.submit("last"))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(buffer.close(), timeout=1)
+
+        assert await pending == "last"
+        with pytest.raises(RuntimeError):
+            await buffer.submit("late")
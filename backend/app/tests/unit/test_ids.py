@@ -0,0 +1,76 @@
+"""
+Unit tests for time-ordered identifiers
+
+Covers the id format, per-process monotonicity and the encoded timestamp.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.ids import ID_LENGTH, IdGenerator, id_timestamp, new_id
+
+
+class TestIds:
+    """Test the ULID-style id generator"""
+
+    def test_id_format(self):
+        """Test ids are 26 Crockford base32 characters"""
+        identifier = new_id()
+
+        assert len(identifier) == ID_LENGTH
+        assert set(identifier) <= set("0123456789ABCDEFGHJKMNPQRSTVWXYZ")
+
+    def test_ids_are_strictly_increasing_within_a_millisecond(self):
+        """Test a burst of ids sorts in generation order without duplicates"""
+        generator = IdGenerator()
+        ids = [generator.new_id() for _ in range(10000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+
+    def test_ids_stay_ordered_when_the_clock_steps_back(self, monkeypatch):
+        """Test a backwards clock step does not reorder ids"""
+        generator = IdGenerator()
+        first = generator.new_id()
+
+        monkeypatch.setattr(time, "time_ns", lambda: 0)
+        second = generator.new_id()
+
+        assert second > first
+
+    def test_ids_are_unique_across_threads(self):
+        """Test concurrent generation yields no duplicates"""
+        generator = IdGenerator()
+        results = [[] for _ in range(8)]
+
+        def generate(bucket):
+            bucket.extend(generator.new_id() for _ in range(2000))
+
+        threads = [threading.Thread(target=generate, args=(bucket,)) for bucket in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        all_ids = [identifier for bucket in results for identifier in bucket]
+        assert len(set(all_ids)) == len(all_ids)
+
+    def test_independent_generators_do_not_collide(self):
+        """Test separate workers in the same millisecond draw distinct ids"""
+        assert IdGenerator().new_id() != IdGenerator().new_id()
+
+    def test_timestamp_round_trip(self):
+        """Test the creation time can be read back from an id"""
+        created = id_timestamp(new_id())
+
+        assert abs(created - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+    def test_invalid_id_rejected(self):
+        """Test malformed ids raise ValueError"""
+        with pytest.raises(ValueError):
+            id_timestamp("belief_123")
+        with pytest.raises(ValueError):
+            id_timestamp("U" * ID_LENGTH)
@@ -0,0 +1,163 @@
+"""
+Unit tests for the enrichment ingest pipelines
+
+Covers installing the pipelines, shipping raw documents through them with
+the bulk indexer, falling back to Python enrichment, and (against a live
+Elasticsearch at ELASTICSEARCH_URL) the Painless scripts computing the same
+fields as the Python enrichment.
+"""
+
+import os
+
+import pytest
+
+from app.core.database import DatabaseConfig
+from app.core.ingest_pipelines import ENRICHMENT_SCRIPTS, enrichment_pipeline
+from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager, IndexType
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+# Documents per index type covering the branches of every enrichment
+SAMPLES = {
+    "workflows": [
+        {"workflow_id": "wf-1", "name": "Onboarding", "description": "New hires"},
+        {"workflow_id": "wf-2", "name": "Sync", "definition": {"steps": [{"type": "task"}] * 3 + [{"type": "condition"}] * 2 + [{"type": "integration"}]}},
+        {"workflow_id": "wf-3", "definition": {"steps": [{"type": "condition"}] * 40}},
+    ],
+    "executions": [
+        {"execution_id": "e1", "status": "completed", "started_at": "2026-03-10T12:00:00Z", "duration": 12.5, "step_count": 4, "completed_steps": 4},
+        {"execution_id": "e2", "status": "failed", "started_at": "2026-03-11T08:30:00Z", "duration": 95, "step_count": 3, "completed_steps": 1},
+        {"execution_id": "e3", "status": "running", "started_at": "2026-03-12", "step_count": 0},
+    ],
+    "users": [
+        {"user_id": "u1", "workflow_count": 50, "execution_count": 300, "activity_summary": {"success_rate": 0.9}},
+        {"user_id": "u2", "workflow_count": 12, "execution_count": 40, "activity_summary": {"success_rate": 0.75}},
+        {"user_id": "u3", "workflow_count": 3, "activity_summary": {"success_rate": 0.5}},
+        {"user_id": "u4"},
+    ],
+    "agents": [
+        {"agent_id": "a1", "performance_metrics": {"success_rate": 0.95, "avg_response_time": 1.5, "uptime_percentage": 0.99, "error_count": 2, "tasks_completed": 200}},
+        {"agent_id": "a2", "performance_metrics": {"success_rate": 0.4, "avg_response_time": 30, "uptime_percentage": 0.5, "error_count": 9, "tasks_completed": 0}},
+        {"agent_id": "a3"},
+    ],
+    "logs": [
+        {"level": "ERROR", "message": "boom"},
+        {"level": "warn", "message": "slow"},
+        {"level": "trace", "message": "noise"},
+        {"message": "no level"},
+    ],
+    "metrics": [
+        {"metric_name": "cpu", "metric_type": "cpu_usage", "value": 95.0},
+        {"metric_name": "memory", "metric_type": "memory_usage", "value": 75},
+        {"metric_name": "memory", "metric_type": "memory_usage", "value": 10},
+        {"metric_name": "latency", "metric_type": "latency", "value": 99},
+    ],
+}
+
+
+class FakeIngest:
+    """Records installed pipelines, optionally failing every installation."""
+
+    def __init__(self, fail=False):
+        self.pipelines = {}
+        self.fail = fail
+
+    async def put_pipeline(self, id, **body):
+        if self.fail:
+            raise RuntimeError("no ingest nodes")
+        self.pipelines[id] = body
+        return {"acknowledged": True}
+
+
+class IngestClient(FakeClient):
+    """Acknowledges _bulk requests and installs pipelines through a fake ingest API."""
+
+    def __init__(self, fail=False):
+        super().__init__()
+        self.ingest = FakeIngest(fail)
+
+
+def python_enrichment(index_type, document):
+    """Fields the Python enrichment adds to a document"""
+    manager = ElasticsearchAnalyticsManager(DatabaseConfig(elasticsearch_bulk_enabled=False))
+    enriched, _ = manager._enrich(IndexType(index_type), document)
+    return {field: value for field, value in enriched.items() if field not in document and field != "indexed_at"}
+
+
+@pytest.fixture(scope="module")
+def elasticsearch():
+    """Synchronous client of a live Elasticsearch, skipping the test when none is reachable"""
+    from elasticsearch import Elasticsearch
+
+    client = Elasticsearch(os.environ.get("ELASTICSEARCH_URL", DatabaseConfig().elasticsearch_url), request_timeout=2)
+    try:
+        if not client.ping():
+            pytest.skip("Elasticsearch is not reachable")
+    except Exception:
+        pytest.skip("Elasticsearch is not reachable")
+    yield client
+    client.close()
+
+
+class TestIngestPipelines:
+    """Test server-side enrichment through ingest pipelines"""
+
+    async def test_raw_documents_are_shipped_through_the_pipelines(self):
+        """Test installed pipelines replace Python enrichment on the bulk path"""
+        client = IngestClient()
+        manager = make_analytics(client)
+
+        await manager._setup_ingest_pipelines()
+        assert set(client.ingest.pipelines) == {f"mabos_{index_type}_enrichment" for index_type in ENRICHMENT_SCRIPTS}
+
+        assert await manager.index_execution({"execution_id": "e1", "status": "completed", "step_count": 2})
+        assert manager.queue_log_entry({"level": "error", "message": "boom", "timestamp": "2026-03-10T12:00:00Z"})
+        await manager.bulk_indexer.close()
+
+        actions = {meta["_index"]: (meta, source) for request in client.requests for action, source in request for meta in action.values()}
+        meta, source = actions["mabos_executions"]
+        assert meta["pipeline"] == "mabos_executions_enrichment"
+        assert source == {"execution_id": "e1", "status": "completed", "step_count": 2}
+        meta, source = actions["mabos_logs"]
+        assert meta["pipeline"] == "mabos_logs_enrichment"
+        assert "is_error" not in source
+
+    async def test_python_enrichment_without_ingest_nodes(self):
+        """Test a cluster rejecting the pipelines keeps documents enriched in Python"""
+        client = IngestClient(fail=True)
+        manager = make_analytics(client)
+
+        await manager._setup_ingest_pipelines()
+        assert manager.ingest_pipelines == {}
+
+        assert await manager.index_metrics({"metric_type": "cpu_usage", "value": 95.0})
+        await manager.bulk_indexer.close()
+
+        (action, source), = client.requests[0]
+        assert "pipeline" not in action["create"]
+        assert source["anomaly_score"] == 0.9
+
+    def test_pipeline_version_tracks_the_script(self):
+        """Test each pipeline stamps indexed_at and is versioned by its script"""
+        pipeline = enrichment_pipeline("metrics")
+
+        assert pipeline["processors"][0] == {"set": {"field": "indexed_at", "value": "{{_ingest.timestamp}}"}}
+        assert pipeline["processors"][1]["script"]["source"] == ENRICHMENT_SCRIPTS["metrics"]
+        assert pipeline["version"] != enrichment_pipeline("logs")["version"]
+
+    @pytest.mark.elasticsearch
+    @pytest.mark.parametrize("index_type", sorted(SAMPLES))
+    def test_painless_matches_python(self, elasticsearch, index_type):
+        """Test the Painless script of a pipeline computes the fields the Python enrichment does"""
+        response = elasticsearch.ingest.simulate(
+            pipeline=enrichment_pipeline(index_type),
+            docs=[{"_source": document} for document in SAMPLES[index_type]]
+        )
+
+        for document, result in zip(SAMPLES[index_type], response["docs"]):
+            source = result["doc"]["_source"]
+            for field, expected in python_enrichment(index_type, document).items():
+                if isinstance(expected, float):
+                    assert source[field] == pytest.approx(expected), field
+                else:
+                    assert source[field] == expected, field
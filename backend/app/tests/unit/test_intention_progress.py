@@ -0,0 +1,258 @@
+"""
+Unit tests for live intention progress
+
+Covers coalescing reports into one Neo4j write per intention, the monotonic
+and rate checks, merging live values into agent contexts, requeueing a
+failed flush and batch progress updates.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.intention_progress import RECORD_PROGRESS_SCRIPT, dirty_key, shard_of
+
+from app.tests.unit.fakes import FakeNeo4j, FakeRedis, make_manager
+
+
+class ProgressNeo4j(FakeNeo4j):
+    """Holds intention progress and records every write batch."""
+
+    def __init__(self, intentions):
+        super().__init__()
+        self.intentions = intentions
+        self.writes = []
+
+    async def update_intentions_progress(self, updates):
+        if self.fail:
+            raise ConnectionError("neo4j unavailable")
+        self.writes.append(updates)
+        owners = {}
+        for update in updates:
+            intention = self.intentions.get(update["intention_id"])
+            if intention is not None:
+                intention["progress"] = update["progress"]
+                owners[update["intention_id"]] = [intention["agent_id"]]
+        return owners
+
+    def knowledge_graph(self, agent_id):
+        intentions = [
+            {"id": intention_id, "progress": intention["progress"]}
+            for intention_id, intention in self.intentions.items()
+            if intention["agent_id"] == agent_id
+        ]
+        return {"agent": {"id": agent_id}, "intentions": intentions}
+
+
+def hash_tag(key):
+    return key[key.index("{"):key.index("}") + 1]
+
+
+class ScriptRedis(FakeRedis):
+    """Emulates the report script over the fake string, set and counter commands.
+
+    Like Redis Cluster, scripts and MGETs spanning several hash tags are refused.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rates = {}
+        self.script_tags = []
+
+    async def get_values(self, keys):
+        assert len({hash_tag(key) for key in keys}) <= 1, "CROSSSLOT"
+        return await super().get_values(keys)
+
+    async def run_script(self, script, keys, args):
+        assert script == RECORD_PROGRESS_SCRIPT
+        assert len({hash_tag(key) for key in keys}) == 1, "CROSSSLOT"
+        self.script_tags.append(hash_tag(keys[0]))
+        live, rate, owners, dirty = keys
+        intention_id, progress, now, max_rate, _, reset = args
+        if max_rate > 0:
+            self.rates[rate] = self.rates.get(rate, 0) + 1
+            if self.rates[rate] > max_rate:
+                return ["rate_limited", self.values.get(live, "")]
+        current = self.values.get(live)
+        if current and reset == "0" and float(progress) < float(current.split("|")[0]):
+            return ["regressed", current]
+        self.values[live] = f"{progress}|{now}"
+        self.sets.setdefault(dirty, set()).add(intention_id)
+        return ["accepted", ""] + sorted(self.sets.get(owners, ()))
+
+
+def make_progress_manager(live=True, **settings):
+    neo4j = ProgressNeo4j({
+        "intention-1": {"agent_id": "agent-1", "progress": 0.0},
+        "intention-2": {"agent_id": "agent-2", "progress": 0.0},
+    })
+    return make_manager(neo4j=neo4j, redis=ScriptRedis(), intention_progress_live_enabled=live, **settings)
+
+
+class TestLiveIntentionProgress:
+    """Test Redis-backed intention progress with periodic flushes"""
+
+    async def test_reports_coalesce_into_one_write_per_intention(self):
+        """Test many reports cost one Neo4j write carrying only the latest value"""
+        manager = make_progress_manager()
+
+        for step in range(1, 21):
+            result = await manager.report_intention_progress("intention-1", step / 20)
+            assert result["accepted"] is True
+        await manager.report_intention_progress("intention-2", 0.5)
+
+        assert manager.neo4j.writes == []
+
+        report = await manager.intention_progress.flush()
+
+        assert report["success"] is True
+        assert report["intentions_flushed"] == 2
+        assert len(manager.neo4j.writes) == 1
+        assert sorted(manager.neo4j.writes[0], key=lambda update: update["intention_id"]) == [
+            {"intention_id": "intention-1", "progress": 1.0},
+            {"intention_id": "intention-2", "progress": 0.5},
+        ]
+        assert manager.redis.counters == {"agent:version:agent-1": 1, "agent:version:agent-2": 1}
+
+        # Nothing was reported since, so the next flush writes nothing
+        await manager.intention_progress.flush()
+        assert len(manager.neo4j.writes) == 1
+
+    async def test_progress_cannot_decrease_without_reset(self):
+        """Test a lower report is rejected unless it is a reset"""
+        manager = make_progress_manager()
+        await manager.report_intention_progress("intention-1", 0.6)
+
+        rejected = await manager.report_intention_progress("intention-1", 0.4)
+        reset = await manager.report_intention_progress("intention-1", 0.1, reset=True)
+
+        assert rejected == {"accepted": False, "reason": "regressed", "progress": 0.6}
+        assert reset["accepted"] is True
+        assert manager.intention_progress.get_metrics().regressed == 1
+
+    def test_progress_endpoint_takes_a_boolean_reset(self, monkeypatch):
+        """Test the progress endpoint reads reset as a JSON boolean"""
+        manager = make_progress_manager()
+
+        async def get_manager():
+            return manager
+
+        monkeypatch.setattr(main, "get_database_manager", get_manager)
+        client = TestClient(main.app)
+        url = "/api/agents/intentions/intention-1/progress"
+
+        assert client.put(url, json={"progress": 0.6}).json()["success"] is True
+        assert client.put(url, json={"progress": 0.4}).json()["reason"] == "regressed"
+        assert client.put(url, json={"progress": 0.1, "reset": True}).json()["success"] is True
+        assert client.put(url, json={"progress": 0.1, "reset": "maybe"}).status_code == 422
+
+    async def test_reports_over_the_rate_limit_are_rejected(self):
+        """Test an intention accepts at most the configured reports per second"""
+        manager = make_progress_manager(intention_progress_max_updates_per_second=3)
+
+        results = [await manager.report_intention_progress("intention-1", step / 10) for step in range(5)]
+
+        assert [result["accepted"] for result in results] == [True, True, True, False, False]
+        assert results[-1]["reason"] == "rate_limited"
+        assert results[-1]["progress"] == 0.2
+
+    async def test_context_merges_live_progress_and_tracks_holders(self):
+        """Test contexts show live progress and later reports invalidate them"""
+        manager = make_progress_manager()
+        await manager.report_intention_progress("intention-1", 0.7)
+
+        context = json.loads(await manager.get_agent_context_json("agent-1"))
+
+        assert context["knowledge_graph"]["intentions"] == [{"id": "intention-1", "progress": 0.7}]
+        assert manager.redis.counters == {}
+
+        # The context read recorded agent-1 as holder, so the next report bumps its version
+        await manager.report_intention_progress("intention-1", 0.8)
+        assert manager.redis.counters == {"agent:version:agent-1": 1}
+
+    async def test_intentions_are_spread_over_hash_tags(self):
+        """Test each report stays on one slot while a flush writes every shard's intentions together"""
+        intentions = {f"intention-{i}": {"agent_id": "agent-1", "progress": 0.0} for i in range(20)}
+        manager = make_manager(
+            neo4j=ProgressNeo4j(intentions), redis=ScriptRedis(), intention_progress_live_enabled=True
+        )
+
+        for intention_id in intentions:
+            await manager.report_intention_progress(intention_id, 0.5)
+        context = json.loads(await manager.get_agent_context_json("agent-1"))
+        report = await manager.intention_progress.flush()
+
+        assert len(set(manager.redis.script_tags)) > 1
+        assert {intention["progress"] for intention in context["knowledge_graph"]["intentions"]} == {0.5}
+        assert report["intentions_flushed"] == 20
+        assert len(manager.neo4j.writes) == 1
+        assert not any(manager.redis.sets.get(dirty_key(shard)) for shard in range(16))
+
+    async def test_failed_flush_requeues_intentions(self):
+        """Test intentions of a failed flush are written by the next one"""
+        manager = make_progress_manager()
+        await manager.report_intention_progress("intention-1", 0.3)
+        manager.neo4j.fail = True
+
+        failed = await manager.intention_progress.flush()
+
+        assert failed["success"] is False
+        assert manager.redis.sets[dirty_key(shard_of("intention-1", 16))] == {"intention-1"}
+
+        manager.neo4j.fail = False
+        await manager.report_intention_progress("intention-1", 0.4)
+        await manager.intention_progress.flush()
+
+        assert manager.neo4j.writes == [[{"intention_id": "intention-1", "progress": 0.4}]]
+        assert manager.intention_progress.get_metrics().failed_flushes == 1
+
+
+class TestBatchIntentionProgress:
+    """Test progress updates of many intentions in one call"""
+
+    async def test_batch_is_validated_and_written_with_one_statement(self):
+        """Test valid updates share one write and invalid or unknown ones are reported"""
+        manager = make_progress_manager(live=False)
+
+        report = await manager.update_intentions_progress([
+            {"intention_id": "intention-1", "progress": 0.2},
+            {"intention_id": "intention-2", "progress": 1.5},
+            {"intention_id": "missing", "progress": 0.3},
+            {"progress": 0.4},
+            {"intention_id": "intention-1", "progress": 0.6},
+        ])
+
+        assert manager.neo4j.writes == [[
+            {"intention_id": "intention-1", "progress": 0.6},
+            {"intention_id": "missing", "progress": 0.3},
+        ]]
+        assert report["updated"] == 1
+        assert report["not_found"] == ["missing"]
+        assert [rejection["index"] for rejection in report["rejections"]] == [1, 3]
+        assert report["results"][0] == {"intention_id": "intention-1", "accepted": True, "reason": None, "progress": 0.6}
+        assert manager.redis.counters == {"agent:version:agent-1": 1}
+
+    async def test_batch_goes_through_live_progress_when_enabled(self):
+        """Test batch updates are reported to Redis and checked like single reports"""
+        manager = make_progress_manager()
+        await manager.report_intention_progress("intention-2", 0.9)
+
+        report = await manager.update_intentions_progress([
+            {"intention_id": "intention-1", "progress": 0.5},
+            {"intention_id": "intention-2", "progress": 0.1},
+        ])
+
+        assert manager.neo4j.writes == []
+        assert report["updated"] == 1
+        assert report["results"][1]["reason"] == "regressed"
+
+    async def test_batch_size_is_limited(self):
+        """Test oversized batches are refused before any write"""
+        manager = make_progress_manager(live=False, intention_progress_batch_max_items=2)
+
+        with pytest.raises(ValueError):
+            await manager.update_intentions_progress([{"intention_id": "intention-1", "progress": 0.1}] * 3)
+
+        assert manager.neo4j.writes == []
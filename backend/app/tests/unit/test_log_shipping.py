@@ -0,0 +1,121 @@
+"""
+Unit tests for log shipping
+
+Covers queueing records without touching Elasticsearch, shipping them with
+their severity through the bulk indexer, both drop policies, dropping when
+the bulk indexer is full and skipping records of the shipping path.
+"""
+
+import logging
+
+import pytest
+
+from app.core.bulk_indexer import BulkIndexer
+from app.core.log_shipping import ElasticsearchLogHandler
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+
+def make_handler(client, max_pending=50000, **settings):
+    analytics = make_analytics(elasticsearch_bulk_flush_interval=60.0)
+    analytics.bulk_indexer = BulkIndexer(client, flush_interval=60.0, max_pending=max_pending)
+    return ElasticsearchLogHandler(analytics, **settings)
+
+
+def make_logger(handler, name="app.tests.shipping"):
+    shipped = logging.getLogger(name)
+    shipped.setLevel(logging.DEBUG)
+    shipped.propagate = False
+    shipped.handlers = [handler]
+    return shipped
+
+
+class TestLogShipping:
+    """Test the non-blocking Elasticsearch logging handler"""
+
+    async def test_records_are_queued_then_shipped_with_severity(self):
+        """Test emit only queues and shipping bulk-indexes enriched entries"""
+        client = FakeClient()
+        handler = make_handler(client)
+        shipped = make_logger(handler)
+
+        shipped.warning("disk at %d%%", 91)
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            shipped.exception("request failed")
+        shipped.debug("below the handler level")
+
+        assert client.requests == []
+        assert handler.get_metrics().queue_depth == 2
+
+        assert handler.ship() == 2
+        await handler.analytics.bulk_indexer.flush()
+
+        warning, error = client.documents()
+        assert warning["message"] == "disk at 91%" and warning["severity_score"] == 3
+        assert error["is_error"] is True and "ValueError: bad input" in error["stack_trace"]
+        metrics = handler.get_metrics()
+        assert metrics.shipped == 2 and metrics.queue_depth == 0 and metrics.max_lag_ms >= 0
+
+    def test_drop_newest_keeps_the_queued_records(self):
+        """Test a full queue rejects incoming records under drop_newest"""
+        handler = make_handler(FakeClient(), queue_size=2)
+        shipped = make_logger(handler)
+
+        for number in range(4):
+            shipped.info("record %d", number)
+
+        assert [entry["message"] for _, entry in handler._queue] == ["record 0", "record 1"]
+        assert handler.get_metrics().dropped_queue_full == 2
+
+    def test_drop_oldest_keeps_the_latest_records(self):
+        """Test a full queue evicts its oldest records under drop_oldest"""
+        handler = make_handler(FakeClient(), queue_size=2, drop_policy="drop_oldest")
+        shipped = make_logger(handler)
+
+        for number in range(4):
+            shipped.info("record %d", number)
+
+        assert [entry["message"] for _, entry in handler._queue] == ["record 2", "record 3"]
+        assert handler.get_metrics().dropped_queue_full == 2
+
+    async def test_full_bulk_indexer_drops_records(self):
+        """Test shipping never waits when the bulk indexer has no room"""
+        handler = make_handler(FakeClient(), max_pending=1)
+        shipped = make_logger(handler)
+
+        for number in range(3):
+            shipped.info("record %d", number)
+        handler.ship()
+
+        metrics = handler.get_metrics()
+        assert metrics.shipped == 1 and metrics.dropped_indexer_full == 2
+        await handler.analytics.bulk_indexer.close()
+
+    def test_shipping_path_records_are_skipped(self):
+        """Test records of the bulk indexer and the Elasticsearch client are not shipped"""
+        handler = make_handler(FakeClient())
+        for name in ("app.core.bulk_indexer", "elastic_transport.transport", "elasticsearch"):
+            handler.handle(logging.makeLogRecord({"name": name, "levelno": logging.ERROR, "msg": "cluster unavailable"}))
+
+        assert handler.get_metrics().queued == 0
+
+    def test_records_are_handled_through_the_handler_lock(self):
+        """Test Handler.handle, which enters the handler lock around emit, queues records"""
+        handler = make_handler(FakeClient())
+        record = logging.makeLogRecord({"name": "app.tests.shipping", "levelno": logging.ERROR, "msg": "failed"})
+
+        assert handler.handle(record)
+        # Python 3.13 handles records with "with self.lock: self.emit(record)"
+        with handler.lock:
+            handler.emit(record)
+        handler.acquire()
+        handler.release()
+
+        assert handler.get_metrics().queued == 2
+
+    def test_unknown_drop_policy_is_refused(self):
+        """Test the drop policy is validated"""
+        with pytest.raises(ValueError):
+            make_handler(FakeClient(), drop_policy="block")
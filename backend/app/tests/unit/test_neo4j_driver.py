@@ -0,0 +1,141 @@
+"""
+Unit tests for the shared Neo4j driver factory
+
+Covers one factory per (uri, user, database), routing managed transactions
+by access mode, and classifying pool acquisition timeouts.
+"""
+
+import pytest
+from neo4j import READ_ACCESS, WRITE_ACCESS
+from neo4j.exceptions import ClientError
+
+from app.core import neo4j_driver
+from app.core.database import DatabaseConfig
+from app.core.neo4j_driver import Neo4jDriverFactory, get_neo4j_driver_factory
+
+
+class FakeSession:
+    """Runs transaction functions and records which managed method ran them."""
+
+    def __init__(self, driver, error=None):
+        self.driver = driver
+        self.error = error
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute_read(self, work):
+        self.driver.calls.append("execute_read")
+        return await self._run(work)
+
+    async def execute_write(self, work):
+        self.driver.calls.append("execute_write")
+        return await self._run(work)
+
+    async def _run(self, work):
+        if self.error is not None:
+            raise self.error
+        return await work("tx")
+
+
+class FakeDriver:
+    """Hands out fake sessions and records their arguments."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.sessions = []
+        self.calls = []
+
+    def session(self, **kwargs):
+        self.sessions.append(kwargs)
+        return FakeSession(self, self.error)
+
+
+def make_factory(driver, **settings):
+    factory = Neo4jDriverFactory(DatabaseConfig(**settings))
+    factory._driver = driver
+    return factory
+
+
+async def echo(tx):
+    return tx
+
+
+class TestDriverFactoryCache:
+    """Test one factory per Neo4j endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def isolated_factories(self, monkeypatch):
+        """Start every test from an empty factory cache."""
+        monkeypatch.setattr(neo4j_driver, "_driver_factories", {})
+
+    def test_same_endpoint_shares_a_factory(self):
+        """Test configs naming the same uri, user and database share one factory"""
+        first = get_neo4j_driver_factory(DatabaseConfig(neo4j_password="one"))
+        second = get_neo4j_driver_factory(DatabaseConfig(neo4j_password="two", neo4j_max_connection_pool_size=5))
+
+        assert first is second
+
+    @pytest.mark.parametrize("setting", [
+        {"neo4j_uri": "bolt://other:7687"},
+        {"neo4j_user": "reader"},
+        {"neo4j_database": "analytics"},
+    ])
+    def test_each_endpoint_gets_its_own_factory(self, setting):
+        """Test a different uri, user or database gets a separate factory"""
+        default = get_neo4j_driver_factory(DatabaseConfig())
+        other = get_neo4j_driver_factory(DatabaseConfig(**setting))
+
+        assert other is not default
+        assert get_neo4j_driver_factory(DatabaseConfig(**setting)) is other
+
+
+class TestRunTransaction:
+    """Test managed transaction routing and metrics"""
+
+    async def test_reads_and_writes_are_routed_by_access_mode(self):
+        """Test each access mode runs in the matching managed transaction and session"""
+        driver = FakeDriver()
+        factory = make_factory(driver, neo4j_database="mabos")
+
+        assert await factory.run_transaction(READ_ACCESS, echo) == "tx"
+        assert await factory.run_transaction(WRITE_ACCESS, echo) == "tx"
+
+        assert driver.calls == ["execute_read", "execute_write"]
+        assert driver.sessions == [
+            {"database": "mabos", "default_access_mode": READ_ACCESS},
+            {"database": "mabos", "default_access_mode": WRITE_ACCESS},
+        ]
+        metrics = factory.get_metrics()
+        assert (metrics.read_transactions, metrics.write_transactions) == (1, 1)
+        assert metrics.in_flight_transactions == 0
+        assert metrics.peak_in_flight_transactions == 1
+
+    async def test_acquisition_timeout_is_classified(self):
+        """Test a pool acquisition timeout is counted apart from other client errors"""
+        factory = make_factory(FakeDriver(ClientError("failed to obtain a connection from the pool within 60.0s")))
+
+        with pytest.raises(ClientError):
+            await factory.run_transaction(READ_ACCESS, echo)
+
+        factory._driver = FakeDriver(ClientError("Invalid input 'MATC'"))
+        with pytest.raises(ClientError):
+            await factory.run_transaction(WRITE_ACCESS, echo)
+
+        metrics = factory.get_metrics()
+        assert metrics.acquisition_timeouts == 1
+        assert metrics.failed_transactions == 2
+        assert metrics.in_flight_transactions == 0
+
+    async def test_transaction_load_is_relative_to_pool_size(self):
+        """Test transaction_load is in-flight transactions over max_pool_size"""
+        factory = make_factory(FakeDriver(), neo4j_max_connection_pool_size=4)
+
+        async def observe(tx):
+            return factory.get_metrics().transaction_load
+
+        assert await factory.run_transaction(READ_ACCESS, observe) == 0.25
+        assert factory.get_metrics().transaction_load == 0.0
@@ -0,0 +1,136 @@
+"""
+Unit tests for bounded agent context collections
+
+Covers cursor encoding, per-collection page trimming, the generated
+collection subqueries and rejecting malformed cursors with 400.
+"""
+
+from datetime import timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from neo4j.time import DateTime
+
+from app import main
+from app.core import cypher_queries
+from app.core.pagination import (
+    EPOCH_SORT_KEY,
+    collection_parameters,
+    decode_cursor,
+    encode_cursor,
+    page_collections,
+    resolve_limits,
+)
+
+from app.tests.unit.fakes import FakeNeo4j, make_manager
+
+
+class TestCursors:
+    """Test opaque keyset cursors"""
+
+    def test_cursor_round_trip_keeps_nanoseconds(self):
+        """Test a cursor decodes to the exact sort key of the item it was built from"""
+        created_at = DateTime(2025, 1, 1, 12, 0, 0, 123456789, tzinfo=timezone.utc)
+        cursor = encode_cursor({"id": "belief-1", "created_at": created_at})
+
+        assert decode_cursor(cursor) == {"created_at": created_at.iso_format(), "id": "belief-1"}
+
+    def test_cursor_without_created_at_uses_epoch(self):
+        """Test items without created_at sort at the epoch, as in the Cypher fallback"""
+        assert decode_cursor(encode_cursor({"id": "plan-1"}))["created_at"] == EPOCH_SORT_KEY
+
+    def test_invalid_cursor_raises_value_error(self):
+        """Test a malformed cursor is rejected"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+class TestPageCollections:
+    """Test per-collection limits and next-page cursors"""
+
+    def test_limits_are_clamped(self):
+        """Test missing limits use the default and large limits are capped"""
+        limits = resolve_limits(["beliefs", "plans"], {"beliefs": 5000}, default=100, maximum=1000)
+
+        assert limits == {"beliefs": 1000, "plans": 100}
+
+    def test_one_extra_item_is_requested(self):
+        """Test the query fetches one item beyond the page size"""
+        params = collection_parameters({"beliefs": 10}, {"beliefs": None})
+
+        assert params == {"beliefs_limit": 11, "beliefs_cursor": None}
+
+    def test_page_is_trimmed_and_cursor_set_when_more_items_exist(self):
+        """Test a full page returns a cursor pointing at its last item"""
+        beliefs = [{"id": f"belief-{i}"} for i in range(3)]
+        record = page_collections({"beliefs": beliefs, "plans": []}, {"beliefs": 2, "plans": 2})
+
+        assert [belief["id"] for belief in record["beliefs"]] == ["belief-0", "belief-1"]
+        assert decode_cursor(record["cursors"]["beliefs"])["id"] == "belief-1"
+        assert record["cursors"]["plans"] is None
+
+
+class TestBoundedCollectionQueries:
+    """Test the generated agent context queries"""
+
+    @pytest.mark.parametrize("order", ["newest", "oldest"])
+    def test_collections_are_independent_subqueries(self, order):
+        """Test every collection is a limited COLLECT subquery rather than an OPTIONAL MATCH"""
+        query = cypher_queries.AGENT_KNOWLEDGE_GRAPH[order]
+
+        assert "OPTIONAL MATCH" not in query.cypher
+        assert query.cypher.count("COLLECT {") == len(cypher_queries.AGENT_KNOWLEDGE_GRAPH_COLLECTIONS)
+        assert "LIMIT $beliefs_limit" in query.cypher
+        assert ("DESC" in query.cypher) == (order == "newest")
+
+    def test_projection_is_pushed_into_return_clause(self):
+        """Test requested fields become map projections that keep the cursor fields"""
+        fields = cypher_queries.normalize_fields(["confidence", "status"])
+        query = cypher_queries.agent_knowledge_graph_query("agent", "newest", fields)
+
+        assert fields == ("confidence", "created_at", "id", "status")
+        assert "RETURN belief {.confidence, .created_at, .id, .status}" in query.cypher
+        assert query is cypher_queries.agent_knowledge_graph_query("agent", "newest", fields)
+
+    def test_projection_rejects_non_identifiers(self):
+        """Test field names cannot inject Cypher"""
+        with pytest.raises(ValueError):
+            cypher_queries.normalize_fields(["id} RETURN 1 //"])
+
+
+class CursorCheckingNeo4j(FakeNeo4j):
+    """Decodes the requested cursors the way the knowledge graph query does."""
+
+    async def get_agent_knowledge_graph(self, agent_id, raw=False, limits=None, cursors=None, order="newest", fields=None):
+        collection_parameters({"beliefs": 10}, cursors)
+        return await super().get_agent_knowledge_graph(agent_id, raw, limits, cursors, order, fields)
+
+
+class TestCursorErrors:
+    """Test malformed cursors are answered as client errors"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        manager = make_manager(neo4j=CursorCheckingNeo4j())
+
+        async def get_manager():
+            return manager
+
+        monkeypatch.setattr(main, "get_database_manager", get_manager)
+        return TestClient(main.app)
+
+    def test_malformed_cursor_is_rejected_with_400(self, client):
+        """Test the context endpoint answers 400 instead of a degraded 200"""
+        response = client.get("/api/agents/agent-1/context", params={"beliefs_cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert "Invalid pagination cursor" in response.json()["error"]
+
+    def test_valid_cursor_is_served(self, client):
+        """Test a cursor from a previous page still returns the context"""
+        cursor = encode_cursor({"created_at": "2025-01-01T00:00:00Z", "id": "b1"})
+
+        response = client.get("/api/agents/agent-1/context", params={"beliefs_cursor": cursor})
+
+        assert response.status_code == 200
+        assert response.json()["knowledge_graph"]["agent"]["id"] == "agent-1"
@@ -0,0 +1,104 @@
+"""
+Unit tests for the Cypher query registry
+
+Covers registration rules, parameter validation and the per-query
+statistics recorded for every execution.
+"""
+
+import pytest
+from neo4j import WRITE_ACCESS
+
+from app.core.query_registry import CypherQuery, QueryRegistry
+
+
+class FakeResult:
+    """Minimal stand-in for an async Neo4j result."""
+
+    def __init__(self, records, profile=None):
+        self.records = records
+        self.profile = profile
+
+    async def data(self):
+        return self.records
+
+    async def consume(self):
+        return self
+
+
+class FakeTransaction:
+    """Records the Cypher text it was asked to run."""
+
+    def __init__(self, result):
+        self.result = result
+        self.queries = []
+
+    async def run(self, query, parameters):
+        self.queries.append(query)
+        return self.result
+
+
+class FakeDriverFactory:
+    """Runs transaction functions against a fake transaction."""
+
+    def __init__(self, result):
+        self.tx = FakeTransaction(result)
+        self.access_modes = []
+
+    async def run_transaction(self, access_mode, work):
+        self.access_modes.append(access_mode)
+        return await work(self.tx)
+
+
+class TestQueryRegistry:
+    """Test suite for the query registry."""
+
+    def setup_method(self):
+        """Create a fresh registry with one write query."""
+        self.registry = QueryRegistry()
+        self.query = self.registry.register(CypherQuery(
+            name="test.write",
+            cypher="MATCH (n {id: $id}) SET n.x = 1 RETURN n.id AS id",
+            access_mode=WRITE_ACCESS,
+            parameters=("id",)
+        ))
+
+    def test_reregistering_different_text_fails(self):
+        """Test that a name cannot be bound to two different queries."""
+        with pytest.raises(ValueError):
+            self.registry.register(CypherQuery(name="test.write", cypher="RETURN 1"))
+
+    async def test_missing_parameters_are_rejected(self):
+        """Test that declared parameters are required."""
+        factory = FakeDriverFactory(FakeResult([]))
+        with pytest.raises(ValueError):
+            await self.registry.run(factory, "test.write", {})
+
+    async def test_run_records_statistics(self):
+        """Test that rows, latency and access mode are recorded."""
+        factory = FakeDriverFactory(FakeResult([{"id": "a"}, {"id": "b"}]))
+        records = await self.registry.run(factory, "test.write", {"id": "a"})
+
+        stats = self.registry.get_stats("test.write")
+        assert len(records) == 2
+        assert factory.access_modes == [WRITE_ACCESS]
+        assert stats.count == 1
+        assert stats.rows == 2
+        assert sum(stats.latency_histogram.values()) == 1
+        assert stats.profiled_count == 0
+        assert stats.avg_db_hits is None
+
+    async def test_sampled_profile_captures_slow_plans(self):
+        """Test that sampled PROFILE runs record db hits and slow plans."""
+        plan = {"operatorType": "ProduceResults", "dbHits": 3, "children": [{"dbHits": 7, "children": []}]}
+        factory = FakeDriverFactory(FakeResult([{"id": "a"}], profile=plan))
+        self.registry.configure(profile_sample_rate=1.0, slow_query_threshold_ms=0.0)
+
+        await self.registry.run(factory, "test.write", {"id": "a"})
+
+        stats = self.registry.get_stats("test.write")
+        assert factory.tx.queries[0].startswith("PROFILE ")
+        assert stats.sampled_db_hits == 10
+        assert stats.profiled_count == 1
+        assert stats.avg_db_hits == 10
+        assert len(stats.slow_plans) == 1
+        assert self.registry.slowest(limit=1)[0].name == "test.write"
@@ -0,0 +1,167 @@
+"""
+Unit tests for the search result cache
+
+Covers normalizing search queries into cache keys, serving repeated searches
+from the in-process tier, sharing results through Redis and invalidating an
+index when the bulk indexer writes to it, and not caching results read
+before a write is searchable.
+"""
+
+import asyncio
+
+from app.core.search_cache import search_digest
+from app.models.elasticsearch_manager import SearchQuery, SearchScope
+
+from app.tests.unit.fakes import FakeClient, FakeRedis, make_manager
+
+
+class CountingClient(FakeClient):
+    """Counts searches; each answer carries the number of searches so far."""
+
+    def __init__(self):
+        super().__init__()
+        self.searches = []
+
+    async def search(self, index, body, size, from_, **params):
+        self.searches.append(index)
+        return {
+            "hits": {"total": {"value": 1}, "hits": [{"_index": index, "_source": {"n": len(self.searches)}}]},
+            "aggregations": {},
+            "took": 2,
+            "timed_out": False
+        }
+
+
+class WorkflowStoreClient:
+    """Stand-in for the workflow store's Elasticsearch client accepting updates and bulk writes."""
+
+    def __init__(self):
+        self.writes = 0
+
+    async def update(self, **kwargs):
+        self.writes += 1
+        return {"result": "updated"}
+
+    async def bulk(self, operations):
+        self.writes += 1
+        return {"errors": False, "items": [{"index": {"status": 201}} for _ in operations[::2]]}
+
+
+def make_cached_manager(redis=None, **settings):
+    return make_manager(
+        redis=redis,
+        client=CountingClient(),
+        search_cache_enabled=True,
+        search_cache_generation_refresh=0.0,
+        **settings
+    )
+
+
+class TestSearchResultCache:
+    """Test the two-tier search result cache"""
+
+    def test_digest_covers_every_query_field(self):
+        """Test equal queries share a key while paging, filters and scope change it"""
+        base = search_digest(SearchQuery(query="etl", filters={"status": "active", "owner": "a"}), "global")
+
+        assert base == search_digest(SearchQuery(query="etl", filters={"owner": "a", "status": "active"}), "global")
+        assert base != search_digest(SearchQuery(query="etl", filters={"owner": "a", "status": "active"}, from_=10), "global")
+        assert base != search_digest(SearchQuery(query="etl", filters={"status": "draft", "owner": "a"}), "global")
+        assert base != search_digest(SearchQuery(query="etl", filters={"status": "active", "owner": "a"}), "user")
+
+    async def test_repeated_search_is_served_from_memory(self):
+        """Test the second identical search neither searches nor reads Redis"""
+        manager = make_cached_manager()
+        analytics = manager.elasticsearch_analytics
+
+        first = await analytics.search_workflows(SearchQuery(query="etl"))
+        manager.redis.cache.clear()
+        second = await analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert analytics.client.searches == ["mabos_workflows"]
+        assert second.model_dump() == first.model_dump()
+        metrics = manager.search_cache.get_metrics()
+        assert metrics.l1_hits == 1
+        assert metrics.misses == 1
+
+    async def test_results_are_shared_through_redis(self):
+        """Test another process answers the search from the Redis tier"""
+        redis = FakeRedis()
+        first = make_cached_manager(redis)
+        second = make_cached_manager(redis)
+
+        await first.elasticsearch_analytics.search_logs(SearchQuery(query="timeout"), {"gte": "now-1h"})
+        result = await second.elasticsearch_analytics.search_logs(SearchQuery(query="timeout"), {"gte": "now-1h"})
+
+        assert second.elasticsearch_analytics.client.searches == []
+        assert result.total == 1
+        assert second.search_cache.get_metrics().redis_hits == 1
+
+        # A different time range is a different search
+        await second.elasticsearch_analytics.search_logs(SearchQuery(query="timeout"), {"gte": "now-2h"})
+        assert second.elasticsearch_analytics.client.searches == ["mabos_logs"]
+
+    async def test_bulk_writes_invalidate_only_their_index(self):
+        """Test writing an execution re-runs execution searches but keeps workflow results"""
+        manager = make_cached_manager()
+        analytics = manager.elasticsearch_analytics
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await analytics.search_executions(SearchQuery(query="etl"), SearchScope.GLOBAL)
+
+        await analytics.bulk_indexer.add("mabos_executions", {"execution_id": "e1"})
+        await analytics.bulk_indexer.flush()
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await analytics.search_executions(SearchQuery(query="etl"), SearchScope.GLOBAL)
+
+        assert analytics.client.searches == ["mabos_workflows", "mabos_executions", "mabos_executions"]
+        assert manager.search_cache.get_metrics().invalidations == 1
+        await analytics.bulk_indexer.close()
+
+    async def test_results_are_not_cached_until_a_write_is_searchable(self):
+        """Test searches right after a write go to Elasticsearch until the index has refreshed"""
+        manager = make_cached_manager(search_cache_write_settle=0.05)
+        analytics = manager.elasticsearch_analytics
+
+        await analytics.bulk_indexer.add("mabos_workflows", {"workflow_id": "wf-1"})
+        await analytics.bulk_indexer.flush()
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert analytics.client.searches == ["mabos_workflows", "mabos_workflows"]
+        assert manager.search_cache.get_metrics().unsettled_skips == 2
+
+        await asyncio.sleep(0.06)
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert len(analytics.client.searches) == 3
+        await analytics.bulk_indexer.close()
+
+    async def test_writes_of_other_processes_settle_too(self):
+        """Test a process seeing another one's write does not cache results before the refresh"""
+        redis = FakeRedis()
+        writer = make_cached_manager(redis)
+        reader = make_cached_manager(redis, search_cache_write_settle=60.0)
+        await reader.elasticsearch_analytics.search_workflows(SearchQuery(query="etl"))
+
+        await writer.search_cache.invalidate(["mabos_workflows"])
+        await reader.elasticsearch_analytics.search_workflows(SearchQuery(query="etl"))
+        await reader.elasticsearch_analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert reader.elasticsearch_analytics.client.searches == ["mabos_workflows"] * 3
+
+    async def test_workflow_store_writes_invalidate_workflow_searches(self):
+        """Test workflow syncs and outbox bulk writes re-run cached workflow searches"""
+        manager = make_cached_manager(write_buffer_enabled=False)
+        manager.elasticsearch.client = WorkflowStoreClient()
+        analytics = manager.elasticsearch_analytics
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert (await manager.sync_workflow({"id": "wf-1", "name": "ETL"}))["success"]
+        await analytics.search_workflows(SearchQuery(query="etl"))
+        await manager.elasticsearch.bulk_index_workflows([("wf-1", 2, {"name": "ETL v2"})])
+        await analytics.search_workflows(SearchQuery(query="etl"))
+
+        assert analytics.client.searches == ["mabos_workflows"] * 3
+        assert manager.search_cache.get_metrics().invalidations == 2
@@ -0,0 +1,75 @@
+"""
+Unit tests for point-in-time search pagination
+
+Covers opaque search cursors, paging through every hit with search_after
+against one point in time, and streaming all hits of a query.
+"""
+
+import pytest
+
+from app.core.search_pagination import decode_search_cursor, encode_search_cursor, with_tiebreaker
+from app.models.elasticsearch_manager import IndexType, SearchQuery
+
+from app.tests.unit.fakes import FakeClient, make_analytics
+
+DOCUMENTS = [{"_id": f"e{number:03d}", "_source": {"n": number}, "sort": [1000 - number, number]} for number in range(25)]
+
+
+class TestSearchPagination:
+    """Test search_after and point-in-time pagination"""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the values it was built from and garbage is rejected"""
+        cursor = encode_search_cursor("pit-1", [975, "e025"], 120)
+
+        assert decode_search_cursor(cursor) == {"pit": "pit-1", "after": [975, "e025"], "total": 120}
+        assert decode_search_cursor(None) is None
+        with pytest.raises(ValueError):
+            decode_search_cursor("not-a-cursor")
+
+    def test_tiebreaker_is_appended_once(self):
+        """Test the _shard_doc tiebreaker completes the sort without being repeated"""
+        assert with_tiebreaker([{"started_at": {"order": "desc"}}]) == [{"started_at": {"order": "desc"}}, {"_shard_doc": "asc"}]
+        assert with_tiebreaker([{"_shard_doc": "desc"}]) == [{"_shard_doc": "desc"}]
+
+    async def test_cursor_pages_cover_every_hit(self):
+        """Test following cursors returns every hit once and closes the point in time"""
+        client = FakeClient(DOCUMENTS)
+        manager = make_analytics(client, elasticsearch_scan_page_size=10)
+
+        pages = [await manager.search_executions(SearchQuery(query="", size=10, paginate=True))]
+        while pages[-1].cursor:
+            pages.append(await manager.search_executions(SearchQuery(query="", size=10, cursor=pages[-1].cursor)))
+
+        assert [len(page.hits) for page in pages] == [10, 10, 5]
+        assert [hit["_id"] for page in pages for hit in page.hits] == [hit["_id"] for hit in DOCUMENTS]
+        assert all(page.total == 25 for page in pages)
+        assert client.opened == ["mabos_executions"]
+        assert client.closed == ["pit-1"]
+
+        # Only the first page computes aggregations and totals
+        assert "aggs" in client.bodies[0] and "search_after" not in client.bodies[0]
+        assert all("aggs" not in body and body["track_total_hits"] is False for body in client.bodies[1:])
+        assert client.bodies[0]["sort"][-1] == {"_shard_doc": "asc"}
+
+    async def test_scan_streams_all_hits(self):
+        """Test the generator yields every hit page by page and releases the point in time"""
+        client = FakeClient(DOCUMENTS)
+        manager = make_analytics(client, elasticsearch_scan_page_size=10)
+
+        hits = [hit async for hit in manager.scan(IndexType.LOGS, SearchQuery(query="timeout"))]
+
+        assert [hit["_id"] for hit in hits] == [hit["_id"] for hit in DOCUMENTS]
+        assert len(client.bodies) == 3
+        assert client.closed == ["pit-1"]
+
+    async def test_abandoned_scan_releases_the_point_in_time(self):
+        """Test closing the generator early still closes the point in time"""
+        client = FakeClient(DOCUMENTS)
+        manager = make_analytics(client, elasticsearch_scan_page_size=10)
+
+        stream = manager.scan(IndexType.LOGS, SearchQuery(query=""))
+        assert (await stream.__anext__())["_id"] == "e000"
+        await stream.aclose()
+
+        assert client.closed == ["pit-1"]
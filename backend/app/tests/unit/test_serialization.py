@@ -0,0 +1,46 @@
+"""
+Unit tests for single-pass Neo4j serialization
+
+Checks that driver values encode to the same JSON shape as the previous
+recursive conversion.
+"""
+
+from datetime import datetime, timezone
+
+from neo4j.time import Date, DateTime, Duration
+
+from app.core.serialization import RawJSONResponse, dumps, loads, to_builtin
+
+
+class TestSerialization:
+    """Test JSON encoding of Neo4j driver values"""
+
+    def test_temporal_values_encode_as_iso_strings(self):
+        """Test Neo4j temporal types are encoded as ISO 8601 strings"""
+        value = {
+            "created_at": DateTime(2025, 1, 1, 12, 30, 15, 500000000, tzinfo=timezone.utc),
+            "due": Date(2025, 2, 3),
+            "window": Duration(days=2),
+            "native": datetime(2025, 1, 1, 8, 0, 0),
+        }
+
+        decoded = loads(dumps(value))
+
+        assert decoded["created_at"] == "2025-01-01T12:30:15.500000+00:00"
+        assert decoded["due"] == "2025-02-03"
+        assert decoded["window"] == "P2D"
+        assert decoded["native"] == "2025-01-01T08:00:00"
+
+    def test_to_builtin_converts_containers(self):
+        """Test sets and tuples become lists and nested dicts are preserved"""
+        value = {"tags": ("a", "b"), "nested": {"ids": frozenset([1])}}
+
+        assert to_builtin(value) == {"tags": ["a", "b"], "nested": {"ids": [1]}}
+
+    def test_raw_json_response_passes_bytes_through(self):
+        """Test pre-encoded bytes are sent without re-encoding"""
+        body = dumps({"agent_id": "agent-1"})
+        response = RawJSONResponse(body)
+
+        assert response.body == body
+        assert response.headers["content-type"] == "application/json"
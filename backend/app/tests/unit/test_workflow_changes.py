@@ -0,0 +1,134 @@
+"""
+Unit tests for workflow change detection
+
+Covers canonical content hashing, skipping unchanged syncs, propagating only
+changed and removed fields, and retrying after a partial failure.
+"""
+
+from app.core.database import DatabaseConfig, RedisManager
+from app.core.workflow_changes import content_hash, detect_changes
+
+from app.tests.unit.fakes import FakeElasticsearch, FakeRedis, make_manager
+
+
+class BrokenClient:
+    """Redis client whose reads fail."""
+
+    async def get(self, key):
+        raise ConnectionError("redis unavailable")
+
+
+class UnreadableStateRedis(FakeRedis):
+    """Reads raw values through RedisManager.get_raw over a failing client while failing is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = False
+        self.broken = RedisManager(DatabaseConfig())
+        self.broken.redis_client = BrokenClient()
+
+    async def get_raw(self, key, raise_errors=False):
+        if self.failing:
+            return await self.broken.get_raw(key, raise_errors=raise_errors)
+        return await super().get_raw(key, raise_errors)
+
+    async def get_cache(self, key):
+        return await self.broken.get_cache(key) if self.failing else await super().get_cache(key)
+
+
+def make_sync_manager(**settings):
+    return make_manager(
+        redis=UnreadableStateRedis(), elasticsearch=FakeElasticsearch(), write_buffer_enabled=False, **settings
+    )
+
+
+WORKFLOW = {"id": "wf-1", "name": "Onboarding", "steps": [{"id": "s1", "type": "task"}], "tags": ["hr"]}
+
+
+class TestWorkflowChanges:
+    """Test content-hash change detection for workflow sync"""
+
+    def test_hash_ignores_key_order(self):
+        """Test equal payloads hash equally regardless of key order"""
+        assert content_hash({"a": 1, "b": {"c": 2, "d": 3}}) == content_hash({"b": {"d": 3, "c": 2}, "a": 1})
+        assert content_hash({"a": 1}) != content_hash({"a": 1.5})
+
+        state = detect_changes(WORKFLOW, None).state()
+        reordered = dict(reversed(list(WORKFLOW.items())))
+        assert detect_changes(reordered, state).unchanged
+
+    async def test_unchanged_payload_is_skipped(self):
+        """Test repeated syncs of the same payload touch no store"""
+        manager = make_sync_manager()
+
+        first = await manager.sync_workflow(dict(WORKFLOW))
+        second = await manager.sync_workflow(dict(WORKFLOW))
+
+        assert first["status"] == "updated"
+        assert second["status"] == "unchanged"
+        assert len(manager.neo4j.beliefs) == 1
+        assert len(manager.redis.hash_writes) == 1
+        assert len(manager.elasticsearch.updates) == 1
+        assert manager.redis.hash_writes[0]["replace"] is True
+
+    async def test_only_changed_fields_are_propagated(self):
+        """Test a changed payload patches only its changed and removed fields"""
+        manager = make_sync_manager()
+        await manager.sync_workflow(dict(WORKFLOW))
+
+        changed = {key: value for key, value in WORKFLOW.items() if key != "tags"}
+        changed["name"] = "Employee onboarding"
+        result = await manager.sync_workflow(changed)
+
+        assert result["status"] == "updated"
+        assert result["changed_fields"] == ["name"]
+        assert result["removed_fields"] == ["tags"]
+        assert manager.redis.hash_writes[-1] == {
+            "key": "workflow:cache:wf-1", "fields": ["name"], "removed": ["tags"], "replace": False
+        }
+        assert manager.elasticsearch.updates[-1] == {"fields": ["name"], "removed": ["tags"]}
+        # The created belief is only asserted on the first sync
+        assert len(manager.neo4j.beliefs) == 1
+
+    async def test_failed_sync_is_retried_by_the_next_call(self):
+        """Test the last synced state is only recorded once every store succeeded"""
+        manager = make_sync_manager()
+        manager.elasticsearch.fail = True
+
+        failed = await manager.sync_workflow(dict(WORKFLOW))
+
+        assert failed["success"] is False
+        assert "workflow:sync:wf-1" not in manager.redis.values
+
+        manager.elasticsearch.fail = False
+        retried = await manager.sync_workflow(dict(WORKFLOW))
+
+        assert retried["success"] is True
+        assert retried["status"] == "updated"
+
+    async def test_unreadable_state_replaces_without_creating(self):
+        """Test a sync whose last state cannot be read replaces the cache but asserts no created belief"""
+        manager = make_sync_manager()
+        await manager.sync_workflow(dict(WORKFLOW))
+        manager.neo4j.beliefs.clear()
+        manager.redis.failing = True
+
+        result = await manager.sync_workflow({**WORKFLOW, "name": "Employee onboarding"})
+
+        assert result["success"] is True
+        assert result["changed_fields"] == sorted(WORKFLOW)
+        assert manager.redis.hash_writes[-1]["replace"] is True
+        assert manager.neo4j.beliefs == {}
+        assert (await manager.get_cached_workflow("wf-1"))["name"] == "Employee onboarding"
+
+    async def test_expired_state_does_not_duplicate_the_created_belief(self):
+        """Test a sync after the recorded state expired re-merges the same created belief"""
+        manager = make_sync_manager()
+        await manager.sync_workflow(dict(WORKFLOW))
+        del manager.redis.values["workflow:sync:wf-1"]
+
+        result = await manager.sync_workflow(dict(WORKFLOW))
+
+        assert result["status"] == "updated"
+        assert list(manager.neo4j.beliefs) == ["workflow_wf-1_created"]
+        assert await manager.get_cached_workflow("wf-1") == WORKFLOW
@@ -0,0 +1,176 @@
+"""
+Unit tests for the workflow outbox
+
+Covers enqueueing without touching the target stores, batched relay to
+Neo4j, Redis and Elasticsearch, per-target retry, dead rows and idempotent
+redelivery.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.core.workflow_outbox import CLAIM_SQL, DELIVERED_SQL, ENQUEUE_SQL, RETRY_SQL
+
+from app.tests.unit.fakes import FakeElasticsearch, FakePostgres, make_manager
+
+
+class OutboxPostgres(FakePostgres):
+    """Emulates the workflow_outbox table for the outbox statements."""
+
+    async def execute_many(self, query, rows):
+        now = datetime.now(timezone.utc)
+        for params in rows:
+            if query is ENQUEUE_SQL:
+                if any(row["event_id"] == params["event_id"] and row["target"] == params["target"] for row in self.rows):
+                    continue
+                self.rows.append({
+                    **params, "id": len(self.rows) + 1, "status": "pending", "attempts": 0,
+                    "available_at": now, "created_at": now, "last_error": None
+                })
+            elif query is DELIVERED_SQL:
+                self.row(params["id"])["status"] = "delivered"
+            elif query is RETRY_SQL:
+                row = self.row(params["id"])
+                row["status"] = "dead" if row["attempts"] >= params["max_attempts"] else "pending"
+                row["available_at"] = now + timedelta(seconds=params["delay"])
+                row["last_error"] = params["error"]
+        return len(rows)
+
+    async def execute_query(self, query, params=None):
+        assert query is CLAIM_SQL
+        now = datetime.now(timezone.utc)
+        claimed = [
+            row for row in self.rows
+            if row["target"] == params["target"] and row["status"] == "pending" and row["available_at"] <= now
+        ][:params["limit"]]
+        for row in claimed:
+            row["attempts"] += 1
+            row["available_at"] = now + timedelta(seconds=params["lease"])
+        return [{key: row[key] for key in ("id", "event_id", "workflow_id", "payload", "attempts", "created_at")} for row in claimed]
+
+    def row(self, row_id):
+        return next(row for row in self.rows if row["id"] == row_id)
+
+    def make_available(self):
+        for row in self.rows:
+            row["available_at"] = datetime.now(timezone.utc)
+
+
+def make_outbox_manager(**settings):
+    return make_manager(
+        postgres=OutboxPostgres(), elasticsearch=FakeElasticsearch(), workflow_outbox_enabled=True, **settings
+    )
+
+
+async def relay_all(manager):
+    for target in manager.config.workflow_outbox_targets:
+        await manager.workflow_outbox.relay_once(target)
+
+
+class TestWorkflowOutbox:
+    """Test the transactional workflow outbox and its relays"""
+
+    async def test_sync_is_queued_then_relayed_to_every_store(self):
+        """Test a sync only writes the outbox and the relays deliver it to each target"""
+        manager = make_outbox_manager()
+
+        assert await manager.sync_workflow_to_knowledge_graph({"id": "wf-1", "name": "Onboarding"})
+
+        assert [row["target"] for row in manager.postgres.rows] == ["neo4j", "redis", "elasticsearch"]
+        assert manager.neo4j.beliefs == {} and manager.redis.hashes == {} and manager.elasticsearch.documents == {}
+
+        await relay_all(manager)
+
+        assert {row["status"] for row in manager.postgres.rows} == {"delivered"}
+        assert [belief["content"] for belief in manager.neo4j.beliefs.values()] == ["workflow_wf-1_created"]
+        assert manager.redis.decoded_hash("workflow:cache:wf-1") == {"id": "wf-1", "name": "Onboarding"}
+        assert manager.elasticsearch.documents["wf-1"][1]["name"] == "Onboarding"
+
+        metrics = manager.workflow_outbox.get_metrics()
+        assert metrics.enqueued == 1
+        assert all(target.delivered == 1 and target.max_lag_ms >= 0 for target in metrics.targets.values())
+
+    async def test_failed_target_is_retried_without_blocking_the_others(self):
+        """Test a failing store is retried with backoff and redelivery stays idempotent"""
+        manager = make_outbox_manager()
+        await manager.workflow_outbox.enqueue({"id": "wf-1", "name": "Onboarding"})
+        manager.neo4j.fail = True
+
+        await relay_all(manager)
+
+        statuses = {row["target"]: row["status"] for row in manager.postgres.rows}
+        assert statuses == {"neo4j": "pending", "redis": "delivered", "elasticsearch": "delivered"}
+        assert manager.postgres.rows[0]["last_error"] == "neo4j unavailable"
+
+        # Backoff keeps the row hidden until it is due
+        manager.neo4j.fail = False
+        assert await manager.workflow_outbox.relay_once("neo4j") == 0
+
+        manager.postgres.make_available()
+        assert await manager.workflow_outbox.relay_once("neo4j") == 1
+        assert len(manager.neo4j.beliefs) == 1
+        assert manager.workflow_outbox.get_metrics().targets["neo4j"].failed_attempts == 1
+
+    async def test_unchanged_sync_is_not_queued(self):
+        """Test a payload identical to the last queued one adds no outbox rows"""
+        manager = make_outbox_manager()
+
+        queued = await manager.sync_workflow({"id": "wf-1", "name": "Onboarding"})
+        repeated = await manager.sync_workflow({"name": "Onboarding", "id": "wf-1"})
+
+        assert "event_id" in queued
+        assert repeated["status"] == "unchanged"
+        assert len(manager.postgres.rows) == 3
+
+    async def test_changed_sync_asserts_no_created_belief(self):
+        """Test only the sync creating a workflow is delivered to Neo4j"""
+        manager = make_outbox_manager()
+
+        await manager.sync_workflow({"id": "wf-1", "name": "Onboarding"})
+        changed = await manager.sync_workflow({"id": "wf-1", "name": "Onboarding v2"})
+        await relay_all(manager)
+
+        assert changed["status"] == "updated"
+        assert [row["target"] for row in manager.postgres.rows] == [
+            "neo4j", "redis", "elasticsearch", "redis", "elasticsearch"
+        ]
+        assert [belief["content"] for belief in manager.neo4j.beliefs.values()] == ["workflow_wf-1_created"]
+        assert manager.redis.decoded_hash("workflow:cache:wf-1")["name"] == "Onboarding v2"
+
+    async def test_rows_are_dead_after_max_attempts(self):
+        """Test a row failing max_attempts times is no longer retried"""
+        manager = make_outbox_manager(workflow_outbox_max_attempts=2, workflow_outbox_targets=["neo4j"])
+        await manager.workflow_outbox.enqueue({"id": "wf-1"})
+        manager.neo4j.fail = True
+
+        for _ in range(3):
+            await manager.workflow_outbox.relay_once("neo4j")
+            manager.postgres.make_available()
+
+        assert manager.postgres.rows[0]["status"] == "dead"
+        assert manager.postgres.rows[0]["attempts"] == 2
+        assert manager.workflow_outbox.get_metrics().targets["neo4j"].dead == 1
+
+    async def test_idempotency_key_is_queued_once(self):
+        """Test a repeated event id does not queue the sync again"""
+        manager = make_outbox_manager()
+
+        first = await manager.workflow_outbox.enqueue({"id": "wf-1"}, event_id="client-key")
+        second = await manager.workflow_outbox.enqueue({"id": "wf-1"}, event_id="client-key")
+
+        assert first == second == "client-key"
+        assert len(manager.postgres.rows) == 3
+
+    async def test_older_event_does_not_overwrite_newer_cache(self):
+        """Test a redelivered older event leaves the newer cached workflow in place"""
+        manager = make_outbox_manager(workflow_outbox_targets=["redis"])
+        await manager.workflow_outbox.enqueue({"id": "wf-1", "name": "v1"})
+        await manager.workflow_outbox.enqueue({"id": "wf-1", "name": "v2"})
+        await manager.workflow_outbox.relay_once("redis")
+
+        # Replay the first event as if its acknowledgement had been lost
+        manager.postgres.rows[0]["status"] = "pending"
+        await manager.workflow_outbox.relay_once("redis")
+
+        assert manager.redis.decoded_hash("workflow:cache:wf-1")["name"] == "v2"
+        assert json.loads(manager.postgres.rows[0]["payload"])["name"] == "v1"
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized batch enrichment
+
+Compares the per-document enrichment of the analytics manager
+(_enrich_execution, _enrich_agent, _enrich_metrics) with the NumPy batch
+enrichment used by the reindex pipeline, on one core and without any
+database.
+
+Usage:
+    cd backend && python benchmarks/benchmark_batch_enrichment.py [document_count] [batch_size]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.batch_enrichment import BATCH_ENRICHERS
+from app.core.database import DatabaseConfig
+from app.models.elasticsearch_manager import ElasticsearchAnalyticsManager
+
+
+def build_documents(rng: random.Random, document_count: int):
+    """Executions, agents and metrics shaped like the index_* inputs"""
+    executions = [
+        {
+            "execution_id": f"e{n}",
+            "workflow_id": f"wf{n % 500}",
+            "status": rng.choice(("completed", "failed", "running")),
+            "started_at": f"2026-03-{n % 28 + 1:02d}T10:00:00Z",
+            "duration": rng.uniform(0, 120),
+            "step_count": rng.randint(0, 20),
+            "completed_steps": rng.randint(0, 20)
+        }
+        for n in range(document_count)
+    ]
+    agents = [
+        {
+            "agent_id": f"a{n}",
+            "performance_metrics": {
+                "success_rate": rng.random(),
+                "avg_response_time": rng.uniform(0, 20),
+                "uptime_percentage": rng.random(),
+                "error_count": rng.randint(0, 50),
+                "tasks_completed": rng.randint(0, 500)
+            }
+        }
+        for n in range(document_count)
+    ]
+    metrics = [
+        {"metric_name": "usage", "metric_type": rng.choice(("cpu_usage", "memory_usage", "latency")), "value": rng.uniform(0, 100)}
+        for _ in range(document_count)
+    ]
+    return {"executions": executions, "agents": agents, "metrics": metrics}
+
+
+def main(document_count: int, batch_size: int) -> None:
+    manager = ElasticsearchAnalyticsManager(DatabaseConfig(elasticsearch_bulk_enabled=False))
+    per_document = {
+        "executions": manager._enrich_execution,
+        "agents": manager._enrich_agent,
+        "metrics": manager._enrich_metrics
+    }
+    documents = build_documents(random.Random(7), document_count)
+
+    print(f"{document_count} documents per type, batches of {batch_size}")
+    print(f"{'type':<12}{'per document':>16}{'batched':>16}{'speedup':>10}")
+    for index_type, enrich in per_document.items():
+        source = documents[index_type]
+
+        start = time.perf_counter()
+        for document in source:
+            enrich(document)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, len(source), batch_size):
+            BATCH_ENRICHERS[index_type](source[offset:offset + batch_size])
+        batched = time.perf_counter() - start
+
+        print(
+            f"{index_type:<12}{document_count / single:>12.0f} d/s"
+            f"{document_count / batched:>12.0f} d/s{single / batched:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    main(count, size)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate belief detection
+
+Measures the in-process cost the deduplication stage adds to the bulk belief
+path: one MinHash signature and one LSH lookup per belief, against agents that
+already hold a few hundred sketched beliefs. Runs without any database.
+
+Usage:
+    cd backend && python benchmarks/benchmark_belief_dedup.py [belief_count] [agent_count] [duplicate_ratio]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.belief_dedup import AgentSketchIndex, MinHasher
+
+def vocabulary(rng: random.Random, size: int = 2000):
+    """Pseudo-words of 3 to 10 letters"""
+    return ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def sentence(rng: random.Random, words) -> str:
+    return " ".join(rng.choice(words) for _ in range(rng.randint(6, 14)))
+
+
+def main(belief_count: int, agent_count: int, duplicate_ratio: float) -> None:
+    rng = random.Random(7)
+    words = vocabulary(rng)
+    hasher = MinHasher()
+    indexes = {f"agent_{i}": AgentSketchIndex(bands=16) for i in range(agent_count)}
+    history = {agent_id: [] for agent_id in indexes}
+
+    # Existing beliefs per agent
+    for agent_id, index in indexes.items():
+        for n in range(300):
+            content = sentence(rng, words)
+            index.add(f"{agent_id}_{n}", "market", hasher.signature(content))
+            history[agent_id].append(content)
+
+    beliefs = []
+    for _ in range(belief_count):
+        agent_id = rng.choice(list(indexes))
+        if rng.random() < duplicate_ratio:
+            content = rng.choice(history[agent_id]) + rng.choice(("", ".", "!", " now"))
+        else:
+            content = sentence(rng, words)
+        beliefs.append((agent_id, content))
+
+    folded = 0
+    candidates = 0
+    start = time.perf_counter()
+    # Signatures are computed per chunk, as on the bulk belief path
+    signatures = hasher.signatures([content for _, content in beliefs])
+    for n, ((agent_id, _), signature) in enumerate(zip(beliefs, signatures)):
+        target, checked = indexes[agent_id].match("market", signature, 0.8)
+        candidates += checked
+        if target is None:
+            indexes[agent_id].add(f"new_{n}", "market", signature)
+        else:
+            folded += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{belief_count} beliefs over {agent_count} agents holding 300 sketches each")
+    print(f"{'throughput':<24}{belief_count / elapsed:>12.0f} beliefs/s")
+    print(f"{'per belief':<24}{elapsed * 1e6 / belief_count:>12.1f} us")
+    print(f"{'candidates per belief':<24}{candidates / belief_count:>12.2f}")
+    print(f"{'dedup rate':<24}{folded / belief_count:>12.1%}  (injected {duplicate_ratio:.0%})")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    agents = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+    main(count, agents, ratio)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark belief ingestion throughput
+
+Compares the single-belief path (one Cypher transaction per belief, as issued
+by `POST /api/agents/{agent_id}/beliefs`) with the bulk path (one UNWIND
+statement per chunk, as issued by `POST /api/agents/beliefs:bulk`).
+
+Requires a running Neo4j configured through the usual NEO4J_* settings. The
+benchmark creates its own agents and removes them and their beliefs afterwards.
+
+Usage:
+    cd backend && python benchmarks/benchmark_belief_ingestion.py [belief_count] [agent_count] [concurrency]
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import DatabaseConfig, Neo4jManager
+
+AGENT_PREFIX = "benchmark_ingestion_agent_"
+
+
+def build_beliefs(belief_count: int, agent_count: int):
+    """Build beliefs spread round-robin over the benchmark agents"""
+    return [
+        {
+            "agent_id": f"{AGENT_PREFIX}{i % agent_count}",
+            "category": "perception",
+            "content": f"observation_{i}",
+            "confidence": 0.9,
+            "source": "benchmark",
+            "description": "Benchmark belief"
+        }
+        for i in range(belief_count)
+    ]
+
+
+async def run_single(neo4j: Neo4jManager, beliefs, concurrency: int) -> float:
+    """Create beliefs one transaction at a time with bounded concurrency"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(belief):
+        async with semaphore:
+            data = {key: value for key, value in belief.items() if key != "agent_id"}
+            await neo4j.create_agent_belief(belief["agent_id"], data)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(create(belief) for belief in beliefs))
+    return time.perf_counter() - start
+
+
+async def run_bulk(neo4j: Neo4jManager, beliefs, chunk_size: int) -> float:
+    """Create beliefs with one UNWIND statement per agent-grouped chunk"""
+    rows = sorted(beliefs, key=lambda belief: belief["agent_id"])
+
+    start = time.perf_counter()
+    for offset in range(0, len(rows), chunk_size):
+        await neo4j.create_agent_beliefs_bulk(rows[offset:offset + chunk_size])
+    return time.perf_counter() - start
+
+
+async def main(belief_count: int, agent_count: int, concurrency: int) -> None:
+    config = DatabaseConfig()
+    neo4j = Neo4jManager(config)
+    await neo4j.initialize()
+
+    try:
+        await neo4j.execute_write(
+            "UNWIND range(0, $count - 1) AS i MERGE (:Agent {id: $prefix + toString(i)})",
+            {"count": agent_count, "prefix": AGENT_PREFIX}
+        )
+        beliefs = build_beliefs(belief_count, agent_count)
+
+        print(f"Ingesting {belief_count} beliefs for {agent_count} agents")
+        single = await run_single(neo4j, beliefs, concurrency)
+        print(f"{'single-belief transactions':<36}{single:>8.2f} s  {belief_count / single:>10.0f} beliefs/s")
+        bulk = await run_bulk(neo4j, beliefs, config.belief_bulk_chunk_size)
+        print(f"{'bulk UNWIND (chunk ' + str(config.belief_bulk_chunk_size) + ')':<36}{bulk:>8.2f} s  {belief_count / bulk:>10.0f} beliefs/s")
+        print(f"speedup: {single / bulk:.1f}x")
+    finally:
+        await neo4j.execute_write(
+            "MATCH (a:Agent) WHERE a.id STARTS WITH $prefix OPTIONAL MATCH (a)-[:HAS_BELIEF]->(b:Belief) DETACH DELETE a, b",
+            {"prefix": AGENT_PREFIX}
+        )
+        await neo4j.driver_factory.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    agents = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    parallel = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+    asyncio.run(main(count, agents, parallel))
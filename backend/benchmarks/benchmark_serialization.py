@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark Neo4j result serialization
+
+Compares the previous response path (Record.data(), the recursive
+`_serialize_neo4j_types` walk and FastAPI's jsonable_encoder + json.dumps)
+against the single-pass `app.core.serialization.dumps` encoder on an agent
+knowledge graph with 10k belief nodes.
+
+Usage:
+    cd backend && python benchmarks/benchmark_serialization.py [node_count]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder
+from neo4j import Record
+from neo4j.graph import Graph, Node
+from neo4j.time import DateTime
+
+from app.core.serialization import dumps
+
+
+def legacy_serialize(obj):
+    """The recursive walk previously used by Neo4jManager"""
+    if hasattr(obj, '__dict__'):
+        from neo4j.time import DateTime
+        if isinstance(obj, DateTime):
+            return obj.isoformat()
+
+    if isinstance(obj, dict):
+        return {key: legacy_serialize(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_serialize(item) for item in obj]
+    elif hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    else:
+        return obj
+
+
+def build_record(node_count: int) -> Record:
+    """Build an agent knowledge graph record with node_count beliefs"""
+    graph = Graph()
+    created_at = DateTime(2025, 1, 1, 12, 0, 0)
+
+    agent = Node(graph, "agent", 0, ["Agent"], {"id": "agent_001", "status": "active", "created_at": created_at})
+    beliefs = [
+        Node(graph, f"belief_{i}", i + 1, ["Belief"], {
+            "id": f"belief_{i}",
+            "category": "workflow_status",
+            "content": f"workflow_{i}_created",
+            "confidence": 0.95,
+            "source": "workflow_manager",
+            "created_at": created_at,
+            "last_updated": created_at,
+            "description": "Benchmark belief"
+        })
+        for i in range(node_count)
+    ]
+    return Record({"agent": agent, "beliefs": beliefs, "desires": [], "intentions": [], "plans": []})
+
+
+def timed(label: str, func, repeat: int = 5) -> float:
+    """Run func several times and report the best wall time"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:8.1f} ms")
+    return best
+
+
+def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    record = build_record(node_count)
+
+    def legacy_path():
+        context = legacy_serialize(record.data())
+        return json.dumps(jsonable_encoder(context)).encode()
+
+    print(f"Serializing an agent knowledge graph with {node_count} nodes")
+    legacy = timed("data() + walk + jsonable_encoder", legacy_path)
+    single_pass = timed("single-pass dumps (driver records)", lambda: dumps(dict(record)))
+    print(f"speedup: {legacy / single_pass:.1f}x")
+
+
+if __name__ == "__main__":
+    main()